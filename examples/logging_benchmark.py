@@ -0,0 +1,117 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Micro-benchmark of logging of streamed tool output.
+
+Compares throughput of a thread logging lines of output (like runner streaming output of ruff) with records written
+directly by the stream handler and with records put into a queue written by a thread of its listener. Terminal is
+simulated by a stream which waits given time on every write.
+
+Usage: python examples/logging_benchmark.py [--records N] [--write-delay us]
+"""
+
+import argparse
+import io
+import logging
+import time
+
+from mfd_code_quality.log_formatter import CustomLogFormatter
+from mfd_code_quality.log_queue import enqueue_handler
+
+
+class SlowStream(io.TextIOBase):
+    """Stream discarding written text after given delay, like a terminal which is slower than the logging thread."""
+
+    def __init__(self, delay: float) -> None:
+        """
+        Init.
+
+        :param delay: Seconds of waiting on every write.
+        """
+        self.delay = delay
+
+    def write(self, s: str) -> int:
+        """Wait and discard text."""
+        deadline = time.perf_counter() + self.delay
+        while time.perf_counter() < deadline:
+            pass
+        return len(s)
+
+
+def create_handler(delay: float) -> logging.StreamHandler:
+    """
+    Create stream handler formatting records like set_up_logging.
+
+    :param delay: Seconds of waiting on every write.
+    :return: Handler.
+    """
+    handler = logging.StreamHandler(SlowStream(delay))
+    handler.setFormatter(
+        CustomLogFormatter(logging.Formatter("%(asctime)s | %(name)13.13s | %(levelname)4.4s | ", "%H:%M:%S"))
+    )
+    return handler
+
+
+def log_lines(logger: logging.Logger, records: int) -> float:
+    """
+    Log lines of output.
+
+    :param logger: Logger.
+    :param records: Number of lines.
+    :return: Seconds spent by the logging thread.
+    """
+    start = time.perf_counter()
+    for i in range(records):
+        logger.info(f"samplepkg/module_{i % 50}.py:{i}:1: F401 `os` imported but unused")
+    return time.perf_counter() - start
+
+
+def benchmark_formatter(records: int) -> None:
+    """
+    Measure formatter alone with single-line and multi-line messages.
+
+    :param records: Number of records.
+    """
+    formatter = create_handler(0).formatter
+    for kind, message in [("single-line", "Checking 'ruff check'..."), ("multi-line", "Output:\nfirst\nsecond")]:
+        record = logging.LogRecord("mfd-code-quality.checks", logging.INFO, __file__, 1, message, None, None)
+        start = time.perf_counter()
+        for _ in range(records):
+            formatter.format(record)
+        print(f"Formatter, {kind} messages: {records / (time.perf_counter() - start):,.0f} records/s")
+
+
+def main() -> None:
+    """Run benchmark."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=20000, help="Number of logged lines.")
+    parser.add_argument("--write-delay", type=float, default=20, help="Microseconds of every write to the terminal.")
+    args = parser.parse_args()
+    delay = args.write_delay / 1e6
+
+    benchmark_formatter(args.records)
+
+    logger = logging.getLogger("mfd-code-quality.benchmark")
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+    handler = create_handler(delay)
+    logger.addHandler(handler)
+    elapsed = log_lines(logger, args.records)
+    logger.removeHandler(handler)
+    print(f"Stream handler: {args.records / elapsed:,.0f} records/s, logging thread busy for {elapsed:.2f} s")
+
+    logger.addHandler(create_handler(delay))
+    queue_handler = enqueue_handler(logger, logger.handlers[0])
+    elapsed = log_lines(logger, args.records)
+    start = time.perf_counter()
+    queue_handler.close()
+    drained = time.perf_counter() - start
+    print(
+        f"Queue handler: {args.records / elapsed:,.0f} records/s, logging thread busy for {elapsed:.2f} s, "
+        f"queue written {drained:.2f} s later"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,355 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Programmatic API.
+
+Checks are run with options given explicitly instead of command line arguments and return results instead of exiting
+the process, so one long-lived process can check many projects:
+
+    from mfd_code_quality.api import CheckOptions, run_all_checks, run_check
+
+    result = run_check("mfd-code-standard", CheckOptions(project_dir="path/to/project"))
+    results = run_all_checks(CheckOptions(project_dir="path/to/other/project", jobs=4))
+
+Options are bound to the calling thread or asyncio task, so checks of different projects can run in parallel threads.
+Code standard checks are run in the calling process, tools they start get the project directory as working directory.
+Tests (import, unit, system) and coverage combining run pytest and coverage, which resolve relative paths against
+the working directory and import modules of the project - each of these checks is run in its own worker process
+started in the project directory, so the working directory, sys.path, modules and environment of the caller are never
+changed. Output of the worker (e.g. of pytest) is written to stderr of the caller.
+
+Logging is not configured, records are emitted by `mfd-code-quality.*` loggers, records of worker processes are passed
+to loggers of the same name in the calling process.
+"""
+
+import dataclasses
+import importlib
+import logging
+import os
+import pickle
+import subprocess
+import sys
+import time
+from argparse import Namespace
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Iterator, NamedTuple
+
+from mfd_code_quality.code_standard.checks import _get_available_code_standard_module
+from mfd_code_quality.code_standard.configure import create_config_files, delete_config_files
+from mfd_code_quality.testing_utilities.static_imports import clear_resolution_cache
+from mfd_code_quality.utils import (
+    CACHE_DIR_NAME,
+    RUN_ID_ENV_VAR,
+    RUNS_DIR_NAME,
+    create_argument_parser,
+    create_run_id,
+    use_options,
+)
+
+logger = logging.getLogger("mfd-code-quality.api")
+
+
+class ApiCheck(NamedTuple):
+    """Check run by api."""
+
+    path: str  # `<module>:<function>` returning True if check passed
+    kwargs: dict[str, Any]  # keyword arguments of the function
+    with_configs: bool  # function creates ruff configuration files unless it's called with with_configs=False
+    in_worker: bool  # check is run in a worker process started in the project directory
+
+
+API_CHECKS = {
+    "mfd-code-standard": ApiCheck("mfd_code_quality.code_standard.checks:_run_code_standard_tests", {}, True, False),
+    "mfd-code-format": ApiCheck("mfd_code_quality.code_standard.formats:_format_code", {}, False, False),
+    "mfd-import-tests": ApiCheck("mfd_code_quality.testing_utilities.import_tests:_run_import_tests", {}, False, True),
+    "mfd-unit-tests": ApiCheck(
+        "mfd_code_quality.testing_utilities.unit_tests:_run_unit_tests", {"compare_coverage": False}, True, True
+    ),
+    "mfd-unit-tests-with-coverage": ApiCheck(
+        "mfd_code_quality.testing_utilities.unit_tests:_run_unit_tests", {"compare_coverage": True}, True, True
+    ),
+    "mfd-coverage-combine": ApiCheck("mfd_code_quality.coverage.combine:_combine_coverage", {}, True, True),
+    "mfd-system-tests": ApiCheck("mfd_code_quality.testing_utilities.system_tests:_run_system_tests", {}, False, True),
+}
+
+# checks of mfd-all-checks, in its order
+ALL_CHECKS = ("mfd-code-standard", "mfd-import-tests", "mfd-system-tests", "mfd-unit-tests-with-coverage")
+
+WORKER_LOGGER_NAME = "mfd-code-quality"  # records of this logger and its children are passed from worker processes
+
+
+@dataclass(frozen=True)
+class CheckOptions:
+    """Options of checks, the same as command line arguments of mfd-* commands (see mfd-help)."""
+
+    project_dir: str | Path
+    no_cache: bool = False
+    jobs: int | None = None
+    tool_timeout: float | None = None
+    tool_output_lines: int | None = None
+    import_time_budget: float | None = None
+    module_import_time_budget: float | None = None
+    strict_import_side_effects: bool = False
+    workers: int | None = None
+    fail_fast: bool = False
+    test_timeout: float | None = None
+    stage_timeout: float | None = None
+    max_worker_rss: int | None = None
+    warm_up_bytecode: bool = False
+    coverage_report: tuple[str, ...] = ()
+    shard: tuple[int, int] | None = None
+
+    @classmethod
+    def from_namespace(cls: "type[CheckOptions]", namespace: Namespace, project_dir: str | Path) -> "CheckOptions":
+        """
+        Create options of the project from parsed command line arguments, e.g. for all projects checked by mfd-batch.
+
+        :param namespace: Parsed command line arguments.
+        :param project_dir: Path of the project.
+        :return: Options.
+        """
+        values = {field.name: getattr(namespace, field.name) for field in dataclasses.fields(cls)}
+        values.update(project_dir=project_dir, coverage_report=tuple(namespace.coverage_report or ()))
+        return cls(**values)
+
+    def to_namespace(self) -> Namespace:
+        """
+        Convert options to namespace of parsed command line arguments, arguments not given here get their defaults.
+
+        :return: Namespace with absolute path of the project.
+        """
+        namespace = create_argument_parser().parse_args([])
+        for field in dataclasses.fields(self):
+            setattr(namespace, field.name, getattr(self, field.name))
+        namespace.project_dir = str(Path(self.project_dir).resolve())
+        namespace.coverage_report = list(self.coverage_report) or None
+        return namespace
+
+
+@dataclass(frozen=True)
+class CheckResult:
+    """Result of a check."""
+
+    check: str  # name of the check, e.g. mfd-unit-tests
+    project_dir: Path
+    passed: bool
+    duration: float  # seconds
+    run_id: str  # artifacts are stored in .mfd_code_quality/runs/<run_id> of the project
+    error: str | None = None  # exception which stopped the check
+
+    @property
+    def run_dir(self) -> Path:
+        """Directory with artifacts of the run."""
+        return self.project_dir / CACHE_DIR_NAME / RUNS_DIR_NAME / self.run_id
+
+
+def run_check(
+    check: str, options: CheckOptions, *, run_id: str | None = None, with_configs: bool = True
+) -> CheckResult:
+    """
+    Run check of the project, tests and coverage combining are run in a worker process, other checks in the calling one.
+
+    :param check: Name of the check, one of API_CHECKS, e.g. mfd-unit-tests.
+    :param options: Options of the check.
+    :param run_id: Id of run the check belongs to, a new run is started by default.
+    :param with_configs: Should checks using ruff configuration files create them before running.
+    :return: Result of the check, exceptions raised by the check are reported in it as well.
+    :raises ValueError: When check is unknown.
+    """
+    if check not in API_CHECKS:
+        raise ValueError(f"Unknown check '{check}', available checks: {', '.join(API_CHECKS)}")
+    api_check = API_CHECKS[check]
+    namespace = options.to_namespace()
+    project_dir = Path(namespace.project_dir)
+    run_id = run_id or create_run_id()
+    kwargs = {**api_check.kwargs, **({"with_configs": with_configs} if api_check.with_configs else {})}
+
+    start = time.perf_counter()
+    if api_check.in_worker:
+        try:
+            passed, error = _run_in_worker(api_check.path, namespace, run_id, kwargs)
+        except Exception as e:
+            logger.exception(f"Worker running {check} of {project_dir} failed.")
+            passed, error = False, repr(e)
+    else:
+        passed, error = _run_check_function(api_check.path, namespace, run_id, kwargs)
+    return CheckResult(check, project_dir, passed, time.perf_counter() - start, run_id, error)
+
+
+def run_all_checks(options: CheckOptions) -> list[CheckResult]:
+    """
+    Run all checks of mfd-all-checks of the project, they share one run.
+
+    Configuration files of ruff are created once, before the first check, and deleted after the last one.
+
+    :param options: Options of the checks.
+    :return: Results of the checks.
+    """
+    run_id = create_run_id()
+    namespace = options.to_namespace()
+    with use_options(namespace, run_id):
+        code_standard_module = _get_available_code_standard_module()
+        if code_standard_module == "ruff":
+            create_config_files()
+    try:
+        return [run_check(check, options, run_id=run_id, with_configs=False) for check in ALL_CHECKS]
+    finally:
+        if code_standard_module == "ruff":
+            with use_options(namespace, run_id):
+                delete_config_files()
+
+
+def _run_check_function(
+    path: str, namespace: Namespace, run_id: str, kwargs: dict[str, Any]
+) -> tuple[bool, str | None]:
+    """
+    Run function of the check with the options in the current process.
+
+    :param path: `<module>:<function>` of the check.
+    :param namespace: Options of the check.
+    :param run_id: Id of the run.
+    :param kwargs: Keyword arguments of the function.
+    :return: Whether the check passed and exception which stopped it, if any.
+    """
+    module_name, function_name = path.split(":")
+    function = getattr(importlib.import_module(module_name), function_name)
+    with use_options(namespace, run_id):
+        # sources of the project might have changed since the last check
+        clear_resolution_cache()
+        try:
+            return bool(function(**kwargs)), None
+        except Exception as e:
+            logger.exception(f"{path} of {namespace.project_dir} failed with an exception.")
+            return False, repr(e)
+
+
+def _run_in_worker(path: str, namespace: Namespace, run_id: str, kwargs: dict[str, Any]) -> tuple[bool, str | None]:
+    """
+    Run function of the check in a worker process started in the project directory.
+
+    The worker gets the project directory as working directory and first entry of sys.path, the id of the run in the
+    environment (for processes it starts, e.g. pytest-xdist workers) and the rest of sys.path of the caller, so it
+    imports the same mfd_code_quality. Log records and the result are sent back through stdout of the worker.
+
+    :param path: `<module>:<function>` of the check.
+    :param namespace: Options of the check.
+    :param run_id: Id of the run.
+    :param kwargs: Keyword arguments of the function.
+    :return: Whether the check passed and exception which stopped it, if any.
+    :raises RuntimeError: When the worker exits without sending the result.
+    """
+    env = {**os.environ, RUN_ID_ENV_VAR: run_id, "PYTHONPATH": os.pathsep.join(filter(None, sys.path))}
+    process = subprocess.Popen(
+        (sys.executable, "-m", __name__),
+        cwd=namespace.project_dir,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+    )
+    with process:
+        pickle.dump((path, namespace, run_id, kwargs), process.stdin)
+        process.stdin.close()
+        result = None
+        for message in _read_messages(process.stdout):
+            if isinstance(message, dict):
+                record = logging.makeLogRecord(message)
+                record_logger = logging.getLogger(record.name)
+                if record_logger.isEnabledFor(record.levelno):
+                    record_logger.handle(record)
+            else:
+                result = message
+    if result is None:
+        raise RuntimeError(f"Worker running {path} exited with code {process.returncode} without result")
+    return result
+
+
+def _read_messages(stream: IO[bytes]) -> Iterator[Any]:
+    """
+    Read pickled messages of the worker until it closes its stdout.
+
+    :param stream: Stdout of the worker.
+    :return: Messages, log records as dicts and result as tuple.
+    """
+    while True:
+        try:
+            yield pickle.load(stream)
+        except EOFError:
+            return
+
+
+class _WorkerLogHandler(logging.Handler):
+    """Handler sending records of the worker to the calling process."""
+
+    def __init__(self, channel: IO[bytes]) -> None:
+        """
+        Init.
+
+        :param channel: Stream read by the calling process.
+        """
+        super().__init__()
+        self._channel = channel
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """
+        Send record with its message formatted, arguments and exception might not be picklable.
+
+        :param record: Log record.
+        """
+        try:
+            message = dict(record.__dict__)
+            message.update(msg=record.getMessage(), args=None, exc_info=None, exc_text=self._format_exception(record))
+            message = {key: value for key, value in message.items() if _is_picklable(value)}
+            with self.lock:
+                pickle.dump(message, self._channel)
+                self._channel.flush()
+        except Exception:
+            self.handleError(record)
+
+    @staticmethod
+    def _format_exception(record: logging.LogRecord) -> str | None:
+        """
+        Format exception of the record.
+
+        :param record: Log record.
+        :return: Formatted traceback or None if there is no exception.
+        """
+        if record.exc_info:
+            return logging.Formatter().formatException(record.exc_info)
+        return record.exc_text
+
+
+def _is_picklable(value: object) -> bool:
+    """
+    Check if value can be sent to the calling process.
+
+    :param value: Attribute of a log record.
+    :return: True if value can be pickled.
+    """
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def _main() -> None:
+    """Run check sent by the calling process on stdin, see _run_in_worker."""
+    channel = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    # output of the check (e.g. of pytest) goes to stderr, stdout is left to messages for the calling process
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+    path, namespace, run_id, kwargs = pickle.load(sys.stdin.buffer)
+    handler = _WorkerLogHandler(channel)
+    worker_logger = logging.getLogger(WORKER_LOGGER_NAME)
+    worker_logger.addHandler(handler)
+    worker_logger.setLevel(logging.DEBUG)
+    worker_logger.propagate = False
+    result = _run_check_function(path, namespace, run_id, kwargs)
+    worker_logger.removeHandler(handler)
+    pickle.dump(result, channel)
+    channel.close()
+
+
+if __name__ == "__main__":
+    _main()
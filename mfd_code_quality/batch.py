@@ -0,0 +1,394 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Checks of many repositories run in parallel.
+
+mfd-batch checks repositories given by `--repositories` or found in `--workspace` directories by a pool of spawned
+worker processes. Each worker runs checks of mfd-all-checks of one repository after another through api, so detection
+of code standard module (done once by the batch) and parsed generic configuration are shared by all of them.
+Output of checks of each repository is written to its own log file in directory of the batch run, results of all
+repositories are aggregated into one JSON report and a summary. A repository checked longer than `--repo-timeout`
+is stopped by killing its worker together with processes it started, the worker is replaced by a new one.
+Workers report process groups of tools they run (tools are started in sessions of their own) and jobserver tokens
+they hold, so tools of a killed worker are killed as well and its tokens are returned to the jobserver by the batch.
+"""
+
+import contextlib
+import dataclasses
+import json
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from multiprocessing.context import SpawnContext
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+
+from mfd_code_quality.api import CheckOptions, CheckResult, run_all_checks
+from mfd_code_quality.code_standard.checks import _get_available_code_standard_module
+from mfd_code_quality.jobserver import TOKEN, get_jobs, get_jobserver
+from mfd_code_quality.log_queue import flush_logging
+from mfd_code_quality.runner import TOOL_KILL_GRACE, set_tool_group_listener
+from mfd_code_quality.utils import (
+    get_parsed_args,
+    get_root_dir,
+    get_run_dir,
+    get_run_id,
+    set_up_logging,
+    write_file_atomically,
+)
+
+logger = logging.getLogger("mfd-code-quality.batch")
+
+BATCH_STAGE = "batch"  # directory of the batch in directory of the run
+BATCH_REPORT_FILE = "batch.json"  # aggregated results of all repositories
+BATCH_JOBS_PER_REPOSITORY = 4  # jobs expected to be used by checks of one repository, sets default number of workers
+REPOSITORY_MARKERS = ("pyproject.toml", "setup.py")  # files in root directory of a repository
+
+PASSED, FAILED, TIMED_OUT, CRASHED = "passed", "failed", "timed out", "crashed"
+TOOL_MESSAGE = "tool"  # message of a worker about its tool: (TOOL_MESSAGE, process group, running)
+TOKENS_MESSAGE = "tokens"  # message of a worker about jobserver tokens: (TOKENS_MESSAGE, taken or -returned count)
+
+
+@dataclass
+class RepositoryResult:
+    """Result of checks of a repository."""
+
+    path: Path
+    status: str  # passed, failed, timed out or crashed
+    duration: float  # seconds
+    log_path: Path
+    checks: list[CheckResult] = field(default_factory=list)
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Convert result to JSON serializable dict.
+
+        :return: Result with paths converted to strings.
+        """
+        return {
+            "path": str(self.path),
+            "status": self.status,
+            "duration": round(self.duration, 3),
+            "log": str(self.log_path),
+            "checks": [
+                {
+                    **dataclasses.asdict(check),
+                    "project_dir": str(check.project_dir),
+                    "duration": round(check.duration, 3),
+                }
+                for check in self.checks
+            ],
+        }
+
+
+def find_repositories(repositories: Iterable[str | Path], workspaces: Iterable[str | Path]) -> list[Path]:
+    """
+    Find repositories to check.
+
+    :param repositories: Paths of repositories.
+    :param workspaces: Directories, whose subdirectories with pyproject.toml or setup.py are repositories.
+    :return: Absolute paths of repositories without duplicates, in given order, repositories of a workspace sorted.
+    """
+    paths = [Path(path).resolve() for path in repositories]
+    for workspace in workspaces:
+        paths.extend(
+            path.resolve()
+            for path in sorted(Path(workspace).iterdir())
+            if path.is_dir() and any((path / marker).is_file() for marker in REPOSITORY_MARKERS)
+        )
+    return list(dict.fromkeys(paths))
+
+
+def run_batch() -> None:
+    """Run checks of all repositories given in command line."""
+    sys.exit(0 if _run_batch() else 1)
+
+
+def _run_batch() -> bool:
+    """
+    Run checks of all repositories given in command line.
+
+    :return: True if checks of all repositories passed, False otherwise.
+    """
+    set_up_logging()
+    args = get_parsed_args()
+    repositories = find_repositories(args.repositories or [], args.workspace or [])
+    if not repositories:
+        logger.error("No repositories to check, use --repositories or --workspace.")
+        return False
+
+    # both are inherited by workers, they share one budget of parallel jobs and don't look for ruff or flake8 again
+    get_jobserver()
+    _get_available_code_standard_module()
+    run_dir = get_run_dir(BATCH_STAGE)
+    workers = min(args.batch_workers or max(1, get_jobs() // BATCH_JOBS_PER_REPOSITORY), len(repositories))
+    logger.info(f"[Batch] Checking {len(repositories)} repositories by {workers} worker(s), logs: {run_dir}")
+
+    start = time.perf_counter()
+    results = check_repositories(
+        [CheckOptions.from_namespace(args, repository) for repository in repositories],
+        workers,
+        args.repo_timeout or None,
+        run_dir,
+    )
+    duration = time.perf_counter() - start
+
+    passed = all(result.status == PASSED for result in results)
+    report = {
+        "run_id": get_run_id(),
+        "root_dir": str(get_root_dir()),
+        "duration": round(duration, 3),
+        "passed": passed,
+        "repositories": [result.to_dict() for result in results],
+    }
+    content = json.dumps(report, indent=2)
+    write_file_atomically(run_dir / BATCH_REPORT_FILE, content)
+    if args.batch_report:
+        write_file_atomically(Path(args.batch_report), content)
+    logger.info(format_summary(results, duration))
+    return passed
+
+
+def check_repositories(
+    options: list[CheckOptions], workers: int, timeout: float | None, run_dir: Path
+) -> list[RepositoryResult]:
+    """
+    Check repositories by a pool of worker processes.
+
+    :param options: Options of checks of each repository.
+    :param workers: Maximum number of workers.
+    :param timeout: Maximum time of checks of one repository in seconds, None for no limit.
+    :param run_dir: Directory of the batch, log files of repositories are written to its logs subdirectory.
+    :return: Results in order of given repositories.
+    """
+    log_dir = run_dir / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    context = multiprocessing.get_context("spawn")
+    pending = deque(enumerate(options))
+    results: dict[int, RepositoryResult] = {}
+    idle: list[_Worker] = []
+    busy: list[_Worker] = []
+    try:
+        while pending or busy:
+            while pending and len(busy) < workers:
+                index, repository_options = pending.popleft()
+                worker = idle.pop() if idle else _Worker(context)
+                log_path = log_dir / f"{index + 1:03d}-{Path(repository_options.project_dir).name}.log"
+                worker.assign(index, repository_options, log_path)
+                busy.append(worker)
+
+            deadlines = [worker.started + timeout for worker in busy] if timeout is not None else []
+            wait(
+                [worker.connection for worker in busy] + [worker.process.sentinel for worker in busy],
+                max(min(deadlines) - time.monotonic(), 0) if deadlines else None,
+            )
+            for worker in list(busy):
+                result = worker.get_result(timeout)
+                if result is None:
+                    continue
+                busy.remove(worker)
+                results[worker.index] = result
+                logger.info(f"[Batch] {result.path.name}: {result.status} in {result.duration:.1f} s.")
+                if worker.process.is_alive():
+                    idle.append(worker)
+    finally:
+        for worker in busy:
+            worker.kill()
+        for worker in idle:
+            worker.stop()
+    return [results[index] for index in range(len(options))]
+
+
+def format_summary(results: list[RepositoryResult], duration: float) -> str:
+    """
+    Format summary of results of all repositories.
+
+    :param results: Results of repositories.
+    :param duration: Duration of the batch in seconds.
+    :return: Summary with counts of statuses and a line for each repository which didn't pass.
+    """
+    counts = {
+        status: sum(result.status == status for result in results) for status in (PASSED, FAILED, TIMED_OUT, CRASHED)
+    }
+    lines = [
+        f"[Batch] Checked {len(results)} repositories in {duration:.1f} s: "
+        + ", ".join(f"{count} {status}" for status, count in counts.items() if count)
+        + "."
+    ]
+    for result in results:
+        if result.status == PASSED:
+            continue
+        failed_checks = ", ".join(check.check for check in result.checks if not check.passed)
+        lines.append(
+            f"{result.status.upper():<9} {result.path.name} ({result.duration:.1f} s)"
+            + (f" - {failed_checks}" if failed_checks else "")
+            + f", log: {result.log_path}"
+        )
+    return "\n".join(lines)
+
+
+class _Worker:
+    """Spawned process checking repositories one at a time."""
+
+    def __init__(self, context: SpawnContext) -> None:
+        """
+        Init.
+
+        :param context: Multiprocessing context used to start the process.
+        """
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_work, args=(child_connection,), name="mfd-batch-worker", daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.index = -1
+        self.options: CheckOptions | None = None
+        self.log_path = Path()
+        self.started = 0.0
+        self.tool_groups: set[int] = set()  # process groups of tools run by the worker
+        self.tokens = 0  # jobserver tokens held by the worker
+
+    def assign(self, index: int, options: CheckOptions, log_path: Path) -> None:
+        """
+        Start checks of a repository.
+
+        :param index: Index of the repository.
+        :param options: Options of the checks.
+        :param log_path: Path of log file of the checks.
+        """
+        self.index, self.options, self.log_path = index, options, log_path
+        self.started = time.monotonic()
+        self.connection.send((options, str(log_path)))
+
+    def get_result(self, timeout: float | None) -> RepositoryResult | None:
+        """
+        Get result of checks of the repository once they are finished, worker stopped or timeout expired.
+
+        :param timeout: Maximum time of checks in seconds, worker is killed once it expires.
+        :return: Result or None if checks are still running.
+        """
+        duration = time.monotonic() - self.started
+        path = Path(self.options.project_dir)
+        checks = self._receive()
+        if checks is not None:
+            status = PASSED if all(check.passed for check in checks) else FAILED
+            return RepositoryResult(path, status, duration, self.log_path, checks)
+        if not self.process.is_alive():
+            logger.error(f"[Batch] Worker checking {path} exited with code {self.process.exitcode}.")
+            self.kill()  # tools and tokens it left behind
+            return RepositoryResult(path, CRASHED, duration, self.log_path)
+        if timeout is not None and duration >= timeout:
+            logger.warning(f"[Batch] Checks of {path} didn't finish in {timeout} s, stopping them.")
+            self.kill()
+            return RepositoryResult(path, TIMED_OUT, duration, self.log_path)
+        return None
+
+    def kill(self) -> None:
+        """Kill the worker together with processes and tools it started, return jobserver tokens it held."""
+        for sig, grace in ((signal.SIGTERM, TOOL_KILL_GRACE), (getattr(signal, "SIGKILL", signal.SIGTERM), None)):
+            self._receive()  # tools started in the meantime
+            if hasattr(os, "killpg"):
+                for group in (self.process.pid, *self.tool_groups):
+                    with contextlib.suppress(OSError):
+                        os.killpg(group, sig)
+            with contextlib.suppress(OSError):
+                os.kill(self.process.pid, sig)  # worker which didn't start its own process group yet
+            self.process.join(grace)
+        self._receive()
+        if self.tool_groups and hasattr(os, "killpg"):
+            for group in self.tool_groups:  # started just before the worker was killed
+                with contextlib.suppress(OSError):
+                    os.killpg(group, signal.SIGKILL)
+        self.tool_groups.clear()
+        if self.tokens > 0 and (jobserver := get_jobserver()) is not None:
+            logger.debug(f"[Batch] Returning {self.tokens} jobserver token(s) held by killed worker.")
+            jobserver.release(TOKEN * self.tokens)
+        self.tokens = 0
+
+    def _receive(self) -> list[CheckResult] | None:
+        """
+        Receive messages of the worker, keep track of its tools and tokens.
+
+        :return: Results of checks or None if they weren't received yet.
+        """
+        try:
+            while self.connection.poll():
+                message = self.connection.recv()
+                if isinstance(message, list):
+                    return message
+                if message[0] == TOOL_MESSAGE:
+                    _, group, running = message
+                    if running:
+                        self.tool_groups.add(group)
+                    else:
+                        self.tool_groups.discard(group)
+                elif message[0] == TOKENS_MESSAGE:
+                    self.tokens += message[1]
+        except (EOFError, OSError):
+            self.process.join(TOOL_KILL_GRACE)  # worker exited, its connection is closed
+        return None
+
+    def stop(self) -> None:
+        """Stop idle worker."""
+        with contextlib.suppress(OSError):
+            self.connection.send(None)
+        self.process.join(TOOL_KILL_GRACE)
+        if self.process.is_alive():
+            self.kill()
+
+
+def _work(connection: Connection) -> None:
+    """
+    Check repositories received from the connection until None is received, send back results of their checks.
+
+    :param connection: Connection to the batch.
+    """
+    if hasattr(os, "setsid"):
+        os.setsid()  # worker is killed together with processes it started
+    set_up_logging()
+    lock = threading.Lock()  # tools and tokens are reported by threads running checks
+
+    def send(message: object) -> None:
+        with lock:
+            connection.send(message)
+
+    jobserver = get_jobserver()
+    if jobserver is not None:
+        jobserver.token_listener = lambda count: send((TOKENS_MESSAGE, count))
+    set_tool_group_listener(lambda group, running: send((TOOL_MESSAGE, group, running)))
+    while (task := connection.recv()) is not None:
+        options, log_path = task
+        with _redirect_output(Path(log_path)):
+            results = run_all_checks(options)
+        send(results)
+
+
+@contextlib.contextmanager
+def _redirect_output(path: Path) -> Iterator[None]:
+    """
+    Redirect stdout and stderr of the process and processes it starts to the file.
+
+    :param path: Path to the file.
+    """
+    flush_logging()
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = [os.dup(1), os.dup(2)]
+    with open(path, "w") as file:
+        os.dup2(file.fileno(), 1)
+        os.dup2(file.fileno(), 2)
+        try:
+            yield
+        finally:
+            flush_logging()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            for fd, saved_fd in zip((1, 2), saved):
+                os.dup2(saved_fd, fd)
+                os.close(saved_fd)
@@ -3,14 +3,18 @@
 """Code standards utilities."""
 
 import logging
+import os
 import sys
-from subprocess import run
 
+from ..jobserver import get_jobs, get_threads_env, job_slots
+from ..runner import run_tool
 from .configure import delete_config_files, create_config_files
 from ..utils import get_root_dir, set_up_logging, set_cwd
 
 logger = logging.getLogger("mfd-code-quality.code_standard")
 
+CODE_STANDARD_MODULE_ENV_VAR = "MFD_CODE_STANDARD_MODULE"  # module detected by a parent process, e.g. mfd-batch
+
 
 def _test_flake8() -> bool:
     """
@@ -18,7 +22,7 @@ def _test_flake8() -> bool:
 
     :return: True if test completed successfully, False - otherwise.
     """
-    flake_run_outcome = run((sys.executable, "-m", "flake8"), cwd=get_root_dir())
+    flake_run_outcome = run_tool((sys.executable, "-m", "flake8"), cwd=get_root_dir(), stream_logger=logger)
     return flake_run_outcome.returncode == 0
 
 
@@ -29,10 +33,13 @@ def _test_ruff_format() -> bool:
     :return: True if there is nothing to format, False - otherwise.
     """
     logger.info("Checking 'ruff format --check'...")
-    ruff_format_outcome = run(
-        (sys.executable, "-m", "ruff", "format", "--check"), capture_output=True, text=True, cwd=get_root_dir()
-    )
-    logger.info(f"Output: {ruff_format_outcome.stdout.strip()}")
+    with job_slots(get_jobs()) as threads:
+        ruff_format_outcome = run_tool(
+            (sys.executable, "-m", "ruff", "format", "--check"),
+            cwd=get_root_dir(),
+            env=get_threads_env(threads),
+            stream_logger=logger,
+        )
     return ruff_format_outcome.returncode == 0
 
 
@@ -43,8 +50,13 @@ def _test_ruff_check() -> bool:
     :return: True if ruff check did not find any issues, False - otherwise.
     """
     logger.info("Checking 'ruff check'...")
-    ruff_run_outcome = run((sys.executable, "-m", "ruff", "check"), capture_output=True, text=True, cwd=get_root_dir())
-    logger.info(f"Output: {ruff_run_outcome.stdout.strip()}")
+    with job_slots(get_jobs()) as threads:
+        ruff_run_outcome = run_tool(
+            (sys.executable, "-m", "ruff", "check"),
+            cwd=get_root_dir(),
+            env=get_threads_env(threads),
+            stream_logger=logger,
+        )
     return ruff_run_outcome.returncode == 0
 
 
@@ -53,15 +65,22 @@ def _get_available_code_standard_module() -> str:
     Get available code standard module which is installed in python.
 
     It will be either flake8 or ruff.
+    Detected module is exported to the environment, so processes started later (stages of mfd-all-checks,
+    workers of mfd-batch) and checks of other projects by the same process don't list installed packages again.
 
     :return: flake8 or ruff
     :raises Exception: When no code standard module is available
     """
     code_standard_modules = ["ruff", "flake8"]
+    detected_module = os.environ.get(CODE_STANDARD_MODULE_ENV_VAR)
+    if detected_module in code_standard_modules:
+        logger.info(f"{detected_module.capitalize()} will be used for code standard check.")
+        return detected_module
+
     commands = [("uv", "pip", "list"), (sys.executable, "-m", "pip", "list")]
     for cmd in commands:
         try:
-            pip_list = run(cmd, capture_output=True, text=True, cwd=get_root_dir())
+            pip_list = run_tool(cmd, cwd=get_root_dir(), keep_output=True)
         except Exception as e:  # noqa
             logger.debug(f"Error occurred while running {cmd}:\n{e}")
             continue
@@ -72,6 +91,7 @@ def _get_available_code_standard_module() -> str:
         for code_standard_module in code_standard_modules:
             if f"{code_standard_module} " in pip_list.stdout:
                 logger.info(f"{code_standard_module.capitalize()} will be used for code standard check.")
+                os.environ[CODE_STANDARD_MODULE_ENV_VAR] = code_standard_module
                 return code_standard_module
 
     raise Exception("No code standard module is available! [flake8 or ruff]")
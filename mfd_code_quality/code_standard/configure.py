@@ -15,15 +15,17 @@ Script is made to be run from repository's root directory because .pre-commit-co
 file must be placed there.
 """
 
+import json
 import logging
 import os
 import pathlib
 import re
 from codecs import open as codec_open
+from functools import lru_cache
 
 from jinja2 import Template
 
-from mfd_code_quality.utils import set_up_logging, get_root_dir, get_package_name
+from mfd_code_quality.utils import set_up_logging, get_root_dir, get_package_names
 
 logger = logging.getLogger("mfd-code-quality.configure")
 
@@ -111,18 +113,40 @@ def _read_config_content(config_file_path: pathlib.Path) -> list[ToolConfig]:
     return tool_config_list
 
 
+@lru_cache()
+def _read_packaged_config_content(config_file_path: pathlib.Path) -> tuple[ToolConfig, ...]:
+    """
+    Read content of config file shipped with this module once per process, e.g. for all projects checked by mfd-batch.
+
+    :param config_file_path: Path of generic or per-module config file.
+    :return: ToolConfigs, which are not modified by their users.
+    """
+    return tuple(_read_config_content(config_file_path))
+
+
 def _get_module_name(destination_path: pathlib.Path) -> str:
     """
-    Get Python package name.
+    Get Python package name, the first one in multi-package repositories.
 
     :param destination_path: Repository's root directory.
     :return: Python package name.
     :raises Exception: When Python package name couldn't be found.
     """
+    return _get_module_names(destination_path)[0]
+
+
+def _get_module_names(destination_path: pathlib.Path) -> list[str]:
+    """
+    Get names of all Python packages of the repository.
+
+    :param destination_path: Repository's root directory.
+    :return: Python package names.
+    :raises Exception: When Python package name couldn't be found.
+    """
     if any(re.match(r"{{.+}}", file.name) for file in destination_path.iterdir()):  # cookiecutter template
-        return _get_template_repo_name(destination_path)
+        return [_get_template_repo_name(destination_path)]
 
-    return get_package_name(destination_path)
+    return get_package_names(destination_path)
 
 
 def _get_template_repo_name(destination_path: pathlib.Path) -> str:
@@ -214,13 +238,14 @@ def _substitute_toml_file(toml_file_path: str) -> None:
         template = Template(f.read())
 
     toml_path = pathlib.Path(toml_file_path)
-    module_name = _get_module_name(toml_path.parent)
+    module_names = _get_module_names(toml_path.parent)
 
-    if "_template" in module_name:
+    if "_template" in module_names[0]:
         logger.debug("Template repository, Cookiecutter found in module name, skipping substitution")
         return
 
-    substitutions = {"module_name": module_name}
+    # module_names is rendered as TOML array of all packages of multi-package repositories
+    substitutions = {"module_name": module_names[0], "module_names": json.dumps(module_names)}
     rendered_template = template.render(substitutions)
 
     with codec_open(toml_file_path, "wt") as f:
@@ -252,11 +277,11 @@ def create_toml_files(cwd: pathlib.Path, pwd: pathlib.Path, custom_config_name:
     generic_config_path = pathlib.Path(pwd, generic_config_name)
     logger.debug(f"Generic {generic_config_name} path: {generic_config_path}")
 
-    generic_tool_config_list = _read_config_content(generic_config_path)
+    generic_tool_config_list = list(_read_packaged_config_content(generic_config_path))
     config_lists.append(generic_tool_config_list)
     if custom_config_path and custom_config_path.is_file():
         logger.debug(f"Custom {custom_config_name} file exists.")
-        custom_ruff_config_list = _read_config_content(custom_config_path)
+        custom_ruff_config_list = list(_read_packaged_config_content(custom_config_path))
         config_lists.append(custom_ruff_config_list)
 
     unified_config_list = _create_unified_tool_config_list(config_lists)
@@ -266,6 +291,17 @@ def create_toml_files(cwd: pathlib.Path, pwd: pathlib.Path, custom_config_name:
     _substitute_toml_file(toml_file_path)
 
 
+def get_generic_excludes() -> list[str]:
+    """
+    Get paths excluded from checks by generic ruff configuration, e.g. virtual environments and build artifacts.
+
+    :return: List of paths from exclude option of generic_ruff.txt.
+    """
+    generic_ruff = pathlib.Path(os.path.abspath(os.path.dirname(__file__)), "generic_ruff.txt").read_text()
+    match = re.search(r"^exclude\s*=\s*\[(.*?)\]", generic_ruff, re.MULTILINE | re.DOTALL)
+    return re.findall(r'"([^"]+)"', match.group(1)) if match else []
+
+
 def create_config_files() -> None:
     """Create config files pyproject.toml and ruff.toml."""
     set_up_logging()
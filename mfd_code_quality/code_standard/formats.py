@@ -4,9 +4,10 @@
 
 import logging
 import sys
-from subprocess import run
 
 from mfd_code_quality.code_standard.configure import create_config_files, delete_config_files
+from mfd_code_quality.jobserver import get_jobs, get_threads_env, job_slots
+from mfd_code_quality.runner import run_tool
 from mfd_code_quality.utils import get_root_dir
 
 logger = logging.getLogger("mfd-code-quality.code_standard")
@@ -19,10 +20,13 @@ def _run_linter() -> bool:
     :return: True if ruff check did not find any issues, False - otherwise.
     """
     logger.info("Running 'ruff check --fix'...")
-    ruff_run_outcome = run(
-        (sys.executable, "-m", "ruff", "check", "--fix"), capture_output=True, text=True, cwd=get_root_dir()
-    )
-    logger.info(f"Output: {ruff_run_outcome.stdout.strip()}")
+    with job_slots(get_jobs()) as threads:
+        ruff_run_outcome = run_tool(
+            (sys.executable, "-m", "ruff", "check", "--fix"),
+            cwd=get_root_dir(),
+            env=get_threads_env(threads),
+            stream_logger=logger,
+        )
     return ruff_run_outcome.returncode == 0
 
 
@@ -33,14 +37,28 @@ def _run_formatter() -> bool:
     :return: True if ruff check did not find any issues, False - otherwise.
     """
     logger.info("Running 'ruff format'...")
-    ruff_run_outcome = run((sys.executable, "-m", "ruff", "format"), capture_output=True, text=True, cwd=get_root_dir())
-    logger.info(f"Output: {ruff_run_outcome.stdout.strip()}")
+    with job_slots(get_jobs()) as threads:
+        ruff_run_outcome = run_tool(
+            (sys.executable, "-m", "ruff", "format"),
+            cwd=get_root_dir(),
+            env=get_threads_env(threads),
+            stream_logger=logger,
+        )
     return ruff_run_outcome.returncode == 0
 
 
-def format_code() -> None:
-    """Run linter and formatter."""
+def _format_code() -> bool:
+    """
+    Run linter and formatter.
+
+    :return: True if neither linter nor formatter found any issues, False otherwise.
+    """
     create_config_files()
     statuses = [_run_linter(), _run_formatter()]
     delete_config_files()
-    sys.exit(not all(statuses))
+    return all(statuses)
+
+
+def format_code() -> None:
+    """Run linter and formatter."""
+    sys.exit(not _format_code())
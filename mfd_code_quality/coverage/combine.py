@@ -0,0 +1,202 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Combining coverage data of unit tests shards run on separate machines."""
+
+import json
+import logging
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+from coverage import Coverage, CoverageData
+from coverage.exceptions import CoverageException, NoDataError
+
+from mfd_code_quality.code_standard.configure import create_config_files, delete_config_files
+from mfd_code_quality.coverage.consts import (
+    COVERAGE_DATA_FILE,
+    COVERAGE_REPORT_FILES,
+    COVERAGE_SHARD_DATA_FILE,
+    COVERAGE_SHARD_MANIFEST_FILE,
+)
+from mfd_code_quality.coverage.utils import (
+    coverage_section,
+    is_diff_coverage_threshold_reached,
+    log_module_coverage,
+    write_coverage_reports,
+)
+from mfd_code_quality.utils import (
+    get_package_names,
+    get_parsed_args,
+    get_root_dir,
+    get_run_dir,
+    publish_artifacts,
+    set_cwd,
+    set_up_logging,
+)
+
+logger = logging.getLogger("mfd-code-quality.coverage")
+
+
+class ShardError(Exception):
+    """Handle incomplete or inconsistent shards."""
+
+
+@dataclass
+class Shard:
+    """Coverage data of a single shard together with its manifest."""
+
+    index: int
+    count: int
+    data_file: Path
+    manifest: dict
+
+
+def find_shards(root_dir: Path) -> list[Shard]:
+    """
+    Find shards in the root directory and verify that together they ran each collected test exactly once.
+
+    :param root_dir: Root directory of the project.
+    :return: Shards ordered by their index.
+    :raises ShardError: When shards are missing or they collected or split tests differently.
+    """
+    shards = []
+    for manifest_path in root_dir.glob(COVERAGE_SHARD_MANIFEST_FILE.format(index="*", count="*")):
+        try:
+            manifest = json.loads(manifest_path.read_text())
+            index, count = int(manifest["index"]), int(manifest["count"])
+        except (OSError, ValueError, KeyError) as e:
+            raise ShardError(f"Can't read manifest of shard {manifest_path.name}: {e}")
+        data_file = root_dir / COVERAGE_SHARD_DATA_FILE.format(index=index, count=count)
+        shards.append(Shard(index, count, data_file, manifest))
+    if not shards:
+        raise ShardError("No shards found, run unit tests with --shard i/N first.")
+
+    counts = {shard.count for shard in shards}
+    if len(counts) > 1:
+        raise ShardError(f"Shards of different splits found (numbers of shards: {sorted(counts)}).")
+    count = counts.pop()
+    missing = sorted(set(range(1, count + 1)) - {shard.index for shard in shards})
+    if missing:
+        raise ShardError(f"Missing shard(s) {', '.join(f'{index}/{count}' for index in missing)}.")
+
+    for key, difference in (("collection", "collected different tests"), ("assignment", "split tests differently")):
+        if len({shard.manifest.get(key) for shard in shards}) > 1:
+            raise ShardError(
+                f"Shards {difference}, make sure all of them run the same revision with the same test duration "
+                "history in .mfd_code_quality directory (or without it, using --no-cache)."
+            )
+    for shard in shards:
+        if shard.manifest.get("tests") and not shard.data_file.exists():
+            raise ShardError(f"Coverage data of shard {shard.index}/{count} not found: {shard.data_file.name}")
+    return sorted(shards, key=lambda shard: shard.index)
+
+
+def combine_shards(shards: list[Shard], root_dir: Path, data: CoverageData) -> None:
+    """
+    Merge coverage data of shards.
+
+    Paths measured on other machines are mapped to the root directory of the project on the current one.
+
+    :param shards: Shards to combine.
+    :param root_dir: Root directory of the project.
+    :param data: Data to merge shards into.
+    """
+    for shard in shards:
+        if not shard.data_file.exists():
+            continue  # shard without tests
+        shard_data = CoverageData(basename=str(shard.data_file))
+        shard_data.read()
+        shard_root = Path(shard.manifest.get("root_dir") or root_dir)
+        paths = {path: str(_map_path(Path(path), shard_root, root_dir)) for path in shard_data.measured_files()}
+        if shard_data.has_arcs():
+            data.add_arcs({paths[path]: shard_data.arcs(path) for path in paths})
+        else:
+            data.add_lines({paths[path]: shard_data.lines(path) for path in paths})
+        data.add_file_tracers({paths[path]: tracer for path in paths if (tracer := shard_data.file_tracer(path))})
+    data.write()
+
+
+def _map_path(path: Path, shard_root: Path, root_dir: Path) -> Path:
+    """
+    Map path measured by shard to the current root directory.
+
+    :param path: Measured path.
+    :param shard_root: Root directory of the project on the machine running the shard.
+    :param root_dir: Root directory of the project.
+    :return: Mapped path, unchanged if it's outside of shard's root directory.
+    """
+    try:
+        return root_dir / path.relative_to(shard_root)
+    except ValueError:
+        return path
+
+
+def _combine_coverage(with_configs: bool = True) -> bool:
+    """
+    Combine coverage data of all shards and compare diff coverage to threshold.
+
+    :param with_configs: Should we create configuration files before running checks.
+    :return: True if all shards were found and threshold met.
+    """
+    set_up_logging()
+    set_cwd()
+    if with_configs:
+        create_config_files()
+    root_dir = get_root_dir()
+    try:
+        with coverage_section():
+            return _combine_and_compare(root_dir)
+    finally:
+        if with_configs:
+            delete_config_files()
+
+
+def _combine_and_compare(root_dir: Path) -> bool:
+    """
+    Combine coverage data of all shards into .coverage and compare diff coverage to threshold.
+
+    Combined data and reports are written to directory of the run and published to the root directory.
+
+    :param root_dir: Root directory of the project.
+    :return: True if all shards were found and threshold met.
+    """
+    try:
+        shards = find_shards(root_dir)
+    except ShardError as e:
+        logger.error(f"[Coverage] {e}")
+        return False
+
+    run_dir = get_run_dir("combine")
+    data_file = run_dir / COVERAGE_DATA_FILE
+    try:
+        combine_shards(shards, root_dir, CoverageData(basename=str(data_file)))
+    except CoverageException as e:
+        logger.error(f"[Coverage] Can't combine coverage data of shards: {e}")
+        return False
+    logger.info(f"[Coverage] Combined coverage data of {len(shards)} shard(s).")
+
+    cov = Coverage(data_file=str(data_file), source_pkgs=get_package_names())
+    report_formats = get_parsed_args().coverage_report or []
+    try:
+        cov.load()
+        if not cov.get_data().measured_files():
+            raise NoDataError("No data to report.")
+        write_coverage_reports(cov, report_formats, run_dir)
+        log_module_coverage(cov)
+    except NoDataError:
+        logger.warning("[Coverage] Shards did not collect any coverage data. Probably there are no unit tests.")
+        return True
+    finally:
+        publish_artifacts(
+            run_dir, [COVERAGE_DATA_FILE, *(COVERAGE_REPORT_FILES[report] for report in report_formats)], root_dir
+        )
+    return is_diff_coverage_threshold_reached(cov)
+
+
+def combine_coverage(with_configs: bool = True) -> None:
+    """
+    Combine coverage data of unit tests shards and check if diff coverage is reaching the threshold.
+
+    :param with_configs: Should we create configuration files before running checks.
+    """
+    sys.exit(0 if _combine_coverage(with_configs=with_configs) else 1)
@@ -3,5 +3,23 @@
 """Coverage related consts."""
 
 DIFF_COVERAGE_THRESHOLD = 80  # % coverage of new code - compared to origin/main
+DIFF_COVERAGE_COMPARE_BRANCH = "origin/main"  # branch, which new code is compared to
+COVERAGE_DATA_FILE = ".coverage"  # default coverage.py data file name
 COVERAGE_XML_FILE = "coverage.xml"  # default coverage.py xml report name
-COVERAGE_JSON_FILE = "coverage.json"  # default coverage.py xml report name
+COVERAGE_JSON_FILE = "coverage.json"  # default coverage.py json report name
+COVERAGE_LCOV_FILE = "coverage.lcov"  # default coverage.py lcov report name
+COVERAGE_HTML_DIR = "htmlcov"  # default coverage.py html report directory
+COVERAGE_REPORT_FORMATS = ("json", "xml", "lcov", "html")  # formats which can be requested with --coverage-report
+# names of report files (html report is a directory) by formats
+# coverage.py versions (from inclusive, to exclusive) whose JSON reporter internals are known to support streaming
+COVERAGE_JSON_STREAMING_VERSIONS = ((7, 6), (8, 0))
+COVERAGE_REPORT_FILES = {
+    "json": COVERAGE_JSON_FILE,
+    "xml": COVERAGE_XML_FILE,
+    "lcov": COVERAGE_LCOV_FILE,
+    "html": COVERAGE_HTML_DIR,
+}
+# coverage data of a single shard of unit tests, not matching .coverage.* files which are erased by coverage.py
+COVERAGE_SHARD_DATA_FILE = ".coverage-shard-{index}-of-{count}"
+# tests collected and assigned to a shard, used to verify shards before their coverage is combined
+COVERAGE_SHARD_MANIFEST_FILE = ".coverage-shard-{index}-of-{count}.json"
@@ -0,0 +1,241 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Diff coverage - coverage of lines changed compared to the base branch."""
+
+import logging
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from coverage.exceptions import CoverageException
+
+from mfd_code_quality.runner import run_tool
+
+if TYPE_CHECKING:
+    from coverage import Coverage
+
+logger = logging.getLogger("mfd-code-quality.coverage")
+
+HUNK_HEADER_PATTERN = re.compile(r"^@@ -\d+(?:,\d+)? \+(?P<start>\d+)(?:,(?P<count>\d+))? @@")
+# paths are parsed as printed with default settings, regardless of configuration of the user
+GIT_CONFIG = ("-c", "core.quotePath=false", "-c", "diff.noprefix=false", "-c", "diff.mnemonicPrefix=false")
+QUOTED_PATH_ESCAPE_PATTERN = re.compile(rb"\\([0-7]{3}|.)")  # escapes of paths with special characters quoted by git
+QUOTED_PATH_ESCAPES = {b"a": b"\a", b"b": b"\b", b"f": b"\f", b"n": b"\n", b"r": b"\r", b"t": b"\t", b"v": b"\v"}
+
+
+class GitDiffError(Exception):
+    """Handle errors of getting changed lines from git."""
+
+
+@dataclass
+class FileDiffCoverage:
+    """Coverage of changed lines of a single file."""
+
+    path: str  # relative to project's root directory, in POSIX format
+    covered_lines: set[int] = field(default_factory=set)
+    missing_lines: set[int] = field(default_factory=set)
+
+    @property
+    def percent_covered(self) -> float:
+        """Percentage of changed statements which were executed."""
+        total = len(self.covered_lines) + len(self.missing_lines)
+        return 100.0 * len(self.covered_lines) / total if total else 100.0
+
+
+@dataclass
+class DiffCoverage:
+    """Coverage of all changed lines."""
+
+    compare_branch: str
+    files: list[FileDiffCoverage] = field(default_factory=list)
+
+    @property
+    def num_changed_statements(self) -> int:
+        """Number of changed lines, which are executable statements."""
+        return sum(len(file.covered_lines) + len(file.missing_lines) for file in self.files)
+
+    @property
+    def num_missing(self) -> int:
+        """Number of changed statements, which were not executed."""
+        return sum(len(file.missing_lines) for file in self.files)
+
+    @property
+    def percent_covered(self) -> float:
+        """Percentage of changed statements which were executed, 100 if no statement was changed."""
+        total = self.num_changed_statements
+        return 100.0 * (total - self.num_missing) / total if total else 100.0
+
+    def format_report(self, title: str = "Diff Coverage") -> str:
+        """
+        Format report in the style of diff-cover console report.
+
+        :param title: First line of the report.
+        :return: Report.
+        """
+        lines = [
+            title,
+            f"Diff: {self.compare_branch}...HEAD, staged, unstaged and untracked changes",
+            "-" * 21,
+        ]
+        if not self.num_changed_statements:
+            lines.append("No lines with coverage information in this diff.")
+            lines.append("-" * 21)
+            return "\n".join(lines)
+
+        for file in sorted(self.files, key=lambda file: file.path):
+            if not file.covered_lines and not file.missing_lines:
+                continue
+            missing = f": Missing lines {_format_line_ranges(file.missing_lines)}" if file.missing_lines else ""
+            lines.append(f"{file.path} ({file.percent_covered:.1f}%){missing}")
+        lines.extend(
+            [
+                "-" * 21,
+                f"Total:   {self.num_changed_statements} lines",
+                f"Missing: {self.num_missing} lines",
+                f"Coverage: {self.percent_covered:.0f}%",
+                "-" * 21,
+            ]
+        )
+        return "\n".join(lines)
+
+
+def get_changed_lines(root_dir: Path, compare_branch: str) -> dict[str, set[int]]:
+    """
+    Get lines of Python files added or modified compared to the merge base with compare branch.
+
+    Committed, staged, unstaged and untracked changes are taken into account.
+
+    :param root_dir: Root directory of the git repository.
+    :param compare_branch: Branch to compare with, e.g. origin/main.
+    :return: Changed line numbers by file paths relative to root directory.
+    :raises GitDiffError: When git commands fail, e.g. compare branch doesn't exist.
+    """
+    merge_base = _git(root_dir, "merge-base", compare_branch, "HEAD").strip()
+    diff = _git(root_dir, "diff", "--no-color", "--no-ext-diff", "--relative", "--unified=0", merge_base, "--", "*.py")
+    changed_lines = parse_diff(diff)
+
+    untracked = _git(root_dir, "ls-files", "--others", "--exclude-standard", "-z", "--", "*.py")
+    for path in filter(None, untracked.split("\0")):
+        try:
+            with open(root_dir / path, "rb") as file:
+                changed_lines[path] = set(range(1, sum(1 for _ in file) + 1))
+        except OSError:
+            continue
+    return changed_lines
+
+
+def parse_diff(diff: str) -> dict[str, set[int]]:
+    """
+    Parse unified diff with zero context lines.
+
+    :param diff: Output of `git diff --unified=0`.
+    :return: Added or modified line numbers (in new version of a file) by file paths.
+    """
+    changed_lines = {}
+    current_lines = None
+    for line in diff.splitlines():
+        if line.startswith("+++ "):
+            path = _unquote_path(line[4:].rstrip("\t"))  # git ends paths with spaces with a tab
+            # deleted files are not interesting
+            current_lines = changed_lines.setdefault(path[2:], set()) if path.startswith("b/") else None
+        elif line.startswith("@@") and current_lines is not None:
+            match = HUNK_HEADER_PATTERN.match(line)
+            if match:
+                start = int(match.group("start"))
+                count = int(match.group("count")) if match.group("count") is not None else 1
+                current_lines.update(range(start, start + count))
+    return {path: lines for path, lines in changed_lines.items() if lines}
+
+
+def _unquote_path(path: str) -> str:
+    """
+    Unquote path of a file quoted by git like a C string, when it contains special characters.
+
+    :param path: Path printed by git.
+    :return: Path without quotes and escapes.
+    """
+    if len(path) < 2 or not path.startswith('"') or not path.endswith('"'):
+        return path
+    unquoted = QUOTED_PATH_ESCAPE_PATTERN.sub(
+        lambda match: (
+            bytes([int(match.group(1), 8)])
+            if len(match.group(1)) == 3
+            else QUOTED_PATH_ESCAPES.get(match.group(1), match.group(1))
+        ),
+        path[1:-1].encode(),
+    )
+    return unquoted.decode(errors="surrogateescape")
+
+
+def get_diff_coverage(
+    cov: "Coverage", root_dir: Path, compare_branch: str, changed_lines: dict[str, set[int]] | None = None
+) -> DiffCoverage:
+    """
+    Intersect changed lines with coverage data.
+
+    Only files which are measured (executed or part of measured source packages) are taken into account.
+
+    :param cov: Coverage object with loaded data.
+    :param root_dir: Root directory of the project.
+    :param compare_branch: Branch to compare with, e.g. origin/main.
+    :param changed_lines: Changed lines by file paths (see get_changed_lines), taken from git if not given.
+    :return: Diff coverage.
+    :raises GitDiffError: When git commands fail, e.g. compare branch doesn't exist.
+    """
+    if changed_lines is None:
+        changed_lines = get_changed_lines(root_dir, compare_branch)
+    measured_files = {Path(path).resolve() for path in cov.get_data().measured_files()}
+    source_dirs = [root_dir.joinpath(*package.split(".")) for package in cov.get_option("run:source_pkgs") or []]
+
+    diff_coverage = DiffCoverage(compare_branch)
+    for path, lines in changed_lines.items():
+        absolute_path = (root_dir / path).resolve()
+        if absolute_path not in measured_files and not any(
+            absolute_path.is_relative_to(source_dir) for source_dir in source_dirs
+        ):
+            continue
+        try:
+            _, statements, _, missing, _ = cov.analysis2(str(absolute_path))
+        except (CoverageException, OSError) as e:
+            logger.debug(f"[Coverage] Can't analyze {path}: {e}")
+            continue
+        diff_coverage.files.append(
+            FileDiffCoverage(
+                path=path,
+                covered_lines=lines.intersection(statements).difference(missing),
+                missing_lines=lines.intersection(missing),
+            )
+        )
+    return diff_coverage
+
+
+def _git(root_dir: Path, *args: str) -> str:
+    """
+    Run git command.
+
+    :param root_dir: Repository directory.
+    :param args: Git arguments.
+    :return: Standard output.
+    :raises GitDiffError: When command failed.
+    """
+    completed_process = run_tool(("git", *GIT_CONFIG, *args), cwd=root_dir, keep_output=True)
+    if completed_process.returncode != 0:
+        raise GitDiffError(f"'git {' '.join(args)}' failed: {completed_process.stderr.strip()}")
+    return completed_process.stdout
+
+
+def _format_line_ranges(lines: set[int]) -> str:
+    """
+    Format line numbers as ranges, e.g. 1-3,7.
+
+    :param lines: Line numbers.
+    :return: Formatted ranges.
+    """
+    ranges = []
+    for line in sorted(lines):
+        if ranges and ranges[-1][1] == line - 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ",".join(str(start) if start == end else f"{start}-{end}" for start, end in ranges)
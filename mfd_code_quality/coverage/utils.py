@@ -3,79 +3,254 @@
 """Coverage utilities."""
 
 import contextlib
+import datetime
 import json
 import logging
+import multiprocessing
+import os
 import shutil
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from pprint import pformat
-from subprocess import run
-from typing import TYPE_CHECKING
+from typing import Iterable, Iterator, TextIO
 
-from mfd_code_quality.coverage.consts import COVERAGE_XML_FILE, DIFF_COVERAGE_THRESHOLD, COVERAGE_JSON_FILE
-from mfd_code_quality.utils import get_root_dir
+import coverage
+from coverage import Coverage
+from coverage.exceptions import CoverageException
 
-if TYPE_CHECKING:
-    from subprocess import CompletedProcess
+from mfd_code_quality.coverage.consts import (
+    COVERAGE_JSON_STREAMING_VERSIONS,
+    COVERAGE_REPORT_FILES,
+    DIFF_COVERAGE_COMPARE_BRANCH,
+    DIFF_COVERAGE_THRESHOLD,
+)
+from mfd_code_quality.coverage.diff_coverage import DiffCoverage, GitDiffError, get_changed_lines, get_diff_coverage
+from mfd_code_quality.jobserver import job_slots
+from mfd_code_quality.utils import get_root_dir
 
 logger = logging.getLogger("mfd-code-quality.coverage")
 
 
-def is_diff_coverage_threshold_reached() -> bool:
+def is_diff_coverage_threshold_reached(cov: "Coverage") -> bool:
     """
     Check if diff coverage value has reached the threshold.
 
-    We just call diff-cover tool here.
-    Under the hood it's just parsing git diff output and compares it with coverage XML report.
+    Lines changed compared to the base branch are taken from git diff and intersected with coverage data in memory.
+    In multi-package repositories each measured package has to reach the threshold on its own.
 
+    :param cov: Coverage object with loaded data.
     :return: True if threshold reached
-    :raise FileNotFoundError: When XML report not found
     """
-    if not (get_root_dir() / COVERAGE_XML_FILE).exists():
-        raise FileNotFoundError(f"{COVERAGE_XML_FILE} does not exist in {get_root_dir()}")
+    root_dir = get_root_dir()
+    packages = cov.get_option("run:source_pkgs") or []
+    try:
+        if len(packages) > 1:
+            verdicts = get_packages_diff_coverage(cov, root_dir, packages)
+        else:
+            verdicts = {"": get_diff_coverage(cov, root_dir, DIFF_COVERAGE_COMPARE_BRANCH)}
+    except GitDiffError as e:
+        logger.error(f"[Coverage] Can't get changed lines: {e}")
+        return False
+
+    failed_packages = []
+    for package, diff_coverage in verdicts.items():
+        of_package = f" of {package}" if package else ""
+        logger.info(diff_coverage.format_report(title=f"Diff Coverage{of_package}"))
+        package_threshold_reached = diff_coverage.percent_covered >= DIFF_COVERAGE_THRESHOLD
+        logger.info(
+            f"[Coverage] Diff coverage{of_package} {diff_coverage.percent_covered:.1f}% - threshold "
+            f"({DIFF_COVERAGE_THRESHOLD}%) is {'' if package_threshold_reached else 'NOT '}met"
+        )
+        if not package_threshold_reached:
+            failed_packages.append(package)
+    if len(verdicts) > 1 and failed_packages:
+        logger.info(f"[Coverage] Diff coverage threshold is NOT met by packages: {', '.join(failed_packages)}")
+    elif len(verdicts) > 1:
+        logger.info(f"[Coverage] Diff coverage threshold is met by all {len(verdicts)} packages")
+    return not failed_packages
+
+
+def get_packages_diff_coverage(cov: "Coverage", root_dir: Path, packages: list[str]) -> dict[str, DiffCoverage]:
+    """
+    Get diff coverage of each package separately.
+
+    Changed lines are taken from git once and split by packages. Changed files of different packages are analyzed
+    in parallel processes (as many as the budget of parallel jobs allows), each loading coverage data on its own.
+
+    :param cov: Coverage object with loaded data.
+    :param root_dir: Root directory of the project.
+    :param packages: Names of top-level packages.
+    :return: Diff coverage by package names.
+    :raises GitDiffError: When git commands fail, e.g. compare branch doesn't exist.
+    """
+    changed_lines = get_changed_lines(root_dir, DIFF_COVERAGE_COMPARE_BRANCH)
+    changed_lines_by_package = {
+        package: {path: lines for path, lines in changed_lines.items() if path.startswith(f"{package}/")}
+        for package in packages
+    }
+    changed_packages = [package for package, lines in changed_lines_by_package.items() if lines]
+    verdicts = {package: DiffCoverage(DIFF_COVERAGE_COMPARE_BRANCH) for package in packages}
+    if len(changed_packages) == 1:
+        package = changed_packages[0]
+        verdicts[package] = get_diff_coverage(
+            cov, root_dir, DIFF_COVERAGE_COMPARE_BRANCH, changed_lines_by_package[package]
+        )
+    elif changed_packages:
+        with (
+            job_slots(len(changed_packages)) as processes,
+            ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("spawn")) as executor,
+        ):
+            futures = {
+                package: executor.submit(
+                    _get_package_diff_coverage,
+                    cov.get_option("run:data_file"),
+                    package,
+                    root_dir,
+                    changed_lines_by_package[package],
+                )
+                for package in changed_packages
+            }
+            verdicts.update({package: future.result() for package, future in futures.items()})
+    return verdicts
+
+
+def _get_package_diff_coverage(
+    data_file: str, package: str, root_dir: Path, changed_lines: dict[str, set[int]]
+) -> DiffCoverage:
+    """
+    Load coverage data and get diff coverage of a single package, run in a separate process.
+
+    :param data_file: Path to coverage data file.
+    :param package: Name of the package.
+    :param root_dir: Root directory of the project.
+    :param changed_lines: Changed lines of files of the package.
+    :return: Diff coverage.
+    """
+    cov = Coverage(data_file=data_file, source_pkgs=[package])
+    cov.load()
+    return get_diff_coverage(cov, root_dir, DIFF_COVERAGE_COMPARE_BRANCH, changed_lines)
+
+
+def get_coverage_totals(cov: "Coverage") -> dict[str, int | float]:
+    """
+    Get coverage totals directly from coverage data, without generating any report.
+
+    :param cov: Coverage object with loaded data.
+    :return: Totals in the format of `totals` section of coverage.py JSON report (line coverage only).
+    """
+    num_statements = missing_lines = excluded_lines = 0
+    for measured_file in cov.get_data().measured_files():
+        try:
+            _, statements, excluded, missing, _ = cov.analysis2(measured_file)
+        except (CoverageException, OSError):
+            continue  # file removed or not a Python source, it's skipped by reports as well
+        num_statements += len(statements)
+        missing_lines += len(missing)
+        excluded_lines += len(excluded)
+
+    covered_lines = num_statements - missing_lines
+    return {
+        "covered_lines": covered_lines,
+        "num_statements": num_statements,
+        "percent_covered": 100.0 * covered_lines / num_statements if num_statements else 100.0,
+        "missing_lines": missing_lines,
+        "excluded_lines": excluded_lines,
+    }
+
+
+def log_module_coverage(cov: "Coverage") -> None:
+    """
+    Log current coverage of module.
+
+    Totals are calculated only if debug logging is enabled.
 
-    diff_cover_executable = Path(sys.executable).parent / "diff-cover"
-    diff_cover_cmd = (
-        f"{diff_cover_executable} {COVERAGE_XML_FILE} --include-untracked --fail-under={DIFF_COVERAGE_THRESHOLD}"
-    )
-    logger.info(f"[Coverage] Executing: {diff_cover_cmd}")
+    :param cov: Coverage object with loaded data.
+    """
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"[Coverage] Calculated coverage of a module:\n{pformat(get_coverage_totals(cov), indent=4)}")
 
-    completed_process: "CompletedProcess" = run(
-        diff_cover_cmd, cwd=get_root_dir(), capture_output=True, text=True, check=False, shell=True
-    )
-    if completed_process.stdout.strip():
-        logger.info(completed_process.stdout)
-    if completed_process.stderr.strip():
-        logger.info(completed_process.stderr)
 
-    logger.info(
-        "[Coverage] diff-cover tool reported that coverage threshold is "
-        f"{'' if completed_process.returncode == 0 else 'NOT '}met"
-    )
-    return completed_process.returncode == 0
+def write_coverage_reports(cov: "Coverage", formats: Iterable[str], output_dir: Path | None = None) -> None:
+    """
+    Write requested coverage reports.
 
+    Reports are written straight to their files (see COVERAGE_REPORT_FILES) - JSON report file by file as they are
+    analyzed, lcov and html by coverage.py.
 
-def get_current_coverage_json() -> dict[str, str | float | int] | None:
+    :param cov: Coverage object with loaded data.
+    :param formats: Report formats, any of COVERAGE_REPORT_FORMATS.
+    :param output_dir: Directory to write reports to, the project's root directory by default.
+    :raises NoDataError: When there is no coverage data to report.
     """
-    Get current coverage in JSON format.
+    output_dir = output_dir or get_root_dir()
+    writers = {
+        "json": lambda: write_json_report(cov, output_dir / COVERAGE_REPORT_FILES["json"]),
+        "xml": lambda: cov.xml_report(outfile=str(output_dir / COVERAGE_REPORT_FILES["xml"])),
+        "lcov": lambda: cov.lcov_report(outfile=str(output_dir / COVERAGE_REPORT_FILES["lcov"])),
+        "html": lambda: cov.html_report(directory=str(output_dir / COVERAGE_REPORT_FILES["html"])),
+    }
+    for report_format in dict.fromkeys(formats):
+        writers[report_format]()
+        logger.info(f"[Coverage] {report_format.upper()} report written.")
 
-    :return: JSON red from coverage report (totals section) or None if coverage report not found
+
+def write_json_report(cov: "Coverage", path: Path) -> None:
     """
-    new_coverage_path = get_root_dir() / COVERAGE_JSON_FILE
-    if not new_coverage_path.exists():
-        logger.warning("[Coverage] New coverage report not found.")
+    Write coverage.py JSON report, streaming entries of files instead of building the whole report in memory.
+
+    Streaming uses internals of the JSON reporter of coverage.py, so it's done only by versions it's known to work with
+    (see COVERAGE_JSON_STREAMING_VERSIONS) and without `json:pretty_print`, otherwise coverage.py writes the report.
+
+    :param cov: Coverage object with loaded data.
+    :param path: Path to the report file.
+    :raises NoDataError: When there is no coverage data to report.
+    """
+    first_version, last_version = COVERAGE_JSON_STREAMING_VERSIONS
+    if cov.get_option("json:pretty_print") or not first_version <= coverage.version_info[:2] < last_version:
+        cov.json_report(outfile=str(path))
         return
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(temporary, "w") as file:
+            _stream_json_report(cov, file)
+        os.replace(temporary, path)
+    finally:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temporary)
 
-    with open(new_coverage_path) as cov:
-        new_coverage_json = json.load(cov)["totals"]
 
-    return new_coverage_json
+def _stream_json_report(cov: "Coverage", file: TextIO) -> None:
+    """
+    Write the same content as `coverage json` file by file, with internals of coverage.py JSON reporter.
 
+    :param cov: Coverage object with loaded data.
+    :param file: File to write the report to.
+    :raises NoDataError: When there is no coverage data to report.
+    """
+    from coverage.jsonreport import FORMAT_VERSION, JsonReporter
+    from coverage.report_core import get_analysis_to_report
 
-def log_module_coverage() -> None:
-    """Log current coverage of module."""
-    new_coverage_json = get_current_coverage_json()
-    logger.debug(f"[Coverage] Calculated coverage of a module:\n{pformat(new_coverage_json, indent=4)}")
+    reporter = JsonReporter(cov)
+    coverage_data = cov.get_data()
+    coverage_data.set_query_contexts(cov.get_option("report:contexts"))
+    meta = {
+        "format": FORMAT_VERSION,
+        "version": coverage.__version__,
+        "timestamp": datetime.datetime.now().isoformat(),
+        "branch_coverage": coverage_data.has_arcs(),
+        "show_contexts": cov.get_option("json:show_contexts"),
+    }
+    file.write(f'{{"meta": {json.dumps(meta)}, "files": {{')
+    separator = ""
+    for file_reporter, analysis in get_analysis_to_report(cov, None):
+        file_report = reporter.report_one_file(coverage_data, analysis, file_reporter)
+        file.write(f"{separator}{json.dumps(file_reporter.relative_filename())}: {json.dumps(file_report)}")
+        separator = ", "
+    totals = reporter.make_summary(reporter.total)
+    if coverage_data.has_arcs():
+        totals.update(reporter.make_branch_summary(reporter.total))
+    file.write(f'}}, "totals": {json.dumps(totals)}}}')
 
 
 @contextlib.contextmanager
@@ -92,3 +267,43 @@ def coverage_section() -> None:
     _log_section_info(" COVERAGE SECTION START ")
     yield
     _log_section_info(" COVERAGE SECTION END ")
+
+
+@contextlib.contextmanager
+def coverage_core() -> Iterator[None]:
+    """
+    Contextmanager selecting the fastest coverage measurement core available for the interpreter.
+
+    On Python 3.12+ `sys.monitoring` based core is used, unless COVERAGE_CORE is already set by the user.
+    Environment variable is used, so it's inherited by pytest-xdist workers as well.
+    """
+    if sys.version_info < (3, 12) or "COVERAGE_CORE" in os.environ:
+        yield
+        return
+
+    os.environ["COVERAGE_CORE"] = "sysmon"
+    try:
+        yield
+    finally:
+        os.environ.pop("COVERAGE_CORE", None)
+
+
+@contextlib.contextmanager
+def coverage_data_file(path: Path) -> Iterator[None]:
+    """
+    Contextmanager redirecting coverage data measured by pytest-cov to given file.
+
+    Environment variable is used, so it's inherited by pytest-xdist workers as well. Their data files are written
+    next to the given file and combined into it.
+
+    :param path: Path to the data file.
+    """
+    previous = os.environ.get("COVERAGE_FILE")
+    os.environ["COVERAGE_FILE"] = str(path)
+    try:
+        yield
+    finally:
+        if previous is None:
+            os.environ.pop("COVERAGE_FILE", None)
+        else:
+            os.environ["COVERAGE_FILE"] = previous
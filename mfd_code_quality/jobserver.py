@@ -0,0 +1,196 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Jobserver sharing one budget of parallel jobs between all tools run by mfd-code-quality.
+
+Budget is given by `--jobs` (number of CPUs available for the process by default) and enforced by a GNU make
+compatible jobserver - a named pipe holding one token per job slot beyond the first one. Every process has one
+implicit slot, additional slots are taken from the pipe before parallel work is started and returned once it's done.
+The pipe is advertised in MAKEFLAGS, so processes started by mfd-code-quality (stages of mfd-all-checks, make or cargo
+building native extensions during pip installs, ...) share the same budget. Tools without jobserver support get
+the number of granted slots through their own options, e.g. pytest-xdist workers or ruff threads.
+"""
+
+import atexit
+import contextlib
+import logging
+import os
+import re
+import shutil
+import stat
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Iterator
+
+from mfd_code_quality.utils import get_available_cpu_count, get_parsed_args
+
+logger = logging.getLogger("mfd-code-quality.jobserver")
+
+MAKEFLAGS_ENV_VAR = "MAKEFLAGS"
+THREADS_ENV_VAR = "RAYON_NUM_THREADS"  # size of thread pool of tools using rayon, e.g. ruff
+JOBSERVER_AUTH_PATTERN = re.compile(r"--jobserver-auth=(?:fifo:(?P<path>\S+)|(?P<read_fd>\d+),(?P<write_fd>\d+))")
+TOKEN = b"+"
+
+
+class JobServer:
+    """Client of GNU make compatible jobserver, optionally its owner."""
+
+    def __init__(self, fd: int, path: Path, jobs: int | None = None) -> None:
+        """
+        Init.
+
+        :param fd: Non-blocking file descriptor of the pipe with tokens, open for reading and writing.
+        :param path: Path to the named pipe.
+        :param jobs: Number of job slots if the jobserver is owned by the current process, None for joined one.
+        """
+        self.fd = fd
+        self.path = path
+        self.jobs = jobs
+        # notified about numbers of taken (positive) and returned (negative) tokens, e.g. to return tokens of a killed
+        # process on its behalf
+        self.token_listener: Callable[[int], None] | None = None
+
+    @classmethod
+    def create(cls: "type[JobServer]", jobs: int) -> "JobServer":
+        """
+        Start jobserver with given number of job slots.
+
+        :param jobs: Number of job slots, including the implicit one of the current process.
+        :return: Jobserver.
+        """
+        path = Path(tempfile.mkdtemp(prefix="mfd-jobserver-")) / "fifo"
+        os.mkfifo(path, 0o600)
+        fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+        os.write(fd, TOKEN * (jobs - 1))
+        return cls(fd, path, jobs)
+
+    @classmethod
+    def join(cls: "type[JobServer]", makeflags: str) -> "JobServer | None":
+        """
+        Join jobserver advertised by a parent process.
+
+        Pipe given by inherited file descriptors (make older than 4.4) is reopened, so reading from it can be
+        non-blocking without changing mode of the descriptors shared with other processes. make closes these
+        descriptors for recipes not marked as recursive but still passes MAKEFLAGS, so their numbers may belong
+        to any other file - only a pipe is joined, tokens are never read from or written to other files.
+
+        :param makeflags: Value of MAKEFLAGS environment variable, the last advertised jobserver is joined (as by make).
+        :return: Jobserver or None if none is advertised or it's not accessible.
+        """
+        matches = list(JOBSERVER_AUTH_PATTERN.finditer(makeflags))
+        if not matches:
+            return None
+        match = matches[-1]
+        path = Path(match["path"] or f"/proc/self/fd/{match['read_fd']}")
+        try:
+            fd = os.open(path, os.O_RDWR | os.O_NONBLOCK)
+        except OSError as e:
+            logger.debug(f"Can't join jobserver {path}: {e}")
+            return None
+        if not stat.S_ISFIFO(os.fstat(fd).st_mode):
+            os.close(fd)
+            logger.debug(f"Can't join jobserver {path}: it's not a pipe, descriptors were probably closed by make.")
+            return None
+        return cls(fd, path)
+
+    @property
+    def makeflags(self) -> str:
+        """MAKEFLAGS advertising the jobserver to child processes."""
+        return f"-j{self.jobs} --jobserver-auth=fifo:{self.path}"
+
+    def acquire(self, count: int) -> bytes:
+        """
+        Take up to given number of tokens without waiting for them.
+
+        :param count: Number of tokens.
+        :return: Taken tokens, have to be returned by release.
+        """
+        if count <= 0:
+            return b""
+        try:
+            tokens = os.read(self.fd, count)
+        except BlockingIOError:
+            return b""
+        if tokens and self.token_listener is not None:
+            self.token_listener(len(tokens))
+        return tokens
+
+    def release(self, tokens: bytes) -> None:
+        """
+        Return tokens to the jobserver.
+
+        :param tokens: Tokens taken by acquire.
+        """
+        if tokens:
+            if self.token_listener is not None:
+                self.token_listener(-len(tokens))
+            os.write(self.fd, tokens)
+
+    def close(self) -> None:
+        """Close the pipe, remove it if it's owned by the current process."""
+        os.close(self.fd)
+        if self.jobs is not None:
+            shutil.rmtree(self.path.parent, ignore_errors=True)
+
+
+def get_jobs() -> int:
+    """
+    Get budget of parallel jobs.
+
+    :return: Number of jobs given by `--jobs`, number of available CPUs by default.
+    """
+    jobs = get_parsed_args().jobs
+    return max(jobs, 1) if jobs is not None else get_available_cpu_count()
+
+
+@lru_cache()
+def get_jobserver() -> JobServer | None:
+    """
+    Join jobserver of a parent process or start a new one with budget of `--jobs` and advertise it to child processes.
+
+    :return: Jobserver or None if named pipes are not supported by the platform.
+    """
+    jobserver = JobServer.join(os.environ.get(MAKEFLAGS_ENV_VAR, ""))
+    if jobserver is not None or not hasattr(os, "mkfifo"):
+        return jobserver
+    jobserver = JobServer.create(get_jobs())
+    # jobserver which couldn't be joined is not advertised to child processes anymore
+    makeflags = JOBSERVER_AUTH_PATTERN.sub("", os.environ.get(MAKEFLAGS_ENV_VAR, ""))
+    os.environ[MAKEFLAGS_ENV_VAR] = " ".join([*makeflags.split(), jobserver.makeflags])
+    atexit.register(jobserver.close)
+    logger.debug(f"Started jobserver with {jobserver.jobs} job slots: {jobserver.path}")
+    return jobserver
+
+
+@contextlib.contextmanager
+def job_slots(count: int) -> Iterator[int]:
+    """
+    Contextmanager reserving job slots for parallel work.
+
+    The implicit slot of the process is always granted, others are taken from the jobserver without waiting, so work
+    started when the budget is used up by other processes runs with less parallelism instead of waiting.
+
+    :param count: Number of requested slots.
+    :return: Number of granted slots, at least 1.
+    """
+    count = min(count, get_jobs())
+    jobserver = get_jobserver()
+    if jobserver is None:
+        yield max(count, 1)
+        return
+    tokens = jobserver.acquire(count - 1)
+    try:
+        yield 1 + len(tokens)
+    finally:
+        jobserver.release(tokens)
+
+
+def get_threads_env(threads: int) -> dict[str, str]:
+    """
+    Get environment limiting thread pools of tools run as subprocesses.
+
+    :param threads: Number of threads.
+    :return: Environment of the current process with the limit.
+    """
+    return {**os.environ, THREADS_ENV_VAR: str(threads)}
@@ -3,6 +3,7 @@
 """Log formatter."""
 
 import logging
+from functools import lru_cache
 
 from colors import ansilen
 
@@ -33,8 +34,8 @@ class CustomLogFormatter(logging.Formatter):
         :return: Formatted message.
         """
         message = record.getMessage()
-        # check if separator
-        if len(set(message)) == 1:
+        # check if separator, strip() stops at the first other character, so it's cheap for regular messages
+        if message and not message.strip(message[0]):
             return message
 
         # check if explicitly marked as separator
@@ -42,9 +43,12 @@ class CustomLogFormatter(logging.Formatter):
             return message
 
         # this module only logs messages from this module, no need to keep prefix
-        record.name = record.name.replace("mfd-code-quality.", "")
-
-        formatted_prefix = self._prev_formatter.format(record)
+        name = record.name
+        record.name = _get_short_name(name)
+        try:
+            formatted_prefix = self._prev_formatter.format(record)
+        finally:
+            record.name = name  # record might be handled by other handlers as well
         return self.get_prepared_message(formatted_prefix, message)
 
     @staticmethod
@@ -56,9 +60,34 @@ class CustomLogFormatter(logging.Formatter):
         :param message: Message, which will be extended with spaces to create column-like aligned text.
         :return: Joined formatted prefix and extended message.
         """
-        indent_length = ansilen(formatted_prefix) + 1  # + 1 because of additional space before message
+        # line breaks and ANSI escape sequences are not printable, there is nothing to indent in a printable message
+        if message.isprintable():
+            return f"{formatted_prefix} {message}"
+        indent_length = _get_prefix_width(formatted_prefix) + 1  # + 1 because of additional space before message
         msg_lines = message.splitlines(True)
         message = ""
         if msg_lines:
             message = "".join([msg_lines[0], *(f"{indent_length * ' '}{line}" for line in msg_lines[1:])])
         return f"{formatted_prefix} {message}"
+
+
+@lru_cache(maxsize=256)
+def _get_short_name(name: str) -> str:
+    """
+    Get name of logger without prefix of this module.
+
+    :param name: Name of logger.
+    :return: Shortened name.
+    """
+    return name.replace("mfd-code-quality.", "")
+
+
+@lru_cache(maxsize=256)
+def _get_prefix_width(formatted_prefix: str) -> int:
+    """
+    Get width of formatted prefix on the terminal, prefixes repeat until time in them changes.
+
+    :param formatted_prefix: Formatted log's prefix.
+    :return: Length of prefix without ANSI escape sequences.
+    """
+    return ansilen(formatted_prefix)
@@ -0,0 +1,97 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Logging through a queue.
+
+Threads emitting records only put them into a queue, formatting and writing them to the terminal is done by a thread
+of the listener, so streaming output of tools and tests through logging doesn't block on terminal I/O.
+"""
+
+import logging
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+LOG_FLUSH_TIMEOUT = 5  # seconds of waiting for records in the queue to be written
+
+
+class LogQueueListener(QueueListener):
+    """Listener writing records from the queue, which can be waited for to write all records queued so far."""
+
+    @property
+    def running(self) -> bool:
+        """Check if thread of the listener is running."""
+        return self._thread is not None
+
+    def handle(self, record: logging.LogRecord) -> None:
+        """
+        Handle record or notify thread waiting in flush().
+
+        :param record: Log record.
+        """
+        flushed = getattr(record, "flushed", None)
+        if flushed is None:
+            super().handle(record)
+            return
+        for handler in self.handlers:
+            handler.flush()
+        flushed.set()
+
+    def flush(self, timeout: float = LOG_FLUSH_TIMEOUT) -> None:
+        """
+        Wait until records queued so far are written.
+
+        :param timeout: Maximum time of waiting in seconds.
+        """
+        if not self.running:
+            return
+        flushed = threading.Event()
+        self.queue.put_nowait(logging.makeLogRecord({"flushed": flushed}))
+        flushed.wait(timeout)
+
+
+class LogQueueHandler(QueueHandler):
+    """Handler putting records into the queue of its listener."""
+
+    def __init__(self, handler: logging.Handler) -> None:
+        """
+        Init.
+
+        :param handler: Handler writing records, it's called by thread of the listener.
+        """
+        super().__init__(SimpleQueue())
+        self.listener = LogQueueListener(self.queue, handler, respect_handler_level=True)
+        self.listener.start()
+
+    def flush(self) -> None:
+        """Wait until records queued so far are written, logging.shutdown() calls it at exit."""
+        self.listener.flush()
+
+    def close(self) -> None:
+        """Write queued records and stop the listener."""
+        if self.listener.running:
+            self.listener.stop()
+        super().close()
+
+
+def enqueue_handler(logger: logging.Logger, handler: logging.Handler) -> LogQueueHandler:
+    """
+    Replace handler of the logger with handler putting records into a queue, the original handler writes them.
+
+    :param logger: Logger with the handler.
+    :param handler: Handler to be called by thread of the listener.
+    :return: Handler added to the logger.
+    """
+    queue_handler = LogQueueHandler(handler)
+    for log_filter in handler.filters:
+        queue_handler.addFilter(log_filter)  # filtered out records are not even queued
+    logger.removeHandler(handler)
+    logger.addHandler(queue_handler)
+    return queue_handler
+
+
+def flush_logging() -> None:
+    """Wait until queued records are written, e.g. before another process or pytest writes to the same terminal."""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, LogQueueHandler):
+            handler.flush()
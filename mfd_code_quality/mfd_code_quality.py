@@ -2,8 +2,12 @@
 # SPDX-License-Identifier: MIT
 """Main module."""
 
+import importlib
 import logging
+import multiprocessing
+import sys
 from collections import namedtuple
+from typing import Any
 
 
 logger = logging.getLogger("mfd-code-quality.general")
@@ -31,6 +35,10 @@ AVAILABLE_CHECKS = {
         path="mfd_code_quality.testing_utilities.unit_tests:run_unit_tests_with_coverage",
         help="Run unittests and check if new code coverage is reaching the threshold (80%).",
     ),
+    "mfd-coverage-combine": PathHelpTuple(
+        path="mfd_code_quality.coverage.combine:combine_coverage",
+        help="Combine coverage of unit tests shards and check if new code coverage is reaching the threshold (80%).",
+    ),
     "mfd-system-tests": PathHelpTuple(
         path="mfd_code_quality.testing_utilities.system_tests:run_checks", help="Run system tests."
     ),
@@ -38,10 +46,26 @@ AVAILABLE_CHECKS = {
         path="mfd_code_quality.mfd_code_quality:run_all_checks",
         help="Run all available checks.",
     ),
+    "mfd-batch": PathHelpTuple(
+        path="mfd_code_quality.batch:run_batch",
+        help="Run all available checks of many repositories in parallel.",
+    ),
     "mfd-help": PathHelpTuple(path="mfd_code_quality.mfd_code_quality:log_help_info", help="Log available commands."),
 }
 
 
+# stages of mfd-all-checks, functions are given by paths, so they are imported only by processes running them
+ALL_CHECKS_STAGES = (
+    ("mfd_code_quality.code_standard.checks:_run_code_standard_tests", {"with_configs": False}),
+    ("mfd_code_quality.testing_utilities.import_tests:_run_import_tests", {}),
+    ("mfd_code_quality.testing_utilities.system_tests:_run_system_tests", {}),
+    (
+        "mfd_code_quality.testing_utilities.unit_tests:_run_unit_tests",
+        {"compare_coverage": True, "with_configs": False},
+    ),
+)
+
+
 def log_help_info() -> None:
     """Log information about available commands."""
     from mfd_code_quality.utils import set_up_logging
@@ -54,32 +78,91 @@ def log_help_info() -> None:
         "Arguments available for all commands:\n"
         "-p / --project-dir <path>     : Specify root directory to run checks in. "
         "Current working directory is a default.\n"
-        "-v / --verbose                : Enable verbose logging."
+        "-v / --verbose                : Enable verbose logging.\n"
+        "--no-cache                    : Ignore data cached by previous runs.\n"
+        "--jobs <N>                    : Number of jobs run in parallel by all tools together (default: CPUs).\n"
+        "--tool-timeout <s>            : Kill external tool (ruff, flake8, pip, git) running longer.\n"
+        "--tool-output-lines <N>       : Number of the latest lines of tool output kept in memory (default: 100).\n\n"
+        "Arguments available for mfd-unit-tests(-with-coverage):\n"
+        "--coverage-report <format>    : Write json/xml/lcov/html coverage report, can be repeated "
+        "(mfd-coverage-combine as well).\n"
+        "--shard <i/N>                 : Run only i-th of N shards, coverage is combined by mfd-coverage-combine.\n\n"
+        "Arguments available for mfd-unit-tests(-with-coverage) and mfd-system-tests:\n"
+        "--workers <N>                 : Number of pytest-xdist workers (default: based on CPUs, memory, tests).\n"
+        "--fail-fast                   : Stop on the first failure, previously failed tests are run first.\n"
+        "--test-timeout <s>            : Fail a test running longer, 0 disables the timeout (default: 600 for unit).\n"
+        "--stage-timeout <s>           : Interrupt the whole run after given time, dump stacks of test processes.\n"
+        "--max-worker-rss <MiB>        : Replace xdist worker exceeding memory limit, 0 disables (default: 2048).\n\n"
+        "Arguments available for mfd-import-tests:\n"
+        "--import-time-budget <s>      : Fail when importing all modules takes longer.\n"
+        "--module-import-time-budget <s>: Fail when importing a single module takes longer.\n"
+        "--strict-import-side-effects   : Fail modules doing I/O at import time.\n\n"
+        "Arguments available for mfd-import-tests and mfd-unit-tests(-with-coverage):\n"
+        "--warm-up-bytecode            : Compile changed files to bytecode in parallel before tests are run.\n\n"
+        "Arguments available for mfd-batch (arguments of checks are applied to all repositories):\n"
+        "--repositories <path> ...     : Paths of repositories to check.\n"
+        "--workspace <path>            : Check each subdirectory with pyproject.toml or setup.py, can be repeated.\n"
+        "--batch-workers <N>           : Number of repositories checked in parallel (default: jobs / 4).\n"
+        "--repo-timeout <s>            : Stop checks of a repository running longer.\n"
+        "--batch-report <path>         : Write JSON report of all repositories to given path as well."
     )
 
 
 def run_all_checks() -> bool:
-    """Run all available checks."""
+    """
+    Run all available checks.
+
+    Each stage is run in a fresh spawned process, so modules of the project imported by one stage don't stay loaded
+    in the others (unit tests import them only once coverage is measured) and memory is reclaimed between stages.
+
+    :return: True if all checks passed, False otherwise.
+    """
     from mfd_code_quality.code_standard.checks import _get_available_code_standard_module
     from mfd_code_quality.code_standard.configure import create_config_files, delete_config_files
-    from .code_standard.checks import _run_code_standard_tests as code_standard_check
-    from .testing_utilities.import_tests import _run_import_tests as import_tests_check
-    from .testing_utilities.system_tests import _run_system_tests as system_tests_check
-    from .testing_utilities.unit_tests import _run_unit_tests as unit_tests_with_coverage_check
+    from mfd_code_quality.jobserver import get_jobserver
+    from mfd_code_quality.utils import get_run_id
 
+    # both are exported to the environment, so all stages write artifacts to directories of the same run
+    # and share one budget of parallel jobs
+    get_run_id()
+    get_jobserver()
     code_standard_module = _get_available_code_standard_module()
     if code_standard_module == "ruff":
         create_config_files()
-    result = all(
-        [
-            code_standard_check(with_configs=False),
-            import_tests_check(),
-            system_tests_check(),
-            unit_tests_with_coverage_check(compare_coverage=True, with_configs=False),
-        ]
-    )
+    result = all([run_stage(path, **kwargs) for path, kwargs in ALL_CHECKS_STAGES])
     if code_standard_module == "ruff":
         delete_config_files()
 
     logger.info("All checks PASSED." if result else "Some checks FAILED.")
     return result
+
+
+def run_stage(path: str, **kwargs: Any) -> bool:
+    """
+    Run stage in a fresh spawned process.
+
+    Spawned process gets command line arguments and working directory of the current one.
+
+    :param path: Path to the function of the stage, `<module>:<function>`.
+    :param kwargs: Keyword arguments of the function.
+    :return: True if function returned truthy value, False if it returned falsy value or raised an exception.
+    """
+    from mfd_code_quality.log_queue import flush_logging
+
+    flush_logging()  # records logged so far are written before the ones of the stage
+    process = multiprocessing.get_context("spawn").Process(target=_run_stage_process, args=(path, kwargs), name=path)
+    process.start()
+    process.join()
+    return process.exitcode == 0
+
+
+def _run_stage_process(path: str, kwargs: dict[str, Any]) -> None:
+    """
+    Import and run function of the stage, exit with its result.
+
+    :param path: Path to the function of the stage, `<module>:<function>`.
+    :param kwargs: Keyword arguments of the function.
+    """
+    module_name, function_name = path.split(":")
+    function = getattr(importlib.import_module(module_name), function_name)
+    sys.exit(0 if function(**kwargs) else 1)
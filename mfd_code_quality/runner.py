@@ -0,0 +1,530 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Runner of external tools (ruff, flake8, pip, git, ...).
+
+Tools are run as asyncio subprocesses with a timeout. Each running tool takes a job slot from the budget of `--jobs`
+shared with other processes through the jobserver, so tools started by parallel threads wait for each other. Output is
+read as it arrives and can be streamed line by line through a logger, so it's formatted by CustomLogFormatter like
+other logs while the tool is still running. Only the latest lines of output are kept in memory (for summary of
+a failure), older lines are spilled to a log file in directory of the run. Tool is killed when its timeout expires or
+when the task running it is cancelled (e.g. by Ctrl+C). On POSIX systems tools are started in their own process group,
+so processes started by a tool are killed together with it, and resource usage (CPU time, peak memory) of each tool
+is collected.
+"""
+
+import asyncio
+import contextlib
+import itertools
+import locale
+import logging
+import os
+import re
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Mapping, Sequence
+
+logger = logging.getLogger("mfd-code-quality.runner")
+
+TOOL_OUTPUT_LINES = 100  # lines of output of each stream of a tool kept in memory, older ones are spilled to a file
+TOOL_OUTPUT_DIR = "tools"  # directory of the run with output spilled by tools
+OUTPUT_CHUNK_SIZE = 64 * 1024  # bytes read from output of a tool at once
+OUTPUT_LINE_LIMIT = 64 * 1024  # bytes after which a line without line break is split
+TOOL_KILL_GRACE = 5  # seconds between terminating a tool and killing it
+TOOL_SLOT_POLL_INTERVAL = 0.05  # seconds between attempts to take a job slot for a tool when the budget is used up
+
+_spill_counter = itertools.count(1)
+
+
+@dataclass(frozen=True)
+class ResourceUsage:
+    """Resources used by a finished tool and processes it waited for."""
+
+    user_time: float  # seconds
+    system_time: float  # seconds
+    max_rss: int  # bytes
+
+
+@dataclass(frozen=True)
+class ToolResult:
+    """Result of a finished tool."""
+
+    args: tuple[str, ...]
+    returncode: int
+    stdout: str  # the latest lines only, unless the whole output was requested
+    stderr: str
+    duration: float  # seconds
+    rusage: ResourceUsage | None = None  # None where it's not available, e.g. on Windows
+    timed_out: bool = False
+    log_paths: tuple[Path, ...] = ()  # files with the whole output of streams which didn't fit into memory
+
+    @property
+    def truncated(self) -> bool:
+        """True if older lines of output are only in log files."""
+        return bool(self.log_paths)
+
+
+class OutputBuffer:
+    """Ring buffer of the latest lines of a stream, older lines are spilled to a file."""
+
+    def __init__(self, max_lines: int | None = TOOL_OUTPUT_LINES, spill_path: Path | None = None) -> None:
+        """
+        Init.
+
+        :param max_lines: Number of lines kept in memory, None for no limit.
+        :param spill_path: File to write older lines to, they are dropped without it.
+        """
+        self.max_lines = max_lines
+        self.spill_path = spill_path
+        self._lines: deque[bytes] = deque()
+        self._spill_file: IO[bytes] | None = None
+
+    @property
+    def spilled(self) -> bool:
+        """True if older lines were written to the spill file."""
+        return self._spill_file is not None
+
+    def append(self, line: bytes) -> None:
+        """
+        Add line, spill the oldest line exceeding the limit.
+
+        :param line: Line including its line break.
+        """
+        self._lines.append(line)
+        if self.max_lines is None or len(self._lines) <= self.max_lines:
+            return
+        oldest = self._lines.popleft()
+        if self.spill_path is None:
+            return
+        if self._spill_file is None:
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._spill_file = open(self.spill_path, "wb")  # noqa: SIM115
+        self._spill_file.write(oldest)
+
+    def close(self) -> None:
+        """Write lines kept in memory to the spill file too, so it contains the whole output."""
+        if self._spill_file is not None:
+            self._spill_file.writelines(self._lines)
+            self._spill_file.close()
+
+    def getvalue(self) -> str:
+        """
+        Get lines kept in memory.
+
+        :return: Output decoded like by subprocess in text mode.
+        """
+        return b"".join(self._lines).decode(locale.getpreferredencoding(False), errors="replace")
+
+
+class _ToolSlots:
+    """
+    Job slots of tools run by the process, shared by all threads and event loops.
+
+    The first running tool uses the implicit slot of the process, every other one waits for a token of the jobserver.
+    Without jobserver (platforms without named pipes) tools of the process are limited by `--jobs` on their own.
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        self._lock = threading.Lock()
+        self._implicit_slot_free = True
+        self._local_tokens: int | None = None  # tokens of the process when there is no jobserver
+
+    async def acquire(self) -> bytes:
+        """
+        Wait for a job slot.
+
+        :return: Token of the slot, empty for the implicit slot, has to be returned by release.
+        """
+        while (token := self._try_acquire()) is None:
+            await asyncio.sleep(TOOL_SLOT_POLL_INTERVAL)
+        return token
+
+    def release(self, token: bytes) -> None:
+        """
+        Return job slot.
+
+        :param token: Token taken by acquire.
+        """
+        from mfd_code_quality.jobserver import get_jobserver
+
+        with self._lock:
+            if not token:
+                self._implicit_slot_free = True
+            elif (jobserver := get_jobserver()) is not None:
+                jobserver.release(token)
+            else:
+                self._local_tokens += 1
+
+    def _try_acquire(self) -> bytes | None:
+        """
+        Take job slot without waiting.
+
+        :return: Token of the slot, empty for the implicit slot, None if no slot is free.
+        """
+        from mfd_code_quality.jobserver import TOKEN, get_jobs, get_jobserver
+
+        with self._lock:
+            if self._implicit_slot_free:
+                self._implicit_slot_free = False
+                return b""
+            jobserver = get_jobserver()
+            if jobserver is not None:
+                return jobserver.acquire(1) or None
+            if self._local_tokens is None:
+                self._local_tokens = get_jobs() - 1
+            if self._local_tokens > 0:
+                self._local_tokens -= 1
+                return TOKEN
+            return None
+
+
+_tool_slots = _ToolSlots()
+_tool_group_listener: Callable[[int, bool], None] | None = None  # notified about process groups of running tools
+
+
+def set_tool_group_listener(listener: Callable[[int, bool], None] | None) -> None:
+    """
+    Set function notified about process groups of tools, e.g. by a process which may be killed together with its tools.
+
+    :param listener: Function called with process group of a tool and True once it started, False once it finished,
+        None to stop notifications.
+    """
+    global _tool_group_listener
+    _tool_group_listener = listener
+
+
+class ToolRunner:
+    """Runner of tools, each running tool takes a job slot from the budget of `--jobs`."""
+
+    def __init__(self, max_concurrency: int | None = None) -> None:
+        """
+        Init.
+
+        :param max_concurrency: Additional limit of tools run by this runner at the same time, None for no limit.
+        """
+        self._semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency is not None else None
+
+    async def run(
+        self,
+        args: Sequence[str],
+        *,
+        cwd: str | os.PathLike | None = None,
+        env: Mapping[str, str] | None = None,
+        timeout: float | None = None,
+        stream_logger: logging.Logger | None = None,
+        stream_level: int = logging.INFO,
+        keep_output: bool = False,
+    ) -> ToolResult:
+        """
+        Run tool once a job slot is free and the number of tools running by this runner is below its limit.
+
+        :param args: Command.
+        :param cwd: Working directory.
+        :param env: Environment, the one of the current process by default.
+        :param timeout: Seconds after which the tool is killed, `--tool-timeout` by default, 0 disables the timeout.
+        :param stream_logger: Logger to log lines of output with as they arrive.
+        :param stream_level: Level of logged lines.
+        :param keep_output: Keep the whole output in memory, e.g. when it's parsed. Otherwise only the latest
+                            `--tool-output-lines` lines of each stream are kept and older ones are spilled to a file.
+        :return: Result of the tool, its return code is negative signal number if it was killed.
+        :raises OSError: When tool can't be started, e.g. it's not installed.
+        """
+        from mfd_code_quality.utils import get_parsed_args, get_run_dir
+
+        args = tuple(str(arg) for arg in args)
+        if timeout is None:
+            timeout = get_parsed_args().tool_timeout
+        if keep_output:
+            buffers = (OutputBuffer(None), OutputBuffer(None))
+        else:
+            max_lines = get_parsed_args().tool_output_lines or TOOL_OUTPUT_LINES
+            name = f"{_get_tool_name(args)}-{os.getpid()}-{next(_spill_counter)}"
+            output_dir = get_run_dir(TOOL_OUTPUT_DIR)
+            buffers = tuple(OutputBuffer(max_lines, output_dir / f"{name}.{stream}.log") for stream in ("out", "err"))
+        async with self._semaphore or contextlib.nullcontext():
+            token = await _tool_slots.acquire()
+            try:
+                return await _run_tool(args, cwd, env, timeout or None, stream_logger, stream_level, buffers)
+            finally:
+                _tool_slots.release(token)
+
+
+def run_tool(args: Sequence[str], **kwargs: Any) -> ToolResult:
+    """
+    Run tool from synchronous code, tools run by parallel threads share job slots.
+
+    :param args: Command.
+    :param kwargs: Options of ToolRunner.run.
+    :return: Result of the tool.
+    """
+    return asyncio.run(ToolRunner().run(args, **kwargs))
+
+
+def describe_failure(result: ToolResult) -> str:
+    """
+    Describe failed tool with the latest lines of its output.
+
+    :param result: Result of the tool.
+    :return: Description.
+    """
+    command = " ".join(result.args)
+    reason = "timed out" if result.timed_out else f"failed with exit code {result.returncode}"
+    description = [f"'{command}' {reason}."]
+    for name, output in (("output", result.stdout), ("error output", result.stderr)):
+        if output.strip():
+            description.append(f"The latest lines of {name}:\n{output.rstrip()}")
+    if result.log_paths:
+        description.append(f"Whole output: {', '.join(str(path) for path in result.log_paths)}")
+    return "\n".join(description)
+
+
+async def _run_tool(
+    args: tuple[str, ...],
+    cwd: str | os.PathLike | None,
+    env: Mapping[str, str] | None,
+    timeout: float | None,
+    stream_logger: logging.Logger | None,
+    stream_level: int,
+    buffers: tuple[OutputBuffer, OutputBuffer],
+) -> ToolResult:
+    """
+    Run tool, kill it after timeout or when cancelled.
+
+    :param args: Command.
+    :param cwd: Working directory.
+    :param env: Environment.
+    :param timeout: Seconds after which the tool is killed, None for no limit.
+    :param stream_logger: Logger to log lines of output with.
+    :param stream_level: Level of logged lines.
+    :param buffers: Buffers of standard output and standard error.
+    :return: Result of the tool.
+    """
+    command = " ".join(args)
+    start = time.monotonic()
+    process = await _ToolProcess.start(args, cwd, env)
+    stdout, stderr = buffers
+    communication = asyncio.gather(
+        _read_output(process.stdout, stdout, stream_logger, stream_level),
+        _read_output(process.stderr, stderr, stream_logger, stream_level),
+        process.wait(),
+    )
+    timed_out = False
+    try:
+        returncode, rusage = (await asyncio.wait_for(communication, timeout))[2]
+    except asyncio.TimeoutError:
+        logger.warning(f"'{command}' is running longer than {timeout} s, killing it.")
+        timed_out = True
+        returncode, rusage = await process.kill()
+    except BaseException:
+        # cancelled, e.g. by Ctrl+C - the tool must not outlive the run
+        communication.cancel()
+        await asyncio.shield(process.kill())
+        raise
+    finally:
+        process.close()
+        stdout.close()
+        stderr.close()
+
+    result = ToolResult(
+        args=args,
+        returncode=returncode,
+        stdout=stdout.getvalue(),
+        stderr=stderr.getvalue(),
+        duration=time.monotonic() - start,
+        rusage=rusage,
+        timed_out=timed_out,
+        log_paths=tuple(buffer.spill_path for buffer in buffers if buffer.spilled),
+    )
+    logger.debug(_describe_result(command, result))
+    return result
+
+
+async def _read_output(
+    reader: asyncio.StreamReader, buffer: OutputBuffer, stream_logger: logging.Logger | None, stream_level: int
+) -> None:
+    """
+    Read output of a tool line by line until it's closed.
+
+    :param reader: Stream of the tool.
+    :param buffer: Buffer to store lines in.
+    :param stream_logger: Logger to log lines with as they arrive.
+    :param stream_level: Level of logged lines.
+    """
+    encoding = locale.getpreferredencoding(False)
+
+    def add_line(line: bytes) -> None:
+        buffer.append(line)
+        if stream_logger is not None:
+            stream_logger.log(stream_level, line.decode(encoding, errors="replace").rstrip())
+
+    pending = b""
+    while chunk := await reader.read(OUTPUT_CHUNK_SIZE):
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            add_line(line + b"\n")
+        while len(pending) >= OUTPUT_LINE_LIMIT:
+            add_line(pending[:OUTPUT_LINE_LIMIT])
+            pending = pending[OUTPUT_LINE_LIMIT:]
+    if pending:
+        add_line(pending)
+
+
+def _get_tool_name(args: tuple[str, ...]) -> str:
+    """
+    Get name of the tool usable in file names.
+
+    :param args: Command, e.g. ("/usr/bin/python", "-m", "ruff", "check").
+    :return: Name, e.g. "ruff-check".
+    """
+    words = list(args[2:4]) if len(args) > 2 and args[1] == "-m" else [Path(args[0]).stem, *args[1:2]]
+    return re.sub(r"[^\w.]+", "-", "-".join(words)).strip("-") or "tool"
+
+
+def _describe_result(command: str, result: ToolResult) -> str:
+    """
+    Describe how tool finished and resources it used.
+
+    :param command: Command.
+    :param result: Result of the tool.
+    :return: Description.
+    """
+    description = f"'{command}' finished with exit code {result.returncode} in {result.duration:.2f} s"
+    if result.rusage is not None:
+        description += (
+            f" (CPU user {result.rusage.user_time:.2f} s, system {result.rusage.system_time:.2f} s, "
+            f"max RSS {result.rusage.max_rss / 1024 / 1024:.1f} MiB)"
+        )
+    if result.log_paths:
+        description += f", whole output is in {', '.join(str(path) for path in result.log_paths)}"
+    return description + "."
+
+
+class _ToolProcess:
+    """
+    Running tool.
+
+    On POSIX the tool is waited for with wait4 in a thread, which gives its resource usage (asyncio subprocesses
+    are reaped by the event loop without it) and output pipes are read by the event loop. Elsewhere asyncio
+    subprocess is used.
+    """
+
+    def __init__(
+        self,
+        stdout: asyncio.StreamReader,
+        stderr: asyncio.StreamReader,
+        popen: subprocess.Popen | None = None,
+        process: asyncio.subprocess.Process | None = None,
+        transports: Sequence[asyncio.BaseTransport] = (),
+    ) -> None:
+        """
+        Init.
+
+        :param stdout: Standard output.
+        :param stderr: Standard error.
+        :param popen: Process waited for by wait4.
+        :param process: Asyncio subprocess, when wait4 is not available.
+        :param transports: Transports of output pipes to close once the tool finished.
+        """
+        self.stdout = stdout
+        self.stderr = stderr
+        self._popen = popen
+        self._process = process
+        self._transports = transports
+        self._exit: asyncio.Future | None = None
+
+    @classmethod
+    async def start(
+        cls: "type[_ToolProcess]", args: tuple[str, ...], cwd: str | os.PathLike | None, env: Mapping[str, str] | None
+    ) -> "_ToolProcess":
+        """
+        Start tool.
+
+        :param args: Command.
+        :param cwd: Working directory.
+        :param env: Environment.
+        :return: Running tool.
+        """
+        if not hasattr(os, "wait4"):
+            process = await asyncio.create_subprocess_exec(
+                *args, cwd=cwd, env=env, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+            )
+            return cls(process.stdout, process.stderr, process=process)
+
+        popen = subprocess.Popen(
+            args,
+            cwd=cwd,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            start_new_session=True,
+        )
+        if _tool_group_listener is not None:
+            _tool_group_listener(popen.pid, True)
+        loop = asyncio.get_running_loop()
+        readers, transports = [], []
+        for pipe in (popen.stdout, popen.stderr):
+            reader = asyncio.StreamReader()
+            transport, _ = await loop.connect_read_pipe(
+                lambda reader=reader: asyncio.StreamReaderProtocol(reader), pipe
+            )
+            readers.append(reader)
+            transports.append(transport)
+        return cls(*readers, popen=popen, transports=transports)
+
+    async def wait(self) -> tuple[int, ResourceUsage | None]:
+        """
+        Wait for the tool to finish.
+
+        :return: Return code and resource usage.
+        """
+        if self._process is not None:
+            return await self._process.wait(), None
+        if self._exit is None:
+            self._exit = asyncio.get_running_loop().run_in_executor(None, os.wait4, self._popen.pid, 0)
+        _, status, rusage = await asyncio.shield(self._exit)
+        self._popen.returncode = os.waitstatus_to_exitcode(status)
+        # ru_maxrss is in kilobytes on Linux, in bytes on macOS
+        max_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        return self._popen.returncode, ResourceUsage(rusage.ru_utime, rusage.ru_stime, max_rss)
+
+    async def kill(self) -> tuple[int, ResourceUsage | None]:
+        """
+        Terminate the tool, kill it if it doesn't finish within grace period.
+
+        :return: Return code and resource usage.
+        """
+        for sig, grace in ((signal.SIGTERM, TOOL_KILL_GRACE), (getattr(signal, "SIGKILL", signal.SIGTERM), None)):
+            self._send_signal(sig)
+            try:
+                return await asyncio.wait_for(self.wait(), grace)
+            except asyncio.TimeoutError:
+                continue
+
+    def close(self) -> None:
+        """Close output pipes."""
+        for transport in self._transports:
+            transport.close()
+        if self._popen is not None and _tool_group_listener is not None:
+            _tool_group_listener(self._popen.pid, False)
+
+    def _send_signal(self, sig: int) -> None:
+        """
+        Send signal to the tool and processes of its group.
+
+        :param sig: Signal.
+        """
+        try:
+            if self._process is not None:
+                self._process.send_signal(sig)
+            else:
+                os.killpg(self._popen.pid, sig)
+        except (ProcessLookupError, PermissionError):
+            pass  # tool and all processes of its group already finished
@@ -0,0 +1,164 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Bytecode warm-up shared by import and unit tests.
+
+Python files of the project are compiled once, by a pool of processes, before tests are run, so imports and
+pytest-xdist workers start from warm bytecode instead of compiling the same files in parallel and racing to write
+`__pycache__`. Checked hash-based pycs (PEP 552) are written, they stay valid when sources are checked out again
+with new modification times, e.g. when CI restores `__pycache__` from its cache. Hashes of compiled sources are
+stored in cache directory, files which didn't change since they were compiled are not compiled again.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import multiprocessing
+import py_compile
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from importlib.util import cache_from_source
+from pathlib import Path
+from typing import Iterable
+
+from mfd_code_quality.jobserver import job_slots
+from mfd_code_quality.utils import write_file_atomically
+
+from .collection import get_norecursedirs, is_in_norecursedir
+from .consts import BYTECODE_MIN_FILES_PER_PROCESS
+from .impact_analysis import is_test_module
+
+logger = logging.getLogger("mfd-code-quality.bytecode")
+
+BYTECODE_CACHE_VERSION = 1
+
+
+def get_bytecode_tag() -> str:
+    """
+    Get tag of bytecode written by the current interpreter, bytecode of other interpreters is stored separately.
+
+    :return: Cache tag of the interpreter with optimization level, e.g. "cpython-312-opt0".
+    """
+    return f"{sys.implementation.cache_tag}-opt{sys.flags.optimize}"
+
+
+def find_source_files(root_dir: Path, package_names: Iterable[str]) -> list[str]:
+    """
+    Find Python files of packages and helpers of tests.
+
+    Test modules and conftest.py files are left out, pytest rewrites their assertions and stores bytecode of its own.
+    Files in directories not searched by pytest (see get_norecursedirs) are left out as well.
+
+    :param root_dir: Root directory of the project.
+    :param package_names: Names of top-level packages.
+    :return: Paths relative to root directory.
+    """
+    patterns = get_norecursedirs(root_dir)
+    tests_path = root_dir / "tests"
+    files = []
+    for directory in [*(root_dir / name for name in package_names), tests_path]:
+        for path in sorted(directory.rglob("*.py")):
+            if is_in_norecursedir(path, directory, patterns):
+                continue
+            if directory == tests_path and (is_test_module(path.name) or path.name == "conftest.py"):
+                continue
+            files.append(path.relative_to(root_dir).as_posix())
+    return files
+
+
+def load_compiled_hashes(path: Path) -> dict[str, str]:
+    """
+    Load hashes of sources compiled by previous runs.
+
+    :param path: Path to the JSON file.
+    :return: Hashes by paths relative to root directory, empty if file doesn't exist or is not compatible.
+    """
+    try:
+        content = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    if content.get("version") != BYTECODE_CACHE_VERSION or content.get("tag") != get_bytecode_tag():
+        return {}
+    return content["files"]
+
+
+def warm_up_bytecode(root_dir: Path, package_names: Iterable[str], cache_path: Path, no_cache: bool = False) -> None:
+    """
+    Compile Python files of the project to bytecode, skip files unchanged since they were compiled last time.
+
+    Files which can't be compiled are only logged, import tests report them once they are imported.
+
+    :param root_dir: Root directory of the project.
+    :param package_names: Names of top-level packages.
+    :param cache_path: Path to the JSON file with hashes of compiled sources.
+    :param no_cache: Compile all files, ignoring hashes stored by previous runs.
+    """
+    if sys.dont_write_bytecode:
+        logger.debug("[Bytecode] Writing bytecode is disabled, warm-up is skipped.")
+        return
+    compiled = {} if no_cache else load_compiled_hashes(cache_path)
+    hashes = {}
+    for path in find_source_files(root_dir, package_names):
+        try:
+            hashes[path] = hashlib.sha256((root_dir / path).read_bytes()).hexdigest()
+        except OSError:
+            continue
+    # bytecode might have been removed (e.g. fresh checkout with restored cache directory) even if source didn't change
+    outdated = [
+        path
+        for path, source_hash in hashes.items()
+        if compiled.get(path) != source_hash or not Path(cache_from_source(root_dir / path)).exists()
+    ]
+    failed = compile_files(root_dir, outdated)
+    content = {
+        "version": BYTECODE_CACHE_VERSION,
+        "tag": get_bytecode_tag(),
+        "files": {path: source_hash for path, source_hash in hashes.items() if path not in failed},
+    }
+    write_file_atomically(cache_path, json.dumps(content, separators=(",", ":")))
+    logger.info(
+        f"[Bytecode] Compiled {len(outdated) - len(failed)} file(s), {len(hashes) - len(outdated)} file(s) unchanged."
+    )
+
+
+def compile_files(root_dir: Path, paths: list[str]) -> set[str]:
+    """
+    Compile files to checked hash-based pycs, in a pool of processes when there are enough of them.
+
+    :param root_dir: Root directory of the project.
+    :param paths: Paths relative to root directory.
+    :return: Paths of files which couldn't be compiled.
+    """
+    if not paths:
+        return set()
+    sources = [str(root_dir / path) for path in paths]
+    with job_slots(math.ceil(len(paths) / BYTECODE_MIN_FILES_PER_PROCESS)) as processes:
+        if processes <= 1:
+            errors = [_compile_file(source) for source in sources]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=processes, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                errors = list(executor.map(_compile_file, sources, chunksize=math.ceil(len(sources) / processes / 4)))
+
+    failed = set()
+    for path, error in zip(paths, errors):
+        if error is not None:
+            logger.debug(f"[Bytecode] Can't compile {path}: {error}")
+            failed.add(path)
+    return failed
+
+
+def _compile_file(source: str) -> str | None:
+    """
+    Compile file to checked hash-based pyc.
+
+    :param source: Path to the file.
+    :return: Error message or None if file was compiled.
+    """
+    try:
+        py_compile.compile(source, doraise=True, invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH)
+    except (py_compile.PyCompileError, OSError) as e:
+        return str(e)
+    return None
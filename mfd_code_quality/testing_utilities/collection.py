@@ -0,0 +1,371 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Cache of tests collected by pytest and restriction of directories searched for tests.
+
+Node ids of collected tests are stored per test module together with hash of its content, so tests of unchanged
+modules are known without collecting them. Shards use it to split test modules before pytest is started, so each
+of them collects only its own modules, and the number of xdist workers is derived from exact number of tests.
+"""
+
+import configparser
+import hashlib
+import json
+import os
+import shlex
+import sys
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, Sequence
+
+import pytest
+
+if sys.version_info >= (3, 11):
+    import tomllib
+else:
+    import tomli as tomllib  # dependency of pytest on older versions
+
+from mfd_code_quality.code_standard.configure import get_generic_excludes
+from mfd_code_quality.utils import write_file_atomically
+
+from .consts import COLLECTION_CONFIG_FILES, PYTEST_CONFIG_FILES, PYTEST_DEFAULT_NORECURSEDIRS
+from .impact_analysis import hash_test_files, is_test_module
+from .workers import count_tests
+
+if TYPE_CHECKING:
+    from xdist.workermanage import WorkerController
+
+COLLECTION_CACHE_VERSION = 1
+
+
+PLUGIN_NAME = "mfd_code_quality.testing_utilities.collection"
+
+
+def get_excluded_dirs() -> list[str]:
+    """
+    Get patterns of directories excluded by generic ruff configuration (virtual environments, build artifacts, ...).
+
+    :return: List of patterns.
+    """
+    return [path for path in get_generic_excludes() if not path.endswith(".py")]
+
+
+def get_norecursedirs(root_dir: Path) -> list[str]:
+    """
+    Get patterns of directories which are not searched for tests.
+
+    Directories excluded by generic ruff configuration are added to `norecursedirs` of the project (pytest defaults
+    when the project doesn't configure it), like pytest does with arguments given by get_collection_args.
+
+    :param root_dir: Root directory of the project.
+    :return: List of patterns.
+    """
+    project_patterns = get_project_norecursedirs(root_dir)
+    patterns = PYTEST_DEFAULT_NORECURSEDIRS if project_patterns is None else project_patterns
+    return list(dict.fromkeys([*patterns, *get_excluded_dirs()]))
+
+
+def get_project_norecursedirs(root_dir: Path) -> list[str] | None:
+    """
+    Read `norecursedirs` from pytest configuration of the project.
+
+    Configuration files are looked for in the same order as by pytest, the first one configuring pytest is used.
+
+    :param root_dir: Root directory of the project.
+    :return: List of patterns, None if the project doesn't configure them.
+    """
+    for name in PYTEST_CONFIG_FILES:
+        path = root_dir / name
+        if not path.is_file():
+            continue
+        try:
+            if name == "pyproject.toml":
+                options = tomllib.loads(path.read_text()).get("tool", {}).get("pytest", {}).get("ini_options")
+                if options is None:
+                    continue
+                value = options.get("norecursedirs")
+            else:
+                parser = configparser.ConfigParser(interpolation=None)
+                parser.read(path)
+                section = "tool:pytest" if name == "setup.cfg" else "pytest"
+                if not parser.has_section(section):
+                    if name in ("pytest.ini", ".pytest.ini"):
+                        return None  # used by pytest even without the section
+                    continue
+                value = parser.get(section, "norecursedirs", fallback=None)
+        except (OSError, ValueError, configparser.Error):
+            return None
+        if value is None:
+            return None
+        return shlex.split(value) if isinstance(value, str) else [str(pattern) for pattern in value]
+    return None
+
+
+def is_norecursedir(directory: Path, patterns: Iterable[str]) -> bool:
+    """
+    Check if directory matches any of `norecursedirs` patterns.
+
+    Like in pytest, patterns with path separator are matched against the whole path, others against the name.
+
+    :param directory: Absolute path of the directory.
+    :param patterns: Patterns.
+    :return: True if directory is not searched for tests.
+    """
+    for pattern in patterns:
+        if os.sep != "/" and os.sep not in pattern:
+            pattern = pattern.replace("/", os.sep)
+        if os.sep not in pattern:
+            if fnmatch(directory.name, pattern):
+                return True
+        elif fnmatch(str(directory), pattern if os.path.isabs(pattern) else f"*{os.sep}{pattern}"):
+            return True
+    return False
+
+
+def is_in_norecursedir(path: Path, top: Path, patterns: Sequence[str]) -> bool:
+    """
+    Check if file is in a directory not searched for tests.
+
+    :param path: Absolute path of the file.
+    :param top: Directory the search starts in, it's not checked itself.
+    :param patterns: Patterns of `norecursedirs`.
+    :return: True if any directory between top and the file matches the patterns.
+    """
+    directory = path.parent
+    while directory != top and top in directory.parents:
+        if is_norecursedir(directory, patterns):
+            return True
+        directory = directory.parent
+    return False
+
+
+def get_collection_args() -> list[str]:
+    """
+    Get pytest arguments restricting directories searched for tests.
+
+    Directories excluded by generic ruff configuration are skipped in addition to `norecursedirs` of the project.
+
+    :return: List of arguments.
+    """
+    return ["-p", PLUGIN_NAME, f"--mfd-norecursedirs={' '.join(get_excluded_dirs())}"]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """
+    Add options of collection.
+
+    :param parser: Pytest parser.
+    """
+    group = parser.getgroup("mfd-collection", "mfd-code-quality collection")
+    group.addoption("--mfd-norecursedirs", help="Patterns of directories not searched for tests, separated by spaces.")
+
+
+def pytest_ignore_collect(collection_path: Path, config: pytest.Config) -> bool | None:
+    """
+    Skip directories matching patterns given by --mfd-norecursedirs, the same way as pytest applies `norecursedirs`.
+
+    :param collection_path: Path to be collected.
+    :param config: Pytest config.
+    :return: True if path is not searched for tests, None to let other hooks decide.
+    """
+    patterns = (config.getoption("mfd_norecursedirs", None) or "").split()
+    if patterns and collection_path.is_dir() and is_norecursedir(collection_path, patterns):
+        return True
+    return None
+
+
+class CollectionCache:
+    """
+    Node ids of tests collected from test modules.
+
+    Tests are known only for unchanged test modules. All of them are invalidated by change of Python environment,
+    helper files of tests (e.g. conftest.py) or pytest configuration, as these may change what is collected.
+    """
+
+    def __init__(
+        self,
+        environment: str,
+        helpers: dict[str, str],
+        test_files: dict[str, str],
+        tests: dict[str, list[str]] | None = None,
+    ) -> None:
+        """
+        Init.
+
+        :param environment: Fingerprint of Python environment.
+        :param helpers: Hashes of helper and configuration files by paths relative to root directory.
+        :param test_files: Hashes of test modules by paths relative to root directory.
+        :param tests: Node ids of tests collected from test modules by their paths.
+        """
+        self.environment = environment
+        self.helpers = helpers
+        self.test_files = test_files
+        self.tests = tests or {}
+
+    @classmethod
+    def from_tree(
+        cls: "type[CollectionCache]",
+        root_dir: Path,
+        tests_path: Path,
+        environment: str,
+        previous: "CollectionCache | None" = None,
+    ) -> "CollectionCache":
+        """
+        Hash current test files and take over tests of unchanged test modules from cache of the previous run.
+
+        Files in directories not searched by pytest (see get_norecursedirs) are left out.
+
+        :param root_dir: Root directory of the project.
+        :param tests_path: Directory with tests.
+        :param environment: Fingerprint of current Python environment.
+        :param previous: Cache of the previous run.
+        :return: Cache.
+        """
+        test_files, helpers = {}, {}
+        patterns = get_norecursedirs(root_dir)
+        for path, file_hash in hash_test_files(root_dir, tests_path).items():
+            if is_in_norecursedir(root_dir / path, tests_path, patterns):
+                continue
+            (test_files if is_test_module(Path(path).name) else helpers)[path] = file_hash
+        for name in COLLECTION_CONFIG_FILES:
+            if (root_dir / name).is_file():
+                helpers[name] = hashlib.sha256((root_dir / name).read_bytes()).hexdigest()
+
+        cache = cls(environment, helpers, test_files)
+        if previous is not None and previous.environment == environment and previous.helpers == helpers:
+            cache.tests = {
+                path: tests
+                for path, tests in previous.tests.items()
+                if path in test_files and previous.test_files.get(path) == test_files[path]
+            }
+        return cache
+
+    @classmethod
+    def load(cls: "type[CollectionCache]", path: Path) -> "CollectionCache | None":
+        """
+        Load cache persisted by previous run.
+
+        :param path: Path to the JSON file.
+        :return: Cache or None if file doesn't exist or is not compatible.
+        """
+        try:
+            content = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if content.get("version") != COLLECTION_CACHE_VERSION:
+            return None
+        return cls(content["environment"], content["helpers"], content["test_files"], content["tests"])
+
+    def save(self, path: Path) -> None:
+        """
+        Persist cache to be used by the next run.
+
+        :param path: Path to the JSON file.
+        """
+        content = {
+            "version": COLLECTION_CACHE_VERSION,
+            "environment": self.environment,
+            "helpers": self.helpers,
+            "test_files": {path: self.test_files[path] for path in sorted(self.tests)},
+            "tests": dict(sorted(self.tests.items())),
+        }
+        write_file_atomically(path, json.dumps(content, separators=(",", ":")))
+
+    def record(self, root_dir: Path, args: Iterable[str], nodeids: Iterable[str], failed: Iterable[str] = ()) -> None:
+        """
+        Store tests collected by pytest from whole test modules.
+
+        Modules given by node ids of single tests were collected only partially and modules which failed
+        to be collected are left out.
+
+        :param root_dir: Root directory of the project.
+        :param args: Paths of test modules and directories given to pytest.
+        :param nodeids: Node ids of collected tests.
+        :param failed: Node ids of collectors which failed, e.g. test modules raising on import.
+        """
+        collected_paths = []
+        for arg in args:
+            if "::" in arg:
+                continue
+            try:
+                collected_paths.append(Path(arg).resolve().relative_to(root_dir.resolve()).as_posix())
+            except ValueError:
+                continue
+        collected = {
+            path: []
+            for path in self.test_files
+            if any(_is_under(path, collected_path) for collected_path in collected_paths)
+            and not any(_is_under(path, failed_path) for failed_path in failed)
+        }
+        for nodeid in nodeids:
+            path = nodeid.split("::", 1)[0]
+            if path in collected:
+                collected[path].append(nodeid)
+        self.tests.update(collected)
+
+    def count_tests(self, root_dir: Path, test_files: Iterable[str] | None = None) -> int:
+        """
+        Count tests of test modules.
+
+        Tests of modules collected in previous runs are known exactly, the rest is estimated.
+
+        :param root_dir: Root directory of the project.
+        :param test_files: Paths of test modules relative to root directory, all test modules by default.
+        :return: Number of tests.
+        """
+        return sum(
+            len(self.tests[path]) if path in self.tests else count_tests(root_dir / path)
+            for path in (self.test_files if test_files is None else test_files)
+        )
+
+
+class CollectionPlugin:
+    """
+    Pytest plugin gathering node ids of collected tests.
+
+    Plugin is registered only in the main process, with xdist node ids collected by workers are received there.
+    """
+
+    def __init__(self) -> None:
+        """Init."""
+        self.nodeids: list[str] = []
+        self.failed: set[str] = set()
+
+    def pytest_collectreport(self, report: pytest.CollectReport) -> None:
+        """
+        Remember collectors which failed.
+
+        :param report: Report of collection.
+        """
+        if report.failed:
+            self.failed.add(report.nodeid.split("::", 1)[0])
+
+    def pytest_collection_finish(self, session: pytest.Session) -> None:
+        """
+        Gather tests collected without xdist.
+
+        :param session: Pytest session.
+        """
+        self.nodeids = [item.nodeid for item in session.items]
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_node_collection_finished(self, node: "WorkerController", ids: Sequence[str]) -> None:
+        """
+        Gather tests collected by xdist workers, all of them collect the same tests.
+
+        :param node: Worker.
+        :param ids: Node ids of collected tests.
+        """
+        if not self.nodeids:
+            self.nodeids = list(ids)
+
+
+def _is_under(path: str, parent: str) -> bool:
+    """
+    Check if path is the parent path or lies in it.
+
+    :param path: Path relative to root directory.
+    :param parent: Path relative to root directory, empty for the root directory itself.
+    :return: True if path is in parent path.
+    """
+    return parent in ("", ".") or path == parent or path.startswith(f"{parent}/")
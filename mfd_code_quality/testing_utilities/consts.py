@@ -5,6 +5,8 @@
 import pytest
 
 PYTEST_OK_STATUSES = [pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED]
+# statuses after which recorded coverage is complete and can be used for test impact analysis
+TEST_IMPACT_STATUSES = [*PYTEST_OK_STATUSES, pytest.ExitCode.TESTS_FAILED]
 
 # Berta - not open-sourced yet
 BERTA_IMPORTS = {
@@ -18,3 +20,57 @@ BERTA_IMPORTS = {
     "wrappers.drv_nicinstaller",
     "wrappers.nvm_nicupdater",
 }
+
+IMPORT_PROFILE_REPORT_LIMIT = 10  # number of the slowest modules logged by import tests
+IMPORT_PROFILE_TRANSITIVE_LIMIT = 3  # number of the heaviest transitive imports logged per slow module
+
+IMPORT_GRAPH_FILE = "import_graph.json"  # intra-project import graph stored in cache directory
+TEST_IMPACT_INDEX_FILE = "test_impact.json"  # mapping of source lines to unit tests stored in cache directory
+PYTEST_CACHE_DIR = "pytest_cache_{suite}"  # pytest cache of unit/system tests stored in cache directory
+PYTEST_CACHE_ENVIRONMENT_FILE = "environment"  # fingerprint of Python environment pytest cache was created in
+
+# audit events considered expensive when raised by module's top-level code
+# see https://docs.python.org/3/library/audit_events.html
+EXPENSIVE_IMPORT_AUDIT_EVENTS = {
+    "subprocess.Popen",
+    "os.system",
+    "os.posix_spawn",
+    "os.spawn",
+    "os.exec",
+    "socket.connect",
+    "socket.getaddrinfo",
+    "time.sleep",
+}
+IMPORT_LARGE_FILE_SIZE = 1024 * 1024  # opening file of this size in bytes or bigger at import time is reported
+
+XDIST_WORKER_MEMORY = 512 * 1024 * 1024  # memory in bytes expected to be used by single pytest-xdist worker
+XDIST_MIN_TESTS_PER_WORKER = 25  # don't start a worker for fewer tests, it costs more than it saves
+
+TEST_DURATIONS_FILE = "test_durations.sqlite"  # history of test durations stored in cache directory
+TEST_DURATION_HISTORY_SIZE = 10  # number of the latest durations kept per test
+TEST_DURATION_HISTORY_MIN_RUNS = 3  # regressions are reported only for tests with at least this number of durations
+TEST_DURATION_REGRESSION_FACTOR = 2.0  # test is reported when it's this many times slower than its median duration
+TEST_DURATION_REGRESSION_MIN_DELTA = 1.0  # ... and slower by at least this many seconds
+TEST_DURATION_REGRESSION_REPORT_LIMIT = 10  # number of the most regressed tests logged
+XDIST_MIN_QUEUED_DURATION = 0.5  # seconds of expected work queued on a worker, short tests are sent in batches
+
+# seconds a single test may take by default, including its setup and teardown, tests of other suites (e.g. system
+# tests of hardware) have no limit unless it is given explicitly
+DEFAULT_TEST_TIMEOUTS = {"unit": 600}
+TEST_TIMEOUT_GRACE = 10  # seconds after timeout when process stuck outside of Python code is killed
+STAGE_TIMEOUT_DUMP_DELAY = 1  # seconds for test processes to dump their stacks before the run is interrupted
+STAGE_TIMEOUT_GRACE = 30  # seconds after interrupting the run when stuck main process is killed
+TIMEOUT_EXIT_CODE = 124  # exit code of process killed after timeout, the same as of `timeout` command
+DEFAULT_MAX_WORKER_RSS = 4 * XDIST_WORKER_MEMORY  # bytes of RSS after which pytest-xdist worker is replaced
+STACK_DUMPS_DIR = "stack_dumps"  # stacks of test processes dumped on timeout, stored in directory of the run
+
+COLLECTION_CACHE_FILE = "collection_{suite}.json"  # node ids of collected tests per test file, in cache directory
+# files outside of tests directory affecting what pytest collects, cached collection is invalid when they change
+COLLECTION_CONFIG_FILES = ("conftest.py", ".pytest.ini", "pyproject.toml", "pytest.ini", "setup.cfg", "tox.ini")
+# pytest's default norecursedirs patterns, kept when norecursedirs is overridden
+PYTEST_CONFIG_FILES = ("pytest.ini", ".pytest.ini", "pyproject.toml", "tox.ini", "setup.cfg")  # in order of precedence
+PYTEST_DEFAULT_NORECURSEDIRS = ("*.egg", ".*", "_darcs", "build", "CVS", "dist", "node_modules", "venv", "{arch}")
+RESOURCE_GROUPS_FILE = "resource_groups.json"  # groups of conflicting system tests, written in directory of the run
+
+BYTECODE_CACHE_FILE = "bytecode.json"  # hashes of sources compiled by bytecode warm-up, stored in cache directory
+BYTECODE_MIN_FILES_PER_PROCESS = 200  # don't start a process compiling fewer files, it costs more than it saves
@@ -0,0 +1,207 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""History of test durations stored in a local SQLite database and pytest plugin recording them."""
+
+import logging
+import sqlite3
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from statistics import median
+from types import TracebackType
+from typing import TYPE_CHECKING, Iterable
+
+import pytest
+
+from .consts import (
+    TEST_DURATION_HISTORY_MIN_RUNS,
+    TEST_DURATION_HISTORY_SIZE,
+    TEST_DURATION_REGRESSION_FACTOR,
+    TEST_DURATION_REGRESSION_MIN_DELTA,
+    TEST_DURATION_REGRESSION_REPORT_LIMIT,
+)
+
+if TYPE_CHECKING:
+    from xdist.remote import Producer
+    from xdist.scheduler import LoadScheduling
+
+logger = logging.getLogger("mfd-code-quality.testing")
+
+
+@dataclass(frozen=True)
+class DurationRegression:
+    """Test which took significantly longer than usually."""
+
+    nodeid: str
+    expected: float
+    actual: float
+
+    def __str__(self) -> str:
+        return f"{self.nodeid}: {self.actual:.2f}s (usually {self.expected:.2f}s)"
+
+
+class DurationStore:
+    """
+    Durations of the latest runs of each test, kept separately for each test suite.
+
+    Durations are stored in seconds and include setup and teardown of the test.
+    """
+
+    def __init__(self, path: Path, suite: str) -> None:
+        """
+        Init.
+
+        :param path: Path to the database file, created if it doesn't exist.
+        :param suite: Name of the test suite, e.g. unit or system.
+        """
+        self._suite = suite
+        self._connection = sqlite3.connect(path)
+        self._connection.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS durations (
+                suite TEXT NOT NULL,
+                nodeid TEXT NOT NULL,
+                recorded REAL NOT NULL,
+                duration REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS durations_by_test ON durations (suite, nodeid, recorded);
+            """
+        )
+
+    def __enter__(self) -> "DurationStore":
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._connection.close()
+
+    def get_history(self) -> dict[str, list[float]]:
+        """
+        Get stored durations of all tests of the suite.
+
+        :return: Durations by node ids, from the oldest one.
+        """
+        history = {}
+        rows = self._connection.execute(
+            "SELECT nodeid, duration FROM durations WHERE suite = ? ORDER BY recorded", (self._suite,)
+        )
+        for nodeid, duration in rows:
+            history.setdefault(nodeid, []).append(duration)
+        return history
+
+    def get_expected_durations(self) -> dict[str, float]:
+        """
+        Get expected duration of each test, i.e. median of its stored durations.
+
+        :return: Durations by node ids.
+        """
+        return {nodeid: median(durations) for nodeid, durations in self.get_history().items()}
+
+    def find_regressions(self, durations: dict[str, float]) -> list[DurationRegression]:
+        """
+        Find tests which took significantly longer than their stored durations.
+
+        :param durations: Durations of the current run by node ids.
+        :return: Regressions, the biggest ones first.
+        """
+        history = self.get_history()
+        regressions = []
+        for nodeid, duration in durations.items():
+            previous = history.get(nodeid, [])
+            if len(previous) < TEST_DURATION_HISTORY_MIN_RUNS:
+                continue
+            expected = median(previous)
+            if duration > expected * TEST_DURATION_REGRESSION_FACTOR and (
+                duration - expected >= TEST_DURATION_REGRESSION_MIN_DELTA
+            ):
+                regressions.append(DurationRegression(nodeid, expected, duration))
+        return sorted(regressions, key=lambda regression: regression.actual - regression.expected, reverse=True)
+
+    def record(self, durations: dict[str, float]) -> None:
+        """
+        Store durations of the current run, only the latest durations of each test are kept.
+
+        :param durations: Durations by node ids.
+        """
+        recorded = time.time()
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO durations (suite, nodeid, recorded, duration) VALUES (?, ?, ?, ?)",
+                ((self._suite, nodeid, recorded, duration) for nodeid, duration in durations.items()),
+            )
+            self._connection.execute(
+                """
+                DELETE FROM durations WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, ROW_NUMBER() OVER (PARTITION BY nodeid ORDER BY recorded DESC) AS position
+                        FROM durations WHERE suite = ?
+                    ) WHERE position > ?
+                )
+                """,
+                (self._suite, TEST_DURATION_HISTORY_SIZE),
+            )
+
+
+class DurationPlugin:
+    """
+    Pytest plugin recording durations of tests and scheduling the longest tests first on xdist workers.
+
+    Plugin is registered only in the main process, with xdist test reports of workers are received there as well.
+    """
+
+    def __init__(self, store: DurationStore, prioritized: Iterable[str] = ()) -> None:
+        """
+        Init.
+
+        :param store: Store of historical test durations.
+        :param prioritized: Node ids of tests to be run first.
+        """
+        self._store = store
+        self._prioritized = set(prioritized)
+        self._expected_durations = store.get_expected_durations()
+        self._durations: dict[str, float] = defaultdict(float)
+        self._not_passed: set[str] = set()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_make_scheduler(self, config: pytest.Config, log: "Producer") -> "LoadScheduling | None":
+        """
+        Replace default load scheduling.
+
+        :param config: Pytest config.
+        :param log: xdist log producer.
+        :return: Scheduler or None to keep xdist default for other distribution modes.
+        """
+        if config.getoption("dist") != "load":
+            return None
+        from .scheduling import LongestFirstScheduling, ResourceScheduling
+
+        # tests declaring resources are grouped, so tests holding the same resource never run at the same time
+        groups_path = config.getoption("mfd_resource_groups", None)
+        if groups_path:
+            return ResourceScheduling(config, log, self._expected_durations, self._prioritized, Path(groups_path))
+        return LongestFirstScheduling(config, log, self._expected_durations, self._prioritized)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """
+        Sum up durations of setup, call and teardown of the test.
+
+        :param report: Report of a single test phase.
+        """
+        self._durations[report.nodeid] += report.duration
+        if not report.passed:
+            self._not_passed.add(report.nodeid)
+
+    def pytest_sessionfinish(self) -> None:
+        """Report tests which got significantly slower and store durations of passed tests."""
+        durations = {nodeid: duration for nodeid, duration in self._durations.items() if nodeid not in self._not_passed}
+        regressions = self._store.find_regressions(durations)
+        if regressions:
+            details = "\n".join(f"  {regression}" for regression in regressions[:TEST_DURATION_REGRESSION_REPORT_LIMIT])
+            logger.warning(f"{len(regressions)} test(s) got significantly slower:\n{details}")
+        self._store.record(durations)
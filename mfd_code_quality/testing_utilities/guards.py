@@ -0,0 +1,493 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Guards of test runs - per-test and whole-run timeouts and replacing pytest-xdist workers which use too much memory.
+
+Module is a pytest plugin loaded with `-p`, so it's loaded by pytest-xdist workers as well. Tests run through api share
+the process with the caller, so guards of that process never exit it, send it signals nor set its signal handlers
+and timers.
+PYTEST_DONT_REWRITE - module is imported before pytest loads it as a plugin, there are no assertions to rewrite.
+"""
+
+import _thread
+import faulthandler
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from pathlib import Path
+from types import FrameType
+from typing import TYPE_CHECKING, Callable, Generator, TextIO
+
+import pytest
+
+from mfd_code_quality.log_queue import flush_logging
+from mfd_code_quality.utils import get_parsed_args, get_process_rss, get_run_dir, is_run_by_api
+
+from .consts import (
+    DEFAULT_MAX_WORKER_RSS,
+    DEFAULT_TEST_TIMEOUTS,
+    STACK_DUMPS_DIR,
+    STAGE_TIMEOUT_DUMP_DELAY,
+    STAGE_TIMEOUT_GRACE,
+    TEST_TIMEOUT_GRACE,
+    TIMEOUT_EXIT_CODE,
+)
+
+if TYPE_CHECKING:
+    from xdist.workermanage import WorkerController
+
+logger = logging.getLogger("mfd-code-quality.testing")
+
+PLUGIN_NAME = "mfd_code_quality.testing_utilities.guards"
+MAIN_PROCESS_NAME = "main"  # name of the process running tests without pytest-xdist
+MIB = 1024 * 1024
+
+
+def get_guard_args(suite: str) -> list[str]:
+    """
+    Get pytest arguments enabling guards requested in command line.
+
+    Stacks are dumped to directory of the run, so only dumps of the current run are reported.
+
+    :param suite: Name of the test suite, e.g. unit or system.
+    :return: Arguments.
+    """
+    args = get_parsed_args()
+    test_timeout = DEFAULT_TEST_TIMEOUTS.get(suite, 0) if args.test_timeout is None else args.test_timeout
+    max_rss = DEFAULT_MAX_WORKER_RSS if args.max_worker_rss is None else args.max_worker_rss * MIB
+    dump_dir = get_run_dir(suite) / STACK_DUMPS_DIR
+    dump_dir.mkdir(exist_ok=True)
+    return [
+        "-p",
+        PLUGIN_NAME,
+        f"--mfd-dump-dir={dump_dir}",
+        *([f"--mfd-test-timeout={test_timeout}"] if test_timeout > 0 else []),
+        # deadline is absolute, so all processes time out at the same moment regardless of when they started
+        *([f"--mfd-stage-deadline={time.time() + args.stage_timeout}"] if args.stage_timeout else []),
+        *([f"--mfd-max-rss={max_rss}"] if max_rss > 0 else []),
+        *(["--mfd-run-by-api"] if is_run_by_api() else []),
+    ]
+
+
+def format_thread_stacks(skip_current: bool = False) -> str:
+    """
+    Format stacks of all threads of the process.
+
+    :param skip_current: Don't include the current thread, e.g. when its traceback is reported anyway.
+    :return: Formatted stacks.
+    """
+    names = {thread.ident: thread.name for thread in threading.enumerate()}
+    stacks = []
+    for ident, frame in sys._current_frames().items():
+        if skip_current and ident == threading.get_ident():
+            continue
+        stacks.append(f"Thread {names.get(ident, ident)}:\n{''.join(traceback.format_stack(frame))}")
+    return "\n".join(stacks)
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """
+    Add options of guards.
+
+    :param parser: Pytest parser.
+    """
+    group = parser.getgroup("mfd-guards", "mfd-code-quality guards")
+    group.addoption("--mfd-dump-dir", help="Directory to dump stacks of test processes to on timeout.")
+    group.addoption("--mfd-test-timeout", type=float, help="Fail a test running longer than given number of seconds.")
+    group.addoption("--mfd-stage-deadline", type=float, help="Time (epoch) at which the whole run is interrupted.")
+    group.addoption("--mfd-max-rss", type=int, help="Replace xdist worker whose RSS exceeds given number of bytes.")
+    group.addoption(
+        "--mfd-run-by-api", action="store_true", help="Tests run in process of a caller of api, don't exit it."
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """
+    Register guards of the process.
+
+    :param config: Pytest config.
+    """
+    if not config.getoption("mfd_dump_dir"):
+        return
+    dump_dir = Path(config.getoption("mfd_dump_dir"))
+    is_worker = hasattr(config, "workerinput")
+    run_by_api = config.getoption("mfd_run_by_api", False)
+    if is_worker or config.getoption("dist", "no") == "no":
+        name = config.workerinput["workerid"] if is_worker else MAIN_PROCESS_NAME
+        guard = ProcessGuard(
+            name,
+            dump_dir,
+            test_timeout=config.getoption("mfd_test_timeout"),
+            stage_deadline=config.getoption("mfd_stage_deadline"),
+            measure_rss=config.getoption("mfd_max_rss") is not None,
+            owns_process=is_worker or not run_by_api,
+            exit_on_stage_timeout=is_worker and run_by_api,
+        )
+        config.pluginmanager.register(guard, "mfd-process-guard")
+    if not is_worker:
+        guard = SessionGuard(
+            config,
+            dump_dir,
+            stage_deadline=config.getoption("mfd_stage_deadline"),
+            max_rss=config.getoption("mfd_max_rss"),
+            interrupt_main=not run_by_api,
+        )
+        config.pluginmanager.register(guard, "mfd-session-guard")
+
+
+class ProcessGuard:
+    """
+    Guard of the process running tests - pytest-xdist worker or the main process when xdist is not used.
+
+    Test exceeding its timeout is failed by SIGALRM with stacks of other threads in the failure message. Process stuck
+    where the signal can't be handled (e.g. in C code) or on platforms without SIGALRM, is killed by faulthandler after
+    dumping stacks of its threads - pytest-xdist reports the test as crashed and replaces the worker. Process of
+    a caller of api is left alone, stacks of a test exceeding its timeout are only logged.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        dump_dir: Path,
+        test_timeout: float | None = None,
+        stage_deadline: float | None = None,
+        measure_rss: bool = False,
+        owns_process: bool = True,
+        exit_on_stage_timeout: bool = False,
+    ) -> None:
+        """
+        Init.
+
+        :param name: Name of the process, e.g. xdist worker id.
+        :param dump_dir: Directory to dump stacks to.
+        :param test_timeout: Seconds a single test may take.
+        :param stage_deadline: Time (epoch) at which the whole run is interrupted.
+        :param measure_rss: Attach RSS of the process to teardown reports of tests.
+        :param owns_process: Process runs only tests, so SIGALRM may interrupt it and a stuck test may kill it,
+            False for process of a caller of api.
+        :param exit_on_stage_timeout: Exit after the stage timeout, for xdist workers whose main process isn't
+            interrupted by a signal.
+        """
+        self._name = name
+        self._dump_path = dump_dir / f"{name}.txt"
+        self._dump_file: TextIO | None = None
+        self._test_timeout = test_timeout
+        self._stage_deadline = stage_deadline
+        self._measure_rss = measure_rss
+        self._owns_process = owns_process
+        self._exit_on_stage_timeout = exit_on_stage_timeout
+        self._test_timer: threading.Timer | None = None
+        self._use_signal = (
+            owns_process and hasattr(signal, "SIGALRM") and threading.current_thread() is threading.main_thread()
+        )
+        self._stage_timer: threading.Timer | None = None
+        self._current_test: str | None = None
+        self._rss_before: int | None = None
+        self._previous_handler = None
+
+    def pytest_sessionstart(self) -> None:
+        """Prepare dump file and start waiting for the end of the whole run."""
+        self._dump_file = open(self._dump_path, "a")  # noqa: SIM115 - kept open for faulthandler
+        if self._test_timeout and self._use_signal:
+            self._previous_handler = signal.signal(signal.SIGALRM, self._on_test_timeout)
+        if self._stage_deadline:
+            self._stage_timer = threading.Timer(max(self._stage_deadline - time.time(), 0), self._on_stage_timeout)
+            self._stage_timer.daemon = True
+            self._stage_timer.start()
+
+    def pytest_sessionfinish(self) -> None:
+        """Stop all timers."""
+        if self._stage_timer is not None:
+            self._stage_timer.cancel()
+        if self._previous_handler is not None:
+            signal.signal(signal.SIGALRM, self._previous_handler)
+        if self._dump_file is not None:
+            self._dump_file.close()
+            self._dump_file = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_protocol(self, item: pytest.Item) -> Generator[None, None, None]:
+        """
+        Run the test (setup, call and teardown) with timeout.
+
+        :param item: Test.
+        """
+        self._current_test = item.nodeid
+        if self._test_timeout:
+            if self._use_signal:
+                signal.setitimer(signal.ITIMER_REAL, self._test_timeout)
+            if self._owns_process:
+                delay = self._test_timeout + (TEST_TIMEOUT_GRACE if self._use_signal else 0)
+                faulthandler.dump_traceback_later(delay, exit=True, file=self._dump_file)
+            else:
+                self._test_timer = threading.Timer(self._test_timeout, self._report_test_timeout, args=(item.nodeid,))
+                self._test_timer.daemon = True
+                self._test_timer.start()
+        try:
+            yield
+        finally:
+            if self._test_timeout:
+                if self._use_signal:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+                if self._owns_process:
+                    faulthandler.cancel_dump_traceback_later()
+                elif self._test_timer is not None:
+                    self._test_timer.cancel()
+                    self._test_timer = None
+            self._current_test = None
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, call: pytest.CallInfo) -> Generator[None, None, None]:
+        """
+        Attach RSS of the process after the test and its growth during the test to teardown report.
+
+        :param call: Test phase.
+        """
+        outcome = yield
+        if not self._measure_rss:
+            return
+        if call.when == "setup":
+            self._rss_before = get_process_rss()
+        elif call.when == "teardown":
+            report = outcome.get_result()
+            report.rss = get_process_rss()
+            if report.rss is not None and self._rss_before is not None:
+                report.rss_growth = report.rss - self._rss_before
+
+    def _on_test_timeout(self, signum: int, frame: FrameType | None) -> None:
+        """
+        Fail the test running for too long.
+
+        :param signum: Signal number.
+        :param frame: Interrupted frame.
+        """
+        __tracebackhide__ = True  # failure points to the code of the test
+        stacks = format_thread_stacks(skip_current=True)
+        pytest.fail(
+            f"Timeout: test did not finish in {self._test_timeout:g}s."
+            + (f"\n\nStacks of other threads:\n{stacks}" if stacks else "")
+        )
+
+    def _report_test_timeout(self, nodeid: str) -> None:
+        """
+        Log stacks of the test running for too long, which can't be interrupted in process of a caller of api.
+
+        :param nodeid: Node id of the test.
+        """
+        logger.error(
+            f"[Timeout] Test {nodeid} did not finish in {self._test_timeout:g}s, it can't be interrupted in process "
+            f"of a caller of api, stacks of threads:\n{format_thread_stacks(skip_current=True)}"
+        )
+
+    def _on_stage_timeout(self) -> None:
+        """Dump stacks of the process when the whole run timed out."""
+        if self._dump_file is None:
+            return
+        self._dump_file.write(
+            f"Stage timeout in {self._name} while running {self._current_test or 'no test'}:\n"
+            f"{format_thread_stacks(skip_current=True)}"
+        )
+        self._dump_file.flush()
+        if self._exit_on_stage_timeout:
+            # main process only stops sending tests, the worker leaves once its stacks are reported
+            timer = threading.Timer(STAGE_TIMEOUT_DUMP_DELAY + STAGE_TIMEOUT_GRACE, self._exit)
+            timer.daemon = True
+            timer.start()
+
+    def _exit(self) -> None:
+        """Exit the worker which didn't finish its tests after the stage timeout."""
+        flush_logging()  # os._exit() skips logging.shutdown()
+        os._exit(TIMEOUT_EXIT_CODE)
+
+
+class SessionGuard:
+    """
+    Guard of the whole run registered in the main process.
+
+    Run exceeding its deadline is interrupted like by Ctrl+C, so pytest reports results of finished tests. Run in
+    process of a caller of api is stopped instead once running tests finish (xdist workers exit on their own).
+    pytest-xdist worker exceeding memory limit is shut down after finishing tests already sent to it (so coverage
+    data it collected is kept) and replaced by a new one.
+    """
+
+    def __init__(
+        self,
+        config: pytest.Config,
+        dump_dir: Path,
+        stage_deadline: float | None = None,
+        max_rss: int | None = None,
+        interrupt_main: bool = True,
+    ) -> None:
+        """
+        Init.
+
+        :param config: Pytest config.
+        :param dump_dir: Directory test processes dump their stacks to.
+        :param stage_deadline: Time (epoch) at which the whole run is interrupted.
+        :param max_rss: RSS in bytes after which xdist worker is replaced.
+        :param interrupt_main: Interrupt the main thread on the deadline and exit the process if it doesn't stop, False
+            for process of a caller of api.
+        """
+        self._config = config
+        self._dump_dir = dump_dir
+        self._stage_deadline = stage_deadline
+        self._max_rss = max_rss
+        self._interrupt_main = interrupt_main
+        self._session: pytest.Session | None = None
+        self._running: set[str] = set()
+        self._running_at_timeout: list[str] = []
+        self._timers: list[threading.Timer] = []
+        self._retired: set["WorkerController"] = set()
+        self._reported_main_rss = False
+        self._finished = False
+        self.timed_out = False
+
+    def pytest_sessionstart(self, session: pytest.Session) -> None:
+        """
+        Start waiting for the deadline of the run.
+
+        :param session: Pytest session.
+        """
+        self._session = session
+        if self._stage_deadline:
+            # give test processes a moment to dump their stacks first
+            self._start_timer(self._stage_deadline - time.time() + STAGE_TIMEOUT_DUMP_DELAY, self._interrupt)
+
+    def pytest_runtest_logstart(self, nodeid: str) -> None:
+        """
+        Track running tests.
+
+        :param nodeid: Node id of the test.
+        """
+        self._running.add(nodeid)
+
+    def pytest_runtest_logfinish(self, nodeid: str) -> None:
+        """
+        Track running tests.
+
+        :param nodeid: Node id of the test.
+        """
+        self._running.discard(nodeid)
+
+    def pytest_runtest_logreport(self, report: pytest.TestReport) -> None:
+        """
+        Replace worker which exceeded memory limit.
+
+        :param report: Report of a single test phase.
+        """
+        rss = getattr(report, "rss", None)
+        if report.when != "teardown" or self._max_rss is None or rss is None or rss <= self._max_rss:
+            return
+        node = getattr(report, "node", None)  # set by xdist for reports of workers
+        if node in self._retired or (node is None and self._reported_main_rss):
+            return
+
+        growth = getattr(report, "rss_growth", None)
+        details = f"RSS {rss // MIB} MiB exceeds limit of {self._max_rss // MIB} MiB after {report.nodeid}" + (
+            f" (+{growth // MIB} MiB during the test)" if growth is not None else ""
+        )
+        if node is None:
+            self._reported_main_rss = True
+            logger.warning(f"[Workers] {details}, tests are not run by xdist workers, so the process isn't replaced.")
+            return
+        logger.warning(f"[Workers] Worker {node.gateway.id} {details}, replacing the worker.")
+        self._retired.add(node)
+        node.shutdown()
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node: "WorkerController", error: object | None) -> None:
+        """
+        Start replacement of retired worker or report stacks of crashed one.
+
+        :param node: Worker.
+        :param error: Error if worker crashed.
+        """
+        if node in self._retired and error is None:
+            self._retired.discard(node)
+            dsession = self._config.pluginmanager.getplugin("dsession")
+            if dsession.sched is not None and dsession.sched.pending and not dsession.shuttingdown:
+                # xdist replaces only crashed workers, there is no public API to add a worker
+                clone = dsession._clone_node(node)
+                logger.info(f"[Workers] Worker {node.gateway.id} replaced by {clone.gateway.id}.")
+        elif error is not None:
+            stacks = self._read_dump(node.gateway.id)
+            if stacks:
+                logger.error(f"[Timeout] Worker {node.gateway.id} was killed, stacks of its threads:\n{stacks}")
+
+    def pytest_sessionfinish(self) -> None:
+        """Stop timers and report stacks of test processes if the run timed out."""
+        self._finished = True
+        for timer in self._timers:
+            timer.cancel()
+        if not self.timed_out:
+            return
+        logger.error(
+            f"[Timeout] Tests did not finish before the stage timeout, running tests: "
+            f"{', '.join(self._running_at_timeout) or 'none'}"
+        )
+        for dump_path in sorted(self._dump_dir.glob("*.txt")):
+            stacks = dump_path.read_text().strip()
+            if stacks:
+                logger.error(f"[Timeout] {stacks}")
+
+    def _read_dump(self, name: str) -> str:
+        """
+        Read stacks dumped by the test process.
+
+        :param name: Name of the process.
+        :return: Dumped stacks, empty if there are none.
+        """
+        try:
+            return (self._dump_dir / f"{name}.txt").read_text().strip()
+        except OSError:
+            return ""
+
+    def _start_timer(self, interval: float, function: Callable[[], None]) -> None:
+        """
+        Start daemon timer.
+
+        :param interval: Seconds to wait.
+        :param function: Function to call.
+        """
+        timer = threading.Timer(max(interval, 0), function)
+        timer.daemon = True
+        timer.start()
+        self._timers.append(timer)
+
+    def _interrupt(self) -> None:
+        """Interrupt the run, like by Ctrl+C."""
+        self.timed_out = True
+        self._running_at_timeout = sorted(self._running)
+        if not self._interrupt_main:
+            self._stop_session()
+            return
+        if hasattr(signal, "pthread_kill"):
+            signal.pthread_kill(threading.main_thread().ident, signal.SIGINT)  # interrupts blocking calls as well
+        else:
+            _thread.interrupt_main()
+        self._start_timer(STAGE_TIMEOUT_GRACE, self._kill)
+
+    def _stop_session(self) -> None:
+        """Stop the run without signals to the process, once running tests finish."""
+        reason = "Stage timeout"
+        if self._session is not None:
+            self._session.shouldstop = reason
+        dsession = self._config.pluginmanager.getplugin("dsession")
+        if dsession is not None:
+            dsession.shouldstop = reason  # checked by xdist after the next event of a worker
+
+    def _kill(self) -> None:
+        """Kill the main process which didn't react to the interruption."""
+        if self._finished:
+            return
+        sys.__stderr__.write(
+            f"Tests didn't stop after stage timeout, running tests: {', '.join(self._running_at_timeout) or 'none'}\n"
+        )
+        faulthandler.dump_traceback(file=sys.__stderr__)
+        sys.__stderr__.flush()
+        flush_logging()  # os._exit() skips logging.shutdown()
+        os._exit(TIMEOUT_EXIT_CODE)
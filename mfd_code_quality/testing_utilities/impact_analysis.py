@@ -0,0 +1,337 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test impact analysis - selection of unit tests affected by changes made since the previous run."""
+
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+from pathlib import Path
+
+from coverage import CoverageData
+
+from mfd_code_quality.utils import write_file_atomically
+
+from .consts import TEST_IMPACT_INDEX_FILE
+from .workers import count_tests
+
+logger = logging.getLogger("mfd-code-quality.unit_tests")
+
+TEST_IMPACT_INDEX_VERSION = 1
+IMPORT_TIME_CONTEXT = ""  # coverage context of code executed outside of tests, e.g. when test modules are collected
+
+
+@dataclass
+class SourceFile:
+    """Source file of the project together with tests covering its lines."""
+
+    hash: str  # noqa: A003
+    source: str
+    coverage: dict[int, set[str]] = field(default_factory=dict)  # test node ids by line number
+
+
+@dataclass
+class TestSelection:
+    """Tests to be run and coverage of tests which are not run."""
+
+    __test__ = False  # not a test class, don't let pytest collect it
+
+    full_run: bool
+    reason: str
+    tests: list[str] = field(default_factory=list)  # node ids or paths of test files, relative to root directory
+    # coverage of previous run which is still valid, by source paths relative to root directory
+    carried_over: dict[str, dict[int, set[str]]] = field(default_factory=dict)
+
+    def count_tests(self, root_dir: Path) -> int:
+        """
+        Estimate number of selected tests.
+
+        :param root_dir: Root directory of the project.
+        :return: Number of selected tests, test files are counted by number of test functions.
+        """
+        return sum(1 if "::" in test else count_tests(root_dir / test) for test in self.tests)
+
+
+class ImpactIndex:
+    """
+    Persistent index mapping lines of project's sources to tests which executed them.
+
+    Index is built from per-test coverage contexts recorded by pytest-cov. Sources are stored as well,
+    so lines of changed files can be mapped to their new positions and coverage of tests which are not
+    affected by a change can be carried over to the next run.
+    """
+
+    def __init__(
+        self,
+        sources: dict[str, SourceFile],
+        test_files: dict[str, str],
+        failed: set[str],
+        environment: str | None = None,
+    ) -> None:
+        """
+        Init.
+
+        :param sources: Measured source files by paths relative to root directory.
+        :param test_files: Hashes of files in tests directory by paths relative to root directory.
+        :param failed: Node ids of tests which failed in the previous run.
+        :param environment: Fingerprint of Python environment the index was built in.
+        """
+        self.sources = sources
+        self.test_files = test_files
+        self.failed = failed
+        self.environment = environment
+
+    @classmethod
+    def load(cls: "type[ImpactIndex]", path: Path) -> "ImpactIndex | None":
+        """
+        Load index persisted by previous run.
+
+        :param path: Path to the JSON file.
+        :return: Index or None if file doesn't exist or is not compatible.
+        """
+        try:
+            content = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if content.get("version") != TEST_IMPACT_INDEX_VERSION:
+            return None
+        tests = content["tests"]
+        sources = {
+            source_path: SourceFile(
+                hash=entry["hash"],
+                source=entry["source"],
+                coverage={
+                    int(line): {tests[index] for index in indexes} for line, indexes in entry["coverage"].items()
+                },
+            )
+            for source_path, entry in content["sources"].items()
+        }
+        return cls(sources, content["test_files"], set(content["failed"]), environment=content.get("environment"))
+
+    def save(self, path: Path) -> None:
+        """
+        Persist index to be used by the next run.
+
+        Node ids are stored once and referenced by their position to keep the file small.
+
+        :param path: Path to the JSON file.
+        """
+        tests = sorted(
+            {test for source in self.sources.values() for line_tests in source.coverage.values() for test in line_tests}
+        )
+        test_indexes = {test: index for index, test in enumerate(tests)}
+        content = {
+            "version": TEST_IMPACT_INDEX_VERSION,
+            "environment": self.environment,
+            "tests": tests,
+            "failed": sorted(self.failed),
+            "test_files": self.test_files,
+            "sources": {
+                source_path: {
+                    "hash": source.hash,
+                    "source": source.source,
+                    "coverage": {
+                        str(line): sorted(test_indexes[test] for test in tests)
+                        for line, tests in sorted(source.coverage.items())
+                    },
+                }
+                for source_path, source in sorted(self.sources.items())
+            },
+        }
+        write_file_atomically(path, json.dumps(content, separators=(",", ":")))
+
+    def select(self, root_dir: Path, test_files: dict[str, str]) -> TestSelection:
+        """
+        Select tests affected by changes made since the index was built.
+
+        Selected are tests which executed changed or removed lines (or lines around inserted ones), all tests
+        executing a file if its import-time code changed, tests which failed previously and all tests
+        from new or modified test files.
+
+        :param root_dir: Root directory of the project.
+        :param test_files: Current hashes of files in tests directory by paths relative to root directory.
+        :return: Test selection, full run if helper files of tests (e.g. conftest.py) changed.
+        """
+        changed_test_files = {path for path, file_hash in test_files.items() if self.test_files.get(path) != file_hash}
+        removed_test_files = self.test_files.keys() - test_files.keys()
+        changed_helpers = sorted(
+            path for path in changed_test_files | removed_test_files if not is_test_module(Path(path).name)
+        )
+        if changed_helpers:
+            return TestSelection(full_run=True, reason=f"test helpers changed: {', '.join(changed_helpers)}")
+
+        affected = set(self.failed)
+        carried_over = {}
+        for source_path, source in self.sources.items():
+            try:
+                current_bytes = (root_dir / source_path).read_bytes()
+            except OSError:
+                affected.update(test for tests in source.coverage.values() for test in tests)
+                continue
+            if hashlib.sha256(current_bytes).hexdigest() == source.hash:
+                carried_over[source_path] = {line: set(tests) for line, tests in source.coverage.items()}
+                continue
+
+            line_mapping, changed_lines = map_lines(source.source, current_bytes.decode(errors="replace"))
+            affected_tests = {test for line in changed_lines for test in source.coverage.get(line, ())}
+            if IMPORT_TIME_CONTEXT in affected_tests:
+                # module level code changed, e.g. a constant or a decorator - any test using the module may be affected
+                affected_tests.update(test for tests in source.coverage.values() for test in tests)
+            affected.update(affected_tests)
+            carried_over[source_path] = {
+                line_mapping[line]: set(tests) for line, tests in source.coverage.items() if line in line_mapping
+            }
+
+        affected.discard(IMPORT_TIME_CONTEXT)
+        rerun_files = sorted(changed_test_files)
+        tests = [*rerun_files]
+        for test in sorted(affected):
+            test_file = test.split("::", 1)[0]
+            if test_file in test_files and test_file not in changed_test_files:
+                tests.append(test)
+
+        rerun_set = set(tests)
+        for coverage in carried_over.values():
+            for line, line_tests in list(coverage.items()):
+                line_tests.difference_update(
+                    test for test in list(line_tests) if test in rerun_set or test.split("::", 1)[0] in rerun_set
+                )
+                if not line_tests:
+                    del coverage[line]
+        return TestSelection(
+            full_run=False,
+            reason=f"{len(rerun_files)} changed test file(s), {len(tests) - len(rerun_files)} affected test(s)",
+            tests=tests,
+            carried_over=carried_over,
+        )
+
+
+def map_lines(old_source: str, new_source: str) -> tuple[dict[int, int], set[int]]:
+    """
+    Map line numbers of the old version of a file to the new one.
+
+    :param old_source: Old content of the file.
+    :param new_source: New content of the file.
+    :return: Mapping of unchanged old line numbers to new ones and old line numbers affected by the change,
+             for insertions these are lines surrounding the insertion point.
+    """
+    mapping = {0: 0}  # coverage.py marks executed empty modules with line 0
+    changed_lines = set()
+    matcher = SequenceMatcher(None, old_source.splitlines(), new_source.splitlines(), autojunk=False)
+    for tag, old_start, old_end, new_start, _ in matcher.get_opcodes():
+        if tag == "equal":
+            mapping.update({old_start + offset + 1: new_start + offset + 1 for offset in range(old_end - old_start)})
+        elif tag == "insert":
+            changed_lines.update((old_start, old_start + 1))
+        else:
+            changed_lines.update(range(old_start + 1, old_end + 1))
+    return mapping, changed_lines
+
+
+def hash_test_files(root_dir: Path, tests_path: Path) -> dict[str, str]:
+    """
+    Hash all Python files in tests directory.
+
+    :param root_dir: Root directory of the project.
+    :param tests_path: Directory with tests.
+    :return: Hashes by paths relative to root directory.
+    """
+    return {
+        path.relative_to(root_dir).as_posix(): hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in sorted(tests_path.rglob("*.py"))
+    }
+
+
+def select_affected_tests(
+    root_dir: Path, tests_path: Path, cache_dir: Path, environment: str, no_cache: bool = False
+) -> TestSelection:
+    """
+    Select tests to be run based on index stored by the previous run.
+
+    :param root_dir: Root directory of the project.
+    :param tests_path: Directory with tests.
+    :param cache_dir: Cache directory of the project.
+    :param environment: Fingerprint of current Python environment.
+    :param no_cache: Ignore stored index and run all tests.
+    :return: Test selection.
+    """
+    if no_cache:
+        return TestSelection(full_run=True, reason="cache disabled")
+    index = ImpactIndex.load(cache_dir / TEST_IMPACT_INDEX_FILE)
+    if index is None:
+        return TestSelection(full_run=True, reason="no test impact index")
+    if index.environment != environment:
+        return TestSelection(full_run=True, reason="Python environment changed")
+    return index.select(root_dir, hash_test_files(root_dir, tests_path))
+
+
+def update_impact_index(
+    root_dir: Path,
+    tests_path: Path,
+    cache_dir: Path,
+    environment: str,
+    selection: TestSelection,
+    data: CoverageData,
+    failed: set[str],
+) -> None:
+    """
+    Update stored index with coverage of the current run and complete coverage data with carried over lines.
+
+    :param root_dir: Root directory of the project.
+    :param tests_path: Directory with tests.
+    :param cache_dir: Cache directory of the project.
+    :param environment: Fingerprint of current Python environment.
+    :param selection: Tests selected for the current run.
+    :param data: Coverage data recorded with per-test contexts, carried over lines are added to it.
+    :param failed: Node ids of tests which failed in the current run.
+    """
+    index_path = cache_dir / TEST_IMPACT_INDEX_FILE
+    if data.has_arcs():
+        logger.debug("[Test impact] Branch coverage is not supported, all tests will be run next time.")
+        index_path.unlink(missing_ok=True)
+        return
+
+    coverage = {} if selection.full_run else {path: dict(lines) for path, lines in selection.carried_over.items()}
+    for measured_file in data.measured_files():
+        try:
+            source_path = Path(measured_file).resolve().relative_to(root_dir.resolve()).as_posix()
+        except ValueError:
+            continue
+        file_coverage = coverage.setdefault(source_path, {})
+        for line, contexts in data.contexts_by_lineno(measured_file).items():
+            file_coverage.setdefault(line, set()).update(context.rsplit("|", 1)[0] for context in contexts)
+
+    sources = {}
+    for source_path, file_coverage in coverage.items():
+        try:
+            source_bytes = (root_dir / source_path).read_bytes()
+        except OSError:
+            continue
+        sources[source_path] = SourceFile(
+            hash=hashlib.sha256(source_bytes).hexdigest(),
+            source=source_bytes.decode(errors="replace"),
+            coverage=file_coverage,
+        )
+    index = ImpactIndex(sources, hash_test_files(root_dir, tests_path), failed, environment=environment)
+    index.save(index_path)
+
+    if not selection.full_run:
+        data.add_lines(
+            {
+                str(root_dir / source_path): set(file_coverage)
+                for source_path, file_coverage in selection.carried_over.items()
+                if file_coverage
+            }
+        )
+        data.write()
+
+
+def is_test_module(file_name: str) -> bool:
+    """
+    Check if file contains tests, as opposed to helpers like conftest.py.
+
+    :param file_name: Name of the file.
+    :return: True if file is collected by pytest as a test module.
+    """
+    return file_name.endswith(".py") and (file_name.startswith("test_") or file_name.endswith("_test.py"))
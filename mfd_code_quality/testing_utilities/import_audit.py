@@ -0,0 +1,157 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Detection of expensive side effects of importing modules, based on audit hooks."""
+
+import logging
+import os
+import socket
+import sys
+import threading
+from dataclasses import dataclass
+from importlib.machinery import all_suffixes
+from types import TracebackType
+from typing import Any
+
+from .consts import EXPENSIVE_IMPORT_AUDIT_EVENTS, IMPORT_LARGE_FILE_SIZE
+from .import_profiling import ImportProfiler
+
+logger = logging.getLogger("mfd-code-quality.import_tests")
+
+_MODULE_FILE_SUFFIXES = (*all_suffixes(), ".pyc", ".pth")
+_active_auditor: "ImportSideEffectAuditor | None" = None
+_hook_installed = False
+
+
+@dataclass(frozen=True)
+class SideEffect:
+    """Expensive operation performed while executing module's top-level code."""
+
+    module: str  # module which was being executed when operation was performed
+    event: str
+    details: str
+
+    def __str__(self) -> str:
+        return f"{self.event}({self.details}) in {self.module}"
+
+
+def _audit_hook(event: str, args: tuple[Any, ...]) -> None:
+    """
+    Forward audit events to the active auditor.
+
+    Audit hooks can't be removed once added, so a single hook is installed for the whole process.
+
+    :param event: Audit event name.
+    :param args: Event arguments.
+    """
+    if _active_auditor is not None:
+        _active_auditor.on_event(event, args)
+
+
+class ImportSideEffectAuditor:
+    """
+    Record expensive operations (subprocesses, network, sleeps, reading large files) done at import time.
+
+    Operations are attributed to the module, which was being executed by the import system at the moment,
+    as tracked by the import profiler. Only operations of the thread which activated the auditor are recorded, those
+    of other threads (e.g. checks run in parallel through api) have nothing to do with the imported module.
+    """
+
+    def __init__(self, profiler: ImportProfiler) -> None:
+        """
+        Init.
+
+        :param profiler: Active import profiler, used to find out which module is being executed.
+        """
+        self._profiler = profiler
+        self._in_hook = False
+        self._thread_id: int | None = None
+        self.side_effects: list[SideEffect] = []
+
+    def __enter__(self) -> "ImportSideEffectAuditor":
+        global _active_auditor, _hook_installed
+        if not _hook_installed:
+            sys.addaudithook(_audit_hook)
+            _hook_installed = True
+        self._thread_id = threading.get_ident()
+        _active_auditor = self
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        global _active_auditor
+        _active_auditor = None
+
+    def on_event(self, event: str, args: tuple[Any, ...]) -> None:
+        """
+        Record event if it's expensive and was raised by module's top-level code.
+
+        :param event: Audit event name.
+        :param args: Event arguments.
+        """
+        if threading.get_ident() != self._thread_id:
+            return
+        module = self._profiler.current_module
+        if module is None or self._in_hook:
+            return
+
+        self._in_hook = True
+        try:
+            if event in EXPENSIVE_IMPORT_AUDIT_EVENTS:
+                self.side_effects.append(SideEffect(module, event, _format_args(args)))
+            elif event == "open" and _is_large_data_file(args[0]):
+                size = os.path.getsize(args[0])
+                self.side_effects.append(SideEffect(module, event, f"{args[0]!r}, {size} bytes"))
+        finally:
+            self._in_hook = False
+
+
+def check_side_effects(module_name: str, side_effects: list[SideEffect], strict: bool) -> bool:
+    """
+    Report expensive operations performed when importing the module.
+
+    :param module_name: Name of the imported module.
+    :param side_effects: Operations recorded while importing the module.
+    :param strict: Treat any recorded operation as failure.
+    :return: False if module failed in strict mode, True otherwise.
+    """
+    if not side_effects:
+        return True
+    details = "\n".join(f"  {side_effect}" for side_effect in side_effects)
+    message = f"Importing {module_name} performs expensive operations at import time:\n{details}"
+    if strict:
+        logger.error(message)
+        return False
+    logger.warning(message)
+    return True
+
+
+def _is_large_data_file(path: Any) -> bool:
+    """
+    Check if opened file is a large data file, not a source or bytecode of imported module.
+
+    :param path: Path passed to open, might be also a file descriptor.
+    :return: True if file should be reported.
+    """
+    if not isinstance(path, (str, bytes, os.PathLike)):
+        return False
+    path = os.fsdecode(path)
+    if path.endswith(_MODULE_FILE_SUFFIXES):
+        return False
+    try:
+        return os.path.isfile(path) and os.path.getsize(path) >= IMPORT_LARGE_FILE_SIZE
+    except OSError:
+        return False
+
+
+def _format_args(args: tuple[Any, ...], max_length: int = 200) -> str:
+    """
+    Format event arguments to be logged.
+
+    :param args: Event arguments.
+    :param max_length: Maximum length of the output.
+    :return: Formatted arguments.
+    """
+    # environment dicts and socket objects are skipped, they are long and may contain secrets
+    formatted = ", ".join(repr(arg) for arg in args if arg is not None and not isinstance(arg, (dict, socket.socket)))
+    return formatted if len(formatted) <= max_length else f"{formatted[:max_length]}..."
@@ -0,0 +1,238 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Intra-project import dependency graph."""
+
+import ast
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable
+
+from mfd_code_quality.utils import write_file_atomically
+
+from .consts import IMPORT_GRAPH_FILE
+from .static_imports import iter_import_statements
+
+logger = logging.getLogger("mfd-code-quality.import_tests")
+
+IMPORT_GRAPH_VERSION = 1
+
+
+@dataclass
+class ModuleNode:
+    """Module of the project in the import graph."""
+
+    path: str  # relative to project's root directory, in POSIX format
+    hash: str  # noqa: A003
+    imports: list[str] = field(default_factory=list)
+    verified: str | None = None  # digest of module and its dependencies at the time of last successful import
+
+
+class ImportGraph:
+    """
+    Graph of imports between modules of the project.
+
+    Each module is stored together with a hash of its source. Graph is persisted between runs, so modules
+    which didn't change (neither their source nor source of any of their transitive in-project dependencies)
+    since their last successful import don't need to be imported again.
+    """
+
+    def __init__(self, nodes: dict[str, ModuleNode], environment: str | None = None) -> None:
+        """
+        Init.
+
+        :param nodes: Modules of the project by their absolute names.
+        :param environment: Fingerprint of Python environment the graph was verified in.
+        """
+        self.nodes = nodes
+        self.environment = environment
+        self._reverse: dict[str, set[str]] | None = None
+
+    @classmethod
+    def build(cls: "type[ImportGraph]", root_dir: Path, module_paths: dict[str, Path]) -> "ImportGraph":
+        """
+        Build graph by parsing modules of the project.
+
+        Both conditional and unconditional imports are taken into account, importing a package implies
+        a dependency on all its parent packages.
+
+        :param root_dir: Root directory of the project.
+        :param module_paths: Paths of project modules by their absolute names.
+        :return: Import graph.
+        """
+        nodes = {}
+        for name, path in module_paths.items():
+            try:
+                source = path.read_bytes()
+            except OSError:
+                continue
+            imports = set(_get_parent_packages(name))
+            try:
+                tree = ast.parse(source, filename=str(path))
+            except SyntaxError:
+                tree = None
+            if tree is not None:
+                for statement in iter_import_statements(tree, name, path.name == "__init__.py"):
+                    candidates = [statement.module, *(f"{statement.module}.{imported}" for imported in statement.names)]
+                    for candidate in candidates:
+                        imports.update(
+                            module for module in (*_get_parent_packages(candidate), candidate) if module in module_paths
+                        )
+            imports.discard(name)
+            nodes[name] = ModuleNode(
+                path=path.relative_to(root_dir).as_posix(),
+                hash=hashlib.sha256(source).hexdigest(),
+                imports=sorted(imports),
+            )
+        return cls(nodes)
+
+    @classmethod
+    def load(cls: "type[ImportGraph]", path: Path) -> "ImportGraph | None":
+        """
+        Load graph persisted by previous run.
+
+        :param path: Path to the JSON file.
+        :return: Import graph or None if file doesn't exist or is not compatible.
+        """
+        try:
+            content = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return None
+        if content.get("version") != IMPORT_GRAPH_VERSION:
+            return None
+        nodes = {name: ModuleNode(**node) for name, node in content["modules"].items()}
+        return cls(nodes, environment=content.get("environment"))
+
+    def save(self, path: Path) -> None:
+        """
+        Persist graph to be reused by the next run or other stages.
+
+        :param path: Path to the JSON file.
+        """
+        content = {
+            "version": IMPORT_GRAPH_VERSION,
+            "environment": self.environment,
+            "modules": {name: vars(node) for name, node in sorted(self.nodes.items())},
+        }
+        write_file_atomically(path, json.dumps(content, indent=1))
+
+    def dependencies(self, module: str, transitive: bool = True) -> set[str]:
+        """
+        Get in-project modules imported by the module.
+
+        :param module: Absolute module name.
+        :param transitive: Include dependencies of dependencies.
+        :return: Set of module names.
+        """
+        return self._traverse(module, lambda name: self.nodes[name].imports if name in self.nodes else [], transitive)
+
+    def reverse_dependencies(self, module: str, transitive: bool = True) -> set[str]:
+        """
+        Get in-project modules importing the module.
+
+        :param module: Absolute module name.
+        :param transitive: Include modules importing the module indirectly.
+        :return: Set of module names.
+        """
+        if self._reverse is None:
+            self._reverse = {name: set() for name in self.nodes}
+            for name, node in self.nodes.items():
+                for imported in node.imports:
+                    self._reverse.setdefault(imported, set()).add(name)
+        return self._traverse(module, lambda name: self._reverse.get(name, ()), transitive)
+
+    def reverse_dependencies_of_file(self, path: str | Path, root_dir: Path | None = None) -> set[str]:
+        """
+        Get in-project modules which are affected by a change of the file.
+
+        :param path: Path to the file, relative to project's root directory or absolute if root_dir is given.
+        :param root_dir: Root directory of the project.
+        :return: Set of module names, empty if file is not a module of the project.
+        """
+        relative_path = (Path(path).relative_to(root_dir) if root_dir else Path(path)).as_posix()
+        module = next((name for name, node in self.nodes.items() if node.path == relative_path), None)
+        return self.reverse_dependencies(module) if module else set()
+
+    def digest(self, module: str) -> str:
+        """
+        Get digest of the module's source together with sources of all its transitive dependencies.
+
+        :param module: Absolute module name.
+        :return: Hex digest.
+        """
+        modules = sorted({module, *self.dependencies(module)} & self.nodes.keys())
+        return hashlib.sha256("\n".join(f"{name}:{self.nodes[name].hash}" for name in modules).encode()).hexdigest()
+
+    def inherit_verified(self, previous: "ImportGraph") -> None:
+        """
+        Take over information which modules were successfully imported from the graph of previous run.
+
+        :param previous: Graph of previous run.
+        """
+        for name, node in self.nodes.items():
+            if name in previous.nodes:
+                node.verified = previous.nodes[name].verified
+
+    def is_verified(self, module: str) -> bool:
+        """
+        Check if module was successfully imported and neither it nor its dependencies changed since then.
+
+        :param module: Absolute module name.
+        :return: True if module doesn't need to be imported again.
+        """
+        node = self.nodes.get(module)
+        return node is not None and node.verified is not None and node.verified == self.digest(module)
+
+    def mark_verified(self, module: str) -> None:
+        """
+        Mark module as successfully imported in its current state.
+
+        :param module: Absolute module name.
+        """
+        if module in self.nodes:
+            self.nodes[module].verified = self.digest(module)
+
+    @staticmethod
+    def _traverse(module: str, get_neighbours: Callable[[str], Iterable[str]], transitive: bool) -> set[str]:
+        """
+        Collect modules reachable from the module.
+
+        :param module: Starting module.
+        :param get_neighbours: Function returning direct neighbours of a module.
+        :param transitive: Traverse the whole graph or direct neighbours only.
+        :return: Set of reachable modules without the starting one.
+        """
+        visited = set()
+        to_visit = list(get_neighbours(module))
+        while to_visit:
+            name = to_visit.pop()
+            if name in visited:
+                continue
+            visited.add(name)
+            if transitive:
+                to_visit.extend(get_neighbours(name))
+        visited.discard(module)
+        return visited
+
+
+def _get_parent_packages(module: str) -> list[str]:
+    """
+    Get names of all parent packages of the module, which are executed before the module itself.
+
+    :param module: Absolute module name.
+    :return: List of parent package names, from top-level one.
+    """
+    parts = module.split(".")
+    return [".".join(parts[:index]) for index in range(1, len(parts))]
+
+
+def load_import_graph(cache_dir: Path) -> ImportGraph | None:
+    """
+    Load import graph persisted by import tests, e.g. to find modules affected by changed files.
+
+    :param cache_dir: Cache directory of the project.
+    :return: Import graph or None if import tests were not run yet.
+    """
+    return ImportGraph.load(cache_dir / IMPORT_GRAPH_FILE)
@@ -0,0 +1,262 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Import-time profiling utilities."""
+
+import logging
+import sys
+import threading
+import tracemalloc
+from dataclasses import dataclass, field
+from importlib.abc import MetaPathFinder
+from importlib.machinery import ModuleSpec
+from time import perf_counter
+from types import ModuleType, TracebackType
+from typing import Any, Iterator, Sequence
+
+from .consts import IMPORT_PROFILE_REPORT_LIMIT, IMPORT_PROFILE_TRANSITIVE_LIMIT
+
+logger = logging.getLogger("mfd-code-quality.import_tests")
+
+
+@dataclass
+class ImportRecord:
+    """Import time and memory of a single module, equivalent to one line of `-X importtime` output."""
+
+    name: str
+    self_time: float = 0.0
+    cumulative_time: float = 0.0
+    self_memory: int = 0
+    cumulative_memory: int = 0
+    children: list["ImportRecord"] = field(default_factory=list)
+
+    def iter_descendants(self) -> Iterator["ImportRecord"]:
+        """Iterate over all modules imported transitively while executing this module."""
+        for child in self.children:
+            yield child
+            yield from child.iter_descendants()
+
+
+class _ProfilingLoader:
+    """Loader proxy measuring execution of the wrapped loader."""
+
+    def __init__(self, loader: Any, profiler: "ImportProfiler") -> None:
+        """
+        Init.
+
+        :param loader: Original loader found by the import system.
+        :param profiler: Profiler which collects the measurements.
+        """
+        self._loader = loader
+        self._profiler = profiler
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._loader, name)
+
+    def create_module(self, spec: ModuleSpec) -> ModuleType | None:
+        """Delegate module creation to the original loader."""
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module: ModuleType) -> None:
+        """Execute module with the original loader while measuring it."""
+        self._profiler._exec_module(self._loader, module)
+
+
+class ImportProfiler(MetaPathFinder):
+    """
+    Meta path finder measuring self and cumulative import time and memory of every executed module.
+
+    Times are measured the same way as `python -X importtime` does it - self time excludes execution of nested imports.
+    Memory is measured with `tracemalloc` as the size of memory blocks still allocated after module execution, on
+    request only - tracing slows down allocations, so import times measured together with memory are inflated.
+    Only imports of the thread which started the profiler are measured, other threads import modules unwrapped.
+    """
+
+    def __init__(self, measure_memory: bool = False) -> None:
+        """
+        Init.
+
+        :param measure_memory: Measure memory allocated by modules, at the cost of accuracy of import times.
+        """
+        self.roots: list[ImportRecord] = []
+        self.measure_memory = measure_memory
+        self._local = threading.local()  # stack of modules being executed
+        self._thread_id: int | None = None
+        self._started_tracemalloc = False
+
+    def __enter__(self) -> "ImportProfiler":
+        self._thread_id = threading.get_ident()
+        if self.measure_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_val: BaseException | None, exc_tb: TracebackType | None
+    ) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    @property
+    def current_module(self) -> str | None:
+        """Name of the module which is being executed at the moment, None outside of imports."""
+        stack = self._stack
+        return stack[-1].name if stack else None
+
+    @property
+    def _stack(self) -> list[ImportRecord]:
+        """Modules being executed by the current thread, innermost last."""
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def find_spec(
+        self, fullname: str, path: Sequence[str] | None, target: ModuleType | None = None
+    ) -> ModuleSpec | None:
+        """Find spec using remaining finders and wrap its loader to measure module execution."""
+        if threading.get_ident() != self._thread_id:
+            return None
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _ProfilingLoader(spec.loader, self)
+        return spec
+
+    def _exec_module(self, loader: Any, module: ModuleType) -> None:
+        """
+        Execute module and record its import time and memory.
+
+        :param loader: Original loader of the module.
+        :param module: Module to execute.
+        """
+        stack = self._stack
+        record = ImportRecord(module.__name__)
+        (stack[-1].children if stack else self.roots).append(record)
+        stack.append(record)
+        start_memory = tracemalloc.get_traced_memory()[0] if self.measure_memory else 0
+        start_time = perf_counter()
+        try:
+            loader.exec_module(module)
+        finally:
+            record.cumulative_time = perf_counter() - start_time
+            if self.measure_memory:
+                record.cumulative_memory = tracemalloc.get_traced_memory()[0] - start_memory
+            record.self_time = record.cumulative_time - sum(child.cumulative_time for child in record.children)
+            record.self_memory = record.cumulative_memory - sum(child.cumulative_memory for child in record.children)
+            stack.pop()
+            # leave no trace of the profiler in the imported module
+            if getattr(module, "__loader__", None) is not loader:
+                module.__loader__ = loader
+            if getattr(module, "__spec__", None) is not None:
+                module.__spec__.loader = loader
+
+    def iter_records(self) -> Iterator[ImportRecord]:
+        """Iterate over records of all measured modules."""
+        for root in self.roots:
+            yield root
+            yield from root.iter_descendants()
+
+    @property
+    def total_time(self) -> float:
+        """Total time spent on executing imported modules."""
+        return sum(root.cumulative_time for root in self.roots)
+
+    def log_report(self, packages: Sequence[str]) -> None:
+        """
+        Log the slowest project modules together with their heaviest transitive imports.
+
+        :param packages: Top-level packages of the project, used to filter out third-party modules.
+        """
+        records = sorted(
+            (record for record in self.iter_records() if _is_project_module(record.name, packages)),
+            key=lambda record: record.cumulative_time,
+            reverse=True,
+        )[:IMPORT_PROFILE_REPORT_LIMIT]
+        if not records:
+            return
+
+        lines = [
+            f"{'cumulative [ms]':>15} | {'self [ms]':>9} | "
+            + (f"{'memory [KiB]':>12} | " if self.measure_memory else "")
+            + "module"
+        ]
+        for record in records:
+            lines.append(_format_record(record, record.name, self.measure_memory))
+            heaviest = sorted(record.iter_descendants(), key=lambda desc: desc.self_time, reverse=True)
+            for descendant in heaviest[:IMPORT_PROFILE_TRANSITIVE_LIMIT]:
+                lines.append(_format_record(descendant, f"  -> {descendant.name}", self.measure_memory))
+        logger.info(
+            f"Total import time: {self.total_time * 1000:.1f} ms. Slowest project modules:\n" + "\n".join(lines)
+        )
+
+    def is_within_budget(
+        self, packages: Sequence[str], total_budget: float | None = None, module_budget: float | None = None
+    ) -> bool:
+        """
+        Check measured import times against budgets.
+
+        :param packages: Top-level packages of the project, only their modules are checked against module budget.
+        :param total_budget: Allowed time in seconds of importing all modules, None for no limit.
+        :param module_budget: Allowed cumulative import time in seconds of a single project module, None for no limit.
+        :return: True if no budget was exceeded, False otherwise.
+        """
+        within_budget = True
+        if total_budget is not None and self.total_time > total_budget:
+            logger.error(f"Total import time {self.total_time:.3f}s exceeds budget of {total_budget}s.")
+            within_budget = False
+
+        if module_budget is not None:
+            for record in self.iter_over_budget(packages, module_budget):
+                logger.error(
+                    f"Import time of {record.name} ({record.cumulative_time:.3f}s) exceeds budget of {module_budget}s."
+                )
+                within_budget = False
+        return within_budget
+
+    def iter_over_budget(self, packages: Sequence[str], module_budget: float) -> Iterator[ImportRecord]:
+        """
+        Iterate over records of project modules, whose cumulative import time exceeds budget.
+
+        :param packages: Top-level packages of the project.
+        :param module_budget: Allowed cumulative import time in seconds of a single project module.
+        """
+        for record in self.iter_records():
+            if _is_project_module(record.name, packages) and record.cumulative_time > module_budget:
+                yield record
+
+
+def _is_project_module(name: str, packages: Sequence[str]) -> bool:
+    """
+    Check if module belongs to one of the given top-level packages.
+
+    :param name: Module name.
+    :param packages: Top-level package names.
+    :return: True if module is part of the project.
+    """
+    return name.split(".", 1)[0] in packages
+
+
+def _format_record(record: ImportRecord, label: str, with_memory: bool) -> str:
+    """
+    Format import record as a single report line.
+
+    :param record: Import record.
+    :param label: Module label to be displayed.
+    :param with_memory: Include memory of the module.
+    :return: Formatted line.
+    """
+    return (
+        f"{record.cumulative_time * 1000:>15.1f} | {record.self_time * 1000:>9.1f} | "
+        + (f"{record.cumulative_memory / 1024:>12.1f} | " if with_memory else "")
+        + label
+    )
@@ -3,17 +3,32 @@
 """Import tests utilities."""
 
 import glob
+import hashlib
 import logging
 import os
 import re
 import sys
 import traceback
-from importlib import import_module
+from importlib import import_module, invalidate_caches
+from pathlib import Path
 
 from setuptools import find_packages
 
-from ..utils import _install_packages, get_root_dir, set_cwd, set_up_logging
-from .consts import BERTA_IMPORTS
+from ..utils import (
+    _install_packages,
+    get_cache_dir,
+    get_environment_fingerprint,
+    get_parsed_args,
+    get_root_dir,
+    set_cwd,
+    set_up_logging,
+)
+from .bytecode import warm_up_bytecode
+from .consts import BERTA_IMPORTS, BYTECODE_CACHE_FILE, IMPORT_GRAPH_FILE
+from .import_audit import ImportSideEffectAuditor, check_side_effects
+from .import_graph import ImportGraph
+from .import_profiling import ImportProfiler, ImportRecord
+from .static_imports import StaticImportChecker, UnresolvedImport, clear_resolution_cache
 
 logger = logging.getLogger("mfd-code-quality.import_tests")
 
@@ -23,7 +38,15 @@ def _run_import_tests() -> bool:
     Detect packages in the project, install their requirements and import all python files in the project.
 
     This is done to check if all files can be imported and will not crash due to incorrect import or similar issues.
-    :return: True if all files can be imported successfully, False otherwise.
+    Each file is checked statically first and executed only if all its imports could be resolved (or result is
+    inconclusive), so broken imports are found without running module's top-level code.
+    Import time and memory of each module is measured and checked against budgets given in command line.
+    Expensive operations done at import time (subprocesses, network, sleeps, reading large files) are reported
+    and treated as failures in strict mode.
+    Modules, which didn't change together with their in-project dependencies since their last successful import
+    within the same module budget and strictness, are not imported again - unless total budget is given, which needs
+    all modules to be measured. With `--warm-up-bytecode` all files are compiled to bytecode in parallel first.
+    :return: True if all files can be imported successfully within budgets, False otherwise.
     """
     set_up_logging()
     set_cwd()
@@ -31,29 +54,100 @@ def _run_import_tests() -> bool:
     root_dir = get_root_dir()
     packages = find_packages(where=root_dir, exclude=["tests", "tests.*"])
     paths = [os.path.join(root_dir, package.replace(".", "/")) for package in packages]
+    static_checker = StaticImportChecker(Path(root_dir), packages)
 
-    for path, package in zip(paths, packages):
+    for path in paths:
         if "requirements.txt" in os.listdir(path):
             logger.debug(f"'requirements.txt' found in: {path}")
             path_to_req = os.path.join(path, "requirements.txt")
             logger.debug(f"Installing requirements from {path_to_req}")
             _install_packages(path_to_req)
+            invalidate_caches()
+            clear_resolution_cache()
 
-        for py_file in glob.iglob("*.py", root_dir=path, recursive=False):
-            name = re.sub(r"[\\/]+", ".", py_file).removesuffix(".py")
-            if "__main__" in name:  # skip https://docs.python.org/3/library/__main__.html
-                continue
-            try:
+    args = get_parsed_args()
+    top_level_packages = {package.split(".", 1)[0] for package in packages}
+    if args.warm_up_bytecode:
+        warm_up_bytecode(
+            Path(root_dir), sorted(top_level_packages), get_cache_dir() / BYTECODE_CACHE_FILE, args.no_cache
+        )
+    import_graph_path = get_cache_dir() / IMPORT_GRAPH_FILE
+    import_graph = ImportGraph.build(Path(root_dir), static_checker.module_paths)
+    import_graph.environment = _get_import_graph_environment()
+    previous_import_graph = None if args.no_cache else ImportGraph.load(import_graph_path)
+    if args.import_time_budget is not None:
+        logger.debug("Total import time budget is given, all modules are imported regardless of previous runs.")
+    elif previous_import_graph is not None and previous_import_graph.environment == import_graph.environment:
+        import_graph.inherit_verified(previous_import_graph)
+
+    skipped_count = 0
+    # modules imported successfully so far, with all modules executed by their import
+    imported_modules: dict[str, set[str]] = {}
+    # tracemalloc would inflate import times checked against budgets
+    measure_memory = args.import_time_budget is None and args.module_import_time_budget is None
+    with ImportProfiler(measure_memory) as profiler, ImportSideEffectAuditor(profiler) as auditor:
+        for path, package in zip(paths, packages):
+            for py_file in glob.iglob("*.py", root_dir=path, recursive=False):
+                name = re.sub(r"[\\/]+", ".", py_file).removesuffix(".py")
+                if "__main__" in name:  # skip https://docs.python.org/3/library/__main__.html
+                    continue
                 name = package + "." + name
-                import_module(name)
-            except Exception as e:
-                if isinstance(e, ModuleNotFoundError) and "berta_wrappers" in name:
-                    if e.name in BERTA_IMPORTS:
-                        logger.debug(f"Found import of berta module in {name}, skipping... Details: {e}")
-                        continue
+                module_name = name.removesuffix(".__init__")
+                if import_graph.is_verified(module_name):
+                    logger.debug(f"{module_name} and its dependencies didn't change since last successful import.")
+                    skipped_count += 1
+                    continue
+
+                unresolved_imports = [
+                    unresolved
+                    for unresolved in static_checker.check(module_name, Path(path, py_file))
+                    if not _is_berta_import(name, unresolved)
+                ]
+                if unresolved_imports:
+                    logger.error("\n".join(str(unresolved) for unresolved in unresolved_imports))
+                    successfully_imported = False
+                    continue
+
+                side_effects_count = len(auditor.side_effects)
+                roots_count = len(profiler.roots)
+                try:
+                    import_module(name)
+                except Exception as e:
+                    if isinstance(e, ModuleNotFoundError) and "berta_wrappers" in name:
+                        if e.name in BERTA_IMPORTS:
+                            logger.debug(f"Found import of berta module in {name}, skipping... Details: {e}")
+                            imported_modules[module_name] = _get_executed_modules(name, profiler.roots[roots_count:])
+                            continue
+
+                    logger.error("".join(traceback.format_exception(e)))
+                    successfully_imported = False
+                    continue
+
+                side_effects = auditor.side_effects[side_effects_count:]
+                if check_side_effects(name, side_effects, strict=args.strict_import_side_effects):
+                    imported_modules[module_name] = _get_executed_modules(name, profiler.roots[roots_count:])
+                else:
+                    successfully_imported = False
+
+    if skipped_count:
+        logger.info(f"Skipped {skipped_count} module(s) unchanged since their last successful import.")
 
-                logger.error("".join(traceback.format_exception(e)))
-                successfully_imported = False
+    profiler.log_report(top_level_packages)
+    if not profiler.is_within_budget(
+        top_level_packages, total_budget=args.import_time_budget, module_budget=args.module_import_time_budget
+    ):
+        successfully_imported = False
+
+    # module importing a module over budget is not verified either, it would be skipped while the slow one isn't
+    over_budget = (
+        set()
+        if args.module_import_time_budget is None
+        else {record.name for record in profiler.iter_over_budget(top_level_packages, args.module_import_time_budget)}
+    )
+    for module_name, executed_modules in imported_modules.items():
+        if not executed_modules & over_budget:
+            import_graph.mark_verified(module_name)
+    import_graph.save(import_graph_path)
 
     if successfully_imported:
         logger.info("Import testing check PASSED.")
@@ -61,6 +155,48 @@ def _run_import_tests() -> bool:
     return successfully_imported
 
 
+def _get_import_graph_environment() -> str:
+    """
+    Get fingerprint of environment and options modules are verified in.
+
+    Module which passed with a looser module budget or without strict checks of side effects needs to be imported
+    again once they are tightened.
+
+    :return: Hash of Python environment, module import time budget and strictness of side effects checks.
+    """
+    args = get_parsed_args()
+    options = f"module_budget={args.module_import_time_budget}, strict={args.strict_import_side_effects}"
+    return hashlib.sha256(f"{get_environment_fingerprint()}\n{options}".encode()).hexdigest()
+
+
+def _get_executed_modules(name: str, records: list[ImportRecord]) -> set[str]:
+    """
+    Get modules executed by import of the module.
+
+    :param name: Name of the imported module.
+    :param records: Import records added to profiler by the import.
+    :return: Names of the module and all modules executed by its import.
+    """
+    executed_modules = {name, name.removesuffix(".__init__")}
+    for record in records:
+        executed_modules.add(record.name)
+        executed_modules.update(descendant.name for descendant in record.iter_descendants())
+    return executed_modules
+
+
+def _is_berta_import(module_name: str, unresolved_import: UnresolvedImport) -> bool:
+    """
+    Check if unresolved import is an import of Berta module, which is expected to be unavailable.
+
+    :param module_name: Name of the module containing the import.
+    :param unresolved_import: Unresolved import.
+    :return: True if import should be ignored.
+    """
+    return "berta_wrappers" in module_name and (
+        unresolved_import.import_name in BERTA_IMPORTS or unresolved_import.import_name.split(".")[0] in BERTA_IMPORTS
+    )
+
+
 def run_checks() -> None:
     """
     Execute each python file found in *mfd* folder and its sub-folders.
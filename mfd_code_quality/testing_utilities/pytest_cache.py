@@ -0,0 +1,65 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Persistent pytest cache used to run previously failing tests first."""
+
+import json
+import logging
+import shutil
+from pathlib import Path
+
+from .consts import PYTEST_CACHE_DIR, PYTEST_CACHE_ENVIRONMENT_FILE
+from ..utils import get_cache_dir, get_environment_fingerprint, get_parsed_args
+
+logger = logging.getLogger("mfd-code-quality.testing")
+
+
+def get_pytest_cache_dir(suite: str) -> Path:
+    """
+    Get pytest cache directory of the test suite, kept in cache directory of the project.
+
+    Cache is cleared when Python environment changed since it was created or `--no-cache` is given.
+
+    :param suite: Name of the test suite, e.g. unit or system.
+    :return: Path to the directory.
+    """
+    pytest_cache_dir = get_cache_dir() / PYTEST_CACHE_DIR.format(suite=suite)
+    environment_file = pytest_cache_dir / PYTEST_CACHE_ENVIRONMENT_FILE
+    environment = get_environment_fingerprint()
+    try:
+        cached_environment = environment_file.read_text()
+    except OSError:
+        cached_environment = None
+
+    if get_parsed_args().no_cache or cached_environment != environment:
+        if cached_environment is not None:
+            logger.debug(f"Clearing pytest cache of {suite} tests.")
+        shutil.rmtree(pytest_cache_dir, ignore_errors=True)
+        pytest_cache_dir.mkdir()
+        environment_file.write_text(environment)
+    return pytest_cache_dir
+
+
+def get_pytest_cache_args(pytest_cache_dir: Path) -> list[str]:
+    """
+    Get pytest arguments running previously failing tests first, optionally stopping on the first failure.
+
+    :param pytest_cache_dir: Pytest cache directory.
+    :return: List of arguments.
+    """
+    args = ["-o", f"cache_dir={pytest_cache_dir}", "--failed-first"]
+    if get_parsed_args().fail_fast:
+        args.append("--exitfirst")
+    return args
+
+
+def read_failed_tests(pytest_cache_dir: Path) -> set[str]:
+    """
+    Read node ids of tests which failed and were not fixed since then from pytest cache.
+
+    :param pytest_cache_dir: Pytest cache directory.
+    :return: Set of node ids.
+    """
+    try:
+        return set(json.loads((pytest_cache_dir / "v" / "cache" / "lastfailed").read_text()))
+    except (OSError, ValueError):
+        return set()
@@ -0,0 +1,183 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Resources declared by tests, which let system tests run in parallel without interfering with each other.
+
+Tests declare resources they use (ports, directories, local services, ...) with `mfd_resources` marker::
+
+    @pytest.mark.mfd_resources("port:8080", shared=["service:ftp"])
+    def test_upload(): ...
+
+Resources given as positional arguments are held exclusively, `shared` ones can be held by many tests at once unless
+another test holds them exclusively. Tests marked without any resources don't conflict with any other test.
+Module is a pytest plugin loaded with `-p`, so it's loaded by pytest-xdist workers as well.
+PYTEST_DONT_REWRITE - module is imported before pytest loads it as a plugin, there are no assertions to rewrite.
+"""
+
+import json
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+PLUGIN_NAME = "mfd_code_quality.testing_utilities.resources"
+RESOURCES_MARKER = "mfd_resources"
+RESOURCES_SELECTIONS = {True: "declaring", False: "other"}  # values of --mfd-resources-selection
+
+
+@dataclass(frozen=True)
+class Resources:
+    """Resources held by a test."""
+
+    exclusive: frozenset[str]
+    shared: frozenset[str]
+
+
+def get_resources(item: pytest.Item) -> Resources | None:
+    """
+    Get resources declared by markers of the test, its class and module.
+
+    :param item: Test.
+    :return: Resources or None if test is not marked.
+    """
+    markers = list(item.iter_markers(RESOURCES_MARKER))
+    if not markers:
+        return None
+    exclusive = {name for marker in markers for name in marker.args}
+    shared = set()
+    for marker in markers:
+        names = marker.kwargs.get("shared", ())
+        shared.update([names] if isinstance(names, str) else names)
+    return Resources(frozenset(exclusive), frozenset(shared - exclusive))
+
+
+def get_conflict_groups(resources: dict[str, Resources | None]) -> dict[str, str]:
+    """
+    Group tests which can't run at the same time.
+
+    Test holding a resource exclusively conflicts with all other tests holding the resource, conflicts are transitive
+    so tests of a group can be run one after another on a single worker.
+
+    :param resources: Resources by node ids of tests, None for tests which don't declare resources.
+    :return: Group names by node ids, group is named after its first test.
+    """
+    if any(test_resources is None for test_resources in resources.values()):
+        # tests which don't declare resources may use any of them
+        return dict.fromkeys(resources, "")
+
+    parents = {nodeid: nodeid for nodeid in resources}
+    order = {nodeid: index for index, nodeid in enumerate(resources)}
+
+    def find(nodeid: str) -> str:
+        while parents[nodeid] != nodeid:
+            parents[nodeid] = parents[parents[nodeid]]
+            nodeid = parents[nodeid]
+        return nodeid
+
+    holders = defaultdict(lambda: ([], []))  # exclusive and shared holders by resource names
+    for nodeid, test_resources in resources.items():
+        for name in test_resources.exclusive:
+            holders[name][0].append(nodeid)
+        for name in test_resources.shared:
+            holders[name][1].append(nodeid)
+
+    for exclusive, shared in holders.values():
+        if not exclusive:
+            continue
+        first, *others = [*exclusive, *shared]
+        for nodeid in others:
+            root, other_root = sorted((find(first), find(nodeid)), key=order.__getitem__)
+            parents[other_root] = root
+    return {nodeid: find(nodeid) for nodeid in resources}
+
+
+def uses_resources(tests_path: Path) -> bool:
+    """
+    Check if any test file declares resources, without collecting tests.
+
+    :param tests_path: Directory with tests.
+    :return: True if marker is found in any Python file.
+    """
+    marker = RESOURCES_MARKER.encode()
+    for path in tests_path.rglob("*.py"):
+        try:
+            if marker in path.read_bytes():
+                return True
+        except OSError:
+            continue
+    return False
+
+
+def get_resources_args(groups_path: Path | None = None, declaring: bool | None = None) -> list[str]:
+    """
+    Get pytest arguments loading the plugin.
+
+    Tests are selected by the plugin instead of `-m`, which would replace `-m` expression of the project's addopts.
+
+    :param groups_path: Path to write groups of conflicting tests to, when tests are run by pytest-xdist.
+    :param declaring: Run only tests declaring resources (True), only tests which don't declare them (False) or all.
+    :return: Arguments.
+    """
+    return [
+        "-p",
+        PLUGIN_NAME,
+        *([f"--mfd-resource-groups={groups_path}"] if groups_path else []),
+        *([f"--mfd-resources-selection={RESOURCES_SELECTIONS[declaring]}"] if declaring is not None else []),
+    ]
+
+
+def pytest_addoption(parser: pytest.Parser) -> None:
+    """
+    Add options of resources.
+
+    :param parser: Pytest parser.
+    """
+    group = parser.getgroup("mfd-resources", "mfd-code-quality resources")
+    group.addoption("--mfd-resource-groups", help="Path to write groups of conflicting tests to.")
+    group.addoption(
+        "--mfd-resources-selection",
+        choices=list(RESOURCES_SELECTIONS.values()),
+        help="Run only tests declaring resources or only the other tests.",
+    )
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """
+    Register the marker.
+
+    :param config: Pytest config.
+    """
+    config.addinivalue_line(
+        "markers",
+        f"{RESOURCES_MARKER}(*exclusive, shared=()): resources held by the test, tests holding the same resource "
+        "exclusively are never run at the same time.",
+    )
+
+
+@pytest.hookimpl(trylast=True)
+def pytest_collection_modifyitems(config: pytest.Config, items: list[pytest.Item]) -> None:
+    """
+    Select tests by resources they declare, write groups of conflicting tests for the scheduler.
+
+    Runs after deselection by `-m` and `-k` of the project.
+
+    :param config: Pytest config.
+    :param items: Collected tests.
+    """
+    selection = config.getoption("mfd_resources_selection")
+    if selection:
+        declaring = selection == RESOURCES_SELECTIONS[True]
+        selected, deselected = [], []
+        for item in items:
+            (selected if (get_resources(item) is not None) == declaring else deselected).append(item)
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+
+    groups_path = config.getoption("mfd_resource_groups")
+    # with xdist all workers collect the same tests, one of them is enough to write the groups
+    if not groups_path or getattr(config, "workerinput", {}).get("workerid", "gw0") != "gw0":
+        return
+    groups = get_conflict_groups({item.nodeid: get_resources(item) for item in items})
+    Path(groups_path).write_text(json.dumps(groups))
@@ -0,0 +1,195 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Scheduling of tests on pytest-xdist workers based on historical test durations and resources used by tests.
+
+Module imports xdist, so it's imported only once pytest has loaded its plugins.
+"""
+
+import json
+from pathlib import Path
+from typing import Iterable
+
+import pytest
+from xdist.remote import Producer
+from xdist.scheduler import LoadScheduling, LoadScopeScheduling
+from xdist.workermanage import WorkerController
+
+from .consts import XDIST_MIN_QUEUED_DURATION
+
+
+class LongestFirstScheduling(LoadScheduling):
+    """
+    Load scheduling sending the longest tests first.
+
+    Instead of splitting the collection into chunks up front, tests are handed out one by one (or in small batches
+    of short tests) to the worker which becomes free first. Together with longest-first order, workers finish
+    at about the same time and the run doesn't end with a single worker going through a cluster of slow tests.
+    Prioritized tests (e.g. those failed in the previous run) are sent before all others.
+    """
+
+    def __init__(
+        self,
+        config: pytest.Config,
+        log: Producer | None = None,
+        durations: dict[str, float] | None = None,
+        prioritized: Iterable[str] = (),
+    ) -> None:
+        """
+        Init.
+
+        :param config: Pytest config.
+        :param log: xdist log producer.
+        :param durations: Expected durations of tests by node ids.
+        :param prioritized: Node ids of tests to be sent first.
+        """
+        super().__init__(config, log)
+        self._durations = durations or {}
+        self._prioritized = set(prioritized)
+        # tests without history are assumed to take an average time
+        self._default_duration = sum(self._durations.values()) / len(self._durations) if self._durations else 0.0
+
+    def expected_duration(self, nodeid: str) -> float:
+        """
+        Get expected duration of the test.
+
+        :param nodeid: Node id of the test.
+        :return: Duration in seconds.
+        """
+        return self._durations.get(nodeid, self._default_duration)
+
+    def schedule(self) -> None:
+        """Order collection longest-first and send initial tests to all workers."""
+        assert self.collection_is_completed
+
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        # sort is stable, tests with equal duration keep collection order, which is optimal for fixtures setup
+        self.pending[:] = sorted(
+            range(len(self.collection)),
+            key=lambda index: (
+                self.collection[index] not in self._prioritized,
+                -self.expected_duration(self.collection[index]),
+            ),
+        )
+        if not self.collection:
+            return
+
+        # one test per worker first, so the longest tests are spread across all workers
+        for node in self.nodes:
+            self._send_tests(node, 1)
+        for node in self.nodes:
+            self.check_schedule(node)
+        if not self.pending:
+            # worker runs its last test only after it knows no more tests will come
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node: WorkerController, duration: float = 0) -> None:
+        """
+        Keep just enough tests queued on the worker.
+
+        Worker needs at least 2 pending tests to run the first of them, short tests are queued until
+        they are expected to take XDIST_MIN_QUEUED_DURATION, so the communication doesn't dominate.
+
+        :param node: Worker.
+        :param duration: Duration of the last test completed by the worker.
+        """
+        if node.shutting_down:
+            return
+
+        if not self.pending:
+            node.shutdown()
+            return
+
+        # the first pending test is the one being run, the rest is queued
+        queued = [self.expected_duration(self.collection[index]) for index in self.node2pending[node]]
+        num_send = 0
+        for index in self.pending:
+            if len(queued) >= 2 and sum(queued[1:]) >= XDIST_MIN_QUEUED_DURATION:
+                break
+            queued.append(self.expected_duration(self.collection[index]))
+            num_send += 1
+        if num_send:
+            self._send_tests(node, num_send)
+        self.log("num items waiting for node:", len(self.pending))
+
+
+class ResourceScheduling(LoadScopeScheduling):
+    """
+    Scheduling keeping tests which hold the same exclusive resource on a single worker.
+
+    Groups of conflicting tests are computed by a worker during collection (see resources module) and each group
+    is a single work unit, so its tests are run one after another. Work units are sent longest-first.
+    Without groups all tests are treated as conflicting and run on a single worker.
+    """
+
+    def __init__(
+        self,
+        config: pytest.Config,
+        log: Producer | None = None,
+        durations: dict[str, float] | None = None,
+        prioritized: Iterable[str] = (),
+        groups_path: Path | None = None,
+    ) -> None:
+        """
+        Init.
+
+        :param config: Pytest config.
+        :param log: xdist log producer.
+        :param durations: Expected durations of tests by node ids.
+        :param prioritized: Node ids of tests to be sent first.
+        :param groups_path: JSON file with groups of conflicting tests by node ids, written during collection.
+        """
+        super().__init__(config, log)
+        self._durations = durations or {}
+        self._prioritized = set(prioritized)
+        self._default_duration = sum(self._durations.values()) / len(self._durations) if self._durations else 0.0
+        self._groups_path = groups_path
+        self._groups: dict[str, str] | None = None
+
+    def schedule(self) -> None:
+        """Read groups of conflicting tests and send initial work units to all workers."""
+        if self._groups is None:
+            try:
+                self._groups = json.loads(self._groups_path.read_text()) if self._groups_path else {}
+            except (OSError, ValueError):
+                self.log("**Groups of conflicting tests not found, running all tests on a single worker**")
+                self._groups = {}
+                self._groups_path = None
+        super().schedule()
+
+    def _split_scope(self, nodeid: str) -> str:
+        """
+        Get work unit of the test.
+
+        :param nodeid: Node id of the test.
+        :return: Group of conflicting tests, the test itself if it doesn't conflict with any other test.
+        """
+        if self._groups_path is None:
+            return ""
+        return self._groups.get(nodeid, nodeid)
+
+    def _assign_work_unit(self, node: WorkerController) -> None:
+        """
+        Assign the longest work unit to the worker, units with prioritized tests first.
+
+        :param node: Worker.
+        """
+        scope = max(
+            self.workqueue,
+            key=lambda scope: (
+                any(nodeid in self._prioritized for nodeid in self.workqueue[scope]),
+                sum(self._durations.get(nodeid, self._default_duration) for nodeid in self.workqueue[scope]),
+            ),
+        )
+        self.workqueue.move_to_end(scope, last=False)
+        super()._assign_work_unit(node)
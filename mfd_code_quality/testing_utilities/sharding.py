@@ -0,0 +1,139 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""
+Deterministic split of unit tests into shards run on separate machines.
+
+Test modules are split as a whole before pytest is started, so each shard collects only its own modules.
+"""
+
+import hashlib
+import heapq
+import json
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable
+
+from .collection import CollectionCache
+from .workers import count_tests
+
+
+def assign_shards(test_files: Iterable[str], count: int, durations: dict[str, float] | None = None) -> dict[str, int]:
+    """
+    Assign test modules to shards.
+
+    With duration history modules are assigned longest-first, each to the shard with the lowest expected duration.
+    Without history modules are split by hash of their path. Both splits depend only on paths and durations,
+    so every shard computes the same assignment.
+
+    :param test_files: Paths of test modules relative to root directory.
+    :param count: Number of shards.
+    :param durations: Expected durations of test modules by their paths.
+    :return: 0-based shard indexes by paths of test modules.
+    """
+    if not durations:
+        return {path: int.from_bytes(hashlib.sha256(path.encode()).digest()[:8], "big") % count for path in test_files}
+
+    loads = [(0.0, index) for index in range(count)]  # heap of expected durations of shards
+    assignment = {}
+    for path in sorted(set(test_files), key=lambda path: (-durations.get(path, 0.0), path)):
+        load, index = heapq.heappop(loads)
+        assignment[path] = index
+        heapq.heappush(loads, (load + durations.get(path, 0.0), index))
+    return assignment
+
+
+def get_file_durations(root_dir: Path, collection: CollectionCache, durations: dict[str, float]) -> dict[str, float]:
+    """
+    Get expected durations of test modules.
+
+    Tests without history are assumed to take an average time. Tests of modules collected in previous runs
+    are known exactly, for other modules number of tests without history is estimated.
+
+    :param root_dir: Root directory of the project.
+    :param collection: Collected tests.
+    :param durations: Expected durations of tests by node ids.
+    :return: Expected durations by paths of test modules, empty without any history.
+    """
+    if not durations:
+        return {}
+    default_duration = sum(durations.values()) / len(durations)
+    history = defaultdict(list)
+    for nodeid, duration in durations.items():
+        history[nodeid.split("::", 1)[0]].append(duration)
+
+    file_durations = {}
+    for path in collection.test_files:
+        if path in collection.tests:
+            file_durations[path] = sum(durations.get(nodeid, default_duration) for nodeid in collection.tests[path])
+        else:
+            num_new = max(count_tests(root_dir / path) - len(history[path]), 0)
+            file_durations[path] = sum(history[path]) + num_new * default_duration
+    return file_durations
+
+
+def select_shard(
+    root_dir: Path,
+    collection: CollectionCache,
+    shard: tuple[int, int],
+    durations: dict[str, float],
+    manifest_path: Path,
+) -> list[str]:
+    """
+    Select test modules of the shard and write its manifest.
+
+    :param root_dir: Root directory of the project.
+    :param collection: Collected tests.
+    :param shard: 1-based index of the shard and number of shards.
+    :param durations: Expected durations of tests by node ids, empty to split test modules by hash.
+    :param manifest_path: Path to write manifest of the shard to.
+    :return: Paths of test modules of the shard relative to root directory.
+    """
+    index, count = shard
+    assignment = assign_shards(collection.test_files, count, get_file_durations(root_dir, collection, durations))
+    selected = sorted(path for path, shard_index in assignment.items() if shard_index == index - 1)
+    write_manifest(
+        manifest_path, index, count, collection, assignment, collection.count_tests(root_dir, selected), root_dir
+    )
+    return selected
+
+
+def write_manifest(
+    path: Path,
+    index: int,
+    count: int,
+    collection: CollectionCache,
+    assignment: dict[str, int],
+    num_selected: int,
+    root_dir: Path,
+) -> None:
+    """
+    Write summary of the shard, which lets combining step verify that each test module was run by exactly one shard.
+
+    :param path: Path to the JSON file.
+    :param index: 1-based index of the shard.
+    :param count: Number of shards.
+    :param collection: Collected tests, hashes of test files identify the revision of tests.
+    :param assignment: 0-based shard indexes by paths of all test modules.
+    :param num_selected: Number of tests run by the shard.
+    :param root_dir: Root directory of the project on the machine running the shard.
+    """
+    files = {**collection.helpers, **collection.test_files}
+    content = {
+        "index": index,
+        "count": count,
+        "tests": num_selected,
+        "collection": _hash_lines(f"{file_path} {file_hash}" for file_path, file_hash in sorted(files.items())),
+        "assignment": _hash_lines(f"{file_path} {shard}" for file_path, shard in sorted(assignment.items())),
+        "root_dir": str(root_dir),
+    }
+    path.write_text(json.dumps(content, indent=4))
+
+
+def _hash_lines(lines: Iterable[str]) -> str:
+    """
+    Hash lines of text.
+
+    :param lines: Lines.
+    :return: SHA-256 hex digest.
+    """
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()
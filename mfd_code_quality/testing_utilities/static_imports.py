@@ -0,0 +1,271 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Static, AST-based import checks which don't execute any code of checked modules."""
+
+import ast
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from importlib.machinery import EXTENSION_SUFFIXES
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Iterable, Iterator
+
+
+@dataclass(frozen=True)
+class UnresolvedImport:
+    """Import which can't be resolved statically."""
+
+    module_name: str
+    lineno: int
+    import_name: str
+    reason: str
+
+    def __str__(self) -> str:
+        return f"{self.module_name}:{self.lineno}: cannot import '{self.import_name}' - {self.reason}"
+
+
+@dataclass(frozen=True)
+class ImportStatement:
+    """Absolute name of imported module together with names imported from it."""
+
+    lineno: int
+    module: str
+    names: tuple[str, ...] = ()
+
+
+class StaticImportChecker:
+    """
+    Resolve imports of project modules against project's package index and installed distributions.
+
+    Only unconditional imports executed at import time are checked, i.e. imports placed on module level
+    or in class bodies, but not in functions or under `if`/`try` statements, which are often
+    used for platform/version specific or optional imports.
+    Imports which can't be verified without executing code (e.g. submodules of third-party packages) are treated
+    as resolvable, so the result is either a list of definitely broken imports or inconclusive.
+    """
+
+    def __init__(self, root_dir: Path, packages: Iterable[str]) -> None:
+        """
+        Init.
+
+        :param root_dir: Root directory of the project.
+        :param packages: All packages of the project (including subpackages), e.g. result of `find_packages`.
+        """
+        self._root_dir = root_dir
+        self.module_paths: dict[str, Path] = {}
+        for package in packages:
+            package_dir = root_dir.joinpath(*package.split("."))
+            self.module_paths[package] = package_dir / "__init__.py"
+            for py_file in package_dir.glob("*.py"):
+                if py_file.name != "__init__.py":
+                    self.module_paths[f"{package}.{py_file.stem}"] = py_file
+        # modules placed directly in root directory are importable too as root directory is added to sys.path
+        for py_file in root_dir.glob("*.py"):
+            self.module_paths.setdefault(py_file.stem, py_file)
+        self._top_level_names = {name.split(".", 1)[0] for name in self.module_paths}
+
+    def check(self, module_name: str, path: Path | None = None) -> list[UnresolvedImport]:
+        """
+        Check if all imports executed at import time of the module can be resolved.
+
+        :param module_name: Absolute name of the module.
+        :param path: Path to the module's source, by default it's taken from project's package index.
+        :return: List of imports which can't be resolved, empty if module is fine or result is inconclusive.
+        """
+        path = path or self.module_paths[module_name]
+        try:
+            tree = ast.parse(path.read_bytes(), filename=str(path))
+        except SyntaxError as e:
+            return [UnresolvedImport(module_name, e.lineno or 0, "", f"syntax error: {e.msg}")]
+        except OSError:
+            return []  # inconclusive, let the import itself report the problem
+
+        unresolved = []
+        is_package = path.name == "__init__.py"
+        for statement in iter_import_statements(tree, module_name, is_package, unconditional_only=True):
+            unresolved.extend(self._check_statement(module_name, statement))
+        return unresolved
+
+    def _check_statement(self, module_name: str, statement: ImportStatement) -> Iterator[UnresolvedImport]:
+        """
+        Check single import statement.
+
+        :param module_name: Name of the module containing the statement.
+        :param statement: Import statement.
+        :return: Iterator over unresolved imports.
+        """
+        top_level_name = statement.module.split(".", 1)[0]
+        if top_level_name not in self._top_level_names:
+            if not _is_importable_top_level(top_level_name):
+                yield UnresolvedImport(
+                    module_name, statement.lineno, statement.module, f"no module named '{top_level_name}'"
+                )
+            return  # submodules of third-party packages can't be checked without executing them
+
+        if not self._is_project_module(statement.module):
+            yield UnresolvedImport(module_name, statement.lineno, statement.module, "module not found in the project")
+            return
+
+        for name in statement.names:
+            if self._is_project_module(f"{statement.module}.{name}"):
+                continue
+            if statement.module not in self.module_paths:
+                continue  # namespace package, names can't be determined statically
+            defined_names = _get_defined_names(self.module_paths[statement.module])
+            if defined_names is not None and name not in defined_names:
+                yield UnresolvedImport(
+                    module_name, statement.lineno, f"{statement.module}.{name}", f"'{name}' is not defined"
+                )
+
+    def _is_project_module(self, name: str) -> bool:
+        """
+        Check if module exists in the project.
+
+        Apart from package index, directories (namespace packages) and extension modules are taken into account.
+
+        :param name: Absolute module name.
+        :return: True if module can be found in the project.
+        """
+        if name in self.module_paths:
+            return True
+        module_path = self._root_dir.joinpath(*name.split("."))
+        return module_path.is_dir() or any(
+            module_path.with_name(module_path.name + suffix).exists() for suffix in EXTENSION_SUFFIXES
+        )
+
+
+def iter_import_statements(
+    tree: ast.Module, module_name: str, is_package: bool, unconditional_only: bool = False
+) -> Iterator[ImportStatement]:
+    """
+    Iterate over import statements of the module with relative imports resolved to absolute names.
+
+    :param tree: Parsed module.
+    :param module_name: Absolute name of the module.
+    :param is_package: True if module is `__init__.py` of a package.
+    :param unconditional_only: Yield only imports which are always executed at import time.
+    :return: Iterator over import statements.
+    """
+    nodes = _iter_unconditional_nodes(tree.body) if unconditional_only else ast.walk(tree)
+    for node in nodes:
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield ImportStatement(node.lineno, alias.name)
+        elif isinstance(node, ast.ImportFrom):
+            module = _resolve_relative_name(node, module_name, is_package)
+            if module is None:
+                continue
+            names = tuple(alias.name for alias in node.names if alias.name != "*")
+            yield ImportStatement(node.lineno, module, names)
+
+
+def _iter_unconditional_nodes(body: list[ast.stmt]) -> Iterator[ast.stmt]:
+    """
+    Iterate over statements which are always executed at import time.
+
+    :param body: List of statements.
+    :return: Iterator over statements, including those nested in class bodies and `with` blocks which don't suppress
+        exceptions (`with contextlib.suppress(ImportError):` is as conditional as `try`).
+    """
+    for node in body:
+        yield node
+        if isinstance(node, ast.ClassDef) or (isinstance(node, ast.With) and not _suppresses_exceptions(node)):
+            yield from _iter_unconditional_nodes(node.body)
+
+
+def _suppresses_exceptions(node: ast.With) -> bool:
+    """
+    Check if `with` statement suppresses exceptions by `suppress(...)` context manager.
+
+    :param node: With node.
+    :return: True if any of its context managers is a call of `suppress` or `contextlib.suppress`.
+    """
+    for item in node.items:
+        func = item.context_expr.func if isinstance(item.context_expr, ast.Call) else None
+        if (isinstance(func, ast.Name) and func.id == "suppress") or (
+            isinstance(func, ast.Attribute) and func.attr == "suppress"
+        ):
+            return True
+    return False
+
+
+def _resolve_relative_name(node: ast.ImportFrom, module_name: str, is_package: bool) -> str | None:
+    """
+    Resolve module name of `from ... import ...` statement to the absolute name.
+
+    :param node: ImportFrom node.
+    :param module_name: Absolute name of the module containing the statement.
+    :param is_package: True if module is `__init__.py` of a package.
+    :return: Absolute module name or None if relative import goes beyond top-level package.
+    """
+    if not node.level:
+        return node.module
+
+    parts = module_name.split(".")
+    if not is_package:
+        parts = parts[:-1]
+    if node.level - 1 >= len(parts):
+        return None
+    base = parts[: len(parts) - (node.level - 1)]
+    return ".".join([*base, node.module] if node.module else base)
+
+
+@lru_cache(maxsize=None)
+def _is_importable_top_level(name: str) -> bool:
+    """
+    Check if top-level module is available in the interpreter.
+
+    Looking for a spec of top-level module doesn't execute any code of that module.
+
+    :param name: Top-level module name.
+    :return: True if module is built-in, part of standard library or installed.
+    """
+    if name in sys.builtin_module_names or name in sys.stdlib_module_names:
+        return True
+    try:
+        return find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def clear_resolution_cache() -> None:
+    """
+    Forget which top-level modules are installed and which names modules define.
+
+    Required e.g. after installing new packages or when sources could change since the last check (see api).
+    """
+    _is_importable_top_level.cache_clear()
+    _get_defined_names.cache_clear()
+
+
+@lru_cache(maxsize=None)
+def _get_defined_names(path: Path) -> frozenset[str] | None:
+    """
+    Get names defined on module level of the project module.
+
+    :param path: Path to the module's source.
+    :return: Set of defined names or None if names can't be determined statically
+             (star imports, module level `__getattr__`, syntax errors, ...).
+    """
+    try:
+        tree = ast.parse(path.read_bytes(), filename=str(path))
+    except (OSError, SyntaxError):
+        return None
+
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if node.name == "__getattr__":
+                return None
+            names.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                if alias.name == "*":
+                    return None
+                names.add(alias.asname or alias.name.split(".", 1)[0])
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            names.add(node.id)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in ("globals", "setattr"):
+            return None
+    return frozenset(names)
@@ -2,15 +2,20 @@
 # SPDX-License-Identifier: MIT
 """System tests utilities."""
 
-import contextlib
 import logging
-import shutil
 import sys
 
 import pytest
 
-from .consts import PYTEST_OK_STATUSES
-from ..utils import get_root_dir, set_up_logging, set_cwd
+from .collection import get_collection_args
+from .consts import PYTEST_OK_STATUSES, RESOURCE_GROUPS_FILE, TEST_DURATIONS_FILE
+from .durations import DurationPlugin, DurationStore
+from .guards import get_guard_args
+from .pytest_cache import get_pytest_cache_args, get_pytest_cache_dir, read_failed_tests
+from .resources import get_resources_args, uses_resources
+from .workers import get_xdist_worker_count, reserve_xdist_workers
+from ..log_queue import flush_logging
+from ..utils import get_cache_dir, get_parsed_args, get_root_dir, get_run_dir, set_up_logging, set_cwd
 
 logger = logging.getLogger("mfd-code-quality.system_tests")
 
@@ -19,18 +24,51 @@ def _run_system_tests() -> bool:
     """
     Run system tests.
 
+    Tests declaring resources they use (`mfd_resources` marker) are run in parallel by pytest-xdist workers, tests
+    holding the same resource exclusively are never run at the same time. The rest of tests is run serially.
+
     :return: True if all tests passed, False otherwise.
     """
     set_up_logging()
     set_cwd()
 
-    with contextlib.suppress(FileNotFoundError):
-        shutil.rmtree(get_root_dir() / ".pytest_cache")
+    # pytest cache is kept between runs, so tests which failed last time are run first
+    pytest_cache_dir = get_pytest_cache_dir("system")
+    system_tests_path = get_root_dir() / "tests" / "system"
+    params = [
+        *get_pytest_cache_args(pytest_cache_dir),
+        *get_guard_args("system"),
+        *get_collection_args(),
+    ]
+
+    # system tests are slow, number of workers is not limited by number of tests
+    workers = get_xdist_worker_count() if uses_resources(system_tests_path) else 0
+    if workers:
+        logger.info(f"Running tests declaring resources on {workers} workers, then the rest of tests serially.")
+        groups_path = get_run_dir("system") / RESOURCE_GROUPS_FILE
+        runs = [
+            (workers, get_resources_args(groups_path, declaring=True)),
+            (0, get_resources_args(declaring=False)),
+        ]
+    else:
+        runs = [(0, get_resources_args())]
 
-    params = [str(get_root_dir() / "tests" / "system")]
-    testing_run_outcome = pytest.main(args=params)
+    prioritized = read_failed_tests(pytest_cache_dir)
+    outcomes = []
+    with DurationStore(get_cache_dir() / TEST_DURATIONS_FILE, "system") as duration_store:
+        for run_workers, run_params in runs:
+            plugin = DurationPlugin(duration_store, prioritized=prioritized)
+            with reserve_xdist_workers(run_workers) as xdist_workers:
+                flush_logging()  # pytest writes to the same stdout as the thread writing queued records
+                outcomes.append(
+                    pytest.main(
+                        args=[f"-n {xdist_workers}", *run_params, *params, str(system_tests_path)], plugins=[plugin]
+                    )
+                )
+            if get_parsed_args().fail_fast and outcomes[-1] == pytest.ExitCode.TESTS_FAILED:
+                break
 
-    return_val = testing_run_outcome in PYTEST_OK_STATUSES
+    return_val = all(outcome in PYTEST_OK_STATUSES for outcome in outcomes)
     if return_val:
         logger.info("System tests check PASSED.")
 
@@ -3,22 +3,58 @@
 """Unit tests utilities."""
 
 import logging
-import shutil
 import sys
 
 import pytest
-from coverage import Coverage
+from coverage import Coverage, CoverageData
 from coverage.exceptions import NoDataError
 
 from mfd_code_quality.code_standard.configure import delete_config_files, create_config_files
-from mfd_code_quality.coverage.consts import COVERAGE_XML_FILE, COVERAGE_JSON_FILE
+from mfd_code_quality.coverage.consts import (
+    COVERAGE_DATA_FILE,
+    COVERAGE_REPORT_FILES,
+    COVERAGE_SHARD_DATA_FILE,
+    COVERAGE_SHARD_MANIFEST_FILE,
+)
 from mfd_code_quality.coverage.utils import (
+    coverage_core,
+    coverage_data_file,
     coverage_section,
     log_module_coverage,
     is_diff_coverage_threshold_reached,
+    write_coverage_reports,
+)
+from mfd_code_quality.log_queue import flush_logging
+from mfd_code_quality.testing_utilities.bytecode import warm_up_bytecode
+from mfd_code_quality.testing_utilities.collection import CollectionCache, CollectionPlugin, get_collection_args
+from mfd_code_quality.testing_utilities.consts import (
+    BYTECODE_CACHE_FILE,
+    COLLECTION_CACHE_FILE,
+    PYTEST_OK_STATUSES,
+    TEST_DURATIONS_FILE,
+    TEST_IMPACT_STATUSES,
+)
+from mfd_code_quality.testing_utilities.durations import DurationPlugin, DurationStore
+from mfd_code_quality.testing_utilities.guards import get_guard_args
+from mfd_code_quality.testing_utilities.impact_analysis import select_affected_tests, update_impact_index
+from mfd_code_quality.testing_utilities.pytest_cache import (
+    get_pytest_cache_args,
+    get_pytest_cache_dir,
+    read_failed_tests,
+)
+from mfd_code_quality.testing_utilities.sharding import select_shard
+from mfd_code_quality.testing_utilities.workers import get_xdist_worker_count, reserve_xdist_workers
+from mfd_code_quality.utils import (
+    get_cache_dir,
+    get_environment_fingerprint,
+    get_package_names,
+    get_parsed_args,
+    get_root_dir,
+    get_run_dir,
+    publish_artifacts,
+    set_cwd,
+    set_up_logging,
 )
-from mfd_code_quality.testing_utilities.consts import PYTEST_OK_STATUSES
-from mfd_code_quality.utils import get_root_dir, set_cwd, set_up_logging, get_package_name
 
 logger = logging.getLogger("mfd-code-quality.unit_tests")
 
@@ -36,39 +72,140 @@ def _run_unit_tests(compare_coverage: bool = False, with_configs: bool = True) -
     if with_configs:
         create_config_files()
     root_dir = get_root_dir()
+    # artifacts are written to directory of the run and published to the root directory once they are complete
+    run_dir = get_run_dir("unit")
 
-    (root_dir / ".coverage").unlink(missing_ok=True)  # sqlite db created by coverage
-    (root_dir / COVERAGE_XML_FILE).unlink(missing_ok=True)
-    (root_dir / COVERAGE_JSON_FILE).unlink(missing_ok=True)
-    shutil.rmtree(root_dir / ".pytest_cache", ignore_errors=True)
+    # pytest cache is kept between runs, so tests which failed last time are run first
+    pytest_cache_dir = get_pytest_cache_dir("unit")
+    unit_tests_path = root_dir / "tests" / "unit"
+    collection_args = get_collection_args()
 
     # we don't need to check cov of template modules. Template MFD modules - not open-sourced yet
     if (root_dir / "{{cookiecutter.project_slug}}").exists():
-        params = [str(root_dir / "tests" / "unit")]
+        params = [*get_pytest_cache_args(pytest_cache_dir), *collection_args, str(unit_tests_path)]
+        flush_logging()
         return pytest.main(args=params) in PYTEST_OK_STATUSES
 
-    package_name = get_package_name()
-    unit_tests_path = str(root_dir / "tests" / "unit")
-    params = ["-n 5", f"--cov={package_name}", unit_tests_path]
-
-    cov = Coverage(source_pkgs=[package_name])
-    with cov.collect():
-        testing_run_outcome = pytest.main(args=params)
+    package_names = get_package_names()
+    if get_parsed_args().warm_up_bytecode:
+        warm_up_bytecode(root_dir, package_names, get_cache_dir() / BYTECODE_CACHE_FILE, get_parsed_args().no_cache)
+    # tests of unchanged test modules are known from previous runs, the cache is refreshed by every run
+    collection_cache_path = get_cache_dir() / COLLECTION_CACHE_FILE.format(suite="unit")
+    collection = CollectionCache.from_tree(
+        root_dir,
+        unit_tests_path,
+        get_environment_fingerprint(),
+        previous=None if get_parsed_args().no_cache else CollectionCache.load(collection_cache_path),
+    )
+    shard = get_parsed_args().shard
+    data_file = run_dir / COVERAGE_DATA_FILE
+    artifacts = [COVERAGE_DATA_FILE]
+    if shard is not None:
+        # each shard runs all its tests, diff coverage is checked by mfd-coverage-combine once all shards are done
+        data_file = run_dir / COVERAGE_SHARD_DATA_FILE.format(index=shard[0], count=shard[1])
+        manifest_path = run_dir / COVERAGE_SHARD_MANIFEST_FILE.format(index=shard[0], count=shard[1])
+        artifacts = [data_file.name, manifest_path.name]
+        durations = {}
+        if not get_parsed_args().no_cache:
+            with DurationStore(get_cache_dir() / TEST_DURATIONS_FILE, "unit") as duration_store:
+                durations = duration_store.get_expected_durations()
+        shard_files = select_shard(root_dir, collection, shard, durations, manifest_path)
+        logger.info(f"Running shard {shard[0]} of {shard[1]} of unit tests ({len(shard_files)} test module(s)).")
+
+    # test impact analysis is used only when coverage of changes is compared, plain unit tests run all tests
+    selection = None
+    if compare_coverage and shard is None:
+        selection = select_affected_tests(
+            root_dir, unit_tests_path, get_cache_dir(), get_environment_fingerprint(), get_parsed_args().no_cache
+        )
+
+    if shard is not None:
+        # shard collects only its own test modules
+        tests = [str(root_dir / path) for path in shard_files]
+        workers = get_xdist_worker_count(collection.count_tests(root_dir, shard_files))
+    elif selection is None or selection.full_run:
+        if selection is not None:
+            logger.info(f"[Test impact] Running all tests - {selection.reason}.")
+        tests = [str(unit_tests_path)]
+        workers = get_xdist_worker_count(collection.count_tests(root_dir))
+    else:
+        logger.info(f"[Test impact] Running only tests affected by changes - {selection.reason}.")
+        tests = selection.tests
+        workers = get_xdist_worker_count(selection.count_tests(root_dir))
+    params = [
+        *(f"--cov={package_name}" for package_name in package_names),
+        "--cov-report=",  # reports are written on request, from combined data
+        *(["--cov-context=test"] if selection else []),
+        *get_pytest_cache_args(pytest_cache_dir),
+        *get_guard_args("unit"),
+        *collection_args,
+        *tests,
+    ]
+
+    # pytest-cov is the only coverage collector, it measures xdist workers and combines their data into .coverage
+    # of the run directory
+    if tests:
+        with DurationStore(get_cache_dir() / TEST_DURATIONS_FILE, "unit") as duration_store:
+            plugin = DurationPlugin(duration_store, prioritized=read_failed_tests(pytest_cache_dir))
+            collection_plugin = CollectionPlugin()
+            with (
+                coverage_core(),
+                coverage_data_file(run_dir / COVERAGE_DATA_FILE),
+                reserve_xdist_workers(workers) as xdist_workers,
+            ):
+                flush_logging()  # pytest writes to the same stdout as the thread writing queued records
+                testing_run_outcome = pytest.main(
+                    args=[f"-n {xdist_workers}", *params], plugins=[plugin, collection_plugin]
+                )
+        collection.record(root_dir, tests, collection_plugin.nodeids, collection_plugin.failed)
+        collection.save(collection_cache_path)
+    elif shard is not None:
+        logger.info("No test modules are assigned to the shard.")
+        testing_run_outcome = pytest.ExitCode.OK
+    else:
+        logger.info("[Test impact] No tests are affected by changes, coverage of previous run is reused.")
+        testing_run_outcome = pytest.ExitCode.OK
+
+    # run stopped on the first failure doesn't have coverage of all selected tests
+    is_run_complete = not (get_parsed_args().fail_fast and testing_run_outcome == pytest.ExitCode.TESTS_FAILED)
+    if selection is not None and testing_run_outcome in TEST_IMPACT_STATUSES and is_run_complete:
+        data = CoverageData(basename=str(run_dir / COVERAGE_DATA_FILE))
+        data.read()
+        update_impact_index(
+            root_dir,
+            unit_tests_path,
+            get_cache_dir(),
+            get_environment_fingerprint(),
+            selection,
+            data,
+            read_failed_tests(pytest_cache_dir),
+        )
+    if shard is not None and (run_dir / COVERAGE_DATA_FILE).exists():
+        (run_dir / COVERAGE_DATA_FILE).replace(data_file)
+    cov = Coverage(data_file=str(data_file), source_pkgs=package_names)
 
     return_val = testing_run_outcome in PYTEST_OK_STATUSES
 
     with coverage_section():
+        report_formats = get_parsed_args().coverage_report or []
         try:
             cov.load()
-            cov.json_report(outfile=COVERAGE_JSON_FILE)
-            log_module_coverage()
+            if not cov.get_data().measured_files():
+                raise NoDataError("No data to report.")
+            write_coverage_reports(cov, report_formats, run_dir)
+            log_module_coverage(cov)
         except NoDataError:
             logger.warning("[Coverage] Coverage did not collect any data. Probably there are no unit tests.")
             return return_val
+        finally:
+            publish_artifacts(
+                run_dir, [*artifacts, *(COVERAGE_REPORT_FILES[report] for report in report_formats)], root_dir
+            )
 
-        if compare_coverage:
-            cov.xml_report(outfile=COVERAGE_XML_FILE)
-            if not is_diff_coverage_threshold_reached():
+        if compare_coverage and shard is not None:
+            logger.info("[Coverage] Diff coverage of all shards will be compared to threshold by mfd-coverage-combine.")
+        elif compare_coverage:
+            if not is_diff_coverage_threshold_reached(cov):
                 return False
         else:
             logger.info(
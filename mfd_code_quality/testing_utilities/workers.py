@@ -0,0 +1,83 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Parallel test execution utilities."""
+
+import contextlib
+import logging
+import re
+from pathlib import Path
+from typing import Iterator
+
+from .consts import XDIST_MIN_TESTS_PER_WORKER, XDIST_WORKER_MEMORY
+from ..jobserver import get_jobs, job_slots
+from ..utils import get_available_memory, get_parsed_args
+
+logger = logging.getLogger("mfd-code-quality.unit_tests")
+
+TEST_FUNCTION_PATTERN = re.compile(rb"^\s*(?:async\s+)?def\s+test", re.MULTILINE)
+
+
+def count_tests(tests_path: Path) -> int:
+    """
+    Estimate number of tests without collecting them by pytest.
+
+    Test functions are counted in test files, parametrization is not taken into account.
+
+    :param tests_path: Directory with tests or a single test file.
+    :return: Estimated number of tests.
+    """
+    if tests_path.is_file():
+        test_files = [tests_path]
+    else:
+        test_files = [test_file for pattern in ("test_*.py", "*_test.py") for test_file in tests_path.rglob(pattern)]
+    count = 0
+    for test_file in test_files:
+        try:
+            count += len(TEST_FUNCTION_PATTERN.findall(test_file.read_bytes()))
+        except OSError:
+            continue
+    return count
+
+
+def get_xdist_worker_count(test_count: int | None = None) -> int:
+    """
+    Get number of pytest-xdist workers.
+
+    Unless given explicitly with `--workers`, number of workers is limited by budget of parallel jobs (`--jobs`,
+    available CPUs respecting affinity and cgroup quota by default), free memory per worker and number of tests.
+
+    :param test_count: Number of tests to run, None if unknown.
+    :return: Number of workers, 0 if tests should be run without xdist.
+    """
+    requested_workers = get_parsed_args().workers
+    if requested_workers is not None:
+        return max(requested_workers, 0)
+
+    limits = {"jobs": get_jobs()}
+    available_memory = get_available_memory()
+    if available_memory is not None:
+        limits["memory"] = available_memory // XDIST_WORKER_MEMORY
+    if test_count is not None:
+        limits["tests"] = test_count // XDIST_MIN_TESTS_PER_WORKER
+
+    workers = min(limits.values())
+    logger.debug(f"Number of xdist workers limited by: {limits}")
+    # single worker is slower than running tests in the main process
+    return workers if workers > 1 else 0
+
+
+@contextlib.contextmanager
+def reserve_xdist_workers(workers: int) -> Iterator[int]:
+    """
+    Contextmanager reserving job slots of the jobserver for pytest-xdist workers.
+
+    When other processes use part of the budget of parallel jobs, fewer workers are started.
+
+    :param workers: Requested number of workers, 0 for tests run without xdist.
+    :return: Number of workers which got a job slot, 0 if tests should be run without xdist.
+    """
+    with job_slots(max(workers, 1)) as slots:
+        granted = slots if workers and slots > 1 else 0
+        if granted < workers:
+            logger.info(f"Number of xdist workers reduced from {workers} to {granted} by budget of parallel jobs.")
+        yield granted
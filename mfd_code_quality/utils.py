@@ -2,20 +2,39 @@
 # SPDX-License-Identifier: MIT
 """General utilities."""
 
+import hashlib
 import logging
+import math
 import os
+import shutil
 import sys
-from argparse import ArgumentParser, Namespace
+import time
+import uuid
+from argparse import ArgumentParser, ArgumentTypeError, Namespace
+from contextlib import contextmanager
+from contextvars import ContextVar
 from functools import lru_cache
+from importlib.metadata import distributions
 from pathlib import Path
-from subprocess import run
+from typing import Iterable, Iterator
 
 from setuptools import find_packages
 
+from mfd_code_quality.coverage.consts import COVERAGE_REPORT_FORMATS
 from mfd_code_quality.log_formatter import CustomLogFormatter
+from mfd_code_quality.log_queue import enqueue_handler
 
 logger = logging.getLogger("mfd-code-quality.utils")
 
+CACHE_DIR_NAME = ".mfd_code_quality"  # directory in tested project where data reused between runs is stored
+RUNS_DIR_NAME = "runs"  # directory in cache directory with artifacts of each run in its own subdirectory
+RUN_DIR_MAX_AGE = 24 * 60 * 60  # seconds after which artifacts of previous runs are removed
+RUN_ID_ENV_VAR = "MFD_RUN_ID"  # id of the current run, inherited by processes started by the run
+
+# options and run id of checks run by api, bound to the current thread or asyncio task instead of the command line
+_context_options: ContextVar[Namespace | None] = ContextVar("mfd_code_quality_options", default=None)
+_context_run_id: ContextVar[str | None] = ContextVar("mfd_code_quality_run_id", default=None)
+
 
 class CustomFilter(logging.Filter):
     """Custom filter to check if log message is coming from this module."""
@@ -41,9 +60,20 @@ def set_up_basic_config(log_level: int = logging.INFO) -> None:
     )
 
 
-@lru_cache()
 def set_up_logging() -> None:
-    """Set up logging to print only logs from this file."""
+    """
+    Set up logging to print only logs from this file.
+
+    Records are written to stdout by a thread of the listener of a queue, see log_queue.
+    Logging of checks run by api is left to the caller.
+    """
+    if _context_options.get() is None:
+        _set_up_logging()
+
+
+@lru_cache()
+def _set_up_logging() -> None:
+    """Set up logging of the process once."""
     set_up_basic_config(log_level=logging.DEBUG if get_parsed_args().verbose else logging.INFO)
     root_stream_handler = next(
         (handler for handler in logging.getLogger().handlers if isinstance(handler, logging.StreamHandler)), None
@@ -52,27 +82,424 @@ def set_up_logging() -> None:
         root_stream_handler.addFilter(CustomFilter())
         root_stream_handler.setStream(sys.stdout)
         root_stream_handler.setFormatter(CustomLogFormatter(root_stream_handler.formatter))
+        enqueue_handler(logging.getLogger(), root_stream_handler)
 
 
-@lru_cache()
 def get_parsed_args() -> Namespace:
+    """
+    Get options of the current run.
+
+    :return: Options given to api in the current context, parsed command line arguments otherwise.
+    """
+    options = _context_options.get()
+    return options if options is not None else _parse_command_line_args()
+
+
+@lru_cache()
+def _parse_command_line_args() -> Namespace:
     """Get parsed command line arguments."""
+    return create_argument_parser().parse_args()
+
+
+def create_argument_parser() -> ArgumentParser:
+    """Create parser of command line arguments shared by all commands."""
     parser = ArgumentParser()
     parser.add_argument(
         "-p", "--project-dir", help="Path to tested project, if not given current directory will be used.", type=str
     )
     parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging.")
-    return parser.parse_args()
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Ignore data cached by previous runs and run all checks from scratch."
+    )
+    parser.add_argument(
+        "--jobs",
+        help="Number of jobs run in parallel by all tools (pytest-xdist workers, ruff threads, ...) together. "
+        "By default it's the number of available CPUs.",
+        type=int,
+    )
+    parser.add_argument(
+        "--tool-timeout",
+        help="Kill external tool (ruff, flake8, pip, git) running longer than given number of seconds, 0 disables "
+        "the timeout. By default there is no limit.",
+        type=float,
+    )
+    parser.add_argument(
+        "--tool-output-lines",
+        help="Number of the latest lines of output of external tools kept in memory and shown in summary of a failure, "
+        "older lines are written to a log file in directory of the run. Default: 100.",
+        type=int,
+    )
+    parser.add_argument(
+        "--import-time-budget",
+        help="Import tests: maximum time in seconds of importing all modules of the project.",
+        type=float,
+    )
+    parser.add_argument(
+        "--module-import-time-budget",
+        help="Import tests: maximum cumulative time in seconds of importing a single module of the project.",
+        type=float,
+    )
+    parser.add_argument(
+        "--strict-import-side-effects",
+        action="store_true",
+        help="Import tests: fail modules doing I/O (subprocesses, network, sleeps, large files) at import time.",
+    )
+    parser.add_argument(
+        "--workers",
+        help="Unit and system tests: number of pytest-xdist workers, 0 disables xdist. By default it's adjusted to "
+        "available CPUs, memory and number of unit tests.",
+        type=int,
+    )
+    parser.add_argument(
+        "--fail-fast",
+        action="store_true",
+        help="Unit/system tests: stop on the first failure. Tests which failed in previous run are always run first.",
+    )
+    parser.add_argument(
+        "--test-timeout",
+        help="Unit/system tests: fail a test running longer than given number of seconds and dump stacks of its "
+        "threads, 0 disables the timeout. Default: 600 for unit tests, no limit for system tests.",
+        type=float,
+    )
+    parser.add_argument(
+        "--stage-timeout",
+        help="Unit/system tests: interrupt the whole test run after given number of seconds and dump stacks of all "
+        "test processes. By default there is no limit.",
+        type=float,
+    )
+    parser.add_argument(
+        "--max-worker-rss",
+        help="Unit/system tests: replace pytest-xdist worker whose memory (RSS) exceeds given number of MiB after "
+        "a test, 0 disables the check. Default: 2048.",
+        type=int,
+    )
+    parser.add_argument(
+        "--warm-up-bytecode",
+        help="Import/unit tests: compile Python files of the project to bytecode in parallel before tests are run, "
+        "files unchanged since they were compiled last time are skipped.",
+        action="store_true",
+    )
+    parser.add_argument(
+        "--coverage-report",
+        help="Unit tests: write coverage report in given format, can be repeated. By default no report is written.",
+        action="append",
+        choices=COVERAGE_REPORT_FORMATS,
+    )
+    parser.add_argument(
+        "--shard",
+        help="Unit tests: run only i-th of N parts of the suite (e.g. 1/4), coverage of all shards is checked "
+        "by mfd-coverage-combine.",
+        type=parse_shard,
+    )
+    parser.add_argument(
+        "--repositories",
+        help="Batch: paths of repositories checked by mfd-batch.",
+        nargs="+",
+        metavar="PATH",
+    )
+    parser.add_argument(
+        "--workspace",
+        help="Batch: directory with repositories checked by mfd-batch, each subdirectory with pyproject.toml or "
+        "setup.py is a repository. Can be repeated.",
+        action="append",
+    )
+    parser.add_argument(
+        "--batch-workers",
+        help="Batch: number of repositories checked in parallel. By default it's derived from number of jobs.",
+        type=int,
+    )
+    parser.add_argument(
+        "--repo-timeout",
+        help="Batch: stop checks of a repository running longer than given number of seconds. By default there is "
+        "no limit.",
+        type=float,
+    )
+    parser.add_argument(
+        "--batch-report",
+        help="Batch: write JSON report of results of all repositories to given path as well.",
+        type=str,
+    )
+    return parser
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """
+    Parse shard given in i/N format.
+
+    :param value: Shard, e.g. 1/4.
+    :return: 1-based index of the shard and number of shards.
+    :raises ArgumentTypeError: When value is not in i/N format or index is out of range.
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ArgumentTypeError(f"invalid shard '{value}', expected i/N format, e.g. 1/4")
+    if not 1 <= index <= count:
+        raise ArgumentTypeError(f"invalid shard '{value}', index must be between 1 and number of shards")
+    return index, count
 
 
-@lru_cache()
 def get_root_dir() -> Path:
-    """Get root dir from cmd argument or current working directory."""
+    """Get root dir from options given to api, cmd argument or current working directory."""
+    options = _context_options.get()
+    if options is not None:
+        return Path(options.project_dir)
+    return _get_command_line_root_dir()
+
+
+@lru_cache()
+def _get_command_line_root_dir() -> Path:
+    """Get root dir from cmd argument or current working directory, working directory is changed by set_cwd."""
     return Path(get_parsed_args().project_dir if get_parsed_args().project_dir else os.getcwd())
 
 
+def get_cache_dir() -> Path:
+    """Get directory for data reused between runs, create it if needed."""
+    cache_dir = get_root_dir() / CACHE_DIR_NAME
+    cache_dir.mkdir(exist_ok=True)
+    gitignore = cache_dir / ".gitignore"
+    if not gitignore.exists():
+        gitignore.write_text("*\n")
+    return cache_dir
+
+
+def get_run_id() -> str:
+    """
+    Get id of the current run.
+
+    Id is generated by the first call and exported to the environment, so processes started by the run
+    (e.g. pytest-xdist workers or checks run in parallel) share it.
+
+    :return: Run id, unique and sortable by start time.
+    """
+    run_id = _context_run_id.get()
+    if run_id is not None:
+        return run_id
+    if not os.environ.get(RUN_ID_ENV_VAR):
+        os.environ[RUN_ID_ENV_VAR] = create_run_id()
+    return os.environ[RUN_ID_ENV_VAR]
+
+
+def create_run_id() -> str:
+    """
+    Create id of a new run.
+
+    :return: Run id, unique and sortable by start time.
+    """
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+@contextmanager
+def use_options(options: Namespace, run_id: str) -> Iterator[None]:
+    """
+    Run checks with given options instead of command line arguments, in a run of their own.
+
+    Options are bound to the current thread or asyncio task, so one process can check many projects.
+
+    :param options: Options with the same attributes as parsed command line arguments.
+    :param run_id: Id of the run, see get_run_id.
+    """
+    options_token = _context_options.set(options)
+    run_id_token = _context_run_id.set(run_id)
+    try:
+        yield
+    finally:
+        _context_run_id.reset(run_id_token)
+        _context_options.reset(options_token)
+
+
+def get_run_dir(stage: str) -> Path:
+    """
+    Get directory for artifacts of a stage of the current run, create it if needed.
+
+    Runs in the same checkout and stages of one run write their artifacts (coverage data, reports, stack dumps, ...)
+    to separate directories, so they never overwrite each other's files. Requested artifacts are copied
+    to their expected locations by publish_artifacts.
+
+    :param stage: Name of the stage, e.g. unit or system.
+    :return: Path to the directory.
+    """
+    runs_dir = get_cache_dir() / RUNS_DIR_NAME
+    run_dir = runs_dir / get_run_id() / stage
+    if not run_dir.parent.exists():
+        _remove_old_runs(runs_dir)
+    run_dir.mkdir(parents=True, exist_ok=True)
+    return run_dir
+
+
+def _remove_old_runs(runs_dir: Path) -> None:
+    """
+    Remove artifacts of runs which were last modified more than RUN_DIR_MAX_AGE ago.
+
+    :param runs_dir: Directory with artifacts of all runs.
+    """
+    if not runs_dir.is_dir():
+        return
+    for run_dir in runs_dir.iterdir():
+        try:
+            if time.time() - run_dir.stat().st_mtime > RUN_DIR_MAX_AGE:
+                shutil.rmtree(run_dir, ignore_errors=True)
+        except OSError:
+            continue
+
+
+def publish_artifacts(run_dir: Path, names: Iterable[str], target_dir: Path) -> list[str]:
+    """
+    Copy artifacts of a run to their expected locations.
+
+    Files and directories are first copied next to their target and then renamed, so a file at expected location
+    is always complete, even if another run publishes the same artifact at the same time. Artifacts which were not
+    produced by the run are removed from the target directory, so no stale file of a previous run is left there.
+
+    :param run_dir: Directory with artifacts of the run.
+    :param names: Names of files or directories to publish.
+    :param target_dir: Directory to copy artifacts to.
+    :return: Names of published artifacts.
+    """
+    published = []
+    for name in names:
+        source, target = run_dir / name, target_dir / name
+        temporary = target_dir / f".{name}.{get_run_id()}.tmp"
+        if source.is_dir():
+            shutil.copytree(source, temporary, dirs_exist_ok=True)
+            shutil.rmtree(target, ignore_errors=True)
+        elif source.is_file():
+            shutil.copy2(source, temporary)
+        elif target.is_dir():
+            shutil.rmtree(target, ignore_errors=True)
+            continue
+        else:
+            target.unlink(missing_ok=True)
+            continue
+        os.replace(temporary, target)
+        published.append(name)
+    return published
+
+
+def write_file_atomically(path: Path, content: str) -> None:
+    """
+    Write text file, so readers never see it partially written.
+
+    :param path: Path to the file.
+    :param content: Content to write.
+    """
+    temporary = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temporary.write_text(content)
+    os.replace(temporary, path)
+
+
+def get_environment_fingerprint() -> str:
+    """
+    Get fingerprint of the Python environment.
+
+    Cached results are valid only as long as interpreter and installed distributions don't change.
+
+    :return: Hash of interpreter version and names with versions of all installed distributions.
+    """
+    installed = sorted(f"{dist.metadata['Name']}=={dist.version}" for dist in distributions())
+    return hashlib.sha256("\n".join([sys.executable, sys.version, *installed]).encode()).hexdigest()
+
+
+@lru_cache()
+def get_available_cpu_count() -> int:
+    """
+    Get number of CPUs available for the process.
+
+    CPU affinity and cgroup CPU quota (containers) are taken into account.
+
+    :return: Number of CPUs, at least 1.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cpu_count = len(os.sched_getaffinity(0))
+    else:
+        cpu_count = os.cpu_count() or 1
+
+    quota = _get_cgroup_cpu_quota()
+    if quota is not None:
+        cpu_count = min(cpu_count, quota)
+    return max(cpu_count, 1)
+
+
+def _get_cgroup_cpu_quota() -> int | None:
+    """
+    Get CPU quota of the cgroup (v2 or v1) the process belongs to.
+
+    :return: Number of CPUs the quota allows to fully use (rounded up) or None if there is no quota.
+    """
+    try:
+        quota, period = Path("/sys/fs/cgroup/cpu.max").read_text().split()
+    except (OSError, ValueError):
+        for cgroup_dir in ("/sys/fs/cgroup/cpu", "/sys/fs/cgroup/cpu,cpuacct"):
+            try:
+                quota = Path(cgroup_dir, "cpu.cfs_quota_us").read_text().strip()
+                period = Path(cgroup_dir, "cpu.cfs_period_us").read_text().strip()
+                break
+            except OSError:
+                continue
+        else:
+            return None
+
+    if quota in ("max", "-1"):
+        return None
+    return math.ceil(int(quota) / int(period))
+
+
+def get_available_memory() -> int | None:
+    """
+    Get memory available for the process.
+
+    Both system-wide available memory and cgroup (v2 or v1) memory limit are taken into account.
+
+    :return: Available memory in bytes or None if it can't be determined (non-Linux systems).
+    """
+    available = []
+    try:
+        meminfo = Path("/proc/meminfo").read_text()
+        available.append(next(int(line.split()[1]) * 1024 for line in meminfo.splitlines() if "MemAvailable" in line))
+    except (OSError, StopIteration, ValueError):
+        pass
+
+    for limit_file, usage_file in (
+        ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory.current"),
+        ("/sys/fs/cgroup/memory/memory.limit_in_bytes", "/sys/fs/cgroup/memory/memory.usage_in_bytes"),
+    ):
+        try:
+            limit = Path(limit_file).read_text().strip()
+            usage = int(Path(usage_file).read_text().strip())
+        except (OSError, ValueError):
+            continue
+        if limit != "max" and int(limit) < 2**60:  # cgroup v1 reports huge number when there is no limit
+            available.append(max(int(limit) - usage, 0))
+        break
+
+    return min(available) if available else None
+
+
+def get_process_rss() -> int | None:
+    """
+    Get resident set size of the current process.
+
+    :return: RSS in bytes or None if it can't be determined (non-Linux systems).
+    """
+    try:
+        return int(Path("/proc/self/statm").read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, IndexError, ValueError, AttributeError):
+        return None
+
+
+def is_run_by_api() -> bool:
+    """
+    Check whether checks are run through api, in process of its caller.
+
+    :return: True if options of checks were given by api, False if they come from command line.
+    """
+    return _context_options.get() is not None
+
+
 def set_cwd() -> None:
-    """Set current working directory and add it to the path."""
+    """Set current working directory and add it to the path, checks run by api leave both untouched."""
+    if _context_options.get() is not None:
+        return
     os.chdir(get_root_dir())
     sys.path.insert(0, str(get_root_dir()))
 
@@ -83,29 +510,39 @@ def _install_packages(path_to_req: str) -> None:
 
     :param path_to_req: Path to requirements file.
     """
-    output = run((sys.executable, "-m", "pip", "install", "-r", path_to_req), capture_output=True, text=True)
-    logger.debug(f"stdout: {output.stdout}")
-    logger.debug(f"stderr: {output.stderr}")
+    from mfd_code_quality.runner import describe_failure, run_tool
 
+    result = run_tool((sys.executable, "-m", "pip", "install", "-r", path_to_req), stream_logger=logger)
+    if result.returncode != 0:
+        logger.warning(describe_failure(result))
 
-def get_package_name(root_dir: str | Path | None = None) -> str:
+
+def get_package_names(root_dir: str | Path | None = None) -> list[str]:
     """
-    Get Python package name.
+    Get names of all top-level Python packages of the project.
 
-    :return: Package name, example "mfd_network_adapter", "pydantic", ...
+    :param root_dir: Root directory of the project, current one by default.
+    :return: Package names sorted alphabetically, example ["mfd_network_adapter"], ["mfd_host", "mfd_host_tools"], ...
     :raise Exception: When project folder not found
     """
-    # *.* will exclude all subpackages as we are looking for root package name
+    # *.* will exclude all subpackages as we are looking for root package names
     root_dir = root_dir or get_root_dir()
-    packages = find_packages(where=root_dir, exclude=["tests", "tests.*", "*.*"])
+    packages = sorted(find_packages(where=root_dir, exclude=["tests", "tests.*", "*.*"]))
     if not packages:
         raise Exception(f"No Python package was found in {root_dir}!")
-
     if len(packages) > 1:
-        logger.warning(
-            f"Multiple Python packages found in {root_dir}: {packages}.\n"
-            "Support for such repositories is not implemented yet. If needed don't hesitate to submit GH issue.\n"
-            f"Using first package: {packages[0]}."
-        )
+        logger.debug(f"Multiple Python packages found in {root_dir}: {packages}.")
+    return packages
+
+
+def get_package_name(root_dir: str | Path | None = None) -> str:
+    """
+    Get Python package name.
+
+    In multi-package repositories the first package (alphabetically) is returned, see get_package_names.
 
-    return packages[0]
+    :param root_dir: Root directory of the project, current one by default.
+    :return: Package name, example "mfd_network_adapter", "pydantic", ...
+    :raise Exception: When project folder not found
+    """
+    return get_package_names(root_dir)[0]
@@ -0,0 +1,199 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for api.py."""
+
+import dataclasses
+import json
+import logging
+import os
+import sys
+import textwrap
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+from mfd_code_quality.api import API_CHECKS, ALL_CHECKS, ApiCheck, CheckOptions, run_all_checks, run_check
+from mfd_code_quality.utils import (
+    RUN_ID_ENV_VAR,
+    create_argument_parser,
+    get_parsed_args,
+    get_root_dir,
+    get_run_id,
+    set_cwd,
+    use_options,
+)
+
+
+@pytest.fixture
+def check_function(mocker):
+    calls = []
+
+    def check(**kwargs: object) -> bool:
+        calls.append(
+            {
+                "kwargs": kwargs,
+                "options": get_parsed_args(),
+                "root_dir": get_root_dir(),
+                "run_id": get_run_id(),
+                "cwd": os.getcwd(),
+            }
+        )
+        return True
+
+    mocker.patch("mfd_code_quality.api.importlib").import_module.return_value = SimpleNamespace(check=check)
+    mocker.patch.dict(API_CHECKS, {"free-check": ApiCheck("module:check", {}, True, False)})
+    return calls
+
+
+def test_check_options_are_command_line_arguments(tmp_path):
+    dests = {action.dest for action in create_argument_parser()._actions}
+    assert {field.name for field in dataclasses.fields(CheckOptions)} <= dests
+
+    namespace = CheckOptions(project_dir=tmp_path, jobs=2, coverage_report=("xml",)).to_namespace()
+    assert namespace.project_dir == str(tmp_path.resolve())
+    assert namespace.jobs == 2
+    assert namespace.coverage_report == ["xml"]
+    assert namespace.verbose is False
+
+
+def test_run_check_uses_given_options_instead_of_command_line(check_function, tmp_path):
+    cwd = os.getcwd()
+    result = run_check("free-check", CheckOptions(project_dir=tmp_path, workers=3))
+    (call,) = check_function
+    assert result.passed and result.error is None
+    assert result.project_dir == tmp_path.resolve()
+    assert result.run_dir == tmp_path.resolve() / ".mfd_code_quality" / "runs" / result.run_id
+    assert call["options"].workers == 3
+    assert call["root_dir"] == tmp_path.resolve()
+    assert call["run_id"] == result.run_id
+    assert call["kwargs"] == {"with_configs": True}
+    assert call["cwd"] == cwd  # working directory is shared by threads, it's never changed
+
+
+def test_run_check_in_worker_leaves_process_state_untouched(mocker, tmp_path, caplog):
+    (tmp_path / "project_check.py").write_text(
+        textwrap.dedent(
+            """
+            import json
+            import logging
+            import os
+            import sys
+
+            from mfd_code_quality.utils import RUN_ID_ENV_VAR, get_parsed_args, get_root_dir, get_run_id
+
+
+            def check(**kwargs):
+                logging.getLogger("mfd-code-quality.project").info("checked %s", "project")
+                print("output of the check")
+                values = {
+                    "kwargs": kwargs,
+                    "workers": get_parsed_args().workers,
+                    "root_dir": str(get_root_dir()),
+                    "run_id": get_run_id(),
+                    "cwd": os.getcwd(),
+                    "sys_path": sys.path[0],
+                    "environ_run_id": os.environ.get(RUN_ID_ENV_VAR),
+                }
+                with open("values.json", "w") as file:
+                    json.dump(values, file)
+                return True
+            """
+        )
+    )
+    mocker.patch.dict(API_CHECKS, {"project-check": ApiCheck("project_check:check", {"key": 1}, True, True)})
+    mocker.patch.dict(os.environ, {RUN_ID_ENV_VAR: "previous"})
+    caplog.set_level(logging.INFO)
+    cwd, sys_path = os.getcwd(), list(sys.path)
+
+    result = run_check("project-check", CheckOptions(project_dir=tmp_path, workers=3), run_id="run")
+
+    assert result.passed and result.error is None
+    project_dir = str(tmp_path.resolve())
+    assert json.loads((tmp_path / "values.json").read_text()) == {
+        "kwargs": {"key": 1, "with_configs": True},
+        "workers": 3,
+        "root_dir": project_dir,
+        "run_id": "run",
+        "cwd": project_dir,
+        "sys_path": project_dir,
+        "environ_run_id": "run",
+    }
+    assert (os.getcwd(), sys.path, os.environ[RUN_ID_ENV_VAR]) == (cwd, sys_path, "previous")
+    assert "project_check" not in sys.modules
+    assert [(record.name, record.getMessage()) for record in caplog.records] == [
+        ("mfd-code-quality.project", "checked project")
+    ]
+
+
+def test_run_check_in_worker_reports_exception(mocker, tmp_path, caplog):
+    (tmp_path / "project_check.py").write_text("def check():\n    raise RuntimeError('broken')\n")
+    mocker.patch.dict(API_CHECKS, {"project-check": ApiCheck("project_check:check", {}, False, True)})
+    result = run_check("project-check", CheckOptions(project_dir=tmp_path))
+    assert not result.passed
+    assert result.error == "RuntimeError('broken')"
+    (record,) = caplog.records
+    assert record.name == "mfd-code-quality.api"
+    assert "RuntimeError: broken" in record.exc_text
+
+
+def test_run_check_reports_worker_exiting_without_result(mocker, tmp_path):
+    (tmp_path / "project_check.py").write_text("import os\n\ndef check():\n    os._exit(3)\n")
+    mocker.patch.dict(API_CHECKS, {"project-check": ApiCheck("project_check:check", {}, False, True)})
+    result = run_check("project-check", CheckOptions(project_dir=tmp_path))
+    assert not result.passed
+    assert result.error == "RuntimeError('Worker running project_check:check exited with code 3 without result')"
+
+
+def test_run_check_reports_exception(mocker, tmp_path):
+    mocker.patch("mfd_code_quality.api.importlib").import_module.return_value = SimpleNamespace(
+        _run_code_standard_tests=mocker.Mock(side_effect=RuntimeError("broken"))
+    )
+    result = run_check("mfd-code-standard", CheckOptions(project_dir=tmp_path))
+    assert not result.passed
+    assert result.error == "RuntimeError('broken')"
+
+
+def test_run_check_raises_for_unknown_check(tmp_path):
+    with pytest.raises(ValueError, match="Unknown check 'mfd-lint'"):
+        run_check("mfd-lint", CheckOptions(project_dir=tmp_path))
+
+
+def test_run_all_checks_share_run_and_config_files(mocker, tmp_path):
+    mocker.patch("mfd_code_quality.api._get_available_code_standard_module", return_value="ruff")
+    mock_create = mocker.patch("mfd_code_quality.api.create_config_files")
+    mock_delete = mocker.patch("mfd_code_quality.api.delete_config_files")
+    mock_run_check = mocker.patch("mfd_code_quality.api.run_check")
+    options = CheckOptions(project_dir=tmp_path)
+    run_all_checks(options)
+    mock_create.assert_called_once_with()
+    mock_delete.assert_called_once_with()
+    assert [call.args for call in mock_run_check.call_args_list] == [(check, options) for check in ALL_CHECKS]
+    assert len({call.kwargs["run_id"] for call in mock_run_check.call_args_list}) == 1
+    assert not any(call.kwargs["with_configs"] for call in mock_run_check.call_args_list)
+
+
+def test_options_are_bound_to_thread(tmp_path):
+    root_dirs = {}
+    barrier = threading.Barrier(2)
+
+    def check(name: str) -> None:
+        with use_options(CheckOptions(project_dir=tmp_path / name).to_namespace(), name):
+            barrier.wait(5)
+            root_dirs[name] = (get_root_dir().name, get_run_id())
+
+    threads = [threading.Thread(target=check, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert root_dirs == {"a": ("a", "a"), "b": ("b", "b")}
+
+
+def test_set_cwd_leaves_process_state_to_api(mocker, tmp_path):
+    mock_chdir = mocker.patch("mfd_code_quality.utils.os.chdir")
+    with use_options(CheckOptions(project_dir=tmp_path).to_namespace(), "run"):
+        set_cwd()
+    mock_chdir.assert_not_called()
+    assert str(Path(tmp_path)) not in sys.path
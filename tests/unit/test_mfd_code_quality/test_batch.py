@@ -0,0 +1,157 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for batch.py."""
+
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from mfd_code_quality.api import CheckOptions, CheckResult
+from mfd_code_quality.batch import (
+    BATCH_REPORT_FILE,
+    CRASHED,
+    FAILED,
+    PASSED,
+    TIMED_OUT,
+    TOKENS_MESSAGE,
+    TOOL_MESSAGE,
+    RepositoryResult,
+    _Worker,
+    _run_batch,
+    _work,
+    check_repositories,
+    find_repositories,
+    format_summary,
+)
+from mfd_code_quality.jobserver import JobServer
+from mfd_code_quality.utils import create_argument_parser
+
+
+def create_result(path: Path, status: str, *failed_checks: str) -> RepositoryResult:
+    checks = [CheckResult(check, path, check not in failed_checks, 1.0, "run") for check in ("a-check", "b-check")]
+    return RepositoryResult(path, status, 2.0, path / "log", checks)
+
+
+def test_find_repositories(tmp_path):
+    workspace = tmp_path / "workspace"
+    for name, marker in [("b", "pyproject.toml"), ("a", "setup.py"), ("docs", "README.md")]:
+        (workspace / name).mkdir(parents=True)
+        (workspace / name / marker).touch()
+    (workspace / "file.py").touch()
+    other = tmp_path / "other"
+    other.mkdir()
+
+    assert find_repositories([other, workspace / "b"], [workspace]) == [
+        other,
+        workspace / "b",
+        workspace / "a",
+    ]
+
+
+def test_format_summary_lists_repositories_which_did_not_pass(tmp_path):
+    summary = format_summary(
+        [
+            create_result(tmp_path / "ok", PASSED),
+            create_result(tmp_path / "broken", FAILED, "b-check"),
+            create_result(tmp_path / "slow", TIMED_OUT),
+        ],
+        10,
+    )
+    lines = summary.splitlines()
+    assert lines[0] == "[Batch] Checked 3 repositories in 10.0 s: 1 passed, 1 failed, 1 timed out."
+    assert lines[1].startswith("FAILED    broken (2.0 s) - b-check, log: ")
+    assert lines[2].startswith("TIMED OUT slow (2.0 s), log: ")
+    assert len(lines) == 3
+
+
+def test_run_batch_writes_report(mocker, tmp_path):
+    args = create_argument_parser().parse_args(
+        ["-p", str(tmp_path), "--repositories", str(tmp_path / "a"), str(tmp_path / "b"), "--batch-report"]
+        + [str(tmp_path / "report.json"), "--batch-workers", "4"]
+    )
+    mocker.patch("mfd_code_quality.batch.get_parsed_args", return_value=args)
+    mocker.patch("mfd_code_quality.batch.set_up_logging")
+    mocker.patch("mfd_code_quality.batch.get_jobserver")
+    mocker.patch("mfd_code_quality.batch._get_available_code_standard_module")
+    mocker.patch("mfd_code_quality.batch.get_run_id", return_value="run")
+    mocker.patch("mfd_code_quality.batch.get_root_dir", return_value=tmp_path)
+    mocker.patch("mfd_code_quality.batch.get_run_dir", return_value=tmp_path)
+    mock_check = mocker.patch(
+        "mfd_code_quality.batch.check_repositories",
+        return_value=[create_result(tmp_path / "a", PASSED), create_result(tmp_path / "b", CRASHED)],
+    )
+
+    assert not _run_batch()
+    options, workers, timeout, run_dir = mock_check.call_args.args
+    assert [Path(option.project_dir).name for option in options] == ["a", "b"]
+    assert (workers, timeout, run_dir) == (2, None, tmp_path)
+    report = json.loads((tmp_path / BATCH_REPORT_FILE).read_text())
+    assert report == json.loads((tmp_path / "report.json").read_text())
+    assert not report["passed"]
+    assert [repository["status"] for repository in report["repositories"]] == [PASSED, CRASHED]
+    assert report["repositories"][0]["checks"][0]["project_dir"] == str(tmp_path / "a")
+
+
+def test_run_batch_fails_without_repositories(mocker):
+    mocker.patch("mfd_code_quality.batch.get_parsed_args", return_value=create_argument_parser().parse_args([]))
+    mocker.patch("mfd_code_quality.batch.set_up_logging")
+    mock_check = mocker.patch("mfd_code_quality.batch.check_repositories")
+    assert not _run_batch()
+    mock_check.assert_not_called()
+
+
+def test_work_writes_output_of_checks_to_log_file(mocker, tmp_path):
+    mocker.patch("mfd_code_quality.batch.set_up_logging")
+    mocker.patch("mfd_code_quality.batch.os.setsid", create=True)
+    mocker.patch("mfd_code_quality.batch.get_jobserver", return_value=None)
+    mocker.patch("mfd_code_quality.batch.set_tool_group_listener")
+    results = [CheckResult("a-check", tmp_path, True, 1.0, "run")]
+
+    def run_all_checks(options: CheckOptions) -> list[CheckResult]:
+        os.write(1, f"checking {Path(options.project_dir).name}\n".encode())
+        os.write(2, b"output of a tool\n")
+        return results
+
+    mocker.patch("mfd_code_quality.batch.run_all_checks", side_effect=run_all_checks)
+    connection, worker_connection = multiprocessing.Pipe()
+    connection.send((CheckOptions(project_dir=tmp_path / "repo"), str(tmp_path / "repo.log")))
+    connection.send(None)
+    _work(worker_connection)
+
+    assert connection.recv() == results
+    assert (tmp_path / "repo.log").read_text() == "checking repo\noutput of a tool\n"
+
+
+def test_check_repositories_stops_repository_checked_too_long(tmp_path):
+    (result,) = check_repositories([CheckOptions(project_dir=tmp_path)], 1, 0.01, tmp_path)
+    assert result.status == TIMED_OUT
+    assert result.path == tmp_path
+    assert result.log_path == tmp_path / "logs" / f"001-{tmp_path.name}.log"
+
+
+@pytest.mark.skipif(not hasattr(os, "killpg") or not hasattr(os, "mkfifo"), reason="process groups are not supported")
+def test_killed_worker_takes_its_tools_down_and_returns_its_tokens(mocker):
+    jobserver = JobServer.create(4)
+    mocker.patch("mfd_code_quality.batch.get_jobserver", return_value=jobserver)
+    sleep = (sys.executable, "-c", "import time; time.sleep(60)")
+    process, tool = (subprocess.Popen(sleep, start_new_session=True) for _ in range(2))
+    messages = [(TOKENS_MESSAGE, 3), (TOOL_MESSAGE, tool.pid, True), (TOKENS_MESSAGE, -1)]
+    jobserver.acquire(2)
+    worker = _Worker.__new__(_Worker)
+    worker.process = mocker.Mock(pid=process.pid)
+    worker.connection = mocker.Mock(poll=lambda: bool(messages), recv=lambda: messages.pop(0))
+    worker.tool_groups, worker.tokens = set(), 0
+    try:
+        worker.kill()
+        assert process.wait(5) and tool.wait(5)
+        assert jobserver.acquire(5) == b"+++"
+    finally:
+        for leftover in (process, tool):
+            leftover.kill()
+            leftover.wait()
+        jobserver.close()
@@ -1,25 +1,34 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: MIT
+import contextlib
 from textwrap import dedent
 
 import logging
+import os
 import sys
 
 import pytest
 
 from mfd_code_quality.code_standard.checks import (
+    CODE_STANDARD_MODULE_ENV_VAR,
     _get_available_code_standard_module,
     _run_code_standard_tests,
     _test_ruff_check,
 )
 
 
+@pytest.fixture(autouse=True)
+def environment_without_detected_module(mocker):
+    mocker.patch.dict(os.environ)
+    os.environ.pop(CODE_STANDARD_MODULE_ENV_VAR, None)
+
+
 class TestChecks:
     def test_get_available_code_standard_module_flake8(self, mocker):
         """flake8 is chosen when ruff is not present but flake8 is."""
         # First command (uv pip list) returns no ruff / flake8
         mocker.patch(
-            "mfd_code_quality.code_standard.checks.run",
+            "mfd_code_quality.code_standard.checks.run_tool",
             side_effect=[
                 mocker.Mock(stdout="", returncode=0),
                 mocker.Mock(
@@ -49,16 +58,28 @@ class TestChecks:
             """
         )
         mocker.patch(
-            "mfd_code_quality.code_standard.checks.run",
+            "mfd_code_quality.code_standard.checks.run_tool",
             return_value=mocker.Mock(stdout=output, returncode=0),
         )
         mocker.patch("mfd_code_quality.code_standard.checks.get_root_dir", return_value="/path/to/root")
 
         assert _get_available_code_standard_module() == "ruff"
 
+    def test_get_available_code_standard_module_is_detected_once(self, mocker):
+        mock_run_tool = mocker.patch(
+            "mfd_code_quality.code_standard.checks.run_tool",
+            return_value=mocker.Mock(stdout="ruff                    0.6.4\n", returncode=0),
+        )
+        mocker.patch("mfd_code_quality.code_standard.checks.get_root_dir", return_value="/path/to/root")
+
+        assert _get_available_code_standard_module() == "ruff"
+        assert os.environ[CODE_STANDARD_MODULE_ENV_VAR] == "ruff"
+        assert _get_available_code_standard_module() == "ruff"
+        mock_run_tool.assert_called_once()
+
     def test_get_available_code_standard_module_none(self, mocker):
         mocker.patch(
-            "mfd_code_quality.code_standard.checks.run",
+            "mfd_code_quality.code_standard.checks.run_tool",
             return_value=mocker.Mock(stdout="", returncode=0),
         )
         mocker.patch("mfd_code_quality.code_standard.checks.get_root_dir", return_value="/path/to/root")
@@ -68,8 +89,10 @@ class TestChecks:
 
     def test__test_ruff_check_call(self, mocker, caplog):
         caplog.set_level(logging.INFO)
+        mocker.patch("mfd_code_quality.code_standard.checks.get_jobs", return_value=3)
+        mocker.patch("mfd_code_quality.code_standard.checks.job_slots", side_effect=contextlib.nullcontext)
         mocker.patch(
-            "mfd_code_quality.code_standard.checks.run",
+            "mfd_code_quality.code_standard.checks.run_tool",
             return_value=mocker.Mock(returncode=1, stdout=""),
         )
         mocker.patch("mfd_code_quality.code_standard.checks.get_root_dir", return_value="/path/to/root")
@@ -152,7 +175,7 @@ class TestChecks:
     def test_get_available_code_standard_module_uv_raises_then_fallback(self, mocker):
         """If the first command raises (e.g. uv missing), fallback command is used."""
         mocker.patch(
-            "mfd_code_quality.code_standard.checks.run",
+            "mfd_code_quality.code_standard.checks.run_tool",
             side_effect=[
                 FileNotFoundError(),  # simulates missing 'uv'
                 mocker.Mock(
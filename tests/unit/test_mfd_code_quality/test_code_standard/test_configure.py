@@ -13,14 +13,23 @@ from mfd_code_quality.code_standard.configure import (
     _create_unified_tool_config_list,
     _get_module_name,
     _read_config_content,
+    _read_packaged_config_content,
     create_toml_files,
     create_config_files,
     delete_config_files,
     _remove_toml_file,
     _get_template_repo_name,
+    get_generic_excludes,
 )
 
 
+@pytest.fixture(autouse=True)
+def clear_packaged_config_cache():
+    _read_packaged_config_content.cache_clear()
+    yield
+    _read_packaged_config_content.cache_clear()
+
+
 class TestConfigure:
     @pytest.fixture
     def tool_configs(self):
@@ -94,7 +103,7 @@ class TestConfigure:
 
         # Call the function and assert the result
         mocker.patch("mfd_code_quality.code_standard.configure._get_template_repo_name", return_value=expected)
-        mocker.patch("mfd_code_quality.code_standard.configure.get_package_name", return_value=expected)
+        mocker.patch("mfd_code_quality.code_standard.configure.get_package_names", return_value=[expected])
         result = _get_module_name(mock_path)
         assert result == expected
 
@@ -233,11 +242,17 @@ class TestConfigure:
         mock_template.render.return_value = 'name = "mfd_example_module"'
         mocker.patch("mfd_code_quality.code_standard.configure.Template", return_value=mock_template)
 
-        # Mocking _get_module_name to return a specific module name
-        mocker.patch("mfd_code_quality.code_standard.configure._get_module_name", return_value="mfd_example_module")
+        # Mocking _get_module_names to return specific module names
+        mocker.patch(
+            "mfd_code_quality.code_standard.configure._get_module_names",
+            return_value=["mfd_example_module", "mfd_example_tools"],
+        )
 
         _substitute_toml_file("/fake/path/pyproject.toml")
 
+        mock_template.render.assert_called_once_with(
+            {"module_name": "mfd_example_module", "module_names": '["mfd_example_module", "mfd_example_tools"]'}
+        )
         mock_open.assert_called_with("/fake/path/pyproject.toml", "wt")
         handle = mock_open()
         handle.writelines.assert_called_once_with('name = "mfd_example_module"')
@@ -258,8 +273,8 @@ class TestConfigure:
 
         # Mocking _get_module_name to return a specific module name
         mocker.patch(
-            "mfd_code_quality.code_standard.configure._get_module_name",
-            return_value="{{cookiecutter.project_slug}}",
+            "mfd_code_quality.code_standard.configure._get_module_names",
+            return_value=["{{cookiecutter.project_slug}}"],
         )
 
         _substitute_toml_file("/fake/path/pyproject.toml")
@@ -315,6 +330,14 @@ class TestConfigure:
         _create_pyproject_toml_file_mock.assert_called_once()
         _substitute_pyproject_toml_file_mock.assert_called_once()
 
+    def test_packaged_config_is_read_once(self, mocker):
+        read_config_content_mock = mocker.patch(
+            "mfd_code_quality.code_standard.configure._read_config_content", return_value=[ToolConfig("[tool]\n")]
+        )
+        path = pathlib.Path("/fake/path/generic.txt")
+        assert _read_packaged_config_content(path) == _read_packaged_config_content(path)
+        read_config_content_mock.assert_called_once_with(path)
+
     def test_delete_config_files_success(self, mocker):
         mocker.patch("mfd_code_quality.code_standard.configure.set_up_logging")
         mocker.patch(
@@ -458,3 +481,7 @@ class TestConfigure:
 
         handle = m()
         handle.write.assert_not_called()
+
+    def test_get_generic_excludes(self):
+        excludes = get_generic_excludes()
+        assert {".venv", "venv", "build", "site-packages", "run_tests.py"} <= set(excludes)
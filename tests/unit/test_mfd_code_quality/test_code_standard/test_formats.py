@@ -1,7 +1,9 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: MIT
+import contextlib
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import ANY, patch, MagicMock
 import sys
 
 from mfd_code_quality.code_standard.formats import (
@@ -20,10 +22,12 @@ class TestCodeStandard:
                 "mfd_code_quality.code_standard.formats.get_root_dir",
                 return_value="/mocked/path",
             ),
-            patch("mfd_code_quality.code_standard.formats.run") as mock_run,
+            patch("mfd_code_quality.code_standard.formats.run_tool") as mock_run,
         ):
             mocker.patch("mfd_code_quality.code_standard.formats.create_config_files")
             mocker.patch("mfd_code_quality.code_standard.formats.delete_config_files")
+            mocker.patch("mfd_code_quality.code_standard.formats.get_jobs", return_value=3)
+            mocker.patch("mfd_code_quality.code_standard.formats.job_slots", side_effect=contextlib.nullcontext)
             yield mock_run
             # Teardown: No specific teardown needed
 
@@ -32,7 +36,7 @@ class TestCodeStandard:
         mock_run.return_value = MagicMock(returncode=0)
         assert _run_linter() is True
         mock_run.assert_called_once_with(
-            (sys.executable, "-m", "ruff", "check", "--fix"), capture_output=True, text=True, cwd="/mocked/path"
+            (sys.executable, "-m", "ruff", "check", "--fix"), cwd="/mocked/path", env=ANY, stream_logger=ANY
         )
 
     def test_run_linter_failure(self, setup_and_teardown):
@@ -40,7 +44,7 @@ class TestCodeStandard:
         mock_run.return_value = MagicMock(returncode=1)
         assert _run_linter() is False
         mock_run.assert_called_once_with(
-            (sys.executable, "-m", "ruff", "check", "--fix"), capture_output=True, text=True, cwd="/mocked/path"
+            (sys.executable, "-m", "ruff", "check", "--fix"), cwd="/mocked/path", env=ANY, stream_logger=ANY
         )
 
     def test_run_formatter_success(self, setup_and_teardown):
@@ -48,7 +52,7 @@ class TestCodeStandard:
         mock_run.return_value = MagicMock(returncode=0)
         assert _run_formatter() is True
         mock_run.assert_called_once_with(
-            (sys.executable, "-m", "ruff", "format"), capture_output=True, text=True, cwd="/mocked/path"
+            (sys.executable, "-m", "ruff", "format"), cwd="/mocked/path", env=ANY, stream_logger=ANY
         )
 
     def test_run_formatter_failure(self, setup_and_teardown):
@@ -56,9 +60,15 @@ class TestCodeStandard:
         mock_run.return_value = MagicMock(returncode=1)
         assert _run_formatter() is False
         mock_run.assert_called_once_with(
-            (sys.executable, "-m", "ruff", "format"), capture_output=True, text=True, cwd="/mocked/path"
+            (sys.executable, "-m", "ruff", "format"), cwd="/mocked/path", env=ANY, stream_logger=ANY
         )
 
+    def test_ruff_threads_limited_by_job_slots(self, setup_and_teardown):
+        mock_run = setup_and_teardown
+        mock_run.return_value = MagicMock(returncode=0)
+        _run_formatter()
+        assert mock_run.call_args.kwargs["env"]["RAYON_NUM_THREADS"] == "3"
+
     def test_format_code_success(self, setup_and_teardown):
         mock_run = setup_and_teardown
         mock_run.return_value = MagicMock(returncode=0)
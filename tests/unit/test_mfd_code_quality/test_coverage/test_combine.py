@@ -0,0 +1,93 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test coverage.combine."""
+
+import json
+
+import pytest
+from coverage import CoverageData
+
+from mfd_code_quality.coverage.combine import ShardError, _combine_and_compare, combine_shards, find_shards
+
+
+def _write_shard(root_dir, index, count, lines=None, shard_root="/ci/project", **manifest):
+    content = {"index": index, "count": count, "tests": 1, "collection": "c", "assignment": "a", "root_dir": shard_root}
+    content.update(manifest)
+    (root_dir / f".coverage-shard-{index}-of-{count}.json").write_text(json.dumps(content))
+    if lines is not None:
+        data = CoverageData(basename=str(root_dir / f".coverage-shard-{index}-of-{count}"))
+        data.add_lines(lines)
+        data.write()
+
+
+class TestCombine:
+    def test_find_shards(self, tmp_path):
+        _write_shard(tmp_path, 2, 2, {"/ci/project/pkg/a.py": {1}})
+        _write_shard(tmp_path, 1, 2, {"/ci/project/pkg/a.py": {2}})
+        assert [shard.index for shard in find_shards(tmp_path)] == [1, 2]
+
+    def test_find_shards_none(self, tmp_path):
+        with pytest.raises(ShardError, match="No shards found"):
+            find_shards(tmp_path)
+
+    def test_find_shards_missing(self, tmp_path):
+        _write_shard(tmp_path, 2, 3, {"/ci/project/pkg/a.py": {1}})
+        with pytest.raises(ShardError, match="Missing shard\\(s\\) 1/3, 3/3"):
+            find_shards(tmp_path)
+
+    def test_find_shards_different_counts(self, tmp_path):
+        _write_shard(tmp_path, 1, 1, {"/ci/project/pkg/a.py": {1}})
+        _write_shard(tmp_path, 1, 2, {"/ci/project/pkg/a.py": {1}})
+        with pytest.raises(ShardError, match="different splits"):
+            find_shards(tmp_path)
+
+    def test_find_shards_split_differently(self, tmp_path):
+        _write_shard(tmp_path, 1, 2, {"/ci/project/pkg/a.py": {1}})
+        _write_shard(tmp_path, 2, 2, {"/ci/project/pkg/a.py": {1}}, assignment="other")
+        with pytest.raises(ShardError, match="split tests differently"):
+            find_shards(tmp_path)
+
+    def test_find_shards_missing_data(self, tmp_path):
+        _write_shard(tmp_path, 1, 2, {"/ci/project/pkg/a.py": {1}})
+        _write_shard(tmp_path, 2, 2)
+        with pytest.raises(ShardError, match="Coverage data of shard 2/2 not found"):
+            find_shards(tmp_path)
+
+    def test_combine_shards_maps_paths(self, tmp_path):
+        _write_shard(tmp_path, 1, 3, {"/ci/project/pkg/a.py": {1, 2}, "/usr/lib/b.py": {1}})
+        _write_shard(tmp_path, 2, 3, {"/other/checkout/pkg/a.py": {3}}, shard_root="/other/checkout")
+        _write_shard(tmp_path, 3, 3, tests=0)  # shard without tests doesn't produce coverage data
+        data = CoverageData(basename=str(tmp_path / ".coverage"))
+        combine_shards(find_shards(tmp_path), tmp_path, data)
+
+        assert sorted(data.measured_files()) == sorted([str(tmp_path / "pkg" / "a.py"), "/usr/lib/b.py"])
+        assert sorted(data.lines(str(tmp_path / "pkg" / "a.py"))) == [1, 2, 3]
+
+    def test_combine_and_compare_missing_shard(self, tmp_path, mocker):
+        _write_shard(tmp_path, 2, 2, {"/ci/project/pkg/a.py": {1}})
+        mock_threshold = mocker.patch("mfd_code_quality.coverage.combine.is_diff_coverage_threshold_reached")
+        assert _combine_and_compare(tmp_path) is False
+        mock_threshold.assert_not_called()
+        assert not (tmp_path / ".coverage").exists()
+
+    def test_combine_and_compare(self, tmp_path, mocker):
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "a.py").write_text("a = 1\nb = 2\n")
+        _write_shard(tmp_path, 1, 2, {"/ci/project/pkg/a.py": {1}})
+        _write_shard(tmp_path, 2, 2, {"/ci/project/pkg/a.py": {2}})
+        (tmp_path / "run").mkdir()
+        (tmp_path / "coverage.xml").write_text("stale report")
+        mocker.patch("mfd_code_quality.coverage.combine.get_run_dir", return_value=tmp_path / "run")
+        mocker.patch("mfd_code_quality.coverage.combine.get_package_names", return_value=["pkg"])
+        mocker.patch("mfd_code_quality.coverage.combine.get_parsed_args").return_value.coverage_report = ["xml"]
+        mock_write_coverage_reports = mocker.patch("mfd_code_quality.coverage.combine.write_coverage_reports")
+        mock_threshold = mocker.patch(
+            "mfd_code_quality.coverage.combine.is_diff_coverage_threshold_reached", return_value=True
+        )
+        assert _combine_and_compare(tmp_path) is True
+        cov = mock_threshold.call_args.args[0]
+        mock_write_coverage_reports.assert_called_once_with(cov, ["xml"], tmp_path / "run")
+        assert cov.analysis2(str(tmp_path / "pkg" / "a.py"))[3] == []
+        # combined data is published to the root directory, report which wasn't written doesn't stay there
+        assert (tmp_path / ".coverage").is_file()
+        assert not (tmp_path / "coverage.xml").exists()
@@ -0,0 +1,137 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+import subprocess
+from subprocess import CompletedProcess
+
+import pytest
+from coverage.exceptions import NoSource
+
+from mfd_code_quality.coverage.diff_coverage import (
+    DiffCoverage,
+    FileDiffCoverage,
+    GitDiffError,
+    _format_line_ranges,
+    get_changed_lines,
+    get_diff_coverage,
+    parse_diff,
+)
+
+DIFF = """diff --git a/pkg/a.py b/pkg/a.py
+index 1111111..2222222 100644
+--- a/pkg/a.py
++++ b/pkg/a.py
+@@ -3,0 +4,2 @@ def f():
++    x = 1
++    y = 2
+@@ -10 +12 @@ def g():
+-    return 1
++    return 2
+@@ -20,3 +22,0 @@ def h():
+-    a
+-    b
+-    c
+diff --git a/pkg/removed.py b/pkg/removed.py
+deleted file mode 100644
+--- a/pkg/removed.py
++++ /dev/null
+@@ -1,2 +0,0 @@
+-import os
+-os.getcwd()
+"""
+
+
+class TestDiffCoverage:
+    def test_parse_diff(self):
+        assert parse_diff(DIFF) == {"pkg/a.py": {4, 5, 12}}
+
+    def test_format_line_ranges(self):
+        assert _format_line_ranges({7, 1, 2, 3, 10, 11}) == "1-3,7,10-11"
+
+    def test_get_changed_lines_includes_untracked_files(self, mocker, tmp_path):
+        (tmp_path / "new.py").write_text("a = 1\nb = 2\n")
+        outputs = iter(["abc123\n", DIFF, "new.py\0"])
+        mocker.patch(
+            "mfd_code_quality.coverage.diff_coverage.run_tool",
+            side_effect=lambda *args, **kwargs: CompletedProcess(args, 0, next(outputs), ""),
+        )
+        assert get_changed_lines(tmp_path, "origin/main") == {"pkg/a.py": {4, 5, 12}, "new.py": {1, 2}}
+
+    def test_get_changed_lines_ignores_prefix_configuration(self, mocker, tmp_path):
+        mocker.patch("mfd_code_quality.utils.get_parsed_args").return_value.tool_timeout = None
+
+        def git(*args: str) -> None:
+            subprocess.run(("git", "-c", "user.name=a", "-c", "user.email=a@a", *args), cwd=tmp_path, check=True)
+
+        git("init", "-q")
+        git("config", "diff.noprefix", "true")
+        (tmp_path / "a.py").write_text("a = 1\n")
+        git("add", "a.py")
+        git("commit", "-q", "-m", "initial")
+        (tmp_path / "a.py").write_text("a = 1\nb = 2\n")
+        assert get_changed_lines(tmp_path, "HEAD") == {"a.py": {2}}
+
+    def test_get_changed_lines_of_files_with_special_characters(self, mocker, tmp_path):
+        mocker.patch("mfd_code_quality.utils.get_parsed_args").return_value.tool_timeout = None
+
+        def git(*args: str) -> None:
+            subprocess.run(("git", "-c", "user.name=a", "-c", "user.email=a@a", *args), cwd=tmp_path, check=True)
+
+        names = ["a b.py", 'quote"d.py', "zażółć.py"]
+        git("init", "-q")
+        for name in names:
+            (tmp_path / name).write_text("a = 1\n")
+        git("add", *names)
+        git("commit", "-q", "-m", "initial")
+        for name in names:
+            (tmp_path / name).write_text("a = 1\nb = 2\n")
+        assert get_changed_lines(tmp_path, "HEAD") == {name: {2} for name in names}
+
+    def test_get_changed_lines_git_error(self, mocker, tmp_path):
+        mocker.patch(
+            "mfd_code_quality.coverage.diff_coverage.run_tool",
+            return_value=CompletedProcess("", 128, "", "fatal: Not a valid object name origin/main"),
+        )
+        with pytest.raises(GitDiffError, match="Not a valid object name"):
+            get_changed_lines(tmp_path, "origin/main")
+
+    def test_get_diff_coverage(self, mocker, tmp_path):
+        mocker.patch(
+            "mfd_code_quality.coverage.diff_coverage.get_changed_lines",
+            return_value={
+                "pkg/a.py": {4, 5, 12},
+                "pkg/not_executed.py": {1},
+                "pkg/broken.py": {1},
+                "tests/test_a.py": {1},
+            },
+        )
+        cov = mocker.Mock()
+        cov.get_data.return_value.measured_files.return_value = [str(tmp_path / "pkg" / "a.py")]
+        cov.get_option.return_value = ["pkg"]
+
+        def analysis2(path):
+            if path.endswith("broken.py"):
+                raise NoSource("No source for code")
+            if path.endswith("a.py"):
+                return path, [1, 4, 5, 12], [], [5], ""
+            return path, [1], [], [1], ""
+
+        cov.analysis2.side_effect = analysis2
+        diff_coverage = get_diff_coverage(cov, tmp_path, "origin/main")
+        assert diff_coverage.files == [
+            FileDiffCoverage("pkg/a.py", {4, 12}, {5}),
+            FileDiffCoverage("pkg/not_executed.py", set(), {1}),
+        ]
+        assert diff_coverage.num_changed_statements == 4
+        assert diff_coverage.percent_covered == 50.0
+
+    def test_format_report(self):
+        diff_coverage = DiffCoverage(
+            "origin/main", [FileDiffCoverage("pkg/a.py", {4, 12}, {5, 6}), FileDiffCoverage("pkg/b.py", {1})]
+        )
+        report = diff_coverage.format_report()
+        assert "pkg/a.py (50.0%): Missing lines 5-6" in report
+        assert "pkg/b.py (100.0%)" in report
+        assert "Coverage: 60%" in report
+
+    def test_format_report_without_changes(self):
+        assert "No lines with coverage information" in DiffCoverage("origin/main").format_report()
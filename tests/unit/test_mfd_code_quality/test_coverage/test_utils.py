@@ -1,16 +1,148 @@
 # Copyright (C) 2025 Intel Corporation
 # SPDX-License-Identifier: MIT
+import contextlib
+import json
 import pathlib
-from subprocess import CompletedProcess
 
-from mfd_code_quality.coverage.utils import is_diff_coverage_threshold_reached
+import os
+import sys
+
+import pytest
+from coverage import Coverage, CoverageData
+
+from mfd_code_quality.coverage.diff_coverage import DiffCoverage, FileDiffCoverage, GitDiffError
+from mfd_code_quality.coverage.utils import (
+    coverage_core,
+    get_coverage_totals,
+    get_packages_diff_coverage,
+    is_diff_coverage_threshold_reached,
+    log_module_coverage,
+    write_coverage_reports,
+    write_json_report,
+)
 
 
 class TestUtils:
-    def test_is_diff_coverage_threshold_reached(self, mocker):
+    @pytest.mark.parametrize("covered, missing, expected", [({1, 2, 3, 4}, {5}, True), ({1}, {2, 3}, False)])
+    def test_is_diff_coverage_threshold_reached(self, mocker, covered, missing, expected):
+        diff_coverage = DiffCoverage("origin/main", [FileDiffCoverage("a.py", covered, missing)])
+        mocker.patch("mfd_code_quality.coverage.utils.get_diff_coverage", return_value=diff_coverage)
+        mocker.patch("mfd_code_quality.coverage.utils.get_root_dir", return_value=mocker.create_autospec(pathlib.Path))
+        assert is_diff_coverage_threshold_reached(mocker.Mock(**{"get_option.return_value": ["pkg"]})) is expected
+
+    def test_is_diff_coverage_threshold_reached_git_error(self, mocker):
+        mocker.patch("mfd_code_quality.coverage.utils.get_diff_coverage", side_effect=GitDiffError("no origin/main"))
+        mocker.patch("mfd_code_quality.coverage.utils.get_root_dir", return_value=mocker.create_autospec(pathlib.Path))
+        assert is_diff_coverage_threshold_reached(mocker.Mock(**{"get_option.return_value": ["pkg"]})) is False
+
+    def test_is_diff_coverage_threshold_reached_by_each_package(self, mocker, caplog):
+        mocker.patch("mfd_code_quality.coverage.utils.get_root_dir")
         mocker.patch(
-            "mfd_code_quality.coverage.utils.run",
-            return_value=CompletedProcess(args="", returncode=0, stdout="", stderr=""),
+            "mfd_code_quality.coverage.utils.get_packages_diff_coverage",
+            return_value={
+                "pkg_a": DiffCoverage("origin/main", [FileDiffCoverage("pkg_a/a.py", {1, 2, 3, 4, 5})]),
+                "pkg_b": DiffCoverage("origin/main", [FileDiffCoverage("pkg_b/b.py", {1}, {2})]),
+            },
         )
-        mocker.patch("mfd_code_quality.coverage.utils.get_root_dir", return_value=mocker.create_autospec(pathlib.Path))
-        assert is_diff_coverage_threshold_reached() is True
+        with caplog.at_level("INFO"):
+            assert is_diff_coverage_threshold_reached(mocker.Mock(**{"get_option.return_value": ["a", "b"]})) is False
+        assert "Diff Coverage of pkg_b" in caplog.text
+        assert "Diff coverage of pkg_a 100.0% - threshold (80%) is met" in caplog.text
+        assert "Diff coverage of pkg_b 50.0% - threshold (80%) is NOT met" in caplog.text
+        assert "Diff coverage threshold is NOT met by packages: pkg_b" in caplog.text
+
+    def test_get_packages_diff_coverage(self, mocker, tmp_path):
+        for package, source in (("pkg_a", "a = 1\nb = 2\n"), ("pkg_b", "c = 3\n"), ("pkg_c", "d = 4\n")):
+            (tmp_path / package).mkdir()
+            (tmp_path / package / "__init__.py").write_text(source)
+        data = CoverageData(basename=str(tmp_path / ".coverage"))
+        data.add_lines({str(tmp_path / "pkg_a" / "__init__.py"): [1], str(tmp_path / "pkg_b" / "__init__.py"): [1]})
+        data.write()
+        mocker.patch(
+            "mfd_code_quality.coverage.utils.get_changed_lines",
+            return_value={"pkg_a/__init__.py": {1, 2}, "pkg_b/__init__.py": {1}, "setup.py": {1}},
+        )
+        cov = mocker.Mock(**{"get_option.return_value": str(tmp_path / ".coverage")})
+        mocker.patch("mfd_code_quality.coverage.utils.job_slots", return_value=contextlib.nullcontext(2))
+
+        verdicts = get_packages_diff_coverage(cov, tmp_path, ["pkg_a", "pkg_b", "pkg_c"])
+
+        assert {package: verdict.percent_covered for package, verdict in verdicts.items()} == {
+            "pkg_a": 50.0,
+            "pkg_b": 100.0,
+            "pkg_c": 100.0,
+        }
+        assert verdicts["pkg_a"].files == [FileDiffCoverage("pkg_a/__init__.py", {1}, {2})]
+
+    @pytest.mark.skipif(sys.version_info < (3, 12), reason="sys.monitoring is available since Python 3.12")
+    def test_coverage_core_uses_sys_monitoring(self, mocker):
+        mocker.patch.dict(os.environ, clear=True)
+        with coverage_core():
+            assert os.environ["COVERAGE_CORE"] == "sysmon"
+        assert "COVERAGE_CORE" not in os.environ
+
+    def test_coverage_core_respects_user_choice(self, mocker):
+        mocker.patch.dict(os.environ, {"COVERAGE_CORE": "ctrace"})
+        with coverage_core():
+            assert os.environ["COVERAGE_CORE"] == "ctrace"
+
+    def test_get_coverage_totals(self, mocker):
+        cov = mocker.Mock()
+        cov.get_data.return_value.measured_files.return_value = ["a.py", "b.py", "removed.py"]
+        cov.analysis2.side_effect = [
+            ("a.py", [1, 2, 3], [], [3], "3"),
+            ("b.py", [1], [5], [], ""),
+            OSError("No such file"),
+        ]
+        assert get_coverage_totals(cov) == {
+            "covered_lines": 3,
+            "num_statements": 4,
+            "percent_covered": 75.0,
+            "missing_lines": 1,
+            "excluded_lines": 1,
+        }
+
+    def test_log_module_coverage_is_lazy(self, mocker):
+        mock_get_coverage_totals = mocker.patch("mfd_code_quality.coverage.utils.get_coverage_totals")
+        mocker.patch("mfd_code_quality.coverage.utils.logger.isEnabledFor", return_value=False)
+        log_module_coverage(mocker.Mock())
+        mock_get_coverage_totals.assert_not_called()
+
+    def test_write_coverage_reports(self, mocker, tmp_path):
+        mocker.patch("mfd_code_quality.coverage.utils.get_root_dir", return_value=tmp_path)
+        cov = mocker.Mock()
+        write_coverage_reports(cov, ["xml", "html", "xml"])
+        cov.xml_report.assert_called_once_with(outfile=str(tmp_path / "coverage.xml"))
+        cov.html_report.assert_called_once_with(directory=str(tmp_path / "htmlcov"))
+        cov.json_report.assert_not_called()
+        cov.lcov_report.assert_not_called()
+
+    def test_write_json_report_honours_pretty_print(self, tmp_path):
+        cov = Coverage(data_file=None, config_file=False)
+        cov.set_option("json:pretty_print", True)
+        cov.get_data().add_lines({str(tmp_path / "module.py"): [1]})
+        (tmp_path / "module.py").write_text("a = 1\n")
+        write_json_report(cov, tmp_path / "coverage.json")
+        assert (tmp_path / "coverage.json").read_text().startswith('{\n    "meta"')
+
+    def test_write_json_report_is_the_same_as_coverage_json_report(self, tmp_path):
+        (tmp_path / "module.py").write_text("def f(x):\n    if x:\n        return 1\n    return 2\n")
+        cov = Coverage(data_file=None, branch=True)
+        sys.path.insert(0, str(tmp_path))
+        try:
+            cov.start()
+            import module
+
+            module.f(1)
+            cov.stop()
+        finally:
+            sys.path.remove(str(tmp_path))
+            sys.modules.pop("module", None)
+
+        write_json_report(cov, tmp_path / "streamed.json")
+        cov.json_report(outfile=str(tmp_path / "coverage.json"))
+        streamed = json.loads((tmp_path / "streamed.json").read_text())
+        expected = json.loads((tmp_path / "coverage.json").read_text())
+        del streamed["meta"]["timestamp"], expected["meta"]["timestamp"]
+        assert streamed == expected
+        assert streamed["totals"]["missing_lines"] == 1
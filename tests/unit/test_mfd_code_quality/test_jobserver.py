@@ -0,0 +1,138 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for jobserver.py."""
+
+import os
+
+import pytest
+
+from mfd_code_quality.jobserver import JobServer, get_jobs, get_jobserver, get_threads_env, job_slots
+
+pytestmark = pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="named pipes are not supported")
+
+
+@pytest.fixture
+def jobserver(mocker):
+    jobserver = JobServer.create(4)
+    mocker.patch("mfd_code_quality.jobserver.get_jobserver", return_value=jobserver)
+    mocker.patch("mfd_code_quality.jobserver.get_parsed_args", return_value=mocker.Mock(jobs=4))
+    yield jobserver
+    jobserver.close()
+
+
+def test_create_and_close():
+    jobserver = JobServer.create(3)
+    assert jobserver.makeflags == f"-j3 --jobserver-auth=fifo:{jobserver.path}"
+    assert jobserver.acquire(5) == b"++"
+    assert jobserver.acquire(1) == b""
+    jobserver.release(b"++")
+    assert jobserver.acquire(1) == b"+"
+    jobserver.close()
+    assert not jobserver.path.parent.exists()
+
+
+def test_token_listener_is_notified_about_taken_and_returned_tokens():
+    jobserver = JobServer.create(3)
+    counts = []
+    jobserver.token_listener = counts.append
+    tokens = jobserver.acquire(5)
+    assert jobserver.acquire(1) == b""
+    jobserver.release(tokens)
+    jobserver.close()
+    assert counts == [2, -2]
+
+
+def test_join_fifo():
+    owner = JobServer.create(2)
+    try:
+        client = JobServer.join(f"-j2 --jobserver-auth=fifo:{owner.path}")
+        assert client.acquire(1) == b"+"
+        assert owner.acquire(1) == b""
+        client.release(b"+")
+        client.close()
+        assert owner.path.exists()
+    finally:
+        owner.close()
+
+
+def test_join_inherited_pipe():
+    read_fd, write_fd = os.pipe()
+    os.write(write_fd, b"++")
+    try:
+        client = JobServer.join(f"-j3 --jobserver-auth={read_fd},{write_fd}")
+        assert client.acquire(3) == b"++"
+        client.close()
+        assert os.get_blocking(read_fd)
+    finally:
+        os.close(read_fd)
+        os.close(write_fd)
+
+
+def test_join_does_not_use_descriptor_of_other_file(tmp_path):
+    path = tmp_path / "log"
+    path.write_bytes(b"ABCDEFGHIJ")
+    with open(path, "rb+") as file:
+        assert JobServer.join(f"-j3 --jobserver-auth={file.fileno()},{file.fileno()}") is None
+    assert path.read_bytes() == b"ABCDEFGHIJ"
+
+
+def test_join_last_advertised_jobserver():
+    owner = JobServer.create(2)
+    try:
+        client = JobServer.join(f"-j2 --jobserver-auth=fifo:/nonexistent/fifo -j2 --jobserver-auth=fifo:{owner.path}")
+        assert client.acquire(1) == b"+"
+        client.close()
+    finally:
+        owner.close()
+
+
+@pytest.mark.parametrize("makeflags", ["", "-j4", "-j2 --jobserver-auth=fifo:/nonexistent/fifo"])
+def test_join_without_jobserver(makeflags):
+    assert JobServer.join(makeflags) is None
+
+
+def test_job_slots_share_budget(jobserver):
+    with job_slots(3) as first:
+        with job_slots(3) as second:
+            with job_slots(2) as third:
+                assert (first, second, third) == (3, 2, 1)
+    with job_slots(10) as slots:
+        assert slots == 4
+
+
+def test_get_jobserver_is_advertised_to_child_processes(mocker, monkeypatch):
+    monkeypatch.setenv("MAKEFLAGS", "-k")
+    mocker.patch("mfd_code_quality.jobserver.get_parsed_args", return_value=mocker.Mock(jobs=2))
+    mocker.patch("mfd_code_quality.jobserver.atexit.register")
+    get_jobserver.cache_clear()
+    try:
+        jobserver = get_jobserver()
+        assert os.environ["MAKEFLAGS"] == f"-k -j2 --jobserver-auth=fifo:{jobserver.path}"
+        jobserver.close()
+    finally:
+        get_jobserver.cache_clear()
+
+
+def test_get_jobserver_replaces_jobserver_which_is_not_accessible(mocker, monkeypatch, tmp_path):
+    with open(tmp_path / "log", "wb") as file:
+        monkeypatch.setenv("MAKEFLAGS", f"-j4 --jobserver-auth={file.fileno()},{file.fileno()}")
+        mocker.patch("mfd_code_quality.jobserver.get_parsed_args", return_value=mocker.Mock(jobs=2))
+        mocker.patch("mfd_code_quality.jobserver.atexit.register")
+        get_jobserver.cache_clear()
+        try:
+            jobserver = get_jobserver()
+            assert jobserver.jobs == 2
+            assert os.environ["MAKEFLAGS"] == f"-j4 -j2 --jobserver-auth=fifo:{jobserver.path}"
+            jobserver.close()
+        finally:
+            get_jobserver.cache_clear()
+
+
+def test_get_jobs_defaults_to_available_cpus(mocker):
+    mocker.patch("mfd_code_quality.jobserver.get_parsed_args", return_value=mocker.Mock(jobs=None))
+    mocker.patch("mfd_code_quality.jobserver.get_available_cpu_count", return_value=6)
+    assert get_jobs() == 6
+
+
+def test_get_threads_env():
+    assert get_threads_env(2)["RAYON_NUM_THREADS"] == "2"
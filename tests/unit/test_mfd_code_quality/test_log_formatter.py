@@ -0,0 +1,43 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for log_formatter.py."""
+
+import logging
+
+import pytest
+
+from mfd_code_quality.log_formatter import CustomLogFormatter
+
+
+@pytest.fixture
+def formatter():
+    return CustomLogFormatter(logging.Formatter("%(name)13.13s | %(levelname)4.4s |"))
+
+
+def _record(message: str, name: str = "mfd-code-quality.utils", **extra: object) -> logging.LogRecord:
+    record = logging.LogRecord(name, logging.INFO, __file__, 1, message, None, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def test_format_single_line_message(formatter):
+    record = _record("message")
+    assert formatter.format(record) == "        utils | INFO | message"
+    assert record.name == "mfd-code-quality.utils"
+
+
+def test_format_indents_lines_of_multiline_message(formatter):
+    assert formatter.format(_record("first\nsecond\n\x1b[31mred\x1b[0m")) == (
+        "        utils | INFO | first\n                       second\n                       \x1b[31mred\x1b[0m"
+    )
+
+
+def test_format_separators(formatter):
+    assert formatter.format(_record("=" * 20)) == "=" * 20
+    assert formatter.format(_record("== title ==", is_separator=True)) == "== title =="
+    assert formatter.format(_record("")) == "        utils | INFO | "
+
+
+def test_get_prepared_message_skips_width_of_color_codes():
+    prefix = "\x1b[32mINFO\x1b[0m |"
+    assert CustomLogFormatter.get_prepared_message(prefix, "a\nb") == f"{prefix} a\n       b"
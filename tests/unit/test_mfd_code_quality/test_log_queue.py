@@ -0,0 +1,66 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for log_queue.py."""
+
+import io
+import logging
+import threading
+
+import pytest
+
+from mfd_code_quality.log_queue import LogQueueHandler, enqueue_handler, flush_logging
+
+
+class _BlockingStream(io.StringIO):
+    def __init__(self) -> None:
+        super().__init__()
+        self.unblocked = threading.Event()
+
+    def write(self, s: str) -> int:
+        self.unblocked.wait(5)
+        return super().write(s)
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("log-queue-test")
+    logger.propagate = False
+    yield logger
+    for handler in logger.handlers:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def test_enqueue_handler_writes_records_in_thread_of_listener(logger):
+    stream = _BlockingStream()
+    stream_handler = logging.StreamHandler(stream)
+    stream_handler.addFilter(lambda record: "skipped" not in record.getMessage())
+    queue_handler = enqueue_handler(logger, stream_handler)
+    assert logger.handlers == [queue_handler]
+
+    # terminal which doesn't accept output doesn't block logging thread
+    for i in range(3):
+        logger.warning("line %d", i)
+    logger.warning("skipped")
+    assert stream.getvalue() == ""
+
+    stream.unblocked.set()
+    queue_handler.flush()
+    assert stream.getvalue() == "line 0\nline 1\nline 2\n"
+
+
+def test_closed_handler_writes_queued_records(logger):
+    stream = io.StringIO()
+    queue_handler = enqueue_handler(logger, logging.StreamHandler(stream))
+    logger.warning("last")
+    queue_handler.close()
+    assert stream.getvalue() == "last\n"
+    assert not queue_handler.listener.running
+    queue_handler.flush()  # stopped listener isn't waited for
+
+
+def test_flush_logging_flushes_queue_handlers_of_root_logger(mocker):
+    queue_handler = mocker.Mock(spec=LogQueueHandler)
+    mocker.patch.object(logging.getLogger(), "handlers", [logging.NullHandler(), queue_handler])
+    flush_logging()
+    queue_handler.flush.assert_called_once_with()
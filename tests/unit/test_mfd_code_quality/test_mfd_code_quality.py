@@ -2,73 +2,72 @@
 # SPDX-License-Identifier: MIT
 """Tests for `mfd_code_quality` package."""
 
-from unittest.mock import patch
+from unittest.mock import call, patch
 
 import pytest
 
-from mfd_code_quality.mfd_code_quality import run_all_checks, log_help_info
+from mfd_code_quality.mfd_code_quality import _run_stage_process, log_help_info, run_all_checks, run_stage
 
 
 @pytest.fixture
-def mock_dependencies():
+def mock_dependencies(mocker):
+    mocker.patch("mfd_code_quality.utils.get_run_id")
+    mocker.patch("mfd_code_quality.jobserver.get_jobserver")
     with (
         patch("mfd_code_quality.code_standard.checks._get_available_code_standard_module") as mock_get_module,
         patch("mfd_code_quality.code_standard.configure.create_config_files") as mock_create_config,
         patch("mfd_code_quality.code_standard.configure.delete_config_files") as mock_delete_config,
-        patch("mfd_code_quality.code_standard.checks._run_code_standard_tests") as mock_code_standard_check,
-        patch("mfd_code_quality.testing_utilities.import_tests._run_import_tests") as mock_import_tests_check,
-        patch("mfd_code_quality.testing_utilities.system_tests._run_system_tests") as mock_system_tests_check,
-        patch("mfd_code_quality.testing_utilities.unit_tests._run_unit_tests") as mock_unit_tests_with_coverage_check,
+        patch("mfd_code_quality.mfd_code_quality.run_stage", return_value=True) as mock_run_stage,
     ):
         yield {
             "mock_get_module": mock_get_module,
             "mock_create_config": mock_create_config,
             "mock_delete_config": mock_delete_config,
-            "mock_code_standard_check": mock_code_standard_check,
-            "mock_import_tests_check": mock_import_tests_check,
-            "mock_system_tests_check": mock_system_tests_check,
-            "mock_unit_tests_with_coverage_check": mock_unit_tests_with_coverage_check,
+            "mock_run_stage": mock_run_stage,
         }
 
 
 def test_run_all_checks_with_ruff(mock_dependencies):
     mock_dependencies["mock_get_module"].return_value = "ruff"
-    mock_dependencies["mock_code_standard_check"].return_value = True
-    mock_dependencies["mock_import_tests_check"].return_value = True
-    mock_dependencies["mock_system_tests_check"].return_value = True
-    mock_dependencies["mock_unit_tests_with_coverage_check"].return_value = True
 
     result = run_all_checks()
 
     assert result is True
     mock_dependencies["mock_create_config"].assert_called_once()
     mock_dependencies["mock_delete_config"].assert_called_once()
-    mock_dependencies["mock_code_standard_check"].assert_called_once_with(with_configs=False)
-    mock_dependencies["mock_import_tests_check"].assert_called_once()
-    mock_dependencies["mock_system_tests_check"].assert_called_once()
-    mock_dependencies["mock_unit_tests_with_coverage_check"].assert_called_once_with(
-        compare_coverage=True, with_configs=False
-    )
+    assert mock_dependencies["mock_run_stage"].call_args_list == [
+        call("mfd_code_quality.code_standard.checks:_run_code_standard_tests", with_configs=False),
+        call("mfd_code_quality.testing_utilities.import_tests:_run_import_tests"),
+        call("mfd_code_quality.testing_utilities.system_tests:_run_system_tests"),
+        call(
+            "mfd_code_quality.testing_utilities.unit_tests:_run_unit_tests", compare_coverage=True, with_configs=False
+        ),
+    ]
 
 
 def test_run_all_checks_with_flake8(mock_dependencies):
     mock_dependencies["mock_get_module"].return_value = "flake8"
-    mock_dependencies["mock_code_standard_check"].return_value = True
-    mock_dependencies["mock_import_tests_check"].return_value = True
-    mock_dependencies["mock_system_tests_check"].return_value = True
-    mock_dependencies["mock_unit_tests_with_coverage_check"].return_value = True
+    mock_dependencies["mock_run_stage"].side_effect = [True, False, True, True]
 
     result = run_all_checks()
 
-    assert result is True
+    assert result is False
     mock_dependencies["mock_create_config"].assert_not_called()
     mock_dependencies["mock_delete_config"].assert_not_called()
-    mock_dependencies["mock_code_standard_check"].assert_called_once_with(with_configs=False)
-    mock_dependencies["mock_import_tests_check"].assert_called_once()
-    mock_dependencies["mock_system_tests_check"].assert_called_once()
-    mock_dependencies["mock_unit_tests_with_coverage_check"].assert_called_once_with(
-        compare_coverage=True, with_configs=False
-    )
+    # failure of a stage doesn't stop the others
+    assert mock_dependencies["mock_run_stage"].call_count == 4
+
+
+@pytest.mark.parametrize("path, expected", [("/", True), ("/nonexistent-directory", False)])
+def test_run_stage_in_spawned_process(path, expected):
+    assert run_stage("os.path:isdir", s=path) is expected
+
+
+def test_run_stage_process_exits_with_result(mocker):
+    function = mocker.patch("os.path.isdir", return_value=False)
+    with pytest.raises(SystemExit, match="1"):
+        _run_stage_process("os.path:isdir", {"s": "/"})
+    function.assert_called_once_with(s="/")
 
 
 def test_log_help_info_logs_commands(caplog, mocker):
@@ -0,0 +1,231 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Tests for runner.py."""
+
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from mfd_code_quality.jobserver import JobServer
+from mfd_code_quality.runner import (
+    OutputBuffer,
+    ToolResult,
+    ToolRunner,
+    _ToolSlots,
+    describe_failure,
+    run_tool,
+    set_tool_group_listener,
+)
+
+posix_only = pytest.mark.skipif(not hasattr(os, "wait4"), reason="processes are not waited for with wait4")
+
+
+@pytest.fixture(autouse=True)
+def mock_get_parsed_args(mocker, tmp_path):
+    mocker.patch("mfd_code_quality.utils.get_run_dir", side_effect=lambda stage: tmp_path / "run" / stage)
+    return mocker.patch(
+        "mfd_code_quality.utils.get_parsed_args", return_value=mocker.Mock(tool_timeout=None, tool_output_lines=None)
+    )
+
+
+def _python(code: str) -> tuple[str, ...]:
+    return sys.executable, "-c", code
+
+
+def _is_running(pid: int) -> bool:
+    # process killed with its parent is a zombie until it's reaped by init
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        try:
+            os.kill(pid, 0)
+            with open(f"/proc/{pid}/stat") as stat:
+                if stat.read().rsplit(")", 1)[1].split()[0] == "Z":
+                    return False
+        except (ProcessLookupError, FileNotFoundError):
+            return False
+        time.sleep(0.05)
+    return True
+
+
+def test_run_tool_captures_output(tmp_path):
+    result = run_tool(
+        _python("import os, sys; print(os.getcwd()); print('error', file=sys.stderr); sys.exit(3)"), cwd=tmp_path
+    )
+    assert result.returncode == 3
+    assert result.stdout.strip() == str(tmp_path)
+    assert result.stderr.strip() == "error"
+    assert not result.timed_out and not result.truncated
+
+
+@posix_only
+def test_run_tool_collects_resource_usage():
+    result = run_tool(_python("data = bytearray(64 * 1024 * 1024)"))
+    assert result.rusage.max_rss >= 64 * 1024 * 1024
+    assert result.rusage.user_time + result.rusage.system_time > 0
+
+
+def test_run_tool_streams_lines_through_logger(caplog):
+    stream_logger = logging.getLogger("runner-stream-test")
+    with caplog.at_level(logging.DEBUG, logger="runner-stream-test"):
+        run_tool(
+            _python("import sys; print('first'); print('second', file=sys.stderr); print('last', end='')"),
+            stream_logger=stream_logger,
+            stream_level=logging.DEBUG,
+        )
+    streamed = [record.getMessage() for record in caplog.records if record.name == "runner-stream-test"]
+    assert sorted(streamed) == ["first", "last", "second"]
+
+
+def test_run_tool_spills_older_lines_to_log_file(mock_get_parsed_args, tmp_path):
+    mock_get_parsed_args.return_value.tool_output_lines = 3
+    result = run_tool(_python("for i in range(10): print(i)"))
+    assert result.stdout == "7\n8\n9\n"
+    assert result.truncated
+    (log_path,) = result.log_paths
+    assert log_path.parent == tmp_path / "run" / "tools"
+    assert log_path.name.startswith("python-c-")
+    assert log_path.read_text() == "".join(f"{i}\n" for i in range(10))
+
+
+def test_run_tool_keeps_whole_output_when_requested(mock_get_parsed_args):
+    mock_get_parsed_args.return_value.tool_output_lines = 3
+    result = run_tool(_python("for i in range(10): print(i)"), keep_output=True)
+    assert result.stdout == "".join(f"{i}\n" for i in range(10))
+    assert not result.truncated
+
+
+def test_run_tool_splits_long_lines(caplog):
+    stream_logger = logging.getLogger("runner-stream-test")
+    with caplog.at_level(logging.INFO, logger="runner-stream-test"):
+        result = run_tool(_python("print('x' * (64 * 1024 + 10))"), stream_logger=stream_logger, keep_output=True)
+    assert result.stdout == "x" * (64 * 1024 + 10) + "\n"
+    assert [len(record.getMessage()) for record in caplog.records if record.name == "runner-stream-test"] == [
+        64 * 1024,
+        10,
+    ]
+
+
+def test_describe_failure():
+    result = ToolResult(("ruff", "check"), 1, "a.py:1:1: F401\n", "", 0.1, log_paths=(Path("out.log"),))
+    assert describe_failure(result) == (
+        "'ruff check' failed with exit code 1.\nThe latest lines of output:\na.py:1:1: F401\nWhole output: out.log"
+    )
+    assert describe_failure(ToolResult(("git",), -15, "", "", 1.0, timed_out=True)) == "'git' timed out."
+
+
+@posix_only
+def test_run_tool_kills_tool_and_its_processes_after_timeout(tmp_path):
+    pid_file = tmp_path / "pid"
+    code = (
+        "import subprocess, sys, time, pathlib; "
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)']); "
+        f"pathlib.Path({str(pid_file)!r}).write_text(str(child.pid)); time.sleep(60)"
+    )
+    start = time.monotonic()
+    result = run_tool(_python(code), timeout=1)
+    assert time.monotonic() - start < 30
+    assert result.timed_out
+    assert result.returncode < 0
+    assert not _is_running(int(pid_file.read_text()))
+
+
+def test_run_tool_timeout_is_taken_from_arguments(mock_get_parsed_args):
+    mock_get_parsed_args.return_value.tool_timeout = 0.5
+    assert run_tool(_python("import time; time.sleep(60)")).timed_out
+    assert not run_tool(_python("pass"), timeout=0).timed_out
+
+
+def test_cancelled_tool_is_killed(tmp_path):
+    pid_file = tmp_path / "pid"
+
+    async def run_and_cancel() -> None:
+        code = f"import os, pathlib, time; pathlib.Path({str(pid_file)!r}).write_text(str(os.getpid())); time.sleep(60)"
+        task = asyncio.ensure_future(ToolRunner(1).run(_python(code)))
+        while not pid_file.exists() or not pid_file.read_text():
+            await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run_and_cancel())
+    assert not _is_running(int(pid_file.read_text()))
+
+
+def test_tool_runner_limits_concurrency():
+    async def run_tools(max_concurrency: int) -> float:
+        runner = ToolRunner(max_concurrency)
+        start = time.monotonic()
+        await asyncio.gather(*(runner.run(_python("import time; time.sleep(0.5)")) for _ in range(2)))
+        return time.monotonic() - start
+
+    assert asyncio.run(run_tools(1)) >= 1.0
+
+
+def _run_tools_in_threads(count: int) -> float:
+    threads = [threading.Thread(target=run_tool, args=(_python("import time; time.sleep(0.5)"),)) for _ in range(count)]
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.monotonic() - start
+
+
+@posix_only
+def test_tools_run_by_threads_share_slots_of_jobserver(mocker):
+    jobserver = JobServer.create(2)
+    mocker.patch("mfd_code_quality.jobserver.get_jobserver", return_value=jobserver)
+    try:
+        assert _run_tools_in_threads(3) >= 1.0
+        assert jobserver.acquire(2) == b"+"
+    finally:
+        jobserver.close()
+
+
+def test_tools_run_by_threads_share_budget_of_jobs_without_jobserver(mocker):
+    mocker.patch("mfd_code_quality.jobserver.get_jobserver", return_value=None)
+    mocker.patch("mfd_code_quality.jobserver.get_jobs", return_value=1)
+    mocker.patch("mfd_code_quality.runner._tool_slots", _ToolSlots())
+    assert _run_tools_in_threads(2) >= 1.0
+
+
+def test_run_tool_raises_when_tool_is_missing():
+    with pytest.raises(OSError):
+        run_tool(("mfd-code-quality-missing-tool",))
+
+
+def test_output_buffer(tmp_path):
+    buffer = OutputBuffer(max_lines=2, spill_path=tmp_path / "tool.out.log")
+    for line in (b"a\n", b"b\n"):
+        buffer.append(line)
+    assert not buffer.spilled
+    buffer.append(b"c\n")
+    buffer.close()
+    assert buffer.getvalue() == "b\nc\n"
+    assert buffer.spilled
+    assert (tmp_path / "tool.out.log").read_text() == "a\nb\nc\n"
+
+    without_spill_file = OutputBuffer(max_lines=1)
+    for line in (b"a\n", b"b\n"):
+        without_spill_file.append(line)
+    without_spill_file.close()
+    assert without_spill_file.getvalue() == "b\n"
+    assert not without_spill_file.spilled
+
+
+@posix_only
+def test_tool_group_listener_is_notified_about_running_tools():
+    events = []
+    set_tool_group_listener(lambda group, running: events.append((group, running)))
+    try:
+        result = run_tool(_python("import os; print(os.getpgid(0))"))
+    finally:
+        set_tool_group_listener(None)
+    group = int(result.stdout)
+    assert events == [(group, True), (group, False)]
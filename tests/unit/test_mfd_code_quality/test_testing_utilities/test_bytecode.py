@@ -0,0 +1,102 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.bytecode."""
+
+import contextlib
+import json
+import sys
+from importlib.util import cache_from_source
+from pathlib import Path
+
+import pytest
+
+from mfd_code_quality.testing_utilities.bytecode import (
+    compile_files,
+    find_source_files,
+    get_bytecode_tag,
+    load_compiled_hashes,
+    warm_up_bytecode,
+)
+
+
+@pytest.fixture
+def project(tmp_path, mocker):
+    mocker.patch.object(sys, "dont_write_bytecode", False)
+    mocker.patch("mfd_code_quality.testing_utilities.bytecode.get_norecursedirs", return_value=[".*", "venv"])
+    mocker.patch("mfd_code_quality.testing_utilities.bytecode.job_slots", side_effect=contextlib.nullcontext)
+    for path in [
+        "pkg/__init__.py",
+        "pkg/module.py",
+        "pkg/venv/module.py",
+        "tests/__init__.py",
+        "tests/conftest.py",
+        "tests/helpers.py",
+        "tests/unit/test_module.py",
+    ]:
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("VALUE = 1\n")
+    return tmp_path
+
+
+def _pyc_flags(source: Path) -> int:
+    return int.from_bytes(Path(cache_from_source(source)).read_bytes()[4:8], "little")
+
+
+def test_find_source_files_skips_test_modules_and_ignored_directories(project):
+    assert find_source_files(project, ["pkg"]) == [
+        "pkg/__init__.py",
+        "pkg/module.py",
+        "tests/__init__.py",
+        "tests/helpers.py",
+    ]
+
+
+def test_warm_up_bytecode_writes_checked_hash_based_pycs(project):
+    cache_path = project / "bytecode.json"
+    warm_up_bytecode(project, ["pkg"], cache_path)
+    assert _pyc_flags(project / "pkg" / "module.py") == 0b11  # hash-based, checked
+    assert not Path(cache_from_source(project / "tests" / "unit" / "test_module.py")).exists()
+    content = json.loads(cache_path.read_text())
+    assert content["tag"] == get_bytecode_tag()
+    assert sorted(content["files"]) == ["pkg/__init__.py", "pkg/module.py", "tests/__init__.py", "tests/helpers.py"]
+
+
+def test_warm_up_bytecode_compiles_only_outdated_files(project, mocker):
+    cache_path = project / "bytecode.json"
+    warm_up_bytecode(project, ["pkg"], cache_path)
+    (project / "pkg" / "module.py").write_text("VALUE = 2\n")
+    Path(cache_from_source(project / "tests" / "helpers.py")).unlink()
+    mock_compile_files = mocker.patch("mfd_code_quality.testing_utilities.bytecode.compile_files", return_value=set())
+    warm_up_bytecode(project, ["pkg"], cache_path)
+    mock_compile_files.assert_called_once_with(project, ["pkg/module.py", "tests/helpers.py"])
+
+    warm_up_bytecode(project, ["pkg"], cache_path, no_cache=True)
+    assert len(mock_compile_files.call_args.args[1]) == 4
+
+
+def test_warm_up_bytecode_does_not_store_files_failing_to_compile(project):
+    cache_path = project / "bytecode.json"
+    (project / "pkg" / "module.py").write_text("def broken(:\n")
+    warm_up_bytecode(project, ["pkg"], cache_path)
+    assert "pkg/module.py" not in load_compiled_hashes(cache_path)
+    assert "pkg/__init__.py" in load_compiled_hashes(cache_path)
+
+
+def test_warm_up_bytecode_is_skipped_when_writing_bytecode_is_disabled(project, mocker):
+    mocker.patch.object(sys, "dont_write_bytecode", True)
+    warm_up_bytecode(project, ["pkg"], project / "bytecode.json")
+    assert not (project / "bytecode.json").exists()
+
+
+def test_load_compiled_hashes_ignores_bytecode_of_other_interpreter(tmp_path):
+    cache_path = tmp_path / "bytecode.json"
+    cache_path.write_text(json.dumps({"version": 1, "tag": "other-311-opt0", "files": {"pkg/module.py": "hash"}}))
+    assert load_compiled_hashes(cache_path) == {}
+    assert load_compiled_hashes(tmp_path / "missing.json") == {}
+
+
+def test_compile_files_in_pool_of_processes(project, mocker):
+    mocker.patch("mfd_code_quality.testing_utilities.bytecode.job_slots", return_value=contextlib.nullcontext(2))
+    (project / "pkg" / "module.py").write_text("def broken(:\n")
+    assert compile_files(project, ["pkg/__init__.py", "pkg/module.py"]) == {"pkg/module.py"}
+    assert _pyc_flags(project / "pkg" / "__init__.py") == 0b11
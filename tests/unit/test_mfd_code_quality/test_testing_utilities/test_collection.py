@@ -0,0 +1,158 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.collection."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+from mfd_code_quality.testing_utilities.collection import (
+    CollectionCache,
+    CollectionPlugin,
+    get_collection_args,
+    get_project_norecursedirs,
+    is_norecursedir,
+)
+
+
+@pytest.fixture
+def tests_tree(tmp_path):
+    tests_path = tmp_path / "tests" / "unit"
+    tests_path.mkdir(parents=True)
+    (tests_path / "conftest.py").write_text("import pytest\n")
+    (tests_path / "test_a.py").write_text("def test_one():\n    pass\n\n\ndef test_two():\n    pass\n")
+    (tests_path / "test_b.py").write_text("def test_three():\n    pass\n")
+    return tests_path
+
+
+class TestCollection:
+    def test_get_collection_args(self):
+        args = get_collection_args()
+        assert args[:2] == ["-p", "mfd_code_quality.testing_utilities.collection"]
+        norecursedirs = args[2].removeprefix("--mfd-norecursedirs=").split()
+        assert {".venv", "venv", "site-packages", "__pypackages__", "examples"} <= set(norecursedirs)
+        assert "run_tests.py" not in norecursedirs
+
+    def test_collection_skips_excluded_directories_and_norecursedirs_of_project(self, tmp_path, tests_tree):
+        (tmp_path / "pytest.ini").write_text("[pytest]\nnorecursedirs = slow\n")
+        for directory in ("site-packages", "slow", "fast"):
+            (tests_tree / directory).mkdir()
+            (tests_tree / directory / f"test_{directory.replace('-', '_')}.py").write_text("def test_x():\n    pass\n")
+        collected = subprocess.run(
+            [sys.executable, "-m", "pytest", "--collect-only", "-q", *get_collection_args(), str(tests_tree)],
+            cwd=tmp_path,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            capture_output=True,
+            text=True,
+        ).stdout
+        assert "test_fast.py::test_x" in collected
+        assert "test_site_packages.py" not in collected
+        assert "test_slow.py" not in collected
+
+    def test_from_tree_splits_test_modules_and_helpers(self, tmp_path, tests_tree):
+        (tmp_path / "pyproject.toml").write_text("[project]\n")
+        cache = CollectionCache.from_tree(tmp_path, tests_tree, "env")
+        assert set(cache.test_files) == {"tests/unit/test_a.py", "tests/unit/test_b.py"}
+        assert set(cache.helpers) == {"tests/unit/conftest.py", "pyproject.toml"}
+        assert cache.tests == {}
+        assert cache.count_tests(tmp_path) == 3
+
+    def test_from_tree_skips_excluded_directories(self, tmp_path, tests_tree):
+        for directory in (".venv/lib", "build", "site-packages/pkg"):
+            (tests_tree / directory).mkdir(parents=True)
+            (tests_tree / directory / "test_installed.py").write_text("def test_installed():\n    pass\n")
+        cache = CollectionCache.from_tree(tmp_path, tests_tree, "env")
+        assert set(cache.test_files) == {"tests/unit/test_a.py", "tests/unit/test_b.py"}
+
+    def test_from_tree_skips_norecursedirs_of_project(self, tmp_path, tests_tree):
+        (tmp_path / "pyproject.toml").write_text(
+            '[tool.pytest.ini_options]\nnorecursedirs = ["legacy", "unit/manual*"]\n'
+        )
+        for directory in ("legacy", "manual_checks", "nested/manual_checks"):
+            (tests_tree / directory).mkdir(parents=True)
+            (tests_tree / directory / "test_c.py").write_text("def test_c():\n    pass\n")
+        cache = CollectionCache.from_tree(tmp_path, tests_tree, "env")
+        assert set(cache.test_files) == {
+            "tests/unit/test_a.py",
+            "tests/unit/test_b.py",
+            "tests/unit/nested/manual_checks/test_c.py",
+        }
+
+    @pytest.mark.parametrize(
+        "files, expected",
+        [
+            ({}, None),
+            ({"pyproject.toml": "[project]\n", "setup.cfg": "[tool:pytest]\nnorecursedirs = a b\n"}, ["a", "b"]),
+            ({"pyproject.toml": "[tool.pytest.ini_options]\n", "tox.ini": "[pytest]\nnorecursedirs = a\n"}, None),
+            ({"pytest.ini": "", "tox.ini": "[pytest]\nnorecursedirs = a\n"}, None),
+            ({"pytest.ini": "[pytest]\nnorecursedirs =\n  a\n  'b c'\n"}, ["a", "b c"]),
+            ({"pyproject.toml": '[tool.pytest.ini_options]\nnorecursedirs = "a .*"\n'}, ["a", ".*"]),
+        ],
+    )
+    def test_get_project_norecursedirs(self, tmp_path, files, expected):
+        for name, content in files.items():
+            (tmp_path / name).write_text(content)
+        assert get_project_norecursedirs(tmp_path) == expected
+
+    def test_is_norecursedir(self, tmp_path):
+        assert is_norecursedir(tmp_path / "tests" / "build", ["build"])
+        assert is_norecursedir(tmp_path / "tests" / "manual", ["tests/man*"])
+        assert not is_norecursedir(tmp_path / "other" / "manual", ["tests/man*"])
+        assert not is_norecursedir(tmp_path / "tests", ["build"])
+
+    def test_tests_of_unchanged_modules_are_reused(self, tmp_path, tests_tree):
+        cache = CollectionCache.from_tree(tmp_path, tests_tree, "env")
+        cache.record(
+            tmp_path, [str(tests_tree)], ["tests/unit/test_a.py::test_one[1]", "tests/unit/test_a.py::test_one[2]"]
+        )
+        cache.save(tmp_path / "collection.json")
+
+        (tests_tree / "test_b.py").write_text("def test_three():\n    pass\n\n\ndef test_four():\n    pass\n")
+        cache = CollectionCache.from_tree(
+            tmp_path, tests_tree, "env", CollectionCache.load(tmp_path / "collection.json")
+        )
+        assert cache.tests == {
+            "tests/unit/test_a.py": ["tests/unit/test_a.py::test_one[1]", "tests/unit/test_a.py::test_one[2]"]
+        }
+        # parametrized tests are counted exactly for collected modules, estimated for changed ones
+        assert cache.count_tests(tmp_path) == 4
+
+    @pytest.mark.parametrize("change", ["environment", "conftest"])
+    def test_cache_invalidated(self, tmp_path, tests_tree, change):
+        cache = CollectionCache.from_tree(tmp_path, tests_tree, "env")
+        cache.record(tmp_path, [str(tests_tree)], ["tests/unit/test_a.py::test_one"])
+        cache.save(tmp_path / "collection.json")
+
+        if change == "conftest":
+            (tests_tree / "conftest.py").write_text("import pytest\n\npytest_plugins = ['plugin']\n")
+        environment = "other env" if change == "environment" else "env"
+        previous = CollectionCache.load(tmp_path / "collection.json")
+        assert CollectionCache.from_tree(tmp_path, tests_tree, environment, previous).tests == {}
+
+    def test_load_incompatible(self, tmp_path):
+        assert CollectionCache.load(tmp_path / "collection.json") is None
+        (tmp_path / "collection.json").write_text('{"version": 0}')
+        assert CollectionCache.load(tmp_path / "collection.json") is None
+
+    def test_record_only_whole_collected_modules(self, tmp_path, tests_tree):
+        (tests_tree / "test_c.py").write_text("raise ImportError\n")
+        cache = CollectionCache.from_tree(tmp_path, tests_tree, "env")
+        cache.record(
+            tmp_path,
+            [str(tests_tree / "test_b.py"), "tests/unit/test_a.py::test_one", str(tests_tree / "test_c.py")],
+            ["tests/unit/test_a.py::test_one"],
+            failed=["tests/unit/test_c.py"],
+        )
+        # module without collected tests has no tests
+        assert cache.tests == {"tests/unit/test_b.py": []}
+
+    def test_plugin_gathers_tests_once(self, mocker):
+        plugin = CollectionPlugin()
+        plugin.pytest_collectreport(mocker.Mock(failed=True, nodeid="tests/unit/test_c.py"))
+        plugin.pytest_collectreport(mocker.Mock(failed=False, nodeid="tests/unit/test_a.py"))
+        plugin.pytest_xdist_node_collection_finished(mocker.Mock(), ["tests/unit/test_a.py::test_one"])
+        plugin.pytest_xdist_node_collection_finished(mocker.Mock(), ["tests/unit/test_a.py::test_two"])
+        assert plugin.nodeids == ["tests/unit/test_a.py::test_one"]
+        assert plugin.failed == {"tests/unit/test_c.py"}
@@ -0,0 +1,61 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.durations."""
+
+import pytest
+
+from mfd_code_quality.testing_utilities.durations import DurationPlugin, DurationRegression, DurationStore
+from mfd_code_quality.testing_utilities.scheduling import LongestFirstScheduling, ResourceScheduling
+
+
+@pytest.fixture
+def store(tmp_path):
+    with DurationStore(tmp_path / "durations.sqlite", "unit") as store:
+        yield store
+
+
+class TestDurationStore:
+    def test_expected_durations_are_medians(self, store):
+        for duration in (1.0, 5.0, 2.0):
+            store.record({"test_a": duration, "test_b": duration / 10})
+        assert store.get_expected_durations() == {"test_a": 2.0, "test_b": 0.2}
+
+    def test_history_is_limited(self, mocker, store):
+        mocker.patch("mfd_code_quality.testing_utilities.durations.TEST_DURATION_HISTORY_SIZE", 2)
+        for duration in (1.0, 2.0, 3.0):
+            store.record({"test_a": duration})
+        assert store.get_history() == {"test_a": [2.0, 3.0]}
+
+    def test_suites_are_separated(self, tmp_path, store):
+        store.record({"test_a": 1.0})
+        with DurationStore(tmp_path / "durations.sqlite", "system") as system_store:
+            assert system_store.get_history() == {}
+
+    def test_find_regressions(self, store):
+        for _ in range(3):
+            store.record({"test_slow": 1.0, "test_fast": 0.01, "test_new": 1.0})
+        regressions = store.find_regressions({"test_slow": 3.0, "test_fast": 0.1, "test_unknown": 10.0})
+        # fast test is 10 times slower, but still it's not a significant difference
+        assert regressions == [DurationRegression("test_slow", 1.0, 3.0)]
+
+
+class TestDurationPlugin:
+    def test_durations_of_passed_tests_are_recorded(self, mocker):
+        store = mocker.Mock()
+        store.find_regressions.return_value = []
+        plugin = DurationPlugin(store)
+        for nodeid, duration, passed in (("test_a", 0.5, True), ("test_a", 0.25, True), ("test_b", 1.0, False)):
+            plugin.pytest_runtest_logreport(mocker.Mock(nodeid=nodeid, duration=duration, passed=passed))
+        plugin.pytest_sessionfinish()
+        store.record.assert_called_once_with({"test_a": 0.75})
+
+    def test_scheduler_is_replaced_for_load_distribution_only(self, mocker):
+        config = mocker.Mock(**{"getvalue.return_value": ["2*popen"]})
+        plugin = DurationPlugin(mocker.Mock(**{"get_expected_durations.return_value": {}}))
+        options = {"dist": "load"}
+        config.getoption.side_effect = lambda name, default=None: options.get(name, default)
+        assert isinstance(plugin.pytest_xdist_make_scheduler(config, mocker.Mock()), LongestFirstScheduling)
+        options["mfd_resource_groups"] = "groups.json"
+        assert isinstance(plugin.pytest_xdist_make_scheduler(config, mocker.Mock()), ResourceScheduling)
+        options["dist"] = "loadscope"
+        assert plugin.pytest_xdist_make_scheduler(config, mocker.Mock()) is None
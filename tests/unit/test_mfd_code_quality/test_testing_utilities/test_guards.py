@@ -0,0 +1,198 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.guards."""
+
+import logging
+import threading
+import time
+
+import pytest
+
+from mfd_code_quality.testing_utilities.guards import (
+    MIB,
+    ProcessGuard,
+    SessionGuard,
+    format_thread_stacks,
+    get_guard_args,
+)
+
+
+@pytest.fixture
+def parsed_args(mocker, tmp_path):
+    mocker.patch("mfd_code_quality.testing_utilities.guards.get_run_dir", return_value=tmp_path)
+    args = mocker.patch("mfd_code_quality.testing_utilities.guards.get_parsed_args").return_value
+    args.test_timeout = args.stage_timeout = args.max_worker_rss = None
+    return args
+
+
+def _make_report(nodeid, rss, node=None, when="teardown"):
+    report = pytest.TestReport(nodeid, ("a.py", 1, "test"), {}, "passed", None, when, rss=rss, rss_growth=100 * MIB)
+    if node is not None:
+        report.node = node
+    return report
+
+
+class TestGuards:
+    def test_get_guard_args_defaults(self, parsed_args, tmp_path):
+        assert get_guard_args("unit") == [
+            "-p",
+            "mfd_code_quality.testing_utilities.guards",
+            f"--mfd-dump-dir={tmp_path / 'stack_dumps'}",
+            "--mfd-test-timeout=600",
+            f"--mfd-max-rss={2048 * MIB}",
+        ]
+        assert (tmp_path / "stack_dumps").is_dir()
+
+    def test_get_guard_args_system_tests_have_no_default_timeout(self, parsed_args, tmp_path):
+        assert "--mfd-test-timeout=600" not in get_guard_args("system")
+        parsed_args.test_timeout = 3600
+        assert "--mfd-test-timeout=3600" in get_guard_args("system")
+
+    def test_get_guard_args_configured(self, parsed_args, mocker):
+        mocker.patch("mfd_code_quality.testing_utilities.guards.time.time", return_value=1000.0)
+        parsed_args.test_timeout = 0
+        parsed_args.max_worker_rss = 0
+        parsed_args.stage_timeout = 60
+        assert get_guard_args("system")[3:] == ["--mfd-stage-deadline=1060.0"]
+
+    def test_format_thread_stacks(self):
+        event = threading.Event()
+        thread = threading.Thread(target=event.wait, name="waiting-thread")
+        thread.start()
+        try:
+            stacks = format_thread_stacks(skip_current=True)
+        finally:
+            event.set()
+            thread.join()
+        assert "Thread waiting-thread:" in stacks
+        assert "test_format_thread_stacks" not in stacks
+
+    def test_test_timeout(self, tmp_path, mocker):
+        guard = ProcessGuard("main", tmp_path, test_timeout=0.2)
+        guard.pytest_sessionstart()
+        protocol = guard.pytest_runtest_protocol(mocker.Mock(nodeid="a.py::test"))
+        next(protocol)
+        try:
+            with pytest.raises(pytest.fail.Exception, match="Timeout: test did not finish in 0.2s"):
+                time.sleep(5)
+        finally:
+            with pytest.raises(StopIteration):
+                next(protocol)
+            guard.pytest_sessionfinish()
+
+    def test_stage_timeout_dumps_stacks(self, tmp_path):
+        guard = ProcessGuard("gw1", tmp_path, stage_deadline=time.time())
+        guard.pytest_sessionstart()
+        guard._stage_timer.join(5)
+        guard.pytest_sessionfinish()
+        assert (tmp_path / "gw1.txt").read_text().startswith("Stage timeout in gw1 while running no test:")
+
+    def test_rss_attached_to_teardown_report(self, tmp_path, mocker):
+        mocker.patch("mfd_code_quality.testing_utilities.guards.get_process_rss", side_effect=[100, 250])
+        guard = ProcessGuard("gw0", tmp_path, measure_rss=True)
+        report = mocker.Mock(spec=[])
+        for when in ("setup", "teardown"):
+            hook = guard.pytest_runtest_makereport(mocker.Mock(when=when))
+            next(hook)
+            with pytest.raises(StopIteration):
+                hook.send(mocker.Mock(get_result=lambda: report))
+        assert report.rss == 250
+        assert report.rss_growth == 150
+
+    def test_worker_exceeding_rss_is_replaced(self, tmp_path, mocker, caplog):
+        config = mocker.Mock()
+        dsession = config.pluginmanager.getplugin.return_value
+        dsession.shuttingdown = False
+        dsession._clone_node.return_value.gateway.id = "gw2"
+        guard = SessionGuard(config, tmp_path, max_rss=200 * MIB)
+        node = mocker.Mock()
+        node.gateway.id = "gw1"
+
+        guard.pytest_runtest_logreport(_make_report("a.py::test_small", 100 * MIB, node))
+        node.shutdown.assert_not_called()
+        with caplog.at_level(logging.WARNING):
+            guard.pytest_runtest_logreport(_make_report("a.py::test_leak", 300 * MIB, node))
+            guard.pytest_runtest_logreport(_make_report("a.py::test_next", 300 * MIB, node))
+        node.shutdown.assert_called_once()
+        assert "gw1 RSS 300 MiB exceeds limit of 200 MiB after a.py::test_leak (+100 MiB" in caplog.text
+
+        guard.pytest_testnodedown(node, None)
+        dsession._clone_node.assert_called_once_with(node)
+
+    def test_main_process_exceeding_rss_is_reported_once(self, tmp_path, mocker, caplog):
+        guard = SessionGuard(mocker.Mock(), tmp_path, max_rss=200 * MIB)
+        with caplog.at_level(logging.WARNING):
+            guard.pytest_runtest_logreport(_make_report("a.py::test_leak", 300 * MIB))
+            guard.pytest_runtest_logreport(_make_report("a.py::test_next", 300 * MIB))
+        assert caplog.text.count("exceeds limit") == 1
+
+    def test_stacks_of_crashed_worker_are_logged(self, tmp_path, mocker, caplog):
+        (tmp_path / "gw0.txt").write_text('File "tests/test_a.py", line 7 in test_hang')
+        guard = SessionGuard(mocker.Mock(), tmp_path)
+        node = mocker.Mock()
+        node.gateway.id = "gw0"
+        with caplog.at_level(logging.ERROR):
+            guard.pytest_testnodedown(node, "crashed")
+        assert "Worker gw0 was killed" in caplog.text
+        assert "test_hang" in caplog.text
+
+    def test_stage_timeout_interrupts_run(self, tmp_path, mocker, caplog):
+        mock_pthread_kill = mocker.patch("mfd_code_quality.testing_utilities.guards.signal.pthread_kill")
+        (tmp_path / "main.txt").write_text("Stage timeout in main while running a.py::test_hang")
+        guard = SessionGuard(mocker.Mock(), tmp_path, stage_deadline=time.time() + 60)
+        guard.pytest_runtest_logstart("a.py::test_hang")
+        guard._interrupt()
+        mock_pthread_kill.assert_called_once()
+        with caplog.at_level(logging.ERROR):
+            guard.pytest_sessionfinish()
+        assert guard.timed_out
+        assert "running tests: a.py::test_hang" in caplog.text
+        assert "Stage timeout in main" in caplog.text
+
+    def test_get_guard_args_run_by_api(self, parsed_args, mocker):
+        mocker.patch("mfd_code_quality.testing_utilities.guards.is_run_by_api", return_value=True)
+        assert get_guard_args("unit")[-1] == "--mfd-run-by-api"
+
+    def test_test_timeout_in_process_of_api_caller_is_logged(self, tmp_path, mocker, caplog):
+        mock_dump_later = mocker.patch("mfd_code_quality.testing_utilities.guards.faulthandler.dump_traceback_later")
+        mock_signal = mocker.patch("mfd_code_quality.testing_utilities.guards.signal.signal")
+        mock_setitimer = mocker.patch("mfd_code_quality.testing_utilities.guards.signal.setitimer")
+        guard = ProcessGuard("main", tmp_path, test_timeout=0.1, owns_process=False)
+        guard.pytest_sessionstart()
+        protocol = guard.pytest_runtest_protocol(mocker.Mock(nodeid="a.py::test_hang"))
+        with caplog.at_level(logging.ERROR):
+            next(protocol)
+            guard._test_timer.join(5)
+            with pytest.raises(StopIteration):
+                next(protocol)
+        guard.pytest_sessionfinish()
+        mock_dump_later.assert_not_called()
+        mock_signal.assert_not_called()
+        mock_setitimer.assert_not_called()
+        assert "Test a.py::test_hang did not finish in 0.1s" in caplog.text
+
+    def test_worker_run_by_api_exits_after_stage_timeout(self, tmp_path, mocker):
+        mocker.patch("mfd_code_quality.testing_utilities.guards.STAGE_TIMEOUT_DUMP_DELAY", 0)
+        mocker.patch("mfd_code_quality.testing_utilities.guards.STAGE_TIMEOUT_GRACE", 0)
+        exited = threading.Event()
+        mock_exit = mocker.patch(
+            "mfd_code_quality.testing_utilities.guards.os._exit", side_effect=lambda code: exited.set()
+        )
+        guard = ProcessGuard("gw0", tmp_path, stage_deadline=time.time(), exit_on_stage_timeout=True)
+        guard.pytest_sessionstart()
+        assert exited.wait(5)
+        guard.pytest_sessionfinish()
+        mock_exit.assert_called_once()
+
+    def test_stage_timeout_stops_run_of_api_caller_without_signals(self, tmp_path, mocker):
+        mock_pthread_kill = mocker.patch("mfd_code_quality.testing_utilities.guards.signal.pthread_kill")
+        config = mocker.Mock()
+        session = mocker.Mock(shouldstop=False)
+        guard = SessionGuard(config, tmp_path, interrupt_main=False)
+        guard.pytest_sessionstart(session)
+        guard._interrupt()
+        mock_pthread_kill.assert_not_called()
+        assert not guard._timers
+        assert session.shouldstop == "Stage timeout"
+        assert config.pluginmanager.getplugin.return_value.shouldstop == "Stage timeout"
+        assert guard.timed_out
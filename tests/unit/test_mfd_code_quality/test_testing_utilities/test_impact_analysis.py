@@ -0,0 +1,139 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.impact_analysis."""
+
+import hashlib
+
+import pytest
+from coverage import CoverageData
+
+from mfd_code_quality.testing_utilities.impact_analysis import (
+    IMPORT_TIME_CONTEXT,
+    ImpactIndex,
+    SourceFile,
+    TestSelection,
+    hash_test_files,
+    map_lines,
+    select_affected_tests,
+    update_impact_index,
+)
+
+SOURCE = "def add(a, b):\n    return a + b\n\n\ndef sub(a, b):\n    return a - b\n"
+TEST_ADD = "tests/unit/test_calc.py::test_add"
+TEST_SUB = "tests/unit/test_calc.py::test_sub"
+TEST_OTHER = "tests/unit/test_other.py::test_other"
+
+
+@pytest.fixture
+def project(tmp_path):
+    (tmp_path / "pkg").mkdir()
+    (tmp_path / "pkg" / "calc.py").write_text(SOURCE)
+    tests_path = tmp_path / "tests" / "unit"
+    tests_path.mkdir(parents=True)
+    (tests_path / "conftest.py").write_text("")
+    (tests_path / "test_calc.py").write_text("def test_add(): ...\ndef test_sub(): ...\n")
+    (tests_path / "test_other.py").write_text("def test_other(): ...\n")
+    return tmp_path
+
+
+@pytest.fixture
+def index(project):
+    coverage = {
+        1: {IMPORT_TIME_CONTEXT},
+        2: {TEST_ADD, TEST_OTHER},
+        5: {IMPORT_TIME_CONTEXT},
+        6: {TEST_SUB},
+    }
+    sources = {"pkg/calc.py": SourceFile(hashlib.sha256(SOURCE.encode()).hexdigest(), SOURCE, coverage)}
+    return ImpactIndex(sources, hash_test_files(project, project / "tests" / "unit"), set(), environment="env")
+
+
+class TestImpactAnalysis:
+    def test_map_lines(self):
+        mapping, changed = map_lines("a\nb\nc\nd\n", "a\nx\nc\nnew\nd\n")
+        assert mapping == {0: 0, 1: 1, 3: 3, 4: 5}
+        assert changed == {2, 3, 4}
+
+    def test_select_nothing_changed(self, project, index):
+        selection = index.select(project, hash_test_files(project, project / "tests" / "unit"))
+        assert selection.full_run is False
+        assert selection.tests == []
+        assert selection.carried_over["pkg/calc.py"][2] == {TEST_ADD, TEST_OTHER}
+
+    def test_select_changed_function(self, project, index):
+        (project / "pkg" / "calc.py").write_text(SOURCE.replace("a - b", "b - a"))
+        selection = index.select(project, hash_test_files(project, project / "tests" / "unit"))
+        assert selection.tests == [TEST_SUB]
+        # coverage of rerun test is not carried over
+        assert selection.carried_over["pkg/calc.py"] == {
+            1: {IMPORT_TIME_CONTEXT},
+            2: {TEST_ADD, TEST_OTHER},
+            5: {IMPORT_TIME_CONTEXT},
+        }
+
+    def test_select_inserted_lines(self, project, index):
+        (project / "pkg" / "calc.py").write_text(SOURCE.replace("a + b\n", "a + b\n    unreachable = True\n"))
+        selection = index.select(project, hash_test_files(project, project / "tests" / "unit"))
+        assert selection.tests == [TEST_ADD, TEST_OTHER]
+        # lines below the inserted one are shifted
+        assert selection.carried_over["pkg/calc.py"] == {
+            1: {IMPORT_TIME_CONTEXT},
+            6: {IMPORT_TIME_CONTEXT},
+            7: {TEST_SUB},
+        }
+
+    def test_select_changed_module_level_code(self, project, index):
+        (project / "pkg" / "calc.py").write_text(SOURCE.replace("def sub(a, b)", "def sub(a, b=1)"))
+        selection = index.select(project, hash_test_files(project, project / "tests" / "unit"))
+        assert selection.tests == [TEST_ADD, TEST_SUB, TEST_OTHER]
+
+    def test_select_changed_test_file_and_failed_tests(self, project, index):
+        index.failed = {TEST_OTHER}
+        (project / "tests" / "unit" / "test_calc.py").write_text("def test_add(): ...\n")
+        selection = index.select(project, hash_test_files(project, project / "tests" / "unit"))
+        assert selection.tests == ["tests/unit/test_calc.py", TEST_OTHER]
+        assert selection.carried_over["pkg/calc.py"] == {1: {IMPORT_TIME_CONTEXT}, 5: {IMPORT_TIME_CONTEXT}}
+
+    def test_select_changed_test_helper(self, project, index):
+        (project / "tests" / "unit" / "conftest.py").write_text("import pytest\n")
+        selection = index.select(project, hash_test_files(project, project / "tests" / "unit"))
+        assert selection.full_run is True
+        assert "conftest.py" in selection.reason
+
+    def test_select_removed_source(self, project, index):
+        (project / "pkg" / "calc.py").unlink()
+        selection = index.select(project, hash_test_files(project, project / "tests" / "unit"))
+        assert selection.tests == [TEST_ADD, TEST_SUB, TEST_OTHER]
+
+    def test_save_and_load(self, tmp_path, index):
+        index.failed = {TEST_SUB}
+        index.save(tmp_path / "index.json")
+        loaded = ImpactIndex.load(tmp_path / "index.json")
+        assert loaded.sources == index.sources
+        assert loaded.test_files == index.test_files
+        assert loaded.failed == {TEST_SUB}
+        assert loaded.environment == "env"
+
+    def test_select_affected_tests_full_run(self, project, index, tmp_path):
+        tests_path = project / "tests" / "unit"
+        assert select_affected_tests(project, tests_path, tmp_path, "env").reason == "no test impact index"
+        index.save(tmp_path / "test_impact.json")
+        assert select_affected_tests(project, tests_path, tmp_path, "other").full_run is True
+        assert select_affected_tests(project, tests_path, tmp_path, "env", no_cache=True).full_run is True
+        assert select_affected_tests(project, tests_path, tmp_path, "env").full_run is False
+
+    def test_update_impact_index_carries_over_coverage(self, project, tmp_path):
+        cache_dir = tmp_path / "cache"
+        cache_dir.mkdir()
+        data = CoverageData(basename=str(tmp_path / ".coverage"))
+        data.set_context(f"{TEST_SUB}|run")
+        data.add_lines({str(project / "pkg" / "calc.py"): {6}})
+        selection = TestSelection(
+            full_run=False, reason="", tests=[TEST_SUB], carried_over={"pkg/calc.py": {2: {TEST_ADD}, 5: {""}}}
+        )
+        update_impact_index(project, project / "tests" / "unit", cache_dir, "env", selection, data, {TEST_SUB})
+
+        index = ImpactIndex.load(cache_dir / "test_impact.json")
+        assert index.sources["pkg/calc.py"].coverage == {2: {TEST_ADD}, 5: {""}, 6: {TEST_SUB}}
+        assert index.failed == {TEST_SUB}
+        assert data.lines(str(project / "pkg" / "calc.py")) == [2, 5, 6]
@@ -0,0 +1,83 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.import_audit."""
+
+import sys
+import threading
+import types
+from importlib import import_module
+
+import pytest
+
+from mfd_code_quality.testing_utilities.import_audit import (
+    ImportSideEffectAuditor,
+    SideEffect,
+    check_side_effects,
+)
+from mfd_code_quality.testing_utilities.import_profiling import ImportProfiler
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    package = tmp_path / "audited_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (tmp_path / "large.bin").write_bytes(b"0" * (2 * 1024 * 1024))
+    (package / "noisy.py").write_text(
+        "import time\n" "time.sleep(0)\n" f"with open({str(tmp_path / 'large.bin')!r}, 'rb') as f:\n" "    pass\n"
+    )
+    (package / "quiet.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package
+    for name in [name for name in sys.modules if name.startswith("audited_pkg")]:
+        del sys.modules[name]
+
+
+class TestImportSideEffectAuditor:
+    def test_records_side_effects_of_executed_module(self, project):
+        with ImportProfiler() as profiler, ImportSideEffectAuditor(profiler) as auditor:
+            import_module("audited_pkg.quiet")
+            assert auditor.side_effects == []
+            import_module("audited_pkg.noisy")
+
+        events = [(side_effect.module, side_effect.event) for side_effect in auditor.side_effects]
+        assert ("audited_pkg.noisy", "open") in events
+        if sys.version_info >= (3, 13):  # time.sleep audit event is not raised by older versions
+            assert ("audited_pkg.noisy", "time.sleep") in events
+
+    def test_events_outside_of_imports_are_ignored(self, tmp_path):
+        with ImportProfiler() as profiler, ImportSideEffectAuditor(profiler) as auditor:
+            (tmp_path / "file").write_bytes(b"0" * (2 * 1024 * 1024))
+            with open(tmp_path / "file", "rb"):
+                pass
+        assert auditor.side_effects == []
+
+    def test_events_of_other_threads_are_ignored(self, project, monkeypatch):
+        sync = types.ModuleType("audited_sync")
+        sync.importing, sync.opened = threading.Event(), threading.Event()
+        monkeypatch.setitem(sys.modules, "audited_sync", sync)
+        (project / "waiting.py").write_text(
+            "import audited_sync\naudited_sync.importing.set()\naudited_sync.opened.wait(5)\n"
+        )
+
+        def open_large_file() -> None:
+            sync.importing.wait(5)
+            with open(project.parent / "large.bin", "rb"):
+                pass
+            sync.opened.set()
+
+        thread = threading.Thread(target=open_large_file)
+        with ImportProfiler() as profiler, ImportSideEffectAuditor(profiler) as auditor:
+            thread.start()
+            import_module("audited_pkg.waiting")
+            thread.join()
+        assert sync.opened.is_set()
+        assert auditor.side_effects == []
+
+
+def test_check_side_effects(caplog):
+    side_effects = [SideEffect("pkg.mod", "subprocess.Popen", "['ls']")]
+    assert check_side_effects("pkg.mod", [], strict=True) is True
+    assert check_side_effects("pkg.mod", side_effects, strict=False) is True
+    assert "subprocess.Popen(['ls']) in pkg.mod" in caplog.text
+    assert check_side_effects("pkg.mod", side_effects, strict=True) is False
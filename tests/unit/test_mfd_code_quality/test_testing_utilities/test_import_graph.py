@@ -0,0 +1,61 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.import_graph."""
+
+import pytest
+
+from mfd_code_quality.testing_utilities.import_graph import ImportGraph
+
+
+@pytest.fixture
+def project(tmp_path):
+    package = tmp_path / "pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "base.py").write_text("import os\n")
+    (package / "middle.py").write_text("from .base import something\n")
+    (package / "top.py").write_text("from pkg import middle\n")
+    (package / "other.py").write_text("")
+    module_paths = {
+        "pkg": package / "__init__.py",
+        **{f"pkg.{name}": package / f"{name}.py" for name in ("base", "middle", "top", "other")},
+    }
+    return tmp_path, module_paths
+
+
+class TestImportGraph:
+    def test_build(self, project):
+        root_dir, module_paths = project
+        graph = ImportGraph.build(root_dir, module_paths)
+
+        assert graph.nodes["pkg.top"].imports == ["pkg", "pkg.middle"]
+        assert graph.nodes["pkg.top"].path == "pkg/top.py"
+        assert graph.dependencies("pkg.top") == {"pkg", "pkg.middle", "pkg.base"}
+        assert graph.dependencies("pkg.top", transitive=False) == {"pkg", "pkg.middle"}
+        assert graph.reverse_dependencies("pkg.base") == {"pkg.middle", "pkg.top"}
+        assert graph.reverse_dependencies_of_file(root_dir / "pkg" / "middle.py", root_dir) == {"pkg.top"}
+
+    def test_verified_modules_are_invalidated_by_changed_dependencies(self, project, tmp_path):
+        root_dir, module_paths = project
+        graph = ImportGraph.build(root_dir, module_paths)
+        for module in graph.nodes:
+            graph.mark_verified(module)
+        graph.environment = "env"
+        graph.save(tmp_path / "graph.json")
+
+        (root_dir / "pkg" / "base.py").write_text("import sys\n")
+        previous = ImportGraph.load(tmp_path / "graph.json")
+        graph = ImportGraph.build(root_dir, module_paths)
+        graph.inherit_verified(previous)
+
+        assert previous.environment == "env"
+        assert {module for module in graph.nodes if not graph.is_verified(module)} == {
+            "pkg.base",
+            "pkg.middle",
+            "pkg.top",
+        }
+
+    def test_load_missing_or_incompatible_file(self, tmp_path):
+        assert ImportGraph.load(tmp_path / "missing.json") is None
+        (tmp_path / "graph.json").write_text('{"version": 0}')
+        assert ImportGraph.load(tmp_path / "graph.json") is None
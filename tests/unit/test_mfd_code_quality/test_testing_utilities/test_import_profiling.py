@@ -0,0 +1,94 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.import_profiling."""
+
+import sys
+import textwrap
+import threading
+import tracemalloc
+from importlib import import_module
+
+import pytest
+
+from mfd_code_quality.testing_utilities.import_profiling import ImportProfiler, ImportRecord
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    package = tmp_path / "profiled_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "leaf.py").write_text("DATA = [str(i) for i in range(10000)]\n")
+    (package / "root.py").write_text(textwrap.dedent("from profiled_pkg import leaf  # noqa\n"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield package
+    for name in [name for name in sys.modules if name.startswith("profiled_pkg")]:
+        del sys.modules[name]
+
+
+class TestImportProfiler:
+    def test_records_nested_imports(self, project):
+        with ImportProfiler(measure_memory=True) as profiler:
+            import_module("profiled_pkg.root")
+
+        records = {record.name: record for record in profiler.iter_records()}
+        root = records["profiled_pkg.root"]
+        assert [child.name for child in root.children] == ["profiled_pkg.leaf"]
+        assert root.cumulative_time >= root.children[0].cumulative_time
+        assert root.self_time == pytest.approx(root.cumulative_time - root.children[0].cumulative_time)
+        assert records["profiled_pkg.leaf"].cumulative_memory > 0
+        assert profiler not in sys.meta_path
+
+    def test_times_are_measured_without_tracemalloc(self, project):
+        with ImportProfiler() as profiler:
+            assert not tracemalloc.is_tracing()
+            import_module("profiled_pkg.leaf")
+        record = next(record for record in profiler.iter_records() if record.name == "profiled_pkg.leaf")
+        assert record.cumulative_time > 0
+        assert record.cumulative_memory == 0
+
+    def test_imports_of_other_threads_are_not_measured(self, project):
+        with ImportProfiler() as profiler:
+            thread = threading.Thread(target=import_module, args=("profiled_pkg.root",))
+            thread.start()
+            thread.join()
+            assert profiler.current_module is None
+        assert "profiled_pkg.root" in sys.modules
+        assert profiler.roots == []
+
+    def test_restores_original_loader(self, project):
+        with ImportProfiler():
+            module = import_module("profiled_pkg.leaf")
+
+        assert type(module.__loader__).__name__ == "SourceFileLoader"
+        assert type(module.__spec__.loader).__name__ == "SourceFileLoader"
+
+    def test_is_within_budget(self, caplog):
+        profiler = ImportProfiler()
+        profiler.roots = [
+            ImportRecord("pkg.slow", cumulative_time=2.0, children=[ImportRecord("numpy", cumulative_time=1.5)])
+        ]
+
+        assert profiler.is_within_budget(["pkg"], total_budget=3, module_budget=2.5) is True
+        assert profiler.is_within_budget(["pkg"], total_budget=1) is False
+        assert profiler.is_within_budget(["pkg"], module_budget=1.9) is False
+        assert "pkg.slow" in caplog.text
+        # third-party modules are not checked against module budget
+        assert profiler.is_within_budget(["pkg"], module_budget=2.0) is True
+
+    def test_log_report_lists_heaviest_transitive_imports(self, caplog):
+        caplog.set_level("INFO")
+        profiler = ImportProfiler()
+        profiler.roots = [
+            ImportRecord(
+                "pkg.slow",
+                cumulative_time=2.0,
+                self_time=0.1,
+                children=[ImportRecord("numpy", cumulative_time=1.9, self_time=1.9)],
+            )
+        ]
+
+        profiler.log_report(["pkg"])
+
+        assert "pkg.slow" in caplog.text
+        assert "-> numpy" in caplog.text
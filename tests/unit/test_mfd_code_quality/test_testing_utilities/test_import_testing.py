@@ -25,6 +25,37 @@ def mock_get_parsed_args():
         yield mock_func
 
 
+@pytest.fixture(autouse=True)
+def mock_import_tests_args():
+    with mock.patch("mfd_code_quality.testing_utilities.import_tests.get_parsed_args") as mock_func:
+        mock_func.return_value = mock.Mock(
+            import_time_budget=None,
+            module_import_time_budget=None,
+            no_cache=False,
+            strict_import_side_effects=False,
+            warm_up_bytecode=False,
+        )
+        yield mock_func
+
+
+@pytest.fixture(autouse=True)
+def mock_import_graph(tmp_path):
+    with (
+        mock.patch("mfd_code_quality.testing_utilities.import_tests.ImportGraph") as mock_class,
+        mock.patch("mfd_code_quality.testing_utilities.import_tests.get_cache_dir", return_value=tmp_path),
+        mock.patch("mfd_code_quality.testing_utilities.import_tests.get_environment_fingerprint", return_value="env"),
+    ):
+        mock_class.build.return_value.is_verified.return_value = False
+        yield mock_class
+
+
+@pytest.fixture(autouse=True)
+def mock_static_import_checker():
+    with mock.patch("mfd_code_quality.testing_utilities.import_tests.StaticImportChecker") as mock_class:
+        mock_class.return_value.check.return_value = []
+        yield mock_class
+
+
 def test_run_import_tests_successful_import(mock_import_module, mock_glob, mocker):
     mocker.patch("mfd_code_quality.testing_utilities.import_tests.find_packages", return_value=["mfd-code-quality"])
     mocker.patch("mfd_code_quality.testing_utilities.import_tests.get_root_dir")
@@ -81,3 +112,151 @@ def test_run_checks_exits_with_one_on_failure(mocker):
     with mock.patch("sys.exit") as mock_exit:
         run_checks()
         mock_exit.assert_called_once_with(1)
+
+
+def test_run_import_tests_fails_when_budget_exceeded(mock_import_module, mock_glob, mocker, mock_import_tests_args):
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.find_packages", return_value=["mfd"])
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.get_root_dir")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_up_logging")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_cwd")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.os.listdir", return_value=["aaa"])
+    mock_profiler = mocker.patch("mfd_code_quality.testing_utilities.import_tests.ImportProfiler")
+    mock_profiler.return_value.__enter__.return_value.is_within_budget.return_value = False
+    mock_import_tests_args.return_value = mock.Mock(
+        import_time_budget=0.1, module_import_time_budget=None, no_cache=False
+    )
+    from mfd_code_quality.testing_utilities.import_tests import _run_import_tests
+
+    mock_glob.return_value = ["module1.py"]
+    assert _run_import_tests() is False
+    mock_profiler.return_value.__enter__.return_value.is_within_budget.assert_called_once_with(
+        {"mfd"}, total_budget=0.1, module_budget=None
+    )
+
+
+def test_run_import_tests_skips_execution_of_statically_broken_module(
+    mock_import_module, mock_glob, mocker, mock_static_import_checker
+):
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.find_packages", return_value=["mfd"])
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.get_root_dir")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_up_logging")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_cwd")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.os.listdir", return_value=["aaa"])
+    from mfd_code_quality.testing_utilities.import_tests import _run_import_tests
+    from mfd_code_quality.testing_utilities.static_imports import UnresolvedImport
+
+    mock_glob.return_value = ["module1.py", "module2.py"]
+    mock_static_import_checker.return_value.check.side_effect = [
+        [UnresolvedImport("mfd.module1", 1, "missing", "no module named 'missing'")],
+        [],
+    ]
+    assert _run_import_tests() is False
+    mock_import_module.assert_called_once_with("mfd.module2")
+
+
+def test_berta_imports_are_not_reported_statically():
+    from mfd_code_quality.testing_utilities.import_tests import _is_berta_import
+    from mfd_code_quality.testing_utilities.static_imports import UnresolvedImport
+
+    unresolved = UnresolvedImport("mfd_berta_wrappers.x", 1, "wrappers.buildinstallers", "no module named 'wrappers'")
+    assert _is_berta_import("mfd_berta_wrappers.x", unresolved) is True
+    assert _is_berta_import("mfd_connect.x", unresolved) is False
+
+
+def test_run_import_tests_skips_unchanged_modules(mock_import_module, mock_glob, mocker, mock_import_graph):
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.find_packages", return_value=["mfd"])
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.get_root_dir")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_up_logging")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_cwd")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.os.listdir", return_value=["aaa"])
+    from mfd_code_quality.testing_utilities.import_tests import _get_import_graph_environment, _run_import_tests
+
+    graph = mock_import_graph.build.return_value
+    mock_import_graph.load.return_value.environment = _get_import_graph_environment()
+    graph.is_verified.side_effect = lambda module: module == "mfd"
+    mock_glob.return_value = ["__init__.py", "module.py"]
+
+    assert _run_import_tests() is True
+    mock_import_module.assert_called_once_with("mfd.module")
+    graph.inherit_verified.assert_called_once_with(mock_import_graph.load.return_value)
+    graph.mark_verified.assert_called_once_with("mfd.module")
+    graph.save.assert_called_once()
+
+
+def test_run_import_tests_warms_up_bytecode(mock_import_module, mock_glob, mocker, mock_import_tests_args, tmp_path):
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.find_packages", return_value=["mfd", "mfd.sub"])
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.get_root_dir", return_value=tmp_path)
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_up_logging")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_cwd")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.os.listdir", return_value=["aaa"])
+    mock_warm_up = mocker.patch("mfd_code_quality.testing_utilities.import_tests.warm_up_bytecode")
+    from mfd_code_quality.testing_utilities.import_tests import _run_import_tests
+
+    mock_import_tests_args.return_value.warm_up_bytecode = True
+    mock_glob.return_value = []
+    assert _run_import_tests() is True
+    mock_warm_up.assert_called_once_with(tmp_path, ["mfd"], tmp_path / "bytecode.json", False)
+
+
+def test_import_graph_environment_depends_on_module_budget_and_strictness(mock_import_tests_args):
+    from mfd_code_quality.testing_utilities.import_tests import _get_import_graph_environment
+
+    environment = _get_import_graph_environment()
+    mock_import_tests_args.return_value.strict_import_side_effects = True
+    strict_environment = _get_import_graph_environment()
+    mock_import_tests_args.return_value.module_import_time_budget = 0.5
+    assert len({environment, strict_environment, _get_import_graph_environment()}) == 3
+
+
+def test_run_import_tests_does_not_verify_modules_over_budget(
+    mock_import_module, mock_glob, mocker, mock_import_graph, mock_import_tests_args
+):
+    from mfd_code_quality.testing_utilities.import_profiling import ImportRecord
+
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.find_packages", return_value=["mfd"])
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.get_root_dir")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_up_logging")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_cwd")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.os.listdir", return_value=["aaa"])
+    mock_profiler = mocker.patch("mfd_code_quality.testing_utilities.import_tests.ImportProfiler")
+    profiler = mock_profiler.return_value.__enter__.return_value
+    profiler.roots = []
+    slow = ImportRecord("mfd.slow", cumulative_time=1)
+
+    def import_module(name: str) -> None:
+        profiler.roots.extend(
+            {
+                "mfd.fast": [ImportRecord("mfd.fast")],
+                "mfd.importer": [ImportRecord("mfd.importer", cumulative_time=1, children=[slow])],
+            }.get(name, [])
+        )
+
+    mock_import_module.side_effect = import_module
+    profiler.is_within_budget.return_value = False
+    profiler.iter_over_budget.return_value = [slow]
+    mock_import_tests_args.return_value.module_import_time_budget = 0.5
+    from mfd_code_quality.testing_utilities.import_tests import _run_import_tests
+
+    mock_glob.return_value = ["fast.py", "importer.py", "slow.py"]
+    assert _run_import_tests() is False
+    graph = mock_import_graph.build.return_value
+    graph.mark_verified.assert_called_once_with("mfd.fast")
+    graph.save.assert_called_once()
+
+
+def test_run_import_tests_imports_all_modules_with_total_budget(
+    mock_import_module, mock_glob, mocker, mock_import_graph, mock_import_tests_args
+):
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.find_packages", return_value=["mfd"])
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.get_root_dir")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_up_logging")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.set_cwd")
+    mocker.patch("mfd_code_quality.testing_utilities.import_tests.os.listdir", return_value=["aaa"])
+    mock_import_tests_args.return_value.import_time_budget = 10
+    from mfd_code_quality.testing_utilities.import_tests import _get_import_graph_environment, _run_import_tests
+
+    mock_import_graph.load.return_value.environment = _get_import_graph_environment()
+    mock_glob.return_value = ["module.py"]
+    assert _run_import_tests() is True
+    mock_import_graph.build.return_value.inherit_verified.assert_not_called()
+    mock_import_module.assert_called_once_with("mfd.module")
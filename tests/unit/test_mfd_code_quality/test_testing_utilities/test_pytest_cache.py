@@ -0,0 +1,42 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.pytest_cache."""
+
+import json
+
+import pytest
+
+from mfd_code_quality.testing_utilities.pytest_cache import get_pytest_cache_dir, read_failed_tests
+
+
+@pytest.fixture
+def cache_dir(mocker, tmp_path):
+    mocker.patch("mfd_code_quality.testing_utilities.pytest_cache.get_cache_dir", return_value=tmp_path)
+    mocker.patch("mfd_code_quality.testing_utilities.pytest_cache.get_parsed_args").return_value.no_cache = False
+    return tmp_path
+
+
+class TestPytestCache:
+    def test_cache_is_kept_in_the_same_environment(self, mocker, cache_dir):
+        mocker.patch("mfd_code_quality.testing_utilities.pytest_cache.get_environment_fingerprint", return_value="a")
+        pytest_cache_dir = get_pytest_cache_dir("unit")
+        (pytest_cache_dir / "v").mkdir()
+        assert get_pytest_cache_dir("unit") == cache_dir / "pytest_cache_unit"
+        assert (pytest_cache_dir / "v").exists()
+
+    def test_cache_is_cleared_when_environment_changed(self, mocker, cache_dir):
+        fingerprint = mocker.patch(
+            "mfd_code_quality.testing_utilities.pytest_cache.get_environment_fingerprint", return_value="a"
+        )
+        pytest_cache_dir = get_pytest_cache_dir("unit")
+        (pytest_cache_dir / "v").mkdir()
+        fingerprint.return_value = "b"
+        get_pytest_cache_dir("unit")
+        assert not (pytest_cache_dir / "v").exists()
+        assert (pytest_cache_dir / "environment").read_text() == "b"
+
+    def test_read_failed_tests(self, tmp_path):
+        assert read_failed_tests(tmp_path) == set()
+        (tmp_path / "v" / "cache").mkdir(parents=True)
+        (tmp_path / "v" / "cache" / "lastfailed").write_text(json.dumps({"tests/test_a.py::test_a": True}))
+        assert read_failed_tests(tmp_path) == {"tests/test_a.py::test_a"}
@@ -0,0 +1,107 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.resources."""
+
+import json
+import os
+import subprocess
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+from mfd_code_quality.testing_utilities.resources import (
+    Resources,
+    get_conflict_groups,
+    get_resources,
+    get_resources_args,
+    pytest_collection_modifyitems,
+    uses_resources,
+)
+
+
+def _resources(*exclusive, shared=()):
+    return Resources(frozenset(exclusive), frozenset(shared))
+
+
+def _marker(*args, **kwargs):
+    return Mock(args=args, kwargs=kwargs)
+
+
+def _make_item(mocker, nodeid, markers):
+    item = mocker.Mock(nodeid=nodeid)
+    item.iter_markers.return_value = markers
+    return item
+
+
+class TestResources:
+    def test_get_resources(self, mocker):
+        markers = [_marker("port:80", shared="ftp"), _marker("dir")]
+        assert get_resources(_make_item(mocker, "a", markers)) == _resources("port:80", "dir", shared={"ftp"})
+        assert get_resources(_make_item(mocker, "a", [_marker()])) == _resources()
+        assert get_resources(_make_item(mocker, "a", [])) is None
+
+    def test_get_conflict_groups(self):
+        groups = get_conflict_groups(
+            {
+                "test_1": _resources("port:80"),
+                "test_2": _resources(shared={"ftp"}),
+                "test_3": _resources(shared={"ftp"}),
+                "test_4": _resources("dir", shared={"port:80"}),
+                "test_5": _resources(),
+                "test_6": _resources("ftp"),
+                "test_7": _resources("dir"),
+            }
+        )
+        # exclusive holder of ftp joins shared holders, port:80 and dir join test_1, test_4 and test_7
+        assert groups == {
+            "test_1": "test_1",
+            "test_2": "test_2",
+            "test_3": "test_2",
+            "test_4": "test_1",
+            "test_5": "test_5",
+            "test_6": "test_2",
+            "test_7": "test_1",
+        }
+
+    def test_tests_without_resources_conflict_with_all(self):
+        assert get_conflict_groups({"test_1": _resources(), "test_2": None}) == {"test_1": "", "test_2": ""}
+
+    def test_uses_resources(self, tmp_path):
+        (tmp_path / "test_a.py").write_text("def test_a(): ...\n")
+        assert not uses_resources(tmp_path)
+        (tmp_path / "conftest.py").write_text("pytestmark = pytest.mark.mfd_resources('port:80')\n")
+        assert uses_resources(tmp_path)
+
+    def test_groups_written_by_first_worker_only(self, mocker, tmp_path):
+        config = mocker.Mock(workerinput={"workerid": "gw1"})
+        config.getoption.side_effect = {
+            "mfd_resource_groups": str(tmp_path / "groups.json"),
+            "mfd_resources_selection": None,
+        }.get
+        items = [_make_item(mocker, "test_1", [_marker("port:80")])]
+        pytest_collection_modifyitems(config, items)
+        assert not (tmp_path / "groups.json").exists()
+
+        config.workerinput = {"workerid": "gw0"}
+        pytest_collection_modifyitems(config, items)
+        assert json.loads((tmp_path / "groups.json").read_text()) == {"test_1": "test_1"}
+
+    @pytest.mark.parametrize("declaring, expected", [(True, "test_b"), (False, "test_c")])
+    def test_selection_keeps_markers_expression_of_project(self, tmp_path, declaring, expected):
+        (tmp_path / "pytest.ini").write_text('[pytest]\naddopts = -m "not slow"\nmarkers = slow\n')
+        (tmp_path / "test_a.py").write_text(
+            "import pytest\n\n\n"
+            "@pytest.mark.slow\n@pytest.mark.mfd_resources('port:80')\ndef test_a(): ...\n\n\n"
+            "@pytest.mark.mfd_resources('port:81')\ndef test_b(): ...\n\n\n"
+            "@pytest.mark.slow\ndef test_slow(): ...\n\n\n"
+            "def test_c(): ...\n"
+        )
+        collected = subprocess.run(
+            [sys.executable, "-m", "pytest", "--collect-only", "-q", *get_resources_args(declaring=declaring)],
+            cwd=tmp_path,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+            capture_output=True,
+            text=True,
+        ).stdout
+        assert [line for line in collected.splitlines() if "::" in line] == [f"test_a.py::{expected}"]
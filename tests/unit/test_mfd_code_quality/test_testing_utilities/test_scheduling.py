@@ -0,0 +1,91 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.scheduling."""
+
+import json
+
+import pytest
+
+from mfd_code_quality.testing_utilities.scheduling import LongestFirstScheduling, ResourceScheduling
+
+COLLECTION = ["test_1", "test_2", "test_3", "test_4", "test_5", "test_6"]
+DURATIONS = {"test_1": 0.1, "test_2": 5.0, "test_3": 1.0, "test_4": 3.0, "test_5": 0.1}
+
+
+@pytest.fixture
+def config(mocker):
+    config = mocker.Mock()
+    config.getvalue.return_value = ["2*popen"]
+    config.getoption.return_value = None
+    return config
+
+
+@pytest.fixture
+def nodes(mocker):
+    return [mocker.Mock(shutting_down=False), mocker.Mock(shutting_down=False)]
+
+
+def _sent_tests(node):
+    return [COLLECTION[index] for call in node.send_runtest_some.call_args_list for index in call.args[0]]
+
+
+class TestLongestFirstScheduling:
+    def test_longest_tests_are_sent_first(self, config, nodes):
+        scheduler = LongestFirstScheduling(config, durations=DURATIONS, prioritized={"test_5"})
+        for node in nodes:
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, COLLECTION)
+        scheduler.schedule()
+
+        # previously failed test first, then the longest ones, unknown test is assumed to take an average time
+        # the longest tests are spread across workers, each worker has one test queued
+        assert _sent_tests(nodes[0]) == ["test_5", "test_4"]
+        assert _sent_tests(nodes[1]) == ["test_2", "test_6"]
+        assert [scheduler.collection[index] for index in scheduler.pending] == ["test_3", "test_1"]
+
+        scheduler.mark_test_complete(nodes[0], COLLECTION.index("test_5"))
+        assert _sent_tests(nodes[0]) == ["test_5", "test_4", "test_3"]
+
+    def test_short_tests_are_sent_in_batches(self, config, nodes):
+        scheduler = LongestFirstScheduling(config, durations=dict.fromkeys(COLLECTION, 0.1))
+        for node in nodes:
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, COLLECTION)
+        scheduler.schedule()
+        assert _sent_tests(nodes[0]) == ["test_1", "test_3", "test_4", "test_5", "test_6"]
+        assert _sent_tests(nodes[1]) == ["test_2"]
+
+    def test_workers_are_shut_down_when_nothing_is_pending(self, config, nodes):
+        scheduler = LongestFirstScheduling(config, durations=DURATIONS)
+        for node in nodes:
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, COLLECTION[:2])
+        scheduler.schedule()
+        assert _sent_tests(nodes[0]) == ["test_2"]
+        assert _sent_tests(nodes[1]) == ["test_1"]
+        for node in nodes:
+            node.shutdown.assert_called()
+
+
+class TestResourceScheduling:
+    def test_conflicting_tests_are_sent_to_single_worker(self, config, nodes, tmp_path):
+        groups = {"test_1": "test_1", "test_2": "test_2", "test_3": "test_1", "test_4": "test_4", "test_5": "test_1"}
+        (tmp_path / "groups.json").write_text(json.dumps(groups))
+        scheduler = ResourceScheduling(config, durations=DURATIONS, groups_path=tmp_path / "groups.json")
+        for node in nodes:
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, COLLECTION)
+        scheduler.schedule()
+
+        # the longest unit first, then the longest remaining units to fill workers
+        assert _sent_tests(nodes[0]) == ["test_2", "test_6"]
+        assert _sent_tests(nodes[1]) == ["test_4", "test_1", "test_3", "test_5"]
+
+    def test_all_tests_on_single_worker_without_groups(self, config, nodes, tmp_path):
+        scheduler = ResourceScheduling(config, durations=DURATIONS, groups_path=tmp_path / "missing.json")
+        for node in nodes:
+            scheduler.add_node(node)
+            scheduler.add_node_collection(node, COLLECTION)
+        scheduler.schedule()
+        assert _sent_tests(nodes[0]) == COLLECTION
+        nodes[1].shutdown.assert_called()
@@ -0,0 +1,71 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.sharding."""
+
+import json
+
+from mfd_code_quality.testing_utilities.collection import CollectionCache
+from mfd_code_quality.testing_utilities.sharding import assign_shards, get_file_durations, select_shard
+
+TEST_FILES = [f"tests/unit/test_{index}.py" for index in range(20)]
+
+
+def _make_collection(tests=None):
+    return CollectionCache("env", {"tests/unit/conftest.py": "h"}, dict.fromkeys(TEST_FILES, "h"), tests)
+
+
+class TestSharding:
+    def test_assign_shards_by_hash(self):
+        assignment = assign_shards(TEST_FILES, 3)
+        assert set(assignment.values()) == {0, 1, 2}
+        # split of a module doesn't depend on other test modules
+        assert assign_shards(TEST_FILES[:5], 3) == {path: assignment[path] for path in TEST_FILES[:5]}
+
+    def test_assign_shards_by_durations(self):
+        durations = {"a": 4.0, "b": 3.0, "c": 2.0, "d": 2.0, "e": 1.0, "new": 2.4}
+        assignment = assign_shards(["e", "d", "c", "b", "a", "new"], 2, durations)
+        # longest first to the least loaded shard
+        assert assignment == {"a": 0, "b": 1, "new": 1, "c": 0, "d": 1, "e": 0}
+
+    def test_get_file_durations(self, tmp_path):
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "test_new.py").write_text("def test_old():\n    pass\n\n\ndef test_new():\n    pass\n")
+        collection = CollectionCache(
+            "env",
+            {},
+            {"tests/test_cached.py": "h", "tests/test_new.py": "h"},
+            {"tests/test_cached.py": ["tests/test_cached.py::test[1]", "tests/test_cached.py::test[2]"]},
+        )
+        durations = {"tests/test_cached.py::test[1]": 5.0, "tests/test_new.py::test_old": 1.0}
+        assert get_file_durations(tmp_path, collection, durations) == {
+            # tests without history take an average time
+            "tests/test_cached.py": 8.0,
+            "tests/test_new.py": 4.0,
+        }
+        assert get_file_durations(tmp_path, collection, {}) == {}
+
+    def test_shards_cover_all_modules_exactly_once(self, tmp_path):
+        selected = {}
+        manifests = []
+        for index in (1, 2, 3):
+            manifest_path = tmp_path / f"manifest_{index}.json"
+            selected[index] = select_shard(tmp_path, _make_collection(), (index, 3), {}, manifest_path)
+            manifests.append(json.loads(manifest_path.read_text()))
+        assert sorted(path for paths in selected.values() for path in paths) == sorted(TEST_FILES)
+        assert len({manifest["collection"] for manifest in manifests}) == 1
+        assert len({manifest["assignment"] for manifest in manifests}) == 1
+
+    def test_manifest(self, tmp_path):
+        tests = {path: [f"{path}::test_{index}" for index in range(2)] for path in TEST_FILES}
+        durations = {nodeid: float(index) for index, nodeid in enumerate(sorted(tests))}
+        selected = select_shard(tmp_path, _make_collection(tests), (2, 2), durations, tmp_path / "manifest.json")
+        manifest = json.loads((tmp_path / "manifest.json").read_text())
+        assert manifest["index"] == 2
+        assert manifest["count"] == 2
+        assert manifest["tests"] == 2 * len(selected) == 20
+        assert manifest["root_dir"] == str(tmp_path)
+
+        other = _make_collection(tests)
+        other.helpers = {"tests/unit/conftest.py": "changed"}
+        select_shard(tmp_path, other, (1, 2), durations, tmp_path / "other.json")
+        assert json.loads((tmp_path / "other.json").read_text())["collection"] != manifest["collection"]
@@ -0,0 +1,103 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.static_imports."""
+
+import ast
+import textwrap
+
+import pytest
+
+from mfd_code_quality.testing_utilities.static_imports import StaticImportChecker, iter_import_statements
+
+
+@pytest.fixture
+def project(tmp_path):
+    package = tmp_path / "static_pkg"
+    (package / "sub").mkdir(parents=True)
+    (package / "__init__.py").write_text("from .base import Base\n")
+    (package / "base.py").write_text("class Base:\n    pass\n")
+    (package / "sub" / "__init__.py").write_text("")
+    return tmp_path
+
+
+def _write(project, name, content):
+    path = project / "static_pkg" / name
+    path.write_text(textwrap.dedent(content))
+    return path
+
+
+class TestStaticImportChecker:
+    def test_clean_module(self, project):
+        path = _write(
+            project,
+            "clean.py",
+            """\
+            import os
+            import logging.handlers
+            from pathlib import Path
+            from static_pkg.base import Base
+            from . import base
+            """,
+        )
+        checker = StaticImportChecker(project, ["static_pkg", "static_pkg.sub"])
+        assert checker.check("static_pkg.clean", path) == []
+
+    def test_unresolvable_imports(self, project):
+        path = _write(
+            project,
+            "broken.py",
+            """\
+            import not_installed_module_xyz
+            from static_pkg.missing import Something
+            from .base import NotDefined
+            """,
+        )
+        checker = StaticImportChecker(project, ["static_pkg", "static_pkg.sub"])
+        unresolved = checker.check("static_pkg.broken", path)
+        assert [item.lineno for item in unresolved] == [1, 2, 3]
+        assert "no module named 'not_installed_module_xyz'" in str(unresolved[0])
+
+    def test_conditional_and_nested_imports_are_ignored(self, project):
+        path = _write(
+            project,
+            "optional.py",
+            """\
+            import contextlib
+            import sys
+            from contextlib import suppress
+            try:
+                import not_installed_module_xyz
+            except ImportError:
+                pass
+            with contextlib.suppress(ImportError):
+                import suppressed_module_xyz
+            with suppress(ImportError), open(__file__):
+                import another_suppressed_module_xyz
+            if sys.platform == "win32":
+                import winreg_like_module_xyz
+
+            def func():
+                import another_missing_module_xyz
+            """,
+        )
+        checker = StaticImportChecker(project, ["static_pkg", "static_pkg.sub"])
+        assert checker.check("static_pkg.optional", path) == []
+
+    def test_syntax_error(self, project):
+        path = _write(project, "invalid.py", "def (:\n")
+        checker = StaticImportChecker(project, ["static_pkg", "static_pkg.sub"])
+        assert "syntax error" in str(checker.check("static_pkg.invalid", path)[0])
+
+
+@pytest.mark.parametrize(
+    "source, module_name, is_package, expected",
+    [
+        ("from . import a", "pkg.mod", False, "pkg"),
+        ("from .a import b", "pkg.sub", True, "pkg.sub.a"),
+        ("from ..a import b", "pkg.sub.mod", False, "pkg.a"),
+        ("from ... import a", "pkg.mod", False, None),
+    ],
+)
+def test_relative_imports_are_resolved(source, module_name, is_package, expected):
+    statements = list(iter_import_statements(ast.parse(source), module_name, is_package))
+    assert [statement.module for statement in statements] == ([expected] if expected else [])
@@ -2,11 +2,12 @@
 # SPDX-License-Identifier: MIT
 """Test testing_utilities.system_tests."""
 
+import contextlib
 from unittest import mock
 
 import pytest
 
-from mfd_code_quality.testing_utilities.system_tests import run_checks
+from mfd_code_quality.testing_utilities.system_tests import _run_system_tests, run_checks
 
 
 @pytest.fixture
@@ -27,3 +28,71 @@ def test_run_checks_exits_with_one_on_failure(mock_run_system_tests):
     with mock.patch("sys.exit") as mock_exit:
         run_checks()
         mock_exit.assert_called_once_with(1)
+
+
+@pytest.fixture
+def system_tests(mocker, tmp_path):
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.set_up_logging")
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.set_cwd")
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.get_root_dir", return_value=tmp_path)
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.get_pytest_cache_dir", return_value=tmp_path / "c")
+    mocker.patch("mfd_code_quality.testing_utilities.pytest_cache.get_parsed_args").return_value.fail_fast = True
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.get_parsed_args").return_value.fail_fast = True
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.get_cache_dir", return_value=tmp_path)
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.get_run_dir", return_value=tmp_path / "run")
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.get_guard_args", return_value=["--mfd-guards"])
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.get_collection_args", return_value=["--mfd-dirs"])
+    mocker.patch("mfd_code_quality.testing_utilities.system_tests.get_xdist_worker_count", return_value=4)
+    mocker.patch(
+        "mfd_code_quality.testing_utilities.system_tests.reserve_xdist_workers", side_effect=contextlib.nullcontext
+    )
+    (tmp_path / "tests" / "system").mkdir(parents=True)
+    return mocker.patch("mfd_code_quality.testing_utilities.system_tests.pytest.main", return_value=0)
+
+
+def test_run_system_tests_failed_first(system_tests, mocker, tmp_path):
+    assert _run_system_tests() is True
+    system_tests.assert_called_once_with(
+        args=[
+            "-n 0",
+            "-p",
+            "mfd_code_quality.testing_utilities.resources",
+            "-o",
+            f"cache_dir={tmp_path / 'c'}",
+            "--failed-first",
+            "--exitfirst",
+            "--mfd-guards",
+            "--mfd-dirs",
+            str(tmp_path / "tests" / "system"),
+        ],
+        plugins=[mocker.ANY],
+    )
+
+
+def test_run_system_tests_declaring_resources_in_parallel(system_tests, tmp_path):
+    (tmp_path / "tests" / "system" / "test_a.py").write_text(
+        "@pytest.mark.mfd_resources('port:80')\ndef test_a(): ...\n"
+    )
+    system_tests.side_effect = [pytest.ExitCode.OK, pytest.ExitCode.NO_TESTS_COLLECTED]
+    assert _run_system_tests() is True
+    parallel, serial = (call.kwargs["args"] for call in system_tests.call_args_list)
+    assert parallel[:5] == [
+        "-n 4",
+        "-p",
+        "mfd_code_quality.testing_utilities.resources",
+        f"--mfd-resource-groups={tmp_path / 'run' / 'resource_groups.json'}",
+        "--mfd-resources-selection=declaring",
+    ]
+    assert serial[:4] == [
+        "-n 0",
+        "-p",
+        "mfd_code_quality.testing_utilities.resources",
+        "--mfd-resources-selection=other",
+    ]
+
+
+def test_run_system_tests_stops_after_failure_with_fail_fast(system_tests, tmp_path):
+    (tmp_path / "tests" / "system" / "test_a.py").write_text("@pytest.mark.mfd_resources()\ndef test_a(): ...\n")
+    system_tests.return_value = pytest.ExitCode.TESTS_FAILED
+    assert _run_system_tests() is False
+    system_tests.assert_called_once()
@@ -2,18 +2,40 @@
 # SPDX-License-Identifier: MIT
 """Test testing_utilities.unit_tests."""
 
+import contextlib
 import sys
 
 import pytest
-from unittest.mock import patch
+from unittest.mock import ANY, patch
 
 from coverage.exceptions import NoDataError
 
+from mfd_code_quality.testing_utilities.impact_analysis import TestSelection
 from mfd_code_quality.testing_utilities.unit_tests import _run_unit_tests, run_unit_tests, run_unit_tests_with_coverage
 
 
 @pytest.fixture
-def mock_dependencies():
+def mock_caches(mocker, tmp_path):
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.get_cache_dir")
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.get_run_dir", return_value=tmp_path)
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.publish_artifacts")
+    mocker.patch(
+        "mfd_code_quality.testing_utilities.unit_tests.reserve_xdist_workers", side_effect=contextlib.nullcontext
+    )
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.get_environment_fingerprint", return_value="env")
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.read_failed_tests", return_value=set())
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.get_pytest_cache_dir")
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.get_pytest_cache_args", return_value=["--ff"])
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.get_guard_args", return_value=[])
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.get_collection_args", return_value=[])
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.CollectionCache")
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.CoverageData")
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.DurationStore")
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.DurationPlugin", return_value="duration_plugin")
+
+
+@pytest.fixture
+def mock_dependencies(mock_caches):
     with (
         patch("mfd_code_quality.testing_utilities.unit_tests.set_up_logging") as mock_set_up_logging,
         patch("mfd_code_quality.testing_utilities.unit_tests.set_cwd") as mock_set_cwd,
@@ -25,8 +47,20 @@ def mock_dependencies():
             "mfd_code_quality.testing_utilities.unit_tests.is_diff_coverage_threshold_reached"
         ) as mock_is_diff_coverage_threshold_reached,
         patch("mfd_code_quality.testing_utilities.unit_tests.pytest.main") as mock_pytest_main,
-        patch("mfd_code_quality.testing_utilities.unit_tests.get_package_name") as mock_get_package_name,
+        patch("mfd_code_quality.testing_utilities.unit_tests.get_package_names") as mock_get_package_names,
+        patch("mfd_code_quality.testing_utilities.unit_tests.get_xdist_worker_count", return_value=5),
+        patch("mfd_code_quality.testing_utilities.unit_tests.get_parsed_args") as mock_get_parsed_args,
+        patch("mfd_code_quality.testing_utilities.unit_tests.write_coverage_reports") as mock_write_coverage_reports,
+        patch(
+            "mfd_code_quality.testing_utilities.unit_tests.select_affected_tests",
+            return_value=TestSelection(full_run=True, reason="no test impact index"),
+        ) as mock_select_affected_tests,
+        patch("mfd_code_quality.testing_utilities.unit_tests.update_impact_index") as mock_update_impact_index,
     ):
+        mock_get_parsed_args.return_value.coverage_report = None
+        mock_get_parsed_args.return_value.fail_fast = False
+        mock_get_parsed_args.return_value.shard = None
+        mock_get_parsed_args.return_value.warm_up_bytecode = False
         yield {
             "mock_set_up_logging": mock_set_up_logging,
             "mock_set_cwd": mock_set_cwd,
@@ -36,18 +70,22 @@ def mock_dependencies():
             "mock_log_module_coverage": mock_log_module_coverage,
             "mock_is_diff_coverage_threshold_reached": mock_is_diff_coverage_threshold_reached,
             "mock_pytest_main": mock_pytest_main,
-            "mock_get_package_name": mock_get_package_name,
+            "mock_get_package_names": mock_get_package_names,
+            "mock_get_parsed_args": mock_get_parsed_args,
+            "mock_write_coverage_reports": mock_write_coverage_reports,
+            "mock_select_affected_tests": mock_select_affected_tests,
+            "mock_update_impact_index": mock_update_impact_index,
         }
 
 
 def test_run_unit_tests_successfully(mock_dependencies):
-    mock_dependencies["mock_get_package_name"].return_value = "test_package"
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
     mock_dependencies["mock_pytest_main"].return_value = 0  # Simulate pytest success
     assert _run_unit_tests(compare_coverage=False, with_configs=False) is True
 
 
 def test_run_unit_tests_with_coverage_with_configs_successfully(mock_dependencies, mocker):
-    mock_dependencies["mock_get_package_name"].return_value = "test_package"
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
     mock_dependencies[
         "mock_get_root_dir"
     ].return_value.__truediv__.return_value.__truediv__.return_value = "root_dir/tests/unit"
@@ -58,12 +96,31 @@ def test_run_unit_tests_with_coverage_with_configs_successfully(mock_dependencie
     mocker.patch("mfd_code_quality.testing_utilities.unit_tests.delete_config_files")
     assert _run_unit_tests(compare_coverage=True, with_configs=True) is True
     mock_dependencies["mock_pytest_main"].assert_called_once_with(
-        args=["-n 5", "--cov=test_package", "root_dir/tests/unit"]
+        args=["-n 5", "--cov=test_package", "--cov-report=", "--cov-context=test", "--ff", "root_dir/tests/unit"],
+        plugins=["duration_plugin", ANY],
     )
+    # coverage is collected only by pytest-cov, data is loaded afterwards
+    mock_dependencies["mock_Coverage"].return_value.collect.assert_not_called()
+    mock_dependencies["mock_Coverage"].return_value.start.assert_not_called()
+    mock_dependencies["mock_Coverage"].return_value.load.assert_called_once()
+
+
+def test_run_unit_tests_warms_up_bytecode(mock_dependencies, mocker):
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_get_parsed_args"].return_value.warm_up_bytecode = True
+    mock_dependencies["mock_get_parsed_args"].return_value.no_cache = False
+    mock_dependencies["mock_pytest_main"].return_value = 0
+    mock_warm_up = mocker.patch("mfd_code_quality.testing_utilities.unit_tests.warm_up_bytecode")
+    assert _run_unit_tests(compare_coverage=False, with_configs=False) is True
+    mock_warm_up.assert_called_once_with(
+        mock_dependencies["mock_get_root_dir"].return_value, ["test_package"], ANY, False
+    )
+    mock_dependencies["mock_pytest_main"].assert_called_once()
 
 
 def test_run_unit_tests_with_coverage_successfully(mock_dependencies):
-    mock_dependencies["mock_get_package_name"].return_value = "test_package"
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
     mock_dependencies[
         "mock_get_root_dir"
     ].return_value.__truediv__.return_value.__truediv__.return_value = "root_dir/tests/unit"
@@ -73,19 +130,96 @@ def test_run_unit_tests_with_coverage_successfully(mock_dependencies):
 
     assert _run_unit_tests(compare_coverage=True, with_configs=False) is True
     mock_dependencies["mock_pytest_main"].assert_called_once_with(
-        args=["-n 5", "--cov=test_package", "root_dir/tests/unit"]
+        args=["-n 5", "--cov=test_package", "--cov-report=", "--cov-context=test", "--ff", "root_dir/tests/unit"],
+        plugins=["duration_plugin", ANY],
+    )
+    mock_dependencies["mock_update_impact_index"].assert_called_once()
+
+
+def test_run_unit_tests_with_coverage_runs_affected_tests_only(mock_dependencies):
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_pytest_main"].return_value = 0
+    mock_dependencies["mock_is_diff_coverage_threshold_reached"].return_value = True
+    mock_dependencies["mock_select_affected_tests"].return_value = TestSelection(
+        full_run=False, reason="1 affected test(s)", tests=["tests/unit/test_a.py::test_a"]
+    )
+    assert _run_unit_tests(compare_coverage=True, with_configs=False) is True
+    mock_dependencies["mock_pytest_main"].assert_called_once_with(
+        args=[
+            "-n 5",
+            "--cov=test_package",
+            "--cov-report=",
+            "--cov-context=test",
+            "--ff",
+            "tests/unit/test_a.py::test_a",
+        ],
+        plugins=["duration_plugin", ANY],
     )
 
 
+def test_run_unit_tests_with_coverage_no_affected_tests(mock_dependencies):
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_is_diff_coverage_threshold_reached"].return_value = True
+    mock_dependencies["mock_select_affected_tests"].return_value = TestSelection(full_run=False, reason="no changes")
+    assert _run_unit_tests(compare_coverage=True, with_configs=False) is True
+    mock_dependencies["mock_pytest_main"].assert_not_called()
+    mock_dependencies["mock_update_impact_index"].assert_called_once()
+
+
+def test_run_unit_tests_without_coverage_runs_all_tests(mock_dependencies):
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_pytest_main"].return_value = 0
+    assert _run_unit_tests(compare_coverage=False, with_configs=False) is True
+    mock_dependencies["mock_select_affected_tests"].assert_not_called()
+    mock_dependencies["mock_update_impact_index"].assert_not_called()
+
+
 def test_run_unit_tests_with_coverage_threshold_not_met(mock_dependencies):
     mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
-    mock_dependencies["mock_get_package_name"].return_value = "test_package"
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
     mock_dependencies["mock_is_diff_coverage_threshold_reached"].return_value = False
     assert _run_unit_tests(compare_coverage=True, with_configs=False) is False
 
 
+def test_run_unit_tests_writes_requested_reports_only(mock_dependencies, tmp_path):
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_pytest_main"].return_value = 0
+    mock_dependencies["mock_get_parsed_args"].return_value.coverage_report = ["xml"]
+    assert _run_unit_tests(compare_coverage=False, with_configs=False) is True
+    cov = mock_dependencies["mock_Coverage"].return_value
+    mock_dependencies["mock_write_coverage_reports"].assert_called_once_with(cov, ["xml"], tmp_path)
+    cov.json_report.assert_not_called()
+    # reports are written to directory of the run and published to the root directory
+    publish_artifacts = sys.modules[_run_unit_tests.__module__].publish_artifacts
+    publish_artifacts.assert_called_once_with(
+        tmp_path, [".coverage", "coverage.xml"], mock_dependencies["mock_get_root_dir"].return_value
+    )
+
+
+def test_run_unit_tests_measures_all_packages(mock_dependencies):
+    mock_dependencies["mock_get_package_names"].return_value = ["pkg_a", "pkg_b"]
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_pytest_main"].return_value = 0
+    assert _run_unit_tests(compare_coverage=False, with_configs=False) is True
+    assert mock_dependencies["mock_pytest_main"].call_args.kwargs["args"][1:3] == ["--cov=pkg_a", "--cov=pkg_b"]
+    assert mock_dependencies["mock_Coverage"].call_args.kwargs["source_pkgs"] == ["pkg_a", "pkg_b"]
+
+
+def test_run_unit_tests_empty_coverage_data(mock_dependencies):
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_pytest_main"].return_value = 0
+    mock_dependencies["mock_Coverage"].return_value.get_data.return_value.measured_files.return_value = set()
+    assert _run_unit_tests(compare_coverage=True, with_configs=False) is True
+    mock_dependencies["mock_is_diff_coverage_threshold_reached"].assert_not_called()
+
+
 def test_run_unit_tests_no_coverage_data(mock_dependencies):
-    mock_dependencies["mock_get_package_name"].return_value = "test_package"
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
     mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
     mock_dependencies["mock_pytest_main"].return_value = 0
     mock_dependencies["mock_Coverage"].return_value.load.side_effect = NoDataError
@@ -94,7 +228,7 @@ def test_run_unit_tests_no_coverage_data(mock_dependencies):
 
 def test_run_unit_tests_failed_no_coverage_data(mock_dependencies):
     mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
-    mock_dependencies["mock_get_package_name"].return_value = "test_package"
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
     mock_dependencies["mock_pytest_main"].return_value = 1  # Simulate pytest failure
     mock_dependencies["mock_Coverage"].return_value.load.side_effect = NoDataError
     assert _run_unit_tests(compare_coverage=False, with_configs=False) is False
@@ -126,3 +260,41 @@ def test_run_unit_tests_with_coverage_function_failure(mocker, mock_dependencies
     mock_dependencies["mock_pytest_main"].return_value = 1  # Simulate pytest failure
     run_unit_tests_with_coverage(with_configs=False)
     sys.exit.assert_called_once_with(1)
+
+
+def test_run_unit_tests_fail_fast_keeps_impact_index(mock_dependencies):
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_get_parsed_args"].return_value.fail_fast = True
+    mock_dependencies["mock_pytest_main"].return_value = pytest.ExitCode.TESTS_FAILED
+    assert _run_unit_tests(compare_coverage=True, with_configs=False) is False
+    mock_dependencies["mock_update_impact_index"].assert_not_called()
+
+
+def test_run_unit_tests_with_coverage_shard(mock_dependencies, mocker):
+    mock_dependencies["mock_get_package_names"].return_value = ["test_package"]
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_get_parsed_args"].return_value.shard = (1, 2)
+    mock_dependencies["mock_get_parsed_args"].return_value.no_cache = True
+    mock_dependencies["mock_pytest_main"].return_value = 0
+    mock_select_shard = mocker.patch(
+        "mfd_code_quality.testing_utilities.unit_tests.select_shard", return_value=["tests/unit/test_a.py"]
+    )
+    assert _run_unit_tests(compare_coverage=True, with_configs=False) is True
+    mock_select_shard.assert_called_once()
+    assert mock_select_shard.call_args.args[2:4] == ((1, 2), {})
+    # shard collects only its own test modules
+    root_dir = mock_dependencies["mock_get_root_dir"].return_value
+    assert mock_dependencies["mock_pytest_main"].call_args.kwargs["args"][-1] == str(root_dir / "tests/unit/test_a.py")
+    # impact analysis and diff coverage are left to mfd-coverage-combine
+    mock_dependencies["mock_select_affected_tests"].assert_not_called()
+    mock_dependencies["mock_update_impact_index"].assert_not_called()
+    mock_dependencies["mock_is_diff_coverage_threshold_reached"].assert_not_called()
+
+
+def test_run_unit_tests_shard_without_test_modules(mock_dependencies, mocker):
+    mock_dependencies["mock_get_root_dir"].return_value.__truediv__.return_value.exists.return_value = False
+    mock_dependencies["mock_get_parsed_args"].return_value.shard = (3, 3)
+    mocker.patch("mfd_code_quality.testing_utilities.unit_tests.select_shard", return_value=[])
+    assert _run_unit_tests(compare_coverage=False, with_configs=False) is True
+    mock_dependencies["mock_pytest_main"].assert_not_called()
@@ -0,0 +1,54 @@
+# Copyright (C) 2025 Intel Corporation
+# SPDX-License-Identifier: MIT
+"""Test testing_utilities.workers."""
+
+import pytest
+
+from mfd_code_quality.testing_utilities.consts import XDIST_MIN_TESTS_PER_WORKER, XDIST_WORKER_MEMORY
+from mfd_code_quality.testing_utilities.workers import count_tests, get_xdist_worker_count
+
+
+@pytest.fixture
+def mock_resources(mocker):
+    mocker.patch("mfd_code_quality.testing_utilities.workers.get_parsed_args", return_value=mocker.Mock(workers=None))
+    cpu = mocker.patch("mfd_code_quality.testing_utilities.workers.get_jobs", return_value=8)
+    memory = mocker.patch(
+        "mfd_code_quality.testing_utilities.workers.get_available_memory", return_value=64 * XDIST_WORKER_MEMORY
+    )
+    return cpu, memory
+
+
+def test_count_tests(tmp_path):
+    (tmp_path / "sub").mkdir()
+    (tmp_path / "test_a.py").write_text("def test_a():\n    pass\n\nclass TestB:\n    async def test_b(self):\n")
+    (tmp_path / "sub" / "b_test.py").write_text("def test_c():\n    pass\ndef helper():\n    pass\n")
+    (tmp_path / "conftest.py").write_text("def test_not_collected():\n    pass\n")
+    assert count_tests(tmp_path) == 3
+
+
+@pytest.mark.parametrize(
+    "cpus, memory_workers, test_count, expected",
+    [
+        (8, 64, None, 8),
+        (2, 64, None, 2),
+        (8, 3, None, 3),
+        (64, 64, 10 * XDIST_MIN_TESTS_PER_WORKER, 10),
+        (8, 64, XDIST_MIN_TESTS_PER_WORKER, 0),
+        (1, 64, None, 0),
+    ],
+)
+def test_get_xdist_worker_count(mock_resources, cpus, memory_workers, test_count, expected):
+    mock_cpu, mock_memory = mock_resources
+    mock_cpu.return_value = cpus
+    mock_memory.return_value = memory_workers * XDIST_WORKER_MEMORY
+    assert get_xdist_worker_count(test_count) == expected
+
+
+def test_get_xdist_worker_count_unknown_memory(mock_resources):
+    mock_resources[1].return_value = None
+    assert get_xdist_worker_count() == 8
+
+
+def test_get_xdist_worker_count_overridden(mock_resources, mocker):
+    mocker.patch("mfd_code_quality.testing_utilities.workers.get_parsed_args", return_value=mocker.Mock(workers=3))
+    assert get_xdist_worker_count(1) == 3
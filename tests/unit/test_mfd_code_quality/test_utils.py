@@ -3,19 +3,35 @@
 """Tests for utils.py."""
 
 import logging
+import os
 
-from unittest.mock import patch, MagicMock
+import pytest
+from unittest.mock import ANY, patch, MagicMock
 from mfd_code_quality.utils import (
     CustomFilter,
     set_up_basic_config,
+    _parse_command_line_args,
     get_parsed_args,
     get_root_dir,
     set_cwd,
     _install_packages,
+    get_cache_dir,
+    get_environment_fingerprint,
+    get_available_cpu_count,
+    get_available_memory,
+    parse_shard,
+    get_package_name,
+    get_package_names,
+    get_run_id,
+    get_run_dir,
+    publish_artifacts,
+    write_file_atomically,
 )
-from argparse import Namespace
+from argparse import ArgumentTypeError, Namespace
 from pathlib import Path
 
+from mfd_code_quality.runner import ToolResult
+
 
 def test_check_if_log_message_is_from_module(mocker):
     mocker.patch("mfd_code_quality.utils.logging.Filter.filter", return_value=True)
@@ -36,7 +52,7 @@ def test_set_up_basic_logging_config(mocker):
 def test_get_parsed_command_line_arguments(mocker):
     mock_parse_args = mocker.patch("mfd_code_quality.utils.ArgumentParser.parse_args")
     mock_parse_args.return_value = Namespace(project_dir="/path/to/project")
-    get_parsed_args.cache_clear()  # Clear lru cache
+    _parse_command_line_args.cache_clear()  # Clear lru cache
     args = get_parsed_args()
     assert args.project_dir == "/path/to/project"
 
@@ -61,13 +77,132 @@ def test_set_current_working_directory_and_add_it_to_path(mocker):
 
 
 def test_install_packages_from_list(mocker):
-    mock_pip_main = mocker.patch("mfd_code_quality.utils.run")
+    mock_pip_main = mocker.patch("mfd_code_quality.runner.run_tool", return_value=MagicMock(returncode=0))
     sys_mock = mocker.patch("mfd_code_quality.utils.sys")
     sys_mock.executable = "python"
 
     path_to_reqs = "path/to/reqs"
     _install_packages(path_to_reqs)
 
-    mock_pip_main.assert_called_once_with(
-        ("python", "-m", "pip", "install", "-r", "path/to/reqs"), capture_output=True, text=True
-    )
+    mock_pip_main.assert_called_once_with(("python", "-m", "pip", "install", "-r", "path/to/reqs"), stream_logger=ANY)
+
+
+def test_install_packages_failure_is_summarized(mocker, caplog):
+    result = ToolResult(("pip", "install"), 1, "", "ERROR: No matching distribution found for missing\n", 1.0)
+    mocker.patch("mfd_code_quality.runner.run_tool", return_value=result)
+    with caplog.at_level(logging.WARNING):
+        _install_packages("path/to/reqs")
+    assert "'pip install' failed with exit code 1." in caplog.text
+    assert "No matching distribution found for missing" in caplog.text
+
+
+def test_get_cache_dir_is_created_and_ignored_by_git(mocker, tmp_path):
+    mocker.patch("mfd_code_quality.utils.get_root_dir", return_value=tmp_path)
+    cache_dir = get_cache_dir()
+    assert cache_dir == tmp_path / ".mfd_code_quality"
+    assert (cache_dir / ".gitignore").read_text() == "*\n"
+
+
+def test_environment_fingerprint_depends_on_installed_distributions(mocker):
+    distribution = mocker.Mock(metadata={"Name": "pkg"}, version="1.0")
+    mocker.patch("mfd_code_quality.utils.distributions", return_value=[distribution])
+    fingerprint = get_environment_fingerprint()
+    distribution.version = "2.0"
+    assert get_environment_fingerprint() != fingerprint
+
+
+def test_get_available_cpu_count_respects_cgroup_quota(mocker):
+    mocker.patch("mfd_code_quality.utils.os.sched_getaffinity", return_value=set(range(16)), create=True)
+    mocker.patch("mfd_code_quality.utils._get_cgroup_cpu_quota", return_value=3)
+    get_available_cpu_count.cache_clear()
+    assert get_available_cpu_count() == 3
+    get_available_cpu_count.cache_clear()
+
+
+def test_get_available_cpu_count_cgroup_v2(mocker):
+    mocker.patch("mfd_code_quality.utils.os.sched_getaffinity", return_value=set(range(16)), create=True)
+    mocker.patch("mfd_code_quality.utils.Path.read_text", return_value="150000 100000\n")
+    get_available_cpu_count.cache_clear()
+    assert get_available_cpu_count() == 2
+    get_available_cpu_count.cache_clear()
+
+
+def test_get_available_memory_respects_cgroup_limit(mocker):
+    files = {
+        "/proc/meminfo": "MemTotal: 1000 kB\nMemAvailable: 800 kB\n",
+        "/sys/fs/cgroup/memory.max": "500000\n",
+        "/sys/fs/cgroup/memory.current": "100000\n",
+    }
+
+    def read_text(path):
+        if str(path) not in files:
+            raise FileNotFoundError(path)
+        return files[str(path)]
+
+    mocker.patch("mfd_code_quality.utils.Path.read_text", autospec=True, side_effect=read_text)
+    assert get_available_memory() == 400000
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+
+
+@pytest.mark.parametrize("value", ["2", "a/4", "0/4", "5/4", "1/2/3"])
+def test_parse_shard_invalid(value):
+    with pytest.raises(ArgumentTypeError):
+        parse_shard(value)
+
+
+def test_get_run_id_is_shared_by_child_processes(monkeypatch):
+    monkeypatch.delenv("MFD_RUN_ID", raising=False)
+    run_id = get_run_id()
+    assert get_run_id() == run_id
+    assert os.environ["MFD_RUN_ID"] == run_id
+
+
+def test_get_run_dir_removes_old_runs(mocker, monkeypatch, tmp_path):
+    mocker.patch("mfd_code_quality.utils.get_cache_dir", return_value=tmp_path)
+    monkeypatch.setenv("MFD_RUN_ID", "new")
+    old_run, recent_run = tmp_path / "runs" / "old", tmp_path / "runs" / "recent"
+    old_run.mkdir(parents=True)
+    recent_run.mkdir()
+    os.utime(old_run, (0, 0))
+    assert get_run_dir("unit") == tmp_path / "runs" / "new" / "unit"
+    assert get_run_dir("system").is_dir()
+    assert sorted(path.name for path in (tmp_path / "runs").iterdir()) == ["new", "recent"]
+
+
+def test_publish_artifacts(monkeypatch, tmp_path):
+    monkeypatch.setenv("MFD_RUN_ID", "run")
+    run_dir, target_dir = tmp_path / "run", tmp_path / "root"
+    (run_dir / "htmlcov").mkdir(parents=True)
+    (run_dir / "htmlcov" / "index.html").write_text("new")
+    (run_dir / ".coverage").write_text("data")
+    (target_dir / "htmlcov").mkdir(parents=True)
+    (target_dir / "htmlcov" / "stale.html").write_text("old")
+    (target_dir / "coverage.xml").write_text("old")
+
+    assert publish_artifacts(run_dir, [".coverage", "htmlcov", "coverage.xml"], target_dir) == [".coverage", "htmlcov"]
+    assert (target_dir / ".coverage").read_text() == "data"
+    assert [path.name for path in (target_dir / "htmlcov").iterdir()] == ["index.html"]
+    assert not (target_dir / "coverage.xml").exists()
+    assert sorted(path.name for path in target_dir.iterdir()) == [".coverage", "htmlcov"]
+
+
+def test_write_file_atomically(tmp_path):
+    write_file_atomically(tmp_path / "cache.json", "{}")
+    assert [path.name for path in tmp_path.iterdir()] == ["cache.json"]
+    assert (tmp_path / "cache.json").read_text() == "{}"
+
+
+def test_get_package_names(tmp_path):
+    for package in ("pkg_b", "pkg_a", "pkg_a/sub", "tests"):
+        (tmp_path / package).mkdir()
+        (tmp_path / package / "__init__.py").touch()
+    assert get_package_names(tmp_path) == ["pkg_a", "pkg_b"]
+    assert get_package_name(tmp_path) == "pkg_a"
+
+
+def test_get_package_names_without_package(tmp_path):
+    with pytest.raises(Exception, match="No Python package was found"):
+        get_package_names(tmp_path)